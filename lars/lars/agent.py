@@ -55,6 +55,25 @@ def _parse_llm_response_content(content: Any) -> Any:
     return content
 
 
+def _is_rate_limit_error(error: Exception) -> bool:
+    """True for a provider 429: litellm.RateLimitError, or any error whose status (or response status) is 429."""
+    if isinstance(error, litellm.RateLimitError):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429
+
+
+def _retry_after_from_error(error: Exception) -> Optional[float]:
+    """Retry-After of a rate-limit error's HTTP response, if the provider sent one."""
+    from .embedding_client import parse_retry_after
+    try:
+        return parse_retry_after(error.response.headers.get("retry-after"))
+    except Exception:
+        return None
+
+
 def parse_ollama_model(model: str, config) -> Tuple[str, str]:
     """
     Parse ollama@host:port/model or ollama@alias/model format.
@@ -141,6 +160,106 @@ class Agent:
                 - tokens_out: Output tokens (NEW - blocking fetch)
                 - provider: Provider name (NEW)
         """
+        args, full_request, toon_transport_metrics = self._prepare_request(input_message, context_messages)
+
+        # Every provider call takes a slot from the process-wide scheduler, so
+        # nested thread pools can't exceed the per-provider limits
+        from .blocking_cost import extract_provider_from_model
+        from .llm_scheduler import estimate_tokens, get_llm_scheduler
+        scheduler = get_llm_scheduler()
+        provider = extract_provider_from_model(self.model)
+        estimated_tokens = estimate_tokens(args["messages"])
+
+        retries = 2
+        for attempt in range(retries + 1):
+            try:
+                import time
+                with scheduler.slot(provider, self.model, tokens=estimated_tokens) as ticket:
+                    # Track client-side latency (includes network + generation time, not queueing)
+                    start_time = time.time()
+                    try:
+                        response = litellm.completion(**args)
+                    except Exception as e:
+                        if _is_rate_limit_error(e):
+                            ticket.throttled(_retry_after_from_error(e))
+                        raise
+                    total_tokens = getattr(getattr(response, "usage", None), "total_tokens", None)
+                    ticket.complete(total_tokens if isinstance(total_tokens, int) else None)
+
+                # Calculate total duration (network + generation)
+                duration_ms = int((time.time() - start_time) * 1000)
+
+                return self._build_response(
+                    response, args, full_request, toon_transport_metrics, context_messages, provider, duration_ms
+                )
+
+            except Exception as e:
+                if _is_rate_limit_error(e) and attempt < retries:
+                    import time
+                    time.sleep(2 * (attempt + 1))
+                    continue
+                self._raise_llm_error(e, args, full_request, attempt)
+
+    async def arun(self, input_message: str | None = None, context_messages: List[Dict] | None = None) -> Dict[str, Any]:
+        """
+        Async run(): same request, retries and returned dict, via litellm.acompletion.
+
+        On the shared LLM loop (lars.async_llm), OpenAI-compatible providers
+        reuse one pooled keep-alive client, so thousands of concurrent calls
+        need neither a thread nor a fresh TLS handshake each.
+        """
+        import asyncio
+        import time
+        from .async_llm import get_llm_loop
+        from .blocking_cost import extract_provider_from_model
+        from .llm_scheduler import estimate_tokens, get_llm_scheduler
+
+        args, full_request, toon_transport_metrics = self._prepare_request(input_message, context_messages)
+
+        # OpenAI-compatible endpoints (OpenRouter, or an openai/ model on an explicit base_url)
+        llm_loop = get_llm_loop()
+        api_style = args.get("custom_llm_provider") or (self.model or "").split("/", 1)[0]
+        if llm_loop.in_loop() and api_style == "openai" and args.get("base_url"):
+            args["client"] = llm_loop.openai_client(args["base_url"], args.get("api_key"))
+
+        scheduler = get_llm_scheduler()
+        provider = extract_provider_from_model(self.model)
+        estimated_tokens = estimate_tokens(args["messages"])
+
+        retries = 2
+        for attempt in range(retries + 1):
+            try:
+                async with scheduler.aslot(provider, self.model, tokens=estimated_tokens) as ticket:
+                    start_time = time.time()
+                    try:
+                        response = await litellm.acompletion(**args)
+                    except Exception as e:
+                        if _is_rate_limit_error(e):
+                            ticket.throttled(_retry_after_from_error(e))
+                        raise
+                    total_tokens = getattr(getattr(response, "usage", None), "total_tokens", None)
+                    ticket.complete(total_tokens if isinstance(total_tokens, int) else None)
+
+                duration_ms = int((time.time() - start_time) * 1000)
+
+                return self._build_response(
+                    response, args, full_request, toon_transport_metrics, context_messages, provider, duration_ms
+                )
+
+            except Exception as e:
+                if _is_rate_limit_error(e) and attempt < retries:
+                    await asyncio.sleep(2 * (attempt + 1))
+                    continue
+                self._raise_llm_error(e, args, full_request, attempt)
+
+    def _prepare_request(self, input_message: str | None, context_messages: List[Dict] | None) -> Tuple[Dict[str, Any], Dict[str, Any], Dict | None]:
+        """
+        Build the litellm arguments for one turn.
+
+        Returns:
+            (args, full_request, toon_transport_metrics) - full_request is the
+            sanitized request as logged; args may carry TOON-encoded messages
+        """
         # Build messages array
         messages = []
 
@@ -357,430 +476,416 @@ class Agent:
         except Exception as e:
             logger.debug(f"TOON transport transformation failed: {e}")
 
-        retries = 2
-        for attempt in range(retries + 1):
-            try:
-                # Track client-side latency (includes network + generation time)
-                import time
-                start_time = time.time()
-
-                response = litellm.completion(**args)
+        return args, full_request, toon_transport_metrics
 
-                # Track LLM call for SQL Trail analytics (fire-and-forget)
-                try:
-                    from .caller_context import get_caller_id
-                    from .sql_trail import increment_llm_call
-                    caller_id = get_caller_id()
-                    if caller_id:
-                        increment_llm_call(caller_id)
-                except Exception:
-                    pass  # Don't fail the main path if tracking fails
+    def _build_response(self, response, args: Dict[str, Any], full_request: Dict[str, Any],
+                        toon_transport_metrics: Dict | None, context_messages: List[Dict] | None,
+                        provider: str, duration_ms: int) -> Dict[str, Any]:
+        """Turn a litellm response into the message dict returned by run()/arun()."""
+        message = response.choices[0].message
 
-                # Calculate total duration (network + generation)
-                duration_ms = int((time.time() - start_time) * 1000)
+        # Extract and parse content (may be TOON format)
+        raw_content = message.content if message.content is not None else ""
+        parsed_content = _parse_llm_response_content(raw_content)
 
-                message = response.choices[0].message
+        # Convert to dict
+        msg_dict = {
+            "role": message.role,
+            "content": parsed_content if isinstance(parsed_content, str) else raw_content,
+            "content_json": parsed_content if not isinstance(parsed_content, str) else None,
+            "id": response.id # Capture Request ID
+        }
+        if hasattr(message, "tool_calls") and message.tool_calls:
+            msg_dict["tool_calls"] = [
+                {
+                    "id": tc.id,
+                    "type": tc.type,
+                    "function": {
+                        "name": tc.function.name,
+                        "arguments": tc.function.arguments
+                    }
+                }
+                for tc in message.tool_calls
+            ]
+
+        # Handle images from image generation models
+        # Different providers return images in different formats:
+        # - OpenRouter (most models): message.images = [{"type": "image_url", "image_url": {"url": "data:..."}}]
+        # - Some models (seedream-4.5): message.images = [{"image_url": {"url": "data:..."}}]
+        # LiteLLM may not always expose 'images' as a direct attribute, so we try multiple extraction methods
+        raw_images = None
+
+        # Method 1: Direct attribute access (standard litellm models)
+        if hasattr(message, "images") and message.images:
+            raw_images = message.images
+
+        # Method 2: Try model_extra (Pydantic v2 stores extra fields here)
+        if not raw_images and hasattr(message, "model_extra"):
+            raw_images = message.model_extra.get("images") if message.model_extra else None
+
+        # Method 3: Try __dict__ (some models expose extra fields here)
+        if not raw_images and hasattr(message, "__dict__"):
+            raw_images = message.__dict__.get("images")
+
+        # Method 4: Try the raw Choice object (access from response.choices[0])
+        if not raw_images:
+            choice = response.choices[0]
+            # Try choice's model_extra
+            if hasattr(choice, "model_extra") and choice.model_extra:
+                choice_msg = choice.model_extra.get("message", {})
+                if isinstance(choice_msg, dict):
+                    raw_images = choice_msg.get("images")
+            # Try choice's __dict__
+            if not raw_images and hasattr(choice, "__dict__"):
+                choice_dict = choice.__dict__
+                if "message" in choice_dict and isinstance(choice_dict["message"], dict):
+                    raw_images = choice_dict["message"].get("images")
+
+        # Method 5: Try _raw_response if litellm preserved it
+        if not raw_images and hasattr(response, "_raw_response"):
+            try:
+                raw_resp = response._raw_response
+                if isinstance(raw_resp, dict):
+                    choices = raw_resp.get("choices", [])
+                    if choices and isinstance(choices[0], dict):
+                        msg = choices[0].get("message", {})
+                        raw_images = msg.get("images") if isinstance(msg, dict) else None
+            except Exception:
+                pass
 
-                # Extract and parse content (may be TOON format)
-                raw_content = message.content if message.content is not None else ""
-                parsed_content = _parse_llm_response_content(raw_content)
+        # Normalize image format and store (with deduplication)
+        if raw_images:
+            normalized_images = []
+            seen_urls = set()  # Track unique image URLs to prevent duplicates
+
+            for img in raw_images:
+                url = None
+                normalized_img = None
+
+                if isinstance(img, dict):
+                    # Format 1: {"type": "image_url", "image_url": {"url": "..."}}
+                    # Format 2: {"image_url": {"url": "..."}}
+                    url = img.get("image_url", {}).get("url", "")
+                    normalized_img = img
+                elif isinstance(img, str) and img.startswith("data:"):
+                    # Some models might return raw data URLs
+                    url = img
+                    normalized_img = {"image_url": {"url": img}}
+
+                # Deduplicate based on URL (or first 100 chars of base64 for efficiency)
+                if url and normalized_img:
+                    # Use a fingerprint: mime type + first 100 chars of base64 data
+                    # This catches identical images even if full URL is massive
+                    url_fingerprint = url[:200] if url.startswith("data:") else url
+                    if url_fingerprint not in seen_urls:
+                        seen_urls.add(url_fingerprint)
+                        normalized_images.append(normalized_img)
+
+            if normalized_images:
+                msg_dict["images"] = normalized_images
+
+        # Handle videos from video generation models
+        # Similar extraction methods as images, looking for:
+        # - {"type": "video_url", "video_url": {"url": "data:video/mp4;base64,..."}}
+        # - {"video_url": {"url": "data:video/mp4;base64,..."}}
+        # - Raw data URLs: "data:video/mp4;base64,..."
+        raw_videos = None
+
+        # Method 1: Direct attribute access
+        if hasattr(message, "videos") and message.videos:
+            raw_videos = message.videos
+
+        # Method 2: Try model_extra (Pydantic v2)
+        if not raw_videos and hasattr(message, "model_extra"):
+            raw_videos = message.model_extra.get("videos") if message.model_extra else None
+
+        # Method 3: Try __dict__
+        if not raw_videos and hasattr(message, "__dict__"):
+            raw_videos = message.__dict__.get("videos")
+
+        # Method 4: Try the raw Choice object
+        if not raw_videos:
+            choice = response.choices[0]
+            if hasattr(choice, "model_extra") and choice.model_extra:
+                choice_msg = choice.model_extra.get("message", {})
+                if isinstance(choice_msg, dict):
+                    raw_videos = choice_msg.get("videos")
+            if not raw_videos and hasattr(choice, "__dict__"):
+                choice_dict = choice.__dict__
+                if "message" in choice_dict and isinstance(choice_dict["message"], dict):
+                    raw_videos = choice_dict["message"].get("videos")
+
+        # Method 5: Try _raw_response
+        if not raw_videos and hasattr(response, "_raw_response"):
+            try:
+                raw_resp = response._raw_response
+                if isinstance(raw_resp, dict):
+                    choices = raw_resp.get("choices", [])
+                    if choices and isinstance(choices[0], dict):
+                        msg = choices[0].get("message", {})
+                        raw_videos = msg.get("videos") if isinstance(msg, dict) else None
+            except Exception:
+                pass
 
-                # Convert to dict
-                msg_dict = {
-                    "role": message.role,
-                    "content": parsed_content if isinstance(parsed_content, str) else raw_content,
-                    "content_json": parsed_content if not isinstance(parsed_content, str) else None,
-                    "id": response.id # Capture Request ID
-                }
-                if hasattr(message, "tool_calls") and message.tool_calls:
-                    msg_dict["tool_calls"] = [
-                        {
-                            "id": tc.id,
-                            "type": tc.type,
-                            "function": {
-                                "name": tc.function.name,
-                                "arguments": tc.function.arguments
-                            }
-                        }
-                        for tc in message.tool_calls
-                    ]
-
-                # Handle images from image generation models
-                # Different providers return images in different formats:
-                # - OpenRouter (most models): message.images = [{"type": "image_url", "image_url": {"url": "data:..."}}]
-                # - Some models (seedream-4.5): message.images = [{"image_url": {"url": "data:..."}}]
-                # LiteLLM may not always expose 'images' as a direct attribute, so we try multiple extraction methods
-                raw_images = None
-
-                # Method 1: Direct attribute access (standard litellm models)
-                if hasattr(message, "images") and message.images:
-                    raw_images = message.images
-
-                # Method 2: Try model_extra (Pydantic v2 stores extra fields here)
-                if not raw_images and hasattr(message, "model_extra"):
-                    raw_images = message.model_extra.get("images") if message.model_extra else None
-
-                # Method 3: Try __dict__ (some models expose extra fields here)
-                if not raw_images and hasattr(message, "__dict__"):
-                    raw_images = message.__dict__.get("images")
-
-                # Method 4: Try the raw Choice object (access from response.choices[0])
-                if not raw_images:
-                    choice = response.choices[0]
-                    # Try choice's model_extra
-                    if hasattr(choice, "model_extra") and choice.model_extra:
-                        choice_msg = choice.model_extra.get("message", {})
-                        if isinstance(choice_msg, dict):
-                            raw_images = choice_msg.get("images")
-                    # Try choice's __dict__
-                    if not raw_images and hasattr(choice, "__dict__"):
-                        choice_dict = choice.__dict__
-                        if "message" in choice_dict and isinstance(choice_dict["message"], dict):
-                            raw_images = choice_dict["message"].get("images")
-
-                # Method 5: Try _raw_response if litellm preserved it
-                if not raw_images and hasattr(response, "_raw_response"):
-                    try:
-                        raw_resp = response._raw_response
-                        if isinstance(raw_resp, dict):
-                            choices = raw_resp.get("choices", [])
-                            if choices and isinstance(choices[0], dict):
-                                msg = choices[0].get("message", {})
-                                raw_images = msg.get("images") if isinstance(msg, dict) else None
-                    except Exception:
-                        pass
-
-                # Normalize image format and store (with deduplication)
-                if raw_images:
-                    normalized_images = []
-                    seen_urls = set()  # Track unique image URLs to prevent duplicates
-
-                    for img in raw_images:
-                        url = None
-                        normalized_img = None
-
-                        if isinstance(img, dict):
-                            # Format 1: {"type": "image_url", "image_url": {"url": "..."}}
-                            # Format 2: {"image_url": {"url": "..."}}
-                            url = img.get("image_url", {}).get("url", "")
-                            normalized_img = img
-                        elif isinstance(img, str) and img.startswith("data:"):
-                            # Some models might return raw data URLs
-                            url = img
-                            normalized_img = {"image_url": {"url": img}}
-
-                        # Deduplicate based on URL (or first 100 chars of base64 for efficiency)
-                        if url and normalized_img:
-                            # Use a fingerprint: mime type + first 100 chars of base64 data
-                            # This catches identical images even if full URL is massive
-                            url_fingerprint = url[:200] if url.startswith("data:") else url
-                            if url_fingerprint not in seen_urls:
-                                seen_urls.add(url_fingerprint)
-                                normalized_images.append(normalized_img)
-
-                    if normalized_images:
-                        msg_dict["images"] = normalized_images
-
-                # Handle videos from video generation models
-                # Similar extraction methods as images, looking for:
-                # - {"type": "video_url", "video_url": {"url": "data:video/mp4;base64,..."}}
-                # - {"video_url": {"url": "data:video/mp4;base64,..."}}
-                # - Raw data URLs: "data:video/mp4;base64,..."
-                raw_videos = None
-
-                # Method 1: Direct attribute access
-                if hasattr(message, "videos") and message.videos:
-                    raw_videos = message.videos
-
-                # Method 2: Try model_extra (Pydantic v2)
-                if not raw_videos and hasattr(message, "model_extra"):
-                    raw_videos = message.model_extra.get("videos") if message.model_extra else None
-
-                # Method 3: Try __dict__
-                if not raw_videos and hasattr(message, "__dict__"):
-                    raw_videos = message.__dict__.get("videos")
-
-                # Method 4: Try the raw Choice object
-                if not raw_videos:
-                    choice = response.choices[0]
-                    if hasattr(choice, "model_extra") and choice.model_extra:
-                        choice_msg = choice.model_extra.get("message", {})
-                        if isinstance(choice_msg, dict):
-                            raw_videos = choice_msg.get("videos")
-                    if not raw_videos and hasattr(choice, "__dict__"):
-                        choice_dict = choice.__dict__
-                        if "message" in choice_dict and isinstance(choice_dict["message"], dict):
-                            raw_videos = choice_dict["message"].get("videos")
-
-                # Method 5: Try _raw_response
-                if not raw_videos and hasattr(response, "_raw_response"):
-                    try:
-                        raw_resp = response._raw_response
-                        if isinstance(raw_resp, dict):
-                            choices = raw_resp.get("choices", [])
-                            if choices and isinstance(choices[0], dict):
-                                msg = choices[0].get("message", {})
-                                raw_videos = msg.get("videos") if isinstance(msg, dict) else None
-                    except Exception:
-                        pass
-
-                # Normalize video format and store (with deduplication)
-                if raw_videos:
-                    normalized_videos = []
-                    seen_urls = set()
-
-                    for vid in raw_videos:
-                        url = None
-                        normalized_vid = None
-
-                        if isinstance(vid, dict):
-                            # Format 1: {"type": "video_url", "video_url": {"url": "..."}}
-                            # Format 2: {"video_url": {"url": "..."}}
-                            url = vid.get("video_url", {}).get("url", "")
-                            normalized_vid = vid
-                        elif isinstance(vid, str) and vid.startswith("data:video"):
-                            # Raw data URL
-                            url = vid
-                            normalized_vid = {"video_url": {"url": vid}}
-
-                        # Deduplicate based on URL fingerprint
-                        if url and normalized_vid:
-                            url_fingerprint = url[:200] if url.startswith("data:") else url
-                            if url_fingerprint not in seen_urls:
-                                seen_urls.add(url_fingerprint)
-                                normalized_videos.append(normalized_vid)
-
-                    if normalized_videos:
-                        msg_dict["videos"] = normalized_videos
-
-                # Capture full response
-                full_response = {
-                    "id": response.id,
-                    "model": response.model if hasattr(response, 'model') else self.model,
-                    "choices": [{
-                        "message": msg_dict,
-                        "finish_reason": response.choices[0].finish_reason if hasattr(response.choices[0], 'finish_reason') else None
-                    }],
-                    "usage": {
-                        "prompt_tokens": response.usage.prompt_tokens if hasattr(response, 'usage') and hasattr(response.usage, 'prompt_tokens') else 0,
-                        "completion_tokens": response.usage.completion_tokens if hasattr(response, 'usage') and hasattr(response.usage, 'completion_tokens') else 0,
-                        "total_tokens": response.usage.total_tokens if hasattr(response, 'usage') and hasattr(response.usage, 'total_tokens') else 0
-                    } if hasattr(response, 'usage') else None
-                }
+        # Normalize video format and store (with deduplication)
+        if raw_videos:
+            normalized_videos = []
+            seen_urls = set()
+
+            for vid in raw_videos:
+                url = None
+                normalized_vid = None
+
+                if isinstance(vid, dict):
+                    # Format 1: {"type": "video_url", "video_url": {"url": "..."}}
+                    # Format 2: {"video_url": {"url": "..."}}
+                    url = vid.get("video_url", {}).get("url", "")
+                    normalized_vid = vid
+                elif isinstance(vid, str) and vid.startswith("data:video"):
+                    # Raw data URL
+                    url = vid
+                    normalized_vid = {"video_url": {"url": vid}}
+
+                # Deduplicate based on URL fingerprint
+                if url and normalized_vid:
+                    url_fingerprint = url[:200] if url.startswith("data:") else url
+                    if url_fingerprint not in seen_urls:
+                        seen_urls.add(url_fingerprint)
+                        normalized_videos.append(normalized_vid)
+
+            if normalized_videos:
+                msg_dict["videos"] = normalized_videos
+
+        # Capture full response
+        full_response = {
+            "id": response.id,
+            "model": response.model if hasattr(response, 'model') else self.model,
+            "choices": [{
+                "message": msg_dict,
+                "finish_reason": response.choices[0].finish_reason if hasattr(response.choices[0], 'finish_reason') else None
+            }],
+            "usage": {
+                "prompt_tokens": response.usage.prompt_tokens if hasattr(response, 'usage') and hasattr(response.usage, 'prompt_tokens') else 0,
+                "completion_tokens": response.usage.completion_tokens if hasattr(response, 'usage') and hasattr(response.usage, 'completion_tokens') else 0,
+                "total_tokens": response.usage.total_tokens if hasattr(response, 'usage') and hasattr(response.usage, 'total_tokens') else 0
+            } if hasattr(response, 'usage') else None
+        }
 
-                # NON-BLOCKING: Don't fetch cost here - let the unified logger handle it
-                # The logger will queue this message and fetch cost in a background worker
-                # after a delay (OpenRouter needs ~3-5 seconds to have cost data available)
-
-                # Extract provider from model name (no API call needed)
-                from .blocking_cost import extract_provider_from_model
-                provider = extract_provider_from_model(self.model)
-
-                # Extract token counts from response (available immediately from LiteLLM)
-                tokens_in = 0
-                tokens_out = 0
-                tokens_reasoning = None
-                if hasattr(response, 'usage'):
-                    tokens_in = response.usage.prompt_tokens if hasattr(response.usage, 'prompt_tokens') else 0
-                    tokens_out = response.usage.completion_tokens if hasattr(response.usage, 'completion_tokens') else 0
-
-                    # Try different field names for reasoning tokens
-                    if hasattr(response.usage, 'reasoning_tokens'):
-                        tokens_reasoning = response.usage.reasoning_tokens
-                    elif hasattr(response.usage, 'thinking_tokens'):
-                        tokens_reasoning = response.usage.thinking_tokens
-
-                # Cost handling:
-                # - Ollama: cost=0 (local/free), no need to fetch
-                # - Vertex AI: cost calculated immediately from token counts
-                # - Azure AI: cost calculated immediately from token counts
-                # - OpenRouter: cost=None (will be fetched by unified logger)
+        # NON-BLOCKING: Don't fetch cost here - let the unified logger handle it
+        # The logger will queue this message and fetch cost in a background worker
+        # after a delay (OpenRouter needs ~3-5 seconds to have cost data available)
+
+        # Extract token counts from response (available immediately from LiteLLM)
+        tokens_in = 0
+        tokens_out = 0
+        tokens_reasoning = None
+        if hasattr(response, 'usage'):
+            tokens_in = response.usage.prompt_tokens if hasattr(response.usage, 'prompt_tokens') else 0
+            tokens_out = response.usage.completion_tokens if hasattr(response.usage, 'completion_tokens') else 0
+
+            # Try different field names for reasoning tokens
+            if hasattr(response.usage, 'reasoning_tokens'):
+                tokens_reasoning = response.usage.reasoning_tokens
+            elif hasattr(response.usage, 'thinking_tokens'):
+                tokens_reasoning = response.usage.thinking_tokens
+
+        # Cost handling:
+        # - Ollama: cost=0 (local/free), no need to fetch
+        # - Vertex AI: cost calculated immediately from token counts
+        # - Azure AI: cost calculated immediately from token counts
+        # - OpenRouter: cost=None (will be fetched by unified logger)
+        cost = None
+        if provider == "ollama":
+            cost = 0.0  # Local models are free
+        elif provider == "vertex_ai":
+            # Calculate Vertex AI cost immediately (no per-request cost API)
+            try:
+                from .vertex_cost import calculate_vertex_cost
+                cost = calculate_vertex_cost(
+                    model=self.model,
+                    tokens_in=tokens_in,
+                    tokens_out=tokens_out,
+                )
+            except Exception as e:
+                logger.warning(f"Failed to calculate Vertex AI cost: {e}")
                 cost = None
-                if provider == "ollama":
-                    cost = 0.0  # Local models are free
-                elif provider == "vertex_ai":
-                    # Calculate Vertex AI cost immediately (no per-request cost API)
-                    try:
-                        from .vertex_cost import calculate_vertex_cost
-                        cost = calculate_vertex_cost(
-                            model=self.model,
-                            tokens_in=tokens_in,
-                            tokens_out=tokens_out,
-                        )
-                    except Exception as e:
-                        logger.warning(f"Failed to calculate Vertex AI cost: {e}")
-                        cost = None
-                elif provider == "azure":
-                    # Calculate Azure OpenAI cost immediately (no per-request cost API)
-                    try:
-                        from .azure_cost import calculate_azure_cost
-                        cost = calculate_azure_cost(
-                            model=self.model,
-                            tokens_in=tokens_in,
-                            tokens_out=tokens_out,
-                        )
-                    except Exception as e:
-                        logger.warning(f"Failed to calculate Azure OpenAI cost: {e}")
-                        cost = None
-
-                # Build TOON telemetry from transport metrics
-                # ALWAYS log baseline metrics for analytics, even if no transforms occurred
-                toon_telemetry = {}
-
-                if toon_transport_metrics:
-                    # Calculate total content size across all messages for baseline
-                    total_content_size = sum(
-                        len(m.get("content", "")) for m in args.get("messages", [])
-                        if isinstance(m.get("content"), str)
-                    )
-
-                    if toon_transport_metrics.get("total_transforms", 0) > 0:
-                        # TOON was used - log full metrics
-                        toon_telemetry = {
-                            "data_format": "toon",
-                            "data_size_json": toon_transport_metrics.get("total_json_size"),
-                            "data_size_toon": toon_transport_metrics.get("total_toon_size"),
-                            "data_token_savings_pct": toon_transport_metrics.get("savings_pct"),
-                            "toon_transforms": toon_transport_metrics.get("total_transforms"),
-                            "toon_messages_modified": toon_transport_metrics.get("messages_modified"),
-                            "total_content_size": total_content_size,
-                            "data_rows": toon_transport_metrics.get("data_rows"),
-                            "data_columns": toon_transport_metrics.get("data_columns"),
-                        }
-                        logger.info(
-                            f"[TOON] Transformed {toon_transport_metrics.get('total_transforms')} arrays, "
-                            f"saved {toon_transport_metrics.get('savings_pct')}% "
-                            f"({toon_transport_metrics.get('total_savings_chars')} chars)"
-                        )
-                    else:
-                        # No transforms - log baseline for comparison
-                        toon_telemetry = {
-                            "data_format": "json",  # No TOON used
-                            "data_size_json": total_content_size,  # Baseline size
-                            "data_size_toon": None,
-                            "data_token_savings_pct": None,
-                            "toon_transforms": 0,
-                            "toon_messages_modified": 0,
-                            "total_content_size": total_content_size,
-                            "toon_skip_reason": "no_eligible_arrays",
-                            "data_rows": toon_transport_metrics.get("data_rows"),
-                            "data_columns": toon_transport_metrics.get("data_columns"),
-                        }
-
-                # Also aggregate from context messages (legacy path)
-                if context_messages:
-                    for msg in context_messages:
-                        if isinstance(msg, dict) and "metadata" in msg:
-                            msg_toon = msg.get("metadata", {}).get("toon_telemetry")
-                            if msg_toon:
-                                # Aggregate telemetry from multiple context messages
-                                if not toon_telemetry:
-                                    toon_telemetry = msg_toon.copy()
-                                else:
-                                    # Sum up sizes if multiple TOON-encoded messages
-                                    # Use `or 0` since .get() returns None if key exists with None value
-                                    if msg_toon.get("data_size_json"):
-                                        toon_telemetry["data_size_json"] = (toon_telemetry.get("data_size_json") or 0) + msg_toon["data_size_json"]
-                                    if msg_toon.get("data_size_toon"):
-                                        toon_telemetry["data_size_toon"] = (toon_telemetry.get("data_size_toon") or 0) + msg_toon["data_size_toon"]
-
-                # Add metadata to response
-                msg_dict.update({
-                    "full_request": full_request,
-                    "full_response": full_response,
-                    "model": response.model if hasattr(response, 'model') else self.model,
-                    "model_requested": self.model_requested,  # Original model string with reasoning spec
-                    "cost": cost,  # 0.0 for Ollama, None for OpenRouter (fetched later)
-                    "tokens_in": tokens_in,  # Use immediate counts from LiteLLM
-                    "tokens_out": tokens_out,  # Use immediate counts from LiteLLM
-                    "tokens_reasoning": tokens_reasoning,
-                    "provider": provider,
-                    "duration_ms": duration_ms,  # Client-side latency (will be overwritten by server-side time from OpenRouter if available)
-                    # Reasoning config info for logging
-                    "reasoning_enabled": self.reasoning_config is not None,
-                    "reasoning_effort": self.reasoning_config.effort if self.reasoning_config else None,
-                    "reasoning_max_tokens": self.reasoning_config.max_tokens if self.reasoning_config else None,
-                    # TOON telemetry (if any)
-                    "toon_telemetry": toon_telemetry if toon_telemetry else None,
-                })
-
-                return msg_dict
-                
+        elif provider == "azure":
+            # Calculate Azure OpenAI cost immediately (no per-request cost API)
+            try:
+                from .azure_cost import calculate_azure_cost
+                cost = calculate_azure_cost(
+                    model=self.model,
+                    tokens_in=tokens_in,
+                    tokens_out=tokens_out,
+                )
             except Exception as e:
-                if "RateLimit" in str(e) and attempt < retries:
-                    import time
-                    time.sleep(2 * (attempt + 1))
-                    continue
+                logger.warning(f"Failed to calculate Azure OpenAI cost: {e}")
+                cost = None
 
-                # If final attempt or other error, log detailed error information
-                import json
+        # Track LLM call for SQL Trail analytics (in-memory, written at query completion)
+        try:
+            from .caller_context import get_caller_id
+            from .sql_trail import record_llm_call
+            caller_id = get_caller_id()
+            if caller_id:
+                record_llm_call(caller_id, tokens_in=tokens_in, tokens_out=tokens_out, cost=cost)
+        except Exception:
+            pass  # Don't fail the main path if tracking fails
+
+        # Build TOON telemetry from transport metrics
+        # ALWAYS log baseline metrics for analytics, even if no transforms occurred
+        toon_telemetry = {}
+
+        if toon_transport_metrics:
+            # Calculate total content size across all messages for baseline
+            total_content_size = sum(
+                len(m.get("content", "")) for m in args.get("messages", [])
+                if isinstance(m.get("content"), str)
+            )
 
-                # Extract detailed error information
-                error_info = {
-                    "error_type": type(e).__name__,
-                    "error_message": str(e),
-                    "attempt": attempt + 1,
+            if toon_transport_metrics.get("total_transforms", 0) > 0:
+                # TOON was used - log full metrics
+                toon_telemetry = {
+                    "data_format": "toon",
+                    "data_size_json": toon_transport_metrics.get("total_json_size"),
+                    "data_size_toon": toon_transport_metrics.get("total_toon_size"),
+                    "data_token_savings_pct": toon_transport_metrics.get("savings_pct"),
+                    "toon_transforms": toon_transport_metrics.get("total_transforms"),
+                    "toon_messages_modified": toon_transport_metrics.get("messages_modified"),
+                    "total_content_size": total_content_size,
+                    "data_rows": toon_transport_metrics.get("data_rows"),
+                    "data_columns": toon_transport_metrics.get("data_columns"),
+                }
+                logger.info(
+                    f"[TOON] Transformed {toon_transport_metrics.get('total_transforms')} arrays, "
+                    f"saved {toon_transport_metrics.get('savings_pct')}% "
+                    f"({toon_transport_metrics.get('total_savings_chars')} chars)"
+                )
+            else:
+                # No transforms - log baseline for comparison
+                toon_telemetry = {
+                    "data_format": "json",  # No TOON used
+                    "data_size_json": total_content_size,  # Baseline size
+                    "data_size_toon": None,
+                    "data_token_savings_pct": None,
+                    "toon_transforms": 0,
+                    "toon_messages_modified": 0,
+                    "total_content_size": total_content_size,
+                    "toon_skip_reason": "no_eligible_arrays",
+                    "data_rows": toon_transport_metrics.get("data_rows"),
+                    "data_columns": toon_transport_metrics.get("data_columns"),
                 }
 
-                # Try to get HTTP response details if available
-                if hasattr(e, 'response'):
-                    try:
-                        error_info["status_code"] = e.response.status_code
-                        error_info["response_headers"] = dict(e.response.headers)
-                        error_info["response_body"] = e.response.text[:1000]  # Truncate to 1000 chars
-                    except:
-                        pass
-
-                # Try to get litellm-specific attributes
-                if hasattr(e, '__dict__'):
-                    error_info["error_attributes"] = {k: str(v)[:200] for k, v in e.__dict__.items() if not k.startswith('_')}
-
-                # Extract more useful error message if the primary message is empty/unhelpful
-                # This happens with litellm parsing errors (e.g., image generation failures)
-                enhanced_message = error_info["error_message"]
-                if not enhanced_message or enhanced_message.strip().endswith('-'):
-                    # Try to get message from response body
-                    if "response_body" in error_info and error_info["response_body"]:
-                        enhanced_message += f"\nResponse: {error_info['response_body'][:500]}"
-
-                    # Try to get message from litellm_debug_info
-                    if "error_attributes" in error_info:
-                        debug_info = error_info["error_attributes"].get("litellm_debug_info")
-                        if debug_info:
-                            enhanced_message += f"\n{debug_info}"
-
-                        # Check for actual error message in attributes
-                        msg_attr = error_info["error_attributes"].get("message")
-                        if msg_attr and msg_attr != enhanced_message:
-                            enhanced_message += f"\nDetails: {msg_attr}"
-
-                    # If still empty, give a generic but useful message
-                    if enhanced_message.strip().endswith('-'):
-                        enhanced_message += " (API returned no error details - possible response parsing failure or transient issue)"
-
-                    error_info["enhanced_message"] = enhanced_message
-
-                # Log to echo system
-                log_message(None, "system", f"LLM API Error: {error_info['error_type']}: {enhanced_message}",
-                           metadata=error_info, node_type="error")
-
-                # Print detailed error to console
-                print(f"\n[ERROR] LLM Call Failed:")
-                print(f"  Error Type: {error_info['error_type']}")
-                print(f"  Error Message: {enhanced_message}")
-                if "status_code" in error_info:
-                    print(f"  HTTP Status: {error_info['status_code']}")
-                    print(f"  Response Body: {error_info.get('response_body', 'N/A')}")
-                print(f"\n  Request Payload (messages):")
-                print(json.dumps(args.get('messages', []), indent=2, default=str))
-                print(f"\n  Full Error Details:")
-                print(json.dumps(error_info, indent=2, default=str))
-
-                # Re-raise with enhanced message and full_request attached for upstream logging
-                # This allows runner to capture the request even on failure
-                e.full_request = full_request
-                e.enhanced_message = enhanced_message  # Attach enhanced message to exception
-                raise e
+        # Also aggregate from context messages (legacy path)
+        if context_messages:
+            for msg in context_messages:
+                if isinstance(msg, dict) and "metadata" in msg:
+                    msg_toon = msg.get("metadata", {}).get("toon_telemetry")
+                    if msg_toon:
+                        # Aggregate telemetry from multiple context messages
+                        if not toon_telemetry:
+                            toon_telemetry = msg_toon.copy()
+                        else:
+                            # Sum up sizes if multiple TOON-encoded messages
+                            # Use `or 0` since .get() returns None if key exists with None value
+                            if msg_toon.get("data_size_json"):
+                                toon_telemetry["data_size_json"] = (toon_telemetry.get("data_size_json") or 0) + msg_toon["data_size_json"]
+                            if msg_toon.get("data_size_toon"):
+                                toon_telemetry["data_size_toon"] = (toon_telemetry.get("data_size_toon") or 0) + msg_toon["data_size_toon"]
+
+        # Add metadata to response
+        msg_dict.update({
+            "full_request": full_request,
+            "full_response": full_response,
+            "model": response.model if hasattr(response, 'model') else self.model,
+            "model_requested": self.model_requested,  # Original model string with reasoning spec
+            "cost": cost,  # 0.0 for Ollama, None for OpenRouter (fetched later)
+            "tokens_in": tokens_in,  # Use immediate counts from LiteLLM
+            "tokens_out": tokens_out,  # Use immediate counts from LiteLLM
+            "tokens_reasoning": tokens_reasoning,
+            "provider": provider,
+            "duration_ms": duration_ms,  # Client-side latency (will be overwritten by server-side time from OpenRouter if available)
+            # Reasoning config info for logging
+            "reasoning_enabled": self.reasoning_config is not None,
+            "reasoning_effort": self.reasoning_config.effort if self.reasoning_config else None,
+            "reasoning_max_tokens": self.reasoning_config.max_tokens if self.reasoning_config else None,
+            # TOON telemetry (if any)
+            "toon_telemetry": toon_telemetry if toon_telemetry else None,
+        })
+
+        return msg_dict
+
+    def _raise_llm_error(self, e: Exception, args: Dict[str, Any], full_request: Dict[str, Any], attempt: int):
+        """Log a failed LLM call in detail and re-raise it with full_request attached."""
+        # If final attempt or other error, log detailed error information
+        import json
+
+        # Extract detailed error information
+        error_info = {
+            "error_type": type(e).__name__,
+            "error_message": str(e),
+            "attempt": attempt + 1,
+        }
+
+        # Try to get HTTP response details if available
+        if hasattr(e, 'response'):
+            try:
+                error_info["status_code"] = e.response.status_code
+                error_info["response_headers"] = dict(e.response.headers)
+                error_info["response_body"] = e.response.text[:1000]  # Truncate to 1000 chars
+            except:
+                pass
+
+        # Try to get litellm-specific attributes
+        if hasattr(e, '__dict__'):
+            error_info["error_attributes"] = {k: str(v)[:200] for k, v in e.__dict__.items() if not k.startswith('_')}
+
+        # Extract more useful error message if the primary message is empty/unhelpful
+        # This happens with litellm parsing errors (e.g., image generation failures)
+        enhanced_message = error_info["error_message"]
+        if not enhanced_message or enhanced_message.strip().endswith('-'):
+            # Try to get message from response body
+            if "response_body" in error_info and error_info["response_body"]:
+                enhanced_message += f"\nResponse: {error_info['response_body'][:500]}"
+
+            # Try to get message from litellm_debug_info
+            if "error_attributes" in error_info:
+                debug_info = error_info["error_attributes"].get("litellm_debug_info")
+                if debug_info:
+                    enhanced_message += f"\n{debug_info}"
+
+                # Check for actual error message in attributes
+                msg_attr = error_info["error_attributes"].get("message")
+                if msg_attr and msg_attr != enhanced_message:
+                    enhanced_message += f"\nDetails: {msg_attr}"
+
+            # If still empty, give a generic but useful message
+            if enhanced_message.strip().endswith('-'):
+                enhanced_message += " (API returned no error details - possible response parsing failure or transient issue)"
+
+            error_info["enhanced_message"] = enhanced_message
+
+        # Log to echo system
+        log_message(None, "system", f"LLM API Error: {error_info['error_type']}: {enhanced_message}",
+                   metadata=error_info, node_type="error")
+
+        # Print detailed error to console
+        print(f"\n[ERROR] LLM Call Failed:")
+        print(f"  Error Type: {error_info['error_type']}")
+        print(f"  Error Message: {enhanced_message}")
+        if "status_code" in error_info:
+            print(f"  HTTP Status: {error_info['status_code']}")
+            print(f"  Response Body: {error_info.get('response_body', 'N/A')}")
+        print(f"\n  Request Payload (messages):")
+        print(json.dumps(args.get('messages', []), indent=2, default=str))
+        print(f"\n  Full Error Details:")
+        print(json.dumps(error_info, indent=2, default=str))
+
+        # Re-raise with enhanced message and full_request attached for upstream logging
+        # This allows runner to capture the request even on failure
+        e.full_request = full_request
+        e.enhanced_message = enhanced_message  # Attach enhanced message to exception
+        raise e
 
     @classmethod
     def embed(
@@ -800,8 +905,13 @@ class Agent:
         Set LARS_EMBED_BACKEND=deterministic for offline/testing mode.
 
         Features:
-        - Automatic batching for large text lists (default 50 texts per batch)
-        - Retry with exponential backoff for transient failures
+        - Embedding cache (LARS_EMBED_CACHE): texts already embedded with this
+          model are served from memory/ClickHouse; only misses (deduplicated)
+          are sent to the provider, and results are returned in input order
+        - Batching by text count and characters (LARS_EMBED_BATCH_SIZE,
+          LARS_EMBED_BATCH_MAX_CHARS), batches sent concurrently over a shared
+          keep-alive client (LARS_EMBED_CONCURRENCY)
+        - Retry with exponential backoff for transient failures; 429s honour Retry-After
         - 5 minute timeout per batch for large embedding requests
 
         Returns:
@@ -809,14 +919,12 @@ class Agent:
                 - embeddings: List of embedding vectors
                 - model: Model used
                 - dim: Embedding dimension
-                - request_id: Provider request ID
+                - request_id: Provider request ID (None if every text was cached)
                 - tokens: Total tokens used
                 - provider: Provider name
+                - cache_hits: Number of texts served from the cache
         """
         import os
-        import hashlib
-        import math
-        import time
 
         cfg = get_config()
 
@@ -828,83 +936,39 @@ class Agent:
         # Use provided model or fall back to default embedding model
         embed_model = model or cfg.default_embed_model
 
-        # Batching config - most embedding APIs have limits on batch size
-        batch_size = int(os.getenv("LARS_EMBED_BATCH_SIZE", "50"))
-        max_retries = 3
-        base_delay = 2.0  # seconds
-
-        # Direct HTTP call to embeddings endpoint - same pattern as chat completions
-        import httpx
+        from .embedding_cache import get_embedding_cache
+        cache = get_embedding_cache()
+        cached = cache.get_many(embed_model, texts) if cache else {}
 
-        url = f"{cfg.provider_base_url.rstrip('/')}/embeddings"
-        headers = {
-            "Authorization": f"Bearer {cfg.provider_api_key}",
-            "Content-Type": "application/json",
-        }
+        # Distinct texts the cache could not answer, in first-seen order
+        pending = list(dict.fromkeys(text for i, text in enumerate(texts) if i not in cached))
 
-        # Process in batches with retry logic
-        all_vectors = []
+        fresh: Dict[str, List[float]] = {}
         total_tokens = 0
         last_request_id = None
         model_used = embed_model
-        dim = None
-
-        # Use longer timeout (5 minutes) for embedding requests which can be slow
-        with httpx.Client(timeout=300.0) as client:
-            for batch_start in range(0, len(texts), batch_size):
-                batch_texts = texts[batch_start:batch_start + batch_size]
-                payload = {
-                    "model": embed_model,
-                    "input": batch_texts,
-                }
-
-                # Retry loop with exponential backoff
-                last_error = None
-                for attempt in range(max_retries):
-                    try:
-                        resp = client.post(url, json=payload, headers=headers)
-                        resp.raise_for_status()
-                        try:
-                            data = resp.json()
-                        except Exception as e:
-                            raise RuntimeError(f"Failed to parse embedding response as JSON. Status: {resp.status_code}, Body: {resp.text[:500]}") from e
-
-                        embeddings_data = data.get("data", [])
-                        if not embeddings_data:
-                            raise RuntimeError(f"No embedding data returned: {data}")
-
-                        batch_vectors = [d["embedding"] for d in embeddings_data]
-                        if not batch_vectors or not batch_vectors[0]:
-                            raise RuntimeError("Empty embedding response")
-
-                        all_vectors.extend(batch_vectors)
-
-                        # Track metadata from last successful batch
-                        if dim is None:
-                            dim = len(batch_vectors[0])
-                        last_request_id = data.get("id")
-                        usage = data.get("usage", {})
-                        total_tokens += usage.get("total_tokens", 0)
-                        model_used = data.get("model", embed_model)
-
-                        break  # Success - exit retry loop
-
-                    except (httpx.TimeoutException, httpx.HTTPStatusError) as e:
-                        last_error = e
-                        if attempt < max_retries - 1:
-                            delay = base_delay * (2 ** attempt)
-                            print(f"[Embed] Retry {attempt + 1}/{max_retries} after {delay}s: {type(e).__name__}")
-                            time.sleep(delay)
-                        else:
-                            raise RuntimeError(f"Embedding failed after {max_retries} retries: {e}") from e
-
+        if pending:
+            result = cls._embed_uncached(pending, embed_model, cfg)
+            fresh = dict(zip(pending, result["embeddings"]))
+            total_tokens = result["tokens"]
+            last_request_id = result["request_id"]
+            model_used = result["model"]
+            if cache:
+                cache.put_many(embed_model, pending, result["embeddings"])
+
+        all_vectors = [cached[i] if i in cached else fresh[text] for i, text in enumerate(texts)]
         if not all_vectors:
             raise RuntimeError("No embeddings generated")
+        dim = len(all_vectors[0])
 
         # Extract provider
         from .blocking_cost import extract_provider_from_model
         provider = extract_provider_from_model(embed_model)
 
+        content = f"Embedded {len(texts)} texts ({dim} dimensions)"
+        if cached:
+            content += f", {len(cached)} from cache"
+
         # Log to unified system (same path as chat completions)
         from .unified_logs import log_unified
         log_unified(
@@ -920,8 +984,8 @@ class Agent:
             model=model_used,
             provider=provider,
             request_id=last_request_id,
-            content=f"Embedded {len(texts)} texts ({dim} dimensions)",
-            metadata={"text_count": len(texts), "dimension": dim},
+            content=content,
+            metadata={"text_count": len(texts), "dimension": dim, "cache_hits": len(cached)},
             tokens_in=total_tokens,
             tokens_out=None,
             cost=None,  # Will be fetched by unified logger if request_id available
@@ -934,8 +998,25 @@ class Agent:
             "request_id": last_request_id,
             "tokens": total_tokens,
             "provider": provider,
+            "cache_hits": len(cached),
         }
 
+    @classmethod
+    def _embed_uncached(cls, texts: List[str], embed_model: str, cfg) -> Dict[str, Any]:
+        """
+        Send texts to the provider's embeddings endpoint.
+
+        Goes through the process-wide EmbeddingClient: one keep-alive
+        connection pool, batches sized by count and characters, up to
+        LARS_EMBED_CONCURRENCY batches in flight, Retry-After aware retries.
+
+        Returns:
+            dict with embeddings (in input order), model, request_id (of the
+            last batch) and tokens
+        """
+        from .embedding_client import get_embedding_client
+        return get_embedding_client(cfg).embed(texts, embed_model)
+
     @classmethod
     def _deterministic_embed(cls, texts: List[str], model: str) -> Dict[str, Any]:
         """
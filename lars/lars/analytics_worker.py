@@ -420,7 +420,7 @@ def _fetch_session_data(session_id: str, db) -> Optional[Dict]:
                 countIf(node_type LIKE '%%error%%') as error_count,
                 uniqExactIf(take_index, take_index IS NOT NULL) as take_count,
                 anyIf(take_index, is_winner = 1) as winner_take_index
-            FROM unified_logs
+            FROM unified_logs_costed_session(sid = '{session_id}')
             WHERE session_id = '{session_id}'
         """
 
@@ -934,7 +934,7 @@ def _analyze_cells(session_id: str, db, cascade_id: str, genus_hash: str,
                 COUNT(DISTINCT turn_number) as turn_count,
                 uniqExactIf(take_index, take_index IS NOT NULL) as take_count,
                 countIf(node_type LIKE '%%error%%') > 0 as error_occurred
-            FROM unified_logs
+            FROM unified_logs_costed_session(sid = '{session_id}')
             WHERE session_id = '{session_id}'
               AND cell_name IS NOT NULL
             GROUP BY cell_name
@@ -1267,7 +1267,7 @@ def _analyze_context_attribution(session_id: str, cell_name: str, db) -> Dict:
                 tokens_out,
                 cost,
                 length(context_hashes) as context_depth
-            FROM unified_logs
+            FROM unified_logs_costed_session(sid = '{session_id}')
             WHERE session_id = '{session_id}'
               AND cell_name = '{cell_name}'
               AND role = 'assistant'
@@ -1293,7 +1293,7 @@ def _analyze_context_attribution(session_id: str, cell_name: str, db) -> Dict:
         # Get first cell's tokens_in as baseline (no context, pure prompt)
         first_cell_query = f"""
             SELECT AVG(tokens_in) as avg_tokens_in
-            FROM unified_logs
+            FROM unified_logs_costed_session(sid = '{session_id}')
             WHERE session_id = '{session_id}'
               AND role = 'assistant'
               AND model IS NOT NULL
@@ -1426,7 +1426,7 @@ def _analyze_context_relevance(session_id: str, cascade_id: str, cell_name: str,
             # Look up the actual content AND role
             content_query = f"""
                 SELECT content_json, tokens_in, tokens_out, role
-                FROM unified_logs
+                FROM unified_logs_costed_session(sid = '{session_id}')
                 WHERE session_id = '{session_id}'
                   AND content_hash = '{ctx_hash}'
                 LIMIT 1
@@ -1571,7 +1571,7 @@ def _analyze_context_relevance(session_id: str, cascade_id: str, cell_name: str,
         # Get the analysis cost from the meta-analysis session
         cost_query = f"""
             SELECT SUM(cost) as total_cost
-            FROM unified_logs
+            FROM unified_logs_costed_session(sid = '{analysis_session_id}')
             WHERE session_id = '{analysis_session_id}'
         """
         cost_result = db.query(cost_query)
@@ -1652,7 +1652,7 @@ def _create_context_breakdown(session_id: str, cell_name: str, cell_index: int,
                 cost,
                 model_requested,
                 take_index
-            FROM unified_logs
+            FROM unified_logs_costed_session(sid = '{session_id}')
             WHERE session_id = '{session_id}'
               AND cell_name = '{cell_name}'
               AND role = 'assistant'
@@ -1683,7 +1683,7 @@ def _create_context_breakdown(session_id: str, cell_name: str, cell_index: int,
                         tokens_in,
                         tokens_out,
                         estimated_tokens
-                    FROM unified_logs
+                    FROM unified_logs_costed_session(sid = '{session_id}')
                     WHERE session_id = '{session_id}'
                       AND content_hash = '{ctx_hash}'
                     LIMIT 1
@@ -123,9 +123,17 @@ class TakeAnalyzer:
         min_confidence: float
     ) -> Optional[Dict[str, Any]]:
         """Analyze a single cell's take patterns."""
+        from lars.schema import costed_logs_where
 
         # Query unified_logs table directly for take data
         # Search by both cascade_file and cascade_id
+        cell_takes = costed_logs_where(f"""
+            (cascade_file = '{cascade_file}'
+             OR position(cascade_file, '{cascade_file}') > 0
+             OR cascade_id = '{cascade_id}')
+            AND cell_name = '{cell_name}'
+            AND take_index IS NOT NULL
+        """)
         query = f"""
             SELECT
                 take_index,
@@ -133,12 +141,7 @@ class TakeAnalyzer:
                 cost,
                 role,
                 content_json
-            FROM unified_logs
-            WHERE (cascade_file = '{cascade_file}'
-               OR position(cascade_file, '{cascade_file}') > 0
-               OR cascade_id = '{cascade_id}')
-              AND cell_name = '{cell_name}'
-              AND take_index IS NOT NULL
+            FROM {cell_takes}
             ORDER BY timestamp DESC
             LIMIT 500
         """
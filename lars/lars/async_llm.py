@@ -0,0 +1,203 @@
+"""
+Shared event loop and keep-alive HTTP clients for async LLM calls.
+
+Agent.run() blocks a thread per request, so thread-pool parallelism holds one
+stack and one socket per row in flight. Batches of row-mode LLM calls
+(vectorized semantic UDFs, lars_run_parallel_batch) instead run as coroutines
+on one process-wide event loop:
+- One daemon thread runs the loop; callers block only their own thread
+  while a batch runs (run_batch)
+- OpenAI-compatible providers (OpenRouter, LARS_PROVIDER_BASE_URL) get one
+  pooled AsyncOpenAI client per (base_url, api_key), so TLS sessions are
+  reused across requests and batches
+- In-flight requests are bounded per batch (LARS_LLM_ASYNC_CONCURRENCY) and
+  globally by the LLM scheduler
+
+Usage:
+    from lars.async_llm import run_batch
+
+    results = run_batch(lambda row: agent.arun(row["prompt"]), rows)
+    # results[i] is the return value for rows[i], or the exception it raised
+"""
+
+import asyncio
+import contextvars
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+log = logging.getLogger(__name__)
+
+
+class LLMEventLoop:
+    """A background event loop plus the async HTTP clients bound to it."""
+
+    def __init__(self, max_connections: int = 64, timeout: float = 600.0):
+        self.max_connections = max(1, max_connections)
+        self.timeout = timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._clients: Dict[tuple, Any] = {}
+        self._stats_lock = threading.Lock()
+
+        self._batches = 0
+        self._tasks = 0
+        self._in_flight = 0
+        self._max_in_flight = 0
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    self._thread = threading.Thread(target=loop.run_forever, name="LLMEventLoop", daemon=True)
+                    self._thread.start()
+                    self._loop = loop
+        return self._loop
+
+    def in_loop(self) -> bool:
+        """True when called from a coroutine running on this loop."""
+        try:
+            return self._loop is not None and asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None):
+        """
+        Run a coroutine on the loop and block the calling thread for its result.
+
+        The coroutine sees the caller's contextvars (caller context, LLM
+        priority), like a worker bound with run_with_caller_context().
+        """
+        if self._thread is not None and threading.current_thread() is self._thread:
+            raise RuntimeError("LLMEventLoop.run() called from the loop thread; await the coroutine instead")
+        ctx = contextvars.copy_context()
+
+        async def in_caller_context():
+            # Tasks copy the context current at creation: create it inside ctx
+            return await ctx.run(asyncio.ensure_future, coro)
+
+        return asyncio.run_coroutine_threadsafe(in_caller_context(), self.loop).result(timeout)
+
+    def openai_client(self, base_url: str, api_key: Optional[str]):
+        """
+        Pooled AsyncOpenAI client for an OpenAI-compatible endpoint.
+
+        Only valid on this loop: its connections belong to the loop they were
+        opened on.
+        """
+        key = (base_url, api_key)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    import httpx
+                    import openai
+                    http_client = httpx.AsyncClient(
+                        timeout=self.timeout,
+                        limits=httpx.Limits(
+                            max_connections=self.max_connections,
+                            max_keepalive_connections=self.max_connections,
+                        ),
+                    )
+                    client = openai.AsyncOpenAI(
+                        base_url=base_url, api_key=api_key or "none",
+                        http_client=http_client, max_retries=0,
+                    )
+                    self._clients[key] = client
+        return client
+
+    async def gather(self, fn: Callable[[Any], Awaitable], items: Sequence, concurrency: int) -> List[Any]:
+        """Await fn(item) for every item, at most `concurrency` at a time; exceptions are returned."""
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def one(item):
+            async with semaphore:
+                with self._stats_lock:
+                    self._in_flight += 1
+                    self._max_in_flight = max(self._max_in_flight, self._in_flight)
+                try:
+                    return await fn(item)
+                finally:
+                    with self._stats_lock:
+                        self._in_flight -= 1
+
+        with self._stats_lock:
+            self._batches += 1
+            self._tasks += len(items)
+        return await asyncio.gather(*(one(item) for item in items), return_exceptions=True)
+
+    def close(self):
+        """Close the pooled clients and stop the loop."""
+        with self._lock:
+            loop, clients = self._loop, list(self._clients.values())
+            self._clients.clear()
+            self._loop = None
+        if loop is None:
+            return
+
+        async def _close():
+            for client in clients:
+                await client.close()
+
+        try:
+            asyncio.run_coroutine_threadsafe(_close(), loop).result(10)
+        except Exception as e:
+            log.debug(f"[LLMEventLoop] Error closing clients: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "running": self._loop is not None,
+                "clients": len(self._clients),
+                "max_connections": self.max_connections,
+                "batches": self._batches,
+                "tasks": self._tasks,
+                "in_flight": self._in_flight,
+                "max_in_flight": self._max_in_flight,
+            }
+
+
+_llm_loop: Optional[LLMEventLoop] = None
+_llm_loop_lock = threading.Lock()
+
+
+def get_llm_loop() -> LLMEventLoop:
+    """Process-wide LLM event loop (started on first use)."""
+    global _llm_loop
+    if _llm_loop is None:
+        with _llm_loop_lock:
+            if _llm_loop is None:
+                from .config import get_config
+                _llm_loop = LLMEventLoop(max_connections=get_config().llm_async_max_connections)
+    return _llm_loop
+
+
+def run_batch(fn: Callable[[Any], Awaitable], items: Sequence, concurrency: Optional[int] = None) -> List[Any]:
+    """
+    Run fn(item) for every item on the shared LLM loop and wait for all of them.
+
+    Args:
+        fn: Coroutine function taking one item
+        items: Inputs
+        concurrency: Max coroutines in flight (default LARS_LLM_ASYNC_CONCURRENCY)
+
+    Returns:
+        One entry per item, in order: fn's return value or the exception it raised
+    """
+    if not items:
+        return []
+    if concurrency is None:
+        from .config import get_config
+        concurrency = get_config().llm_async_concurrency
+    llm_loop = get_llm_loop()
+    return llm_loop.run(llm_loop.gather(fn, items, concurrency))
+
+
+def get_llm_loop_stats() -> Optional[Dict[str, Any]]:
+    """Stats of the process-wide loop, or None if it was never used."""
+    return _llm_loop.get_stats() if _llm_loop is not None else None
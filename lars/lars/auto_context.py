@@ -1022,6 +1022,10 @@ Return ONLY a JSON object: {{"selected": ["hash1", "hash2", ...], "reasoning": "
 
         try:
             from .db_adapter import get_db
+            from .unified_logs import flush_logs
+
+            # The hashed messages may have been logged by this run and still be queued
+            flush_logs()
             db = get_db()
 
             # Build query for multiple hashes
@@ -0,0 +1,251 @@
+"""
+Background batching writer for ClickHouse tables.
+
+Shared by the unified_logs writer and the persistent cache tiers (semantic
+SQL cache, embedding cache, tool result cache), so each gets the same bounded
+queue, overflow policies, flush() and stats instead of its own thread loop.
+
+Usage:
+    from lars.batch_writer import BatchTableWriter
+
+    writer = BatchTableWriter(get_db, "embedding_cache", overflow="drop_newest")
+    writer.write({"model": model, "text_hash": text_hash, ...})
+    writer.flush()  # read-your-writes
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+class BatchTableWriter:
+    """
+    Background batching writer for one ClickHouse table.
+
+    write() only enqueues; one thread INSERTs what is queued in batches of up
+    to `batch_size` items, at the latest `flush_interval` seconds after an
+    item was queued (sooner once a full batch is waiting). This keeps INSERTs
+    off the caller's hot path and avoids one tiny part per row.
+
+    The queue is bounded. When it is full, `overflow` decides what happens:
+    - 'block': the caller waits up to `block_timeout` seconds for space
+      (backpressure), and the item is dropped if none frees up
+    - 'drop_newest': the new item is dropped
+    - 'drop_oldest': the oldest queued item is dropped to make room
+    - 'sync': the item is written on the caller's thread
+
+    flush() writes everything queued before it returns, for readers that
+    need to see rows that were just written. Subclasses that merge queued
+    items before writing (coalescing keys, summing counters) override
+    _write_items().
+    """
+
+    OVERFLOW_POLICIES = ("block", "drop_newest", "drop_oldest", "sync")
+
+    def __init__(
+        self,
+        get_db,
+        table: str,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        queue_max: int = 20000,
+        overflow: str = "block",
+        block_timeout: float = 5.0,
+        name: str = "BatchTableWriter",
+    ):
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow!r}, expected one of {self.OVERFLOW_POLICIES}")
+        self._get_db = get_db
+        self.table = table
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.queue_max = queue_max
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.name = name
+
+        self._queue: "queue.Queue[tuple]" = queue.Queue(maxsize=queue_max)
+        self._wakeup = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._thread_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._shutdown = False
+
+        # Counters
+        self._enqueued = 0
+        self._rows_written = 0
+        self._batches = 0
+        self._max_batch = 0
+        self._dropped = 0
+        self._blocked = 0
+        self._blocked_s = 0.0
+        self._sync_writes = 0
+        self._errors = 0
+        self._lag_total_s = 0.0
+        self._lag_max_s = 0.0
+        self._last_lag_s = 0.0
+
+    def _ensure_thread(self):
+        """Start the flush thread on first use."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._flush_loop, daemon=True, name=self.name)
+                self._thread.start()
+
+    def write(self, item: Any):
+        """Queue an item for insertion (applies the overflow policy if the queue is full)."""
+        if self._shutdown:
+            self._write([item])
+            return
+
+        entry = (time.time(), item)
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            if not self._handle_overflow(entry):
+                return
+
+        with self._stats_lock:
+            self._enqueued += 1
+        self._ensure_thread()
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+
+    def _handle_overflow(self, entry) -> bool:
+        """Apply the overflow policy; True if the entry ended up queued."""
+        self._wakeup.set()
+
+        if self.overflow == "block":
+            start = time.time()
+            try:
+                self._queue.put(entry, timeout=self.block_timeout)
+                queued = True
+            except queue.Full:
+                queued = False
+            with self._stats_lock:
+                self._blocked += 1
+                self._blocked_s += time.time() - start
+                if not queued:
+                    self._dropped += 1
+            return queued
+
+        if self.overflow == "drop_oldest":
+            try:
+                self._queue.get_nowait()
+                with self._stats_lock:
+                    self._dropped += 1
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(entry)
+                return True
+            except queue.Full:
+                with self._stats_lock:
+                    self._dropped += 1
+                return False
+
+        if self.overflow == "sync":
+            with self._stats_lock:
+                self._sync_writes += 1
+            self._write([entry[1]], enqueued_at=entry[0])
+            return False
+
+        # drop_newest
+        with self._stats_lock:
+            self._dropped += 1
+        return False
+
+    def _flush_loop(self):
+        """Background thread that writes queued items in batches."""
+        while not self._shutdown:
+            try:
+                self._wakeup.wait(timeout=self.flush_interval)
+                self._wakeup.clear()
+                self.flush()
+            except Exception as e:
+                # Never crash the flush thread
+                print(f"[{self.name}] Writer error: {e}")
+
+    def flush(self):
+        """Write everything queued so far (blocking)."""
+        with self._flush_lock:
+            while True:
+                batch = []
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not batch:
+                    return
+                self._write([item for _, item in batch], enqueued_at=batch[0][0])
+                if len(batch) < self.batch_size:
+                    return
+
+    def _write(self, items: List[Any], enqueued_at: Optional[float] = None):
+        try:
+            db = self._get_db()
+            if db is None:
+                # No database to write to: the batch is lost, report it as dropped
+                with self._stats_lock:
+                    self._dropped += len(items)
+                return
+            rows = self._write_items(db, items)
+        except Exception as e:
+            with self._stats_lock:
+                self._errors += 1
+            print(f"[{self.name}] INSERT error ({len(items)} items): {e}")
+            return
+
+        lag = time.time() - enqueued_at if enqueued_at is not None else 0.0
+        with self._stats_lock:
+            self._rows_written += rows
+            self._batches += 1
+            self._max_batch = max(self._max_batch, len(items))
+            self._lag_total_s += lag
+            self._lag_max_s = max(self._lag_max_s, lag)
+            self._last_lag_s = lag
+
+    def _write_items(self, db, items: List[Any]) -> int:
+        """INSERT one batch of queued items; returns the number of rows written."""
+        db.insert_rows(self.table, items)
+        return len(items)
+
+    def shutdown(self):
+        """Stop the flush thread and write anything still queued."""
+        if self._shutdown:
+            return
+        self._shutdown = True
+        self._wakeup.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+        try:
+            self.flush()
+        except Exception:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, batch sizes, write lag (oldest item in a batch) and drop counters."""
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "queue_max": self.queue_max,
+                "overflow": self.overflow,
+                "enqueued": self._enqueued,
+                "rows_written": self._rows_written,
+                "batches": self._batches,
+                "avg_batch_size": round(self._rows_written / self._batches, 1) if self._batches else 0.0,
+                "max_batch_size": self._max_batch,
+                "avg_lag_ms": round(self._lag_total_s / self._batches * 1000, 1) if self._batches else 0.0,
+                "max_lag_ms": round(self._lag_max_s * 1000, 1),
+                "last_lag_ms": round(self._last_lag_s * 1000, 1),
+                "dropped": self._dropped,
+                "blocked": self._blocked,
+                "blocked_ms": round(self._blocked_s * 1000, 1),
+                "sync_writes": self._sync_writes,
+                "errors": self._errors,
+            }
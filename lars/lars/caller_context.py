@@ -6,12 +6,20 @@ Tracks the "caller" that initiated a cascade execution, enabling:
 - Debugging: "What spawned this session?"
 - Analytics: Usage by origin (SQL vs UI vs CLI)
 
-Uses ClickHouse Memory table as the authoritative store for cross-thread access.
-ContextVars and thread-local are kept for fast local access within the same thread.
+Lookups are served in-process:
+- ContextVars (and thread-local) hold the context of the current thread
+- A per-connection registry holds the context of every active SQL query, so
+  DuckDB UDF threads can find it without a ClickHouse round trip
+- Worker threads get the context explicitly via run_with_caller_context() /
+  submit_with_caller_context()
+
+The ClickHouse caller_context_active table is only a cross-process fallback.
 """
 
 from contextvars import ContextVar
-from typing import Optional, Dict, Any, Tuple, List
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Tuple, List, Callable
+import contextvars
 import threading
 import json
 import logging
@@ -33,11 +41,26 @@ _thread_local = threading.local()
 # Lock for DuckDB attachments registry (still in-memory, not high-frequency)
 _registry_lock = threading.Lock()
 
+# Active caller contexts by connection_id (insertion order: most recent last)
+_active_contexts: Dict[str, "CallerContext"] = {}
+
 # DuckDB attachments for sql_statement execution
 # We store attachment info (not the connection itself) to avoid deadlocks
 _duckdb_attachments_registry: Dict[str, List[Tuple[str, str]]] = {}  # connection_id -> [(alias, path), ...]
 
 
+@dataclass(frozen=True)
+class CallerContext:
+    """Caller id and invocation metadata of one execution, captured once."""
+    caller_id: Optional[str]
+    metadata: Optional[Dict[str, Any]] = None
+    connection_id: Optional[str] = None
+
+    def run(self, fn: Callable, *args, **kwargs):
+        """Call fn with this context bound (see run_with_caller_context)."""
+        return run_with_caller_context(self, fn, *args, **kwargs)
+
+
 # ============================================================================
 # ClickHouse Operations
 # ============================================================================
@@ -186,20 +209,26 @@ def clear_duckdb_attachments(connection_id: str):
 # Context Management
 # ============================================================================
 
-def set_caller_context(caller_id: str, metadata: Dict[str, Any], connection_id: str | None = None):
+def set_caller_context(
+    caller_id: str, metadata: Dict[str, Any], connection_id: str | None = None
+) -> CallerContext:
     """
-    Set caller context for current thread AND ClickHouse (cross-thread access).
+    Set caller context for current thread, the connection registry and ClickHouse.
 
     Stores in:
     1. ContextVar (fast access within same thread/coroutine)
     2. Thread-local (backup for same thread)
-    3. ClickHouse Memory table (authoritative cross-thread store)
+    3. In-process registry by connection_id (other threads of this process)
+    4. ClickHouse table (fallback for other processes)
 
     Args:
         caller_id: Unique identifier for the caller (e.g., 'sql-clever-fox-abc123')
         metadata: Invocation metadata dict
         connection_id: Connection ID for cross-thread access (required for SQL queries)
 
+    Returns:
+        The CallerContext, for passing explicitly to worker threads
+
     Example:
         set_caller_context('sql-quick-rabbit-xyz', {
             'origin': 'sql',
@@ -215,45 +244,80 @@ def set_caller_context(caller_id: str, metadata: Dict[str, Any], connection_id:
     _thread_local.caller_id = caller_id
     _thread_local.invocation_metadata = metadata
 
-    # 3. Write to ClickHouse (authoritative cross-thread store)
+    ctx = CallerContext(caller_id, metadata, connection_id)
     if connection_id:
+        # 3. Per-connection registry (cross-thread, same process)
+        with _registry_lock:
+            _active_contexts.pop(connection_id, None)
+            _active_contexts[connection_id] = ctx
+            _global_caller_registry[connection_id] = (caller_id, metadata)
+
+        # 4. Write to ClickHouse (cross-process fallback)
         _write_context_to_clickhouse(connection_id, caller_id, metadata)
 
+    return ctx
 
-def get_caller_id(connection_id: str | None = None) -> Optional[str]:
+
+def _lookup_active_context(connection_id: str | None = None) -> Optional[CallerContext]:
+    """Context of an active query in this process: this connection's, else the most recent."""
+    with _registry_lock:
+        if connection_id:
+            return _active_contexts.get(connection_id)
+        if _active_contexts:
+            return next(reversed(_active_contexts.values()))
+    return None
+
+
+def get_caller_context(connection_id: str | None = None) -> tuple[Optional[str], Optional[Dict]]:
     """
-    Get current caller_id, trying local storage first then ClickHouse.
+    Get both caller_id and metadata in one call.
 
     Priority order:
-    1. ContextVar (same thread/coroutine) - fastest
+    1. ContextVar (same thread/coroutine, or propagated to a worker) - fastest
     2. Thread-local (same thread) - fast
-    3. ClickHouse Memory table (cross-thread) - authoritative
+    3. In-process connection registry (cross-thread) - fast
+    4. ClickHouse table (cross-process fallback) - one round trip
 
     Args:
-        connection_id: Optional connection ID for ClickHouse lookup
+        connection_id: Optional connection ID for the registry/ClickHouse lookup
 
     Returns:
-        caller_id or None if not set
+        (caller_id, metadata) tuple
     """
     # 1. Try contextvar first (fastest, same thread)
-    ctx_caller = _caller_id.get()
-    if ctx_caller:
-        return ctx_caller
+    caller_id = _caller_id.get()
+    if caller_id:
+        return (caller_id, _invocation_metadata.get())
 
     # 2. Try thread-local (same thread backup)
-    try:
-        tl_caller = getattr(_thread_local, 'caller_id', None)
-        if tl_caller:
-            return tl_caller
-    except AttributeError:
-        pass
+    tl_caller = getattr(_thread_local, 'caller_id', None)
+    if tl_caller:
+        return (tl_caller, getattr(_thread_local, 'invocation_metadata', None))
 
-    # 3. Fall back to ClickHouse (cross-thread authoritative store)
+    # 3. Active query in this process
+    ctx = _lookup_active_context(connection_id)
+    if ctx:
+        return (ctx.caller_id, ctx.metadata)
+
+    # 4. Fall back to ClickHouse (context set by another process)
     result = _read_context_from_clickhouse(connection_id)
     if result:
-        return result[0]
+        return result
 
-    return None
+    return (None, None)
+
+
+def get_caller_id(connection_id: str | None = None) -> Optional[str]:
+    """
+    Get current caller_id (see get_caller_context for the lookup order).
+
+    Args:
+        connection_id: Optional connection ID for the registry/ClickHouse lookup
+
+    Returns:
+        caller_id or None if not set
+    """
+    return get_caller_context(connection_id)[0]
 
 
 def get_invocation_metadata(connection_id: str | None = None) -> Optional[Dict]:
@@ -261,64 +325,54 @@ def get_invocation_metadata(connection_id: str | None = None) -> Optional[Dict]:
     Get current invocation metadata from context.
 
     Args:
-        connection_id: Optional connection ID for ClickHouse lookup
+        connection_id: Optional connection ID for the registry/ClickHouse lookup
 
     Returns:
         metadata dict or None if not set
     """
-    # Try contextvar first
-    metadata = _invocation_metadata.get()
-    if metadata:
-        return metadata
+    return get_caller_context(connection_id)[1]
 
-    # Try thread-local
-    try:
-        tl_metadata = getattr(_thread_local, 'invocation_metadata', None)
-        if tl_metadata:
-            return tl_metadata
-    except AttributeError:
-        pass
 
-    # Fall back to ClickHouse
-    result = _read_context_from_clickhouse(connection_id)
-    if result:
-        return result[1]
+def capture_caller_context(connection_id: str | None = None) -> CallerContext:
+    """
+    Resolve the current caller context once, to hand to worker threads.
 
-    return None
+    Example:
+        ctx = capture_caller_context()
+        futures = [submit_with_caller_context(executor, fn, row, ctx=ctx) for row in rows]
+    """
+    caller_id, metadata = get_caller_context(connection_id)
+    return CallerContext(caller_id, metadata, connection_id)
 
 
-def get_caller_context(connection_id: str | None = None) -> tuple[Optional[str], Optional[Dict]]:
+def run_with_caller_context(ctx: Optional[CallerContext], fn: Callable, *args, **kwargs):
     """
-    Get both caller_id and metadata in one call.
+    Call fn(*args, **kwargs) with ctx as the caller context of the current thread.
 
-    Args:
-        connection_id: Optional connection ID for ClickHouse lookup
-
-    Returns:
-        (caller_id, metadata) tuple
+    Runs in a copy of the current contextvars context, so nothing leaks into
+    pooled worker threads once fn returns.
     """
-    # Try local first
-    caller_id = _caller_id.get()
-    metadata = _invocation_metadata.get()
+    def _run():
+        if ctx is not None and ctx.caller_id:
+            _caller_id.set(ctx.caller_id)
+            _invocation_metadata.set(ctx.metadata)
+        return fn(*args, **kwargs)
 
-    if caller_id:
-        return (caller_id, metadata)
+    return contextvars.copy_context().run(_run)
 
-    # Try thread-local
-    try:
-        tl_caller = getattr(_thread_local, 'caller_id', None)
-        tl_metadata = getattr(_thread_local, 'invocation_metadata', None)
-        if tl_caller:
-            return (tl_caller, tl_metadata)
-    except AttributeError:
-        pass
 
-    # Fall back to ClickHouse
-    result = _read_context_from_clickhouse(connection_id)
-    if result:
-        return result
+def submit_with_caller_context(executor, fn: Callable, *args, ctx: Optional[CallerContext] = None, **kwargs):
+    """
+    executor.submit() that carries the caller context into the worker thread.
 
-    return (None, None)
+    Args:
+        executor: A concurrent.futures executor
+        fn: Callable to run
+        ctx: Context to bind (default: captured from the submitting thread)
+    """
+    if ctx is None:
+        ctx = capture_caller_context()
+    return executor.submit(run_with_caller_context, ctx, fn, *args, **kwargs)
 
 
 def clear_caller_context(connection_id: str | None = None):
@@ -341,8 +395,11 @@ def clear_caller_context(connection_id: str | None = None):
     except AttributeError:
         pass
 
-    # Clear from ClickHouse
+    # Clear from the connection registry and ClickHouse
     if connection_id:
+        with _registry_lock:
+            _active_contexts.pop(connection_id, None)
+            _global_caller_registry.pop(connection_id, None)
         _clear_context_from_clickhouse(connection_id)
 
 
@@ -356,6 +413,20 @@ def has_caller_context() -> bool:
     return _caller_id.get() is not None
 
 
+def get_local_invocation_metadata() -> Optional[Dict]:
+    """
+    Invocation metadata bound to this thread (contextvar or thread-local) only.
+
+    Unlike get_invocation_metadata(), never falls back to another query's
+    context or to ClickHouse, so it is cheap enough for every LLM call.
+    """
+    if _caller_id.get():
+        return _invocation_metadata.get()
+    if getattr(_thread_local, 'caller_id', None):
+        return getattr(_thread_local, 'invocation_metadata', None)
+    return None
+
+
 # ============================================================================
 # Context Builders (Helpers)
 # ============================================================================
@@ -1,4 +1,9 @@
-from typing import List, Dict, Any, Optional, Union, Literal
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple, Union, Literal
 from pydantic import BaseModel, Field
 from enum import Enum
 
@@ -352,7 +357,7 @@ class ToolCachingConfig(BaseModel):
     }
     """
     enabled: bool = False
-    storage: Literal["memory", "redis", "sqlite"] = "memory"
+    storage: Literal["memory", "sqlite", "clickhouse", "redis"] = "memory"  # Persistent tier behind the shared LRU
     global_ttl: int = 3600  # Default TTL in seconds
     max_cache_size: int = 1000  # Max entries before LRU eviction
     tools: Dict[str, ToolCachePolicy] = Field(default_factory=dict)
@@ -1777,17 +1782,124 @@ def _migrate_legacy_terminology(data: Dict) -> Dict:
     return data
 
 
+class CompiledCascadeCache:
+    """
+    Process-wide cache of parsed and validated CascadeConfig objects.
+
+    Semantic SQL UDFs build a LARSRunner per row, so without this every row
+    re-reads the YAML, migrates legacy terminology and runs pydantic validation.
+
+    Keys:
+    - file paths: (resolved path, mtime_ns, size) - editing the file invalidates
+    - dicts (e.g. cascades with injected takes overrides): hash of the content
+
+    Returned configs are shared between callers and must be treated as
+    read-only; use config.model_copy(deep=True) before modifying one.
+    """
+
+    MAX_ENTRIES = 512
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, CascadeConfig]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def path_key(path: str) -> Tuple:
+        from .loaders import resolve_config_path
+        resolved = resolve_config_path(path)
+        st = os.stat(resolved)
+        return ("path", os.path.abspath(resolved), st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def dict_key(data: Dict) -> Optional[Tuple]:
+        try:
+            blob = json.dumps(data, sort_keys=True, default=str)
+        except (TypeError, ValueError):
+            return None
+        return ("dict", hashlib.sha256(blob.encode("utf-8")).hexdigest())
+
+    def get(self, key: Tuple) -> Optional[CascadeConfig]:
+        with self._lock:
+            config = self._entries.get(key)
+            if config is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return config
+
+    def put(self, key: Tuple, config: CascadeConfig):
+        with self._lock:
+            self._entries[key] = config
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+_compiled_cascades = CompiledCascadeCache()
+
+
+def get_compiled_cascade_cache() -> CompiledCascadeCache:
+    """Get the process-wide compiled cascade cache."""
+    return _compiled_cascades
+
+
+def _compile_cascade(data: Dict) -> CascadeConfig:
+    # Apply legacy terminology migration
+    data = _migrate_legacy_terminology(data)
+
+    return CascadeConfig(**data)
+
+
 def load_cascade_config(path_or_dict: Union[str, Dict, "CascadeConfig"]) -> CascadeConfig:
+    """
+    Load and validate a cascade from a file path or dict.
+
+    Results are cached process-wide (see CompiledCascadeCache), so the returned
+    config may be shared and must not be mutated.
+    """
     # If already a CascadeConfig, return as-is
     if isinstance(path_or_dict, CascadeConfig):
         return path_or_dict
+
+    if isinstance(path_or_dict, str):
+        key = CompiledCascadeCache.path_key(path_or_dict)
+    else:
+        key = CompiledCascadeCache.dict_key(path_or_dict)
+
+    if key is not None:
+        config = _compiled_cascades.get(key)
+        if config is not None:
+            return config
+
     if isinstance(path_or_dict, str):
         from .loaders import load_config_file
-        data = load_config_file(path_or_dict)
+        data = load_config_file(key[1])
     else:
         data = path_or_dict
 
-    # Apply legacy terminology migration
-    data = _migrate_legacy_terminology(data)
-
-    return CascadeConfig(**data)
+    config = _compile_cascade(data)
+    if key is not None:
+        _compiled_cascades.put(key, config)
+    return config
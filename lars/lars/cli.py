@@ -3602,11 +3602,13 @@ def cmd_embed_costs(args):
     """Show embedding API costs."""
     from lars.db_adapter import get_db_adapter
     from lars.embedding_worker import EMBEDDING_CASCADE_ID
+    from lars.schema import costed_logs_where
     from rich.console import Console
     from rich.table import Table
 
     db = get_db_adapter()
     console = Console()
+    embedding_logs = costed_logs_where(f"cascade_id = '{EMBEDDING_CASCADE_ID}' AND node_type = 'embedding'")
 
     print()
     print("="*60)
@@ -3623,9 +3625,7 @@ def cmd_embed_costs(args):
                 COUNT(*) as call_count,
                 MIN(timestamp) as first_call,
                 MAX(timestamp) as last_call
-            FROM unified_logs
-            WHERE cascade_id = '{EMBEDDING_CASCADE_ID}'
-              AND node_type = 'embedding'
+            FROM {embedding_logs}
         """, output_format='dict')
 
         if result and result[0].get('call_count', 0) > 0:
@@ -3653,9 +3653,7 @@ def cmd_embed_costs(args):
                 SUM(cost) as cost,
                 SUM(tokens_in) as tokens,
                 COUNT(*) as calls
-            FROM unified_logs
-            WHERE cascade_id = '{EMBEDDING_CASCADE_ID}'
-              AND node_type = 'embedding'
+            FROM {embedding_logs}
             GROUP BY day
             ORDER BY day DESC
             LIMIT 10
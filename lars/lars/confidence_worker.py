@@ -235,7 +235,7 @@ def assess_training_confidence(session_id: str) -> Optional[dict]:
         for poll_count in range(max_polls):
             cost_check = db.query(f"""
                 SELECT SUM(cost) as total_cost, COUNT(*) as llm_count
-                FROM unified_logs
+                FROM unified_logs_costed_session(sid = '{session_id}')
                 WHERE session_id = '{session_id}'
                   AND role = 'assistant'
                   AND model IS NOT NULL
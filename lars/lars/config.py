@@ -134,6 +134,66 @@ def _resolve_google_credentials() -> Optional[str]:
 # Ollama Hosts Configuration Parser
 # ============================================================================
 
+def _parse_semantic_cache_function_limits() -> Dict[str, Dict[str, int]]:
+    """
+    Parse LARS_SEMANTIC_CACHE_L1_FUNCTION_LIMITS environment variable.
+
+    JSON mapping function name to limits, e.g.:
+        {"semantic_summarize": {"max_entries": 500, "max_bytes": 52428800}}
+
+    Returns:
+        Dictionary mapping function names to {"max_entries", "max_bytes"} limits
+    """
+    limits_str = os.getenv("LARS_SEMANTIC_CACHE_L1_FUNCTION_LIMITS", "")
+    if not limits_str:
+        return {}
+
+    try:
+        result = json.loads(limits_str)
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(result, dict):
+        return {}
+
+    limits = {}
+    for name, limit in result.items():
+        if isinstance(limit, dict):
+            limits[name] = {
+                k: int(v) for k, v in limit.items() if k in ("max_entries", "max_bytes")
+            }
+    return limits
+
+
+def _parse_llm_limits() -> Dict[str, Dict[str, int]]:
+    """
+    Parse LARS_LLM_LIMITS environment variable.
+
+    JSON mapping a provider or model name to request scheduler limits, e.g.:
+        {"ollama": {"concurrency": 2}, "anthropic/claude-sonnet-4": {"rpm": 50, "tpm": 400000}}
+
+    Returns:
+        Dictionary mapping names to {"concurrency", "rpm", "tpm"} limits
+    """
+    limits_str = os.getenv("LARS_LLM_LIMITS", "")
+    if not limits_str:
+        return {}
+
+    try:
+        result = json.loads(limits_str)
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(result, dict):
+        return {}
+
+    limits = {}
+    for name, limit in result.items():
+        if isinstance(limit, dict):
+            limits[name] = {
+                k: int(v) for k, v in limit.items() if k in ("concurrency", "rpm", "tpm")
+            }
+    return limits
+
+
 def _parse_ollama_hosts() -> Dict[str, str]:
     """
     Parse LARS_OLLAMA_HOSTS environment variable.
@@ -272,6 +332,18 @@ class Config(BaseModel):
         )
     )
 
+    # Agent.embed() request shaping: texts per request, total characters per
+    # request, and batches in flight at once (process-wide)
+    embed_batch_size: int = Field(
+        default_factory=lambda: int(os.getenv("LARS_EMBED_BATCH_SIZE", "50"))
+    )
+    embed_batch_max_chars: int = Field(
+        default_factory=lambda: int(os.getenv("LARS_EMBED_BATCH_MAX_CHARS", "100000"))
+    )
+    embed_concurrency: int = Field(
+        default_factory=lambda: int(os.getenv("LARS_EMBED_CONCURRENCY", "4"))
+    )
+
     # Model for generative UI generation (used by ask_human_custom)
     generative_ui_model: str = Field(
         default_factory=lambda: os.getenv(
@@ -421,6 +493,66 @@ class Config(BaseModel):
     clickhouse_password: str = Field(
         default_factory=lambda: os.getenv("LARS_CLICKHOUSE_PASSWORD", "lars")
     )
+    # Client pool: max concurrent clients, how many of them only writes
+    # (log/cache inserts) may use, and seconds to wait for a free client
+    clickhouse_pool_size: int = Field(
+        default_factory=lambda: int(os.getenv("LARS_CLICKHOUSE_POOL_SIZE", "8"))
+    )
+    clickhouse_pool_reserved_writes: int = Field(
+        default_factory=lambda: int(os.getenv("LARS_CLICKHOUSE_POOL_RESERVED_WRITES", "2"))
+    )
+    clickhouse_pool_timeout: float = Field(
+        default_factory=lambda: float(os.getenv("LARS_CLICKHOUSE_POOL_TIMEOUT", "30"))
+    )
+
+    # unified_logs writer: rows are INSERTed in batches of up to log_batch_size,
+    # at most log_flush_interval_ms after they were logged
+    log_batch_size: int = Field(
+        default_factory=lambda: int(os.getenv("LARS_LOG_BATCH_SIZE", "500"))
+    )
+    log_flush_interval_ms: int = Field(
+        default_factory=lambda: int(os.getenv("LARS_LOG_FLUSH_INTERVAL_MS", "250"))
+    )
+    log_queue_max: int = Field(
+        default_factory=lambda: int(os.getenv("LARS_LOG_QUEUE_MAX", "20000"))
+    )
+    # When the queue is full: 'block' (wait up to log_block_timeout_s, then drop),
+    # 'drop_newest', 'drop_oldest', or 'sync' (INSERT on the caller's thread)
+    log_overflow: str = Field(
+        default_factory=lambda: os.getenv("LARS_LOG_OVERFLOW", "block")
+    )
+    log_block_timeout_s: float = Field(
+        default_factory=lambda: float(os.getenv("LARS_LOG_BLOCK_TIMEOUT_S", "5"))
+    )
+
+    # Late cost lookups (OpenRouter /generation): parallel requests over one
+    # keep-alive session, retried on a schedule while the provider has no data
+    cost_api_base_url: str = Field(
+        default_factory=lambda: os.getenv("LARS_COST_API_BASE_URL", "https://openrouter.ai/api/v1")
+    )
+    cost_fetch_concurrency: int = Field(
+        default_factory=lambda: int(os.getenv("LARS_COST_FETCH_CONCURRENCY", "16"))
+    )
+
+    # SQL trail: seconds between progress snapshots (sql_query_progress) of
+    # running SQL queries; 0 disables snapshots
+    sql_trail_progress_interval_s: float = Field(
+        default_factory=lambda: float(os.getenv("LARS_SQL_TRAIL_PROGRESS_INTERVAL_S", "10"))
+    )
+
+    # VECTOR_SEARCH over lars_embeddings: 'exact' (brute-force cosineDistance),
+    # 'ann' (HNSW vector_similarity index), or 'auto' (ANN once a source table
+    # has vector_ann_min_rows embeddings). vector_ann_ef_search trades latency
+    # for recall (hnsw_candidate_list_size_for_search).
+    vector_index: str = Field(
+        default_factory=lambda: os.getenv("LARS_VECTOR_INDEX", "auto")
+    )
+    vector_ann_min_rows: int = Field(
+        default_factory=lambda: int(os.getenv("LARS_VECTOR_ANN_MIN_ROWS", "50000"))
+    )
+    vector_ann_ef_search: int = Field(
+        default_factory=lambda: int(os.getenv("LARS_VECTOR_ANN_EF_SEARCH", "256"))
+    )
 
     # =========================================================================
     # Harbor (HuggingFace Spaces) Configuration
@@ -559,6 +691,84 @@ class Config(BaseModel):
     parallel_workers: int = Field(
         default_factory=lambda: int(os.getenv("LARS_PARALLEL_WORKERS", "8"))
     )
+    # Run eligible single-cell, no-tools, no-takes cascades on the lean
+    # row-mode path instead of a full LARSRunner per row
+    sql_row_mode: bool = Field(
+        default_factory=lambda: os.getenv("LARS_SQL_ROW_MODE", "true").lower() == "true"
+    )
+
+    # Process-wide LLM request scheduler (lars/llm_scheduler.py). Every
+    # Agent.run/Agent.embed provider call takes a slot, whatever thread pool
+    # it runs in. Defaults apply per provider; 0 = unlimited.
+    llm_scheduler: bool = Field(
+        default_factory=lambda: os.getenv("LARS_LLM_SCHEDULER", "true").lower() == "true"
+    )
+    llm_max_concurrency: int = Field(
+        default_factory=lambda: int(os.getenv("LARS_LLM_MAX_CONCURRENCY", "16"))
+    )
+    llm_rpm: int = Field(
+        default_factory=lambda: int(os.getenv("LARS_LLM_RPM", "0"))
+    )
+    llm_tpm: int = Field(
+        default_factory=lambda: int(os.getenv("LARS_LLM_TPM", "0"))
+    )
+    # Per-provider or per-model overrides, e.g. {"ollama": {"concurrency": 2}}
+    llm_limits: Dict[str, Dict[str, int]] = Field(
+        default_factory=_parse_llm_limits
+    )
+    # Run row-mode batches (vectorized semantic UDFs, lars_run_parallel_batch)
+    # as coroutines on one shared event loop (lars/async_llm.py) instead of
+    # a thread per row
+    llm_async: bool = Field(
+        default_factory=lambda: os.getenv("LARS_LLM_ASYNC", "true").lower() == "true"
+    )
+    # Max coroutines in flight per batch (the scheduler still caps requests)
+    llm_async_concurrency: int = Field(
+        default_factory=lambda: int(os.getenv("LARS_LLM_ASYNC_CONCURRENCY", "256"))
+    )
+    # Keep-alive connections per provider endpoint on the shared loop
+    llm_async_max_connections: int = Field(
+        default_factory=lambda: int(os.getenv("LARS_LLM_ASYNC_MAX_CONNECTIONS", "64"))
+    )
+
+    # =========================================================================
+    # Semantic SQL Cache Configuration
+    # =========================================================================
+    # L1 (in-memory LRU) limits for the semantic SQL result cache
+    semantic_cache_l1_max_entries: int = Field(
+        default_factory=lambda: int(os.getenv("LARS_SEMANTIC_CACHE_L1_MAX_ENTRIES", "10000"))
+    )
+    semantic_cache_l1_max_bytes: int = Field(
+        default_factory=lambda: int(os.getenv("LARS_SEMANTIC_CACHE_L1_MAX_BYTES", str(256 * 1024 * 1024)))
+    )
+    # Per-function L1 limits, e.g. {"semantic_summarize": {"max_entries": 500, "max_bytes": 52428800}}
+    semantic_cache_l1_function_limits: Dict[str, Dict[str, int]] = Field(
+        default_factory=_parse_semantic_cache_function_limits
+    )
+
+    # Embedding cache consulted by Agent.embed() per text, keyed by
+    # (model, sha256(text)): 'clickhouse' (in-memory LRU + embedding_cache
+    # table), 'memory' (LRU only) or 'off'
+    embed_cache: str = Field(
+        default_factory=lambda: os.getenv("LARS_EMBED_CACHE", "clickhouse")
+    )
+    embed_cache_l1_max_entries: int = Field(
+        default_factory=lambda: int(os.getenv("LARS_EMBED_CACHE_L1_MAX_ENTRIES", "100000"))
+    )
+    embed_cache_l1_max_bytes: int = Field(
+        default_factory=lambda: int(os.getenv("LARS_EMBED_CACHE_L1_MAX_BYTES", str(256 * 1024 * 1024)))
+    )
+
+    # Tool result cache shared by every runner in the process (cascades opt in
+    # with tool_caching). The LRU holds at least this many entries; cascades
+    # with storage 'sqlite' also persist results to tool_cache_sqlite_path
+    # (default: <data_dir>/tool_cache.sqlite)
+    tool_cache_max_entries: int = Field(
+        default_factory=lambda: int(os.getenv("LARS_TOOL_CACHE_MAX_ENTRIES", "10000"))
+    )
+    tool_cache_sqlite_path: str = Field(
+        default_factory=lambda: os.getenv("LARS_TOOL_CACHE_SQLITE_PATH", "")
+    )
 
     # =========================================================================
     # Deprecated Settings (kept for backward compatibility)
@@ -7,7 +7,7 @@ No more dual-mode (chDB/ClickHouse) - we now use ClickHouse server exclusively.
 Key features:
 - Singleton pattern for connection reuse
 - Batch INSERT for efficient writes
-- ALTER TABLE UPDATE for cost tracking and winner flagging
+- Append-only cost events (llm_cost_events), ALTER TABLE UPDATE for winner flagging
 - Native vector search with cosineDistance()
 - Auto-create database and tables on startup
 - Query logging to ui_sql_log table (async fire-and-forget)
@@ -20,6 +20,7 @@ import queue
 import contextvars
 import atexit
 import traceback
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Union
 import pandas as pd
@@ -386,6 +387,187 @@ def get_query_logger() -> Optional[QueryLogger]:
     return _query_logger
 
 
+def vector_literal(vector) -> str:
+    """
+    Format a query vector as a ClickHouse array literal.
+
+    Float32 precision (%.7g) keeps a 4096-dim literal around 40KB instead of
+    the ~80KB str(float) produces; queries bind it once via WITH ... AS q.
+    """
+    return "[" + ",".join("%.7g" % float(v) for v in vector) + "]"
+
+
+# =============================================================================
+# Connection Pool
+# =============================================================================
+
+def _is_server_error(error: BaseException) -> bool:
+    """True for errors ClickHouse reported for a query (the connection is still usable)."""
+    try:
+        from clickhouse_driver.errors import ServerException
+    except ImportError:
+        return False
+    return isinstance(error, ServerException)
+
+
+class ConnectionPoolTimeout(Exception):
+    """Raised when no ClickHouse client could be checked out within the pool timeout."""
+
+
+class ClickHousePool:
+    """
+    Bounded pool of native-protocol ClickHouse clients.
+
+    clickhouse_driver clients are not thread-safe, so each query checks out
+    a client for its duration. Reads may hold at most `size - reserved_writes`
+    clients at once; the reserved clients are only handed to writes, so a
+    burst of slow Studio analytics queries cannot starve log inserts.
+
+    Clients are created lazily, up to `size`. A client whose operation failed
+    for any reason other than a ClickHouse server error is disconnected
+    before going back to the pool (clickhouse_driver reconnects on next use),
+    so a broken socket is never reused.
+    """
+
+    def __init__(self, client_factory, size: int = 8, reserved_writes: int = 2, timeout: float = 30.0):
+        self._client_factory = client_factory
+        self.size = max(1, size)
+        self.reserved_writes = max(0, min(reserved_writes, self.size - 1))
+        self.timeout = timeout
+
+        self._cond = threading.Condition()
+        self._idle: List[Any] = []
+        self._created = 0
+        self._in_use = {'read': 0, 'write': 0}
+
+        # Metrics
+        self._checkouts = {'read': 0, 'write': 0}
+        self._wait_s = {'read': 0.0, 'write': 0.0}
+        self._max_wait_s = {'read': 0.0, 'write': 0.0}
+        self._waiting = 0
+        self._timeouts = 0
+        self._errors = 0
+        self._peak_in_use = 0
+
+    def _available(self, kind: str) -> bool:
+        in_use = self._in_use['read'] + self._in_use['write']
+        if in_use >= self.size:
+            return False
+        if kind == 'read':
+            return self._in_use['read'] < self.size - self.reserved_writes
+        return True
+
+    def acquire(self, kind: str = 'read'):
+        """Check out a client for a 'read' or 'write'; raises ConnectionPoolTimeout."""
+        start = time.time()
+        deadline = start + self.timeout
+        with self._cond:
+            self._waiting += 1
+            try:
+                while not self._available(kind):
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise ConnectionPoolTimeout(
+                            f"No ClickHouse {kind} connection available after {self.timeout:.0f}s "
+                            f"(pool size {self.size}, {self.reserved_writes} reserved for writes)"
+                        )
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+
+            self._in_use[kind] += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use['read'] + self._in_use['write'])
+            waited = time.time() - start
+            self._checkouts[kind] += 1
+            self._wait_s[kind] += waited
+            self._max_wait_s[kind] = max(self._max_wait_s[kind], waited)
+
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+
+        try:
+            return self._client_factory()
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._in_use[kind] -= 1
+                self._errors += 1
+                self._cond.notify_all()
+            raise
+
+    def release(self, client, kind: str = 'read', error: BaseException | None = None):
+        """
+        Return a checked-out client.
+
+        If the client's operation raised, the error is counted, and unless
+        ClickHouse itself reported it, the connection is dropped first.
+        """
+        if error is not None and not _is_server_error(error):
+            try:
+                client.disconnect()
+            except Exception:
+                pass
+        with self._cond:
+            if error is not None:
+                self._errors += 1
+            self._in_use[kind] -= 1
+            self._idle.append(client)
+            self._cond.notify_all()
+
+    @contextmanager
+    def connection(self, kind: str = 'read'):
+        """Context manager around acquire()/release()."""
+        client = self.acquire(kind)
+        error = None
+        try:
+            yield client
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self.release(client, kind, error=error)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool metrics: sizes, clients in use, checkout counts and wait times, errors."""
+        with self._cond:
+            checkouts = self._checkouts['read'] + self._checkouts['write']
+            wait_s = self._wait_s['read'] + self._wait_s['write']
+            return {
+                'size': self.size,
+                'reserved_writes': self.reserved_writes,
+                'created': self._created,
+                'idle': len(self._idle),
+                'in_use': self._in_use['read'] + self._in_use['write'],
+                'in_use_reads': self._in_use['read'],
+                'in_use_writes': self._in_use['write'],
+                'peak_in_use': self._peak_in_use,
+                'waiting': self._waiting,
+                'checkouts': checkouts,
+                'read_checkouts': self._checkouts['read'],
+                'write_checkouts': self._checkouts['write'],
+                'avg_wait_ms': (wait_s / checkouts * 1000) if checkouts else 0.0,
+                'read_avg_wait_ms': (self._wait_s['read'] / self._checkouts['read'] * 1000) if self._checkouts['read'] else 0.0,
+                'write_avg_wait_ms': (self._wait_s['write'] / self._checkouts['write'] * 1000) if self._checkouts['write'] else 0.0,
+                'read_max_wait_ms': self._max_wait_s['read'] * 1000,
+                'write_max_wait_ms': self._max_wait_s['write'] * 1000,
+                'timeouts': self._timeouts,
+                'errors': self._errors,
+            }
+
+    def close(self):
+        """Disconnect all idle clients."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+        for client in idle:
+            try:
+                client.disconnect()
+            except Exception:
+                pass
+
+
 class ClickHouseAdapter:
     """
     Pure ClickHouse adapter - single implementation for all database operations.
@@ -393,17 +575,17 @@ class ClickHouseAdapter:
     This adapter:
     - Connects to ClickHouse server (no embedded chDB, no Parquet files)
     - Provides batch INSERT for efficient writes
-    - Supports ALTER TABLE UPDATE for cost tracking and winner flagging
+    - Records late cost data as append-only events; ALTER TABLE UPDATE for winner flagging
     - Implements native vector search with cosineDistance()
     - Auto-creates database and tables on first use
-    - Thread-safe: Uses locks for concurrent access from main thread + background workers
+    - Thread-safe: Each operation checks out its own client from a bounded
+      ClickHousePool, with capacity reserved for writes (logging, cache inserts)
     """
 
     _instance = None
     _lock = threading.Lock()
     _initialized = False
     _housekeeping_done = False  # Track if schema/migrations have been run
-    _query_lock = threading.Lock()  # Serialize all queries to avoid concurrent connection issues
 
     def __new__(cls, *args, **kwargs):
         # Singleton pattern for connection reuse
@@ -420,7 +602,10 @@ class ClickHouseAdapter:
         database: str = "lars",
         user: str = "default",
         password: str = "",
-        auto_create: bool = False
+        auto_create: bool = False,
+        pool_size: int = 8,
+        pool_reserved_writes: int = 2,
+        pool_timeout: float = 30.0
     ):
         """
         Initialize ClickHouse adapter (singleton - only runs once).
@@ -434,6 +619,9 @@ class ClickHouseAdapter:
             auto_create: If True, create database/tables/migrations on connect.
                          Default is False for fast cascade startup.
                          Use run_housekeeping() to explicitly initialize schema.
+            pool_size: Max concurrent ClickHouse clients
+            pool_reserved_writes: Clients only writes may use (reads never starve logging)
+            pool_timeout: Seconds to wait for a client before ConnectionPoolTimeout
         """
         # Skip if already initialized (singleton)
         if ClickHouseAdapter._initialized:
@@ -458,13 +646,30 @@ class ClickHouseAdapter:
         if auto_create:
             self._ensure_database()
 
-        # Now connect to the database with connection pooling settings
-        self.client = self._Client(
-            host=host,
-            port=port,
-            database=database,
-            user=user,
-            password=password,
+        # Pool of clients for the database (created lazily on first checkout)
+        self.pool = ClickHousePool(
+            self._create_client,
+            size=pool_size,
+            reserved_writes=pool_reserved_writes,
+            timeout=pool_timeout,
+        )
+
+        # Auto-create tables if requested
+        if auto_create:
+            self._ensure_tables()
+            self._run_migrations()
+            ClickHouseAdapter._housekeeping_done = True
+
+        ClickHouseAdapter._initialized = True
+
+    def _create_client(self):
+        """Create one database client for the pool."""
+        return self._Client(
+            host=self.host,
+            port=self.port,
+            database=self.database,
+            user=self.user,
+            password=self.password,
             # Connection settings for high concurrency
             connect_timeout=10,
             send_receive_timeout=30,
@@ -478,13 +683,9 @@ class ClickHouseAdapter:
             }
         )
 
-        # Auto-create tables if requested
-        if auto_create:
-            self._ensure_tables()
-            self._run_migrations()
-            ClickHouseAdapter._housekeeping_done = True
-
-        ClickHouseAdapter._initialized = True
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool metrics (see ClickHousePool.stats)."""
+        return self.pool.stats()
 
     def run_housekeeping(self):
         """
@@ -592,22 +793,22 @@ class ClickHouseAdapter:
         success = True
         error_msg = None
 
-        with ClickHouseAdapter._query_lock:
+        with self.pool.connection('read') as client:
             try:
                 if output_format == "dataframe":
-                    result = self.client.query_dataframe(sql, params or {})
+                    result = client.query_dataframe(sql, params or {})
                     rows_returned = len(result) if result is not None else 0
                     return result
                 elif output_format == "dict":
                     # Disable numpy for dict output to get native Python types
-                    result = self.client.execute(sql, params or {}, with_column_types=True, settings={'use_numpy': False})
+                    result = client.execute(sql, params or {}, with_column_types=True, settings={'use_numpy': False})
                     rows, columns = result
                     col_names = [c[0] for c in columns]
                     dict_result = [dict(zip(col_names, row)) for row in rows]
                     rows_returned = len(dict_result)
                     return dict_result
                 else:  # raw
-                    result = self.client.execute(sql, params or {})
+                    result = client.execute(sql, params or {})
                     rows_returned = len(result) if isinstance(result, (list, tuple)) else 0
                     return result
             except Exception as e:
@@ -653,9 +854,9 @@ class ClickHouseAdapter:
         success = True
         error_msg = None
 
-        with ClickHouseAdapter._query_lock:
+        with self.pool.connection('write') as client:
             try:
-                self.client.execute(sql, params or {})
+                client.execute(sql, params or {})
             except Exception as e:
                 success = False
                 error_msg = str(e)
@@ -759,10 +960,10 @@ class ClickHouseAdapter:
             values.append(tuple(row_values))
 
         cols_str = ', '.join(columns)
-        with ClickHouseAdapter._query_lock:
+        with self.pool.connection('write') as client:
             try:
                 # Disable numpy processing in clickhouse_driver
-                self.client.execute(
+                client.execute(
                     f"INSERT INTO {table} ({cols_str}) VALUES",
                     values,
                     settings={'use_numpy': False}
@@ -813,9 +1014,9 @@ class ClickHouseAdapter:
 
         # Use clickhouse-driver's native DataFrame insert
         cols_str = ', '.join(columns)
-        with ClickHouseAdapter._query_lock:
+        with self.pool.connection('write') as client:
             try:
-                self.client.insert_dataframe(
+                client.insert_dataframe(
                     f"INSERT INTO {table} ({cols_str}) VALUES",
                     df[columns],
                     settings={'use_numpy': True}
@@ -917,9 +1118,9 @@ class ClickHouseAdapter:
             WHERE {where}
             {settings}
         """
-        with ClickHouseAdapter._query_lock:
+        with self.pool.connection('write') as client:
             try:
-                self.client.execute(sql)
+                client.execute(sql)
             except Exception as e:
                 success = False
                 error_msg = str(e)
@@ -942,59 +1143,60 @@ class ClickHouseAdapter:
                         error_message=error_msg
                     )
 
-    def batch_update_costs(self, table: str, updates: List[Dict]):
+    def insert_cost_events(self, updates: List[Dict]):
         """
-        Batch update cost data for multiple rows by trace_id.
+        Record cost data for LLM calls as rows in llm_cost_events.
 
-        This is more efficient than individual updates - ClickHouse processes
-        as a single mutation operation.
+        Costs fetched after a call are appended rather than written back with
+        ALTER TABLE UPDATE (one mutation per message, each rewriting whole
+        parts). Readers get them merged into unified_logs through the
+        unified_logs_costed view.
 
-        IMPORTANT: Only updates rows with role='assistant' to avoid propagating
-        cost data to system/cell_start rows that share the same trace_id.
-        This prevents double/triple counting of costs in aggregate queries.
+        Events apply to the assistant row of each trace only - system/cell_start
+        rows share the trace_id but must not carry cost (prevents double
+        counting in SUM queries).
 
         Args:
-            updates: List of dicts with keys: trace_id, cost, tokens_in, tokens_out, provider, model
+            updates: List of dicts with keys: trace_id, cost, tokens_in, tokens_out,
+                     tokens_reasoning, provider, model (and optionally request_id, session_id)
         """
-        if not updates:
-            return
-
-        # Build individual UPDATE statements for each trace_id
-        # ClickHouse doesn't have CASE/WHEN in UPDATE, so we batch by grouping
+        rows = []
         for update in updates:
             trace_id = update.get('trace_id')
             if not trace_id:
                 continue
 
-            update_data = {}
-            if 'cost' in update and update['cost'] is not None:
-                update_data['cost'] = update['cost']
-            if 'tokens_in' in update and update['tokens_in'] is not None:
-                update_data['tokens_in'] = update['tokens_in']
-            if 'tokens_out' in update and update['tokens_out'] is not None:
-                update_data['tokens_out'] = update['tokens_out']
-            if 'tokens_reasoning' in update and update['tokens_reasoning'] is not None:
-                update_data['tokens_reasoning'] = update['tokens_reasoning']
-            if 'provider' in update and update['provider']:
-                update_data['provider'] = update['provider']
-            if 'model' in update and update['model']:
-                update_data['model'] = update['model']
-
-            # Calculate total_tokens (only if we have at least one token count)
-            tokens_in_val = update_data.get('tokens_in', 0) or 0
-            tokens_out_val = update_data.get('tokens_out', 0) or 0
-            if 'tokens_in' in update_data or 'tokens_out' in update_data:
-                update_data['total_tokens'] = tokens_in_val + tokens_out_val
-
-            if update_data:
-                # Only update the assistant row - system/cell_start rows share trace_id
-                # but shouldn't have cost data (prevents double-counting in SUM queries)
-                self.update_row(
-                    table,
-                    update_data,
-                    f"trace_id = '{trace_id}' AND role = 'assistant'",
-                    sync=False  # Don't wait for each individual update
-                )
+            tokens_in = update.get('tokens_in')
+            tokens_out = update.get('tokens_out')
+            total_tokens = None
+            if tokens_in is not None or tokens_out is not None:
+                total_tokens = (tokens_in or 0) + (tokens_out or 0)
+
+            rows.append({
+                'trace_id': trace_id,
+                'role': 'assistant',
+                'request_id': update.get('request_id') or '',
+                'session_id': update.get('session_id') or '',
+                'cost': update.get('cost'),
+                'tokens_in': tokens_in,
+                'tokens_out': tokens_out,
+                'tokens_reasoning': update.get('tokens_reasoning'),
+                'total_tokens': total_tokens,
+                'provider': update.get('provider') or None,
+                'model': update.get('model') or None,
+            })
+
+        if rows:
+            self.insert_rows('llm_cost_events', rows)
+
+    def batch_update_costs(self, table: str, updates: List[Dict]):
+        """
+        Backward-compatible alias for insert_cost_events().
+
+        Cost data is no longer written into `table` with ALTER TABLE UPDATE;
+        it is appended to llm_cost_events and merged at read time.
+        """
+        self.insert_cost_events(updates)
 
     def mark_take_winner(
         self,
@@ -1036,9 +1238,9 @@ class ClickHouseAdapter:
               AND take_index != {winning_index}
             SETTINGS mutations_sync = 1
         """
-        with ClickHouseAdapter._query_lock:
+        with self.pool.connection('write') as client:
             try:
-                self.client.execute(sql)
+                client.execute(sql)
             except Exception as e:
                 success = False
                 error_msg = str(e)
@@ -1085,13 +1287,11 @@ class ClickHouseAdapter:
         """
         where_clause = f"WHERE {where}" if where else ""
 
-        # Convert query vector to ClickHouse array format
-        vec_str = f"[{','.join(str(v) for v in query_vector)}]"
-
         sql = f"""
+            WITH {vector_literal(query_vector)} AS q
             SELECT {select_cols},
-                   cosineDistance({embedding_col}, {vec_str}) AS distance,
-                   1 - cosineDistance({embedding_col}, {vec_str}) AS similarity
+                   cosineDistance({embedding_col}, q) AS distance,
+                   1 - distance AS similarity
             FROM {table}
             {where_clause}
             ORDER BY distance ASC
@@ -1299,30 +1499,30 @@ class ClickHouseAdapter:
             table_name: Name of the table to check
             ddl: CREATE TABLE statement (should include IF NOT EXISTS)
         """
-        with ClickHouseAdapter._query_lock:
+        with self.pool.connection('write') as client:
             try:
-                result = self.client.execute(
+                result = client.execute(
                     f"SELECT 1 FROM system.tables WHERE database = '{self.database}' AND name = '{table_name}'"
                 )
                 if not result:
                     print(f"[LARS] Creating table '{table_name}'...")
-                    self.client.execute(ddl)  # Direct execute to avoid nested lock
+                    client.execute(ddl)
                     print(f"[LARS] Table '{table_name}' created")
             except Exception as e:
                 print(f"[LARS] Warning: Could not ensure table '{table_name}': {e}")
 
     def table_exists(self, table_name: str) -> bool:
         """Check if a table exists."""
-        with ClickHouseAdapter._query_lock:
-            result = self.client.execute(
+        with self.pool.connection('read') as client:
+            result = client.execute(
                 f"SELECT 1 FROM system.tables WHERE database = '{self.database}' AND name = '{table_name}'"
             )
             return len(result) > 0
 
     def get_table_row_count(self, table_name: str) -> int:
         """Get approximate row count for a table."""
-        with ClickHouseAdapter._query_lock:
-            result = self.client.execute(f"SELECT count() FROM {table_name}")
+        with self.pool.connection('read') as client:
+            result = client.execute(f"SELECT count() FROM {table_name}")
             return result[0][0] if result else 0
 
 
@@ -1354,7 +1554,10 @@ def get_db_adapter() -> ClickHouseAdapter:
         port=config.clickhouse_port,
         database=config.clickhouse_database,
         user=config.clickhouse_user,
-        password=config.clickhouse_password
+        password=config.clickhouse_password,
+        pool_size=config.clickhouse_pool_size,
+        pool_reserved_writes=config.clickhouse_pool_reserved_writes,
+        pool_timeout=config.clickhouse_pool_timeout
     )
 
     return _adapter_singleton
@@ -1383,6 +1586,8 @@ def ensure_housekeeping():
 def reset_adapter():
     """Reset the adapter singleton (useful for testing)."""
     global _adapter_singleton
+    if _adapter_singleton is not None and hasattr(_adapter_singleton, 'pool'):
+        _adapter_singleton.pool.close()
     _adapter_singleton = None
     ClickHouseAdapter._instance = None
     ClickHouseAdapter._initialized = False
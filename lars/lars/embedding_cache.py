@@ -0,0 +1,227 @@
+"""
+Content-addressed cache for text embeddings.
+
+Agent.embed() looks every text up by (model, sha256(text)) before calling the
+embeddings endpoint and only sends the misses, so re-running EMBED,
+SIMILAR_TO or VECTOR_SEARCH over the same rows does not pay for them again.
+
+Two tiers:
+- L1: in-memory LRU bounded by entry count and bytes. Vectors are held as
+  packed float32 (a 4096-dim embedding is 16KB).
+- L2: ClickHouse table embedding_cache, read with batched IN (...) lookups and
+  written by a background batching writer
+
+Usage:
+    from lars.embedding_cache import get_embedding_cache
+
+    cache = get_embedding_cache()  # None when LARS_EMBED_CACHE=off
+    found = cache.get_many(model, texts)  # {index: vector} for cached texts
+    cache.put_many(model, new_texts, new_vectors)
+"""
+
+import atexit
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .sql_tools.cache_adapter import L1Cache
+from .batch_writer import BatchTableWriter
+
+log = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """Two-tier (memory + ClickHouse) embedding cache keyed by (model, text hash)."""
+
+    TABLE = "embedding_cache"
+    LOOKUP_CHUNK_SIZE = 1000  # Max hashes per IN (...) lookup
+
+    def __init__(
+        self,
+        get_db=None,
+        max_entries: int = 100000,
+        max_bytes: int = 256 * 1024 * 1024,
+    ):
+        """
+        Args:
+            get_db: Callable returning the ClickHouse adapter, or None for an
+                in-memory-only cache
+            max_entries: L1 entry limit
+            max_bytes: L1 byte limit
+        """
+        self._get_db = get_db
+        self._l1 = L1Cache(max_entries, max_bytes)
+        self._db = None
+        self._db_checked = False
+        self._db_lock = threading.Lock()
+        self._writer: Optional[BatchTableWriter] = None
+        self._stats_lock = threading.Lock()
+
+        self._l2_hits = 0
+        self._l2_misses = 0
+        self._l2_errors = 0
+        self._stored = 0
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _l1_key(model: str, text_hash: str) -> str:
+        return f"{model}\x00{text_hash}"
+
+    def _l2(self):
+        """ClickHouse adapter for the persistent tier, or None if unavailable."""
+        if self._get_db is None:
+            return None
+        if not self._db_checked:
+            with self._db_lock:
+                if not self._db_checked:
+                    try:
+                        from .schema import EMBEDDING_CACHE_SCHEMA
+                        db = self._get_db()
+                        db.ensure_table_exists(self.TABLE, EMBEDDING_CACHE_SCHEMA)
+                        self._db = db
+                        self._writer = BatchTableWriter(
+                            lambda: self._db, self.TABLE, batch_size=500, flush_interval=1.0,
+                            overflow="drop_newest", name="EmbeddingCacheWriter",
+                        )
+                        atexit.register(self._writer.shutdown)
+                    except Exception as e:
+                        log.warning(f"[EmbeddingCache] ClickHouse tier unavailable: {e}")
+                        self._db = None
+                    self._db_checked = True
+        return self._db
+
+    def get_many(self, model: str, texts: List[str]) -> Dict[int, List[float]]:
+        """
+        Look texts up in L1, then L2 for whatever L1 missed.
+
+        Returns:
+            {index into texts: vector} for every text found; L2 hits are
+            promoted to L1
+        """
+        found: Dict[int, List[float]] = {}
+        missing: Dict[str, List[int]] = {}  # text hash -> indexes still missing
+
+        for i, text in enumerate(texts):
+            text_hash = self.text_hash(text)
+            entry = self._l1.get(self._l1_key(model, text_hash))
+            if entry is not None:
+                found[i] = np.frombuffer(entry[0], dtype=np.float32).tolist()
+            else:
+                missing.setdefault(text_hash, []).append(i)
+
+        if missing and self._l2() is not None:
+            for text_hash, packed in self._get_l2(model, list(missing)).items():
+                self._set_l1(model, text_hash, packed)
+                vector = np.frombuffer(packed, dtype=np.float32).tolist()
+                for i in missing[text_hash]:
+                    found[i] = vector
+
+        return found
+
+    def _get_l2(self, model: str, hashes: List[str]) -> Dict[str, bytes]:
+        """Fetch packed vectors for text hashes from ClickHouse."""
+        found: Dict[str, bytes] = {}
+        query = f"""
+            SELECT text_hash, embedding
+            FROM {self.TABLE}
+            WHERE model = %(model)s AND text_hash IN %(hashes)s
+            LIMIT 1 BY text_hash
+        """
+        for start in range(0, len(hashes), self.LOOKUP_CHUNK_SIZE):
+            chunk = tuple(hashes[start:start + self.LOOKUP_CHUNK_SIZE])
+            try:
+                rows = self._db.query(query, {"model": model, "hashes": chunk})
+            except Exception as e:
+                with self._stats_lock:
+                    self._l2_errors += 1
+                log.debug(f"[EmbeddingCache] L2 lookup error: {e}")
+                continue
+            for row in rows or []:
+                if not isinstance(row, dict):
+                    row = {"text_hash": row[0], "embedding": row[1]}
+                found[row["text_hash"]] = np.asarray(row["embedding"], dtype=np.float32).tobytes()
+
+        with self._stats_lock:
+            self._l2_hits += len(found)
+            self._l2_misses += len(hashes) - len(found)
+        return found
+
+    def _set_l1(self, model: str, text_hash: str, packed: bytes):
+        self._l1.set(self._l1_key(model, text_hash), model, packed, "float32", 0.0, None)
+
+    def put_many(self, model: str, texts: List[str], vectors: List[List[float]]):
+        """Store freshly computed embeddings in L1 and queue them for L2."""
+        db = self._l2()
+        for text, vector in zip(texts, vectors):
+            text_hash = self.text_hash(text)
+            packed = np.asarray(vector, dtype=np.float32).tobytes()
+            self._set_l1(model, text_hash, packed)
+            if db is not None:
+                self._writer.write({
+                    "model": model,
+                    "text_hash": text_hash,
+                    "embedding": vector,
+                    "dim": len(vector),
+                    "text_chars": len(text),
+                })
+        with self._stats_lock:
+            self._stored += len(texts)
+
+    def flush(self):
+        """Write queued L2 rows now (blocking)."""
+        if self._writer is not None:
+            self._writer.flush()
+
+    def clear(self) -> int:
+        """Drop the in-memory tier; the ClickHouse table is left alone."""
+        return self._l1.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        l1 = self._l1.get_stats()
+        with self._stats_lock:
+            return {
+                "l1": {key: l1[key] for key in ("entries", "bytes", "max_bytes", "hits", "misses", "hit_rate", "evictions")},
+                "l2_enabled": self._db is not None,
+                "l2_hits": self._l2_hits,
+                "l2_misses": self._l2_misses,
+                "l2_errors": self._l2_errors,
+                "stored": self._stored,
+                "writer": self._writer.get_stats() if self._writer is not None else None,
+            }
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Process-wide embedding cache configured by LARS_EMBED_CACHE (None when 'off')."""
+    global _embedding_cache
+    if _embedding_cache is None:
+        from .config import get_config
+        config = get_config()
+        mode = (config.embed_cache or "clickhouse").lower()
+        if mode == "off":
+            return None
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                get_db = None
+                if mode == "clickhouse":
+                    from .db_adapter import get_db
+                _embedding_cache = EmbeddingCache(
+                    get_db,
+                    max_entries=config.embed_cache_l1_max_entries,
+                    max_bytes=config.embed_cache_l1_max_bytes,
+                )
+    return _embedding_cache
+
+
+def get_embedding_cache_stats() -> Optional[Dict[str, Any]]:
+    """Stats of the process-wide cache, or None if it has not been used."""
+    return _embedding_cache.get_stats() if _embedding_cache is not None else None
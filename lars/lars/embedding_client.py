@@ -0,0 +1,294 @@
+"""
+Pooled, concurrent client for the provider's /embeddings endpoint.
+
+Agent.embed() sends its cache misses through one process-wide
+EmbeddingClient:
+- One keep-alive httpx.Client shared by every caller (no per-call TLS handshakes)
+- Batches sized by text count and total characters (plan_batches), so a few
+  long documents don't end up in one oversized request
+- Up to `concurrency` batches in flight across all callers
+- Retries for timeouts, connection errors, 429 and 5xx. A 429 honours
+  Retry-After and pauses every batch, not just the one that was throttled.
+- Each request takes a slot from the process-wide LLM scheduler, so
+  embeddings share the provider's limits with completions
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+def plan_batches(texts: List[str], max_items: int, max_chars: int) -> List[Tuple[int, int]]:
+    """
+    Split texts into consecutive [start, end) batches of at most `max_items`
+    texts and `max_chars` total characters. A text longer than `max_chars`
+    gets a batch of its own.
+    """
+    batches = []
+    start, chars = 0, 0
+    for i, text in enumerate(texts):
+        size = len(text)
+        if i > start and (i - start >= max_items or chars + size > max_chars):
+            batches.append((start, i))
+            start, chars = i, 0
+        chars += size
+    if start < len(texts):
+        batches.append((start, len(texts)))
+    return batches
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class EmbeddingClient:
+    """Shared keep-alive client that embeds batches concurrently with retries."""
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str],
+        concurrency: int = 4,
+        batch_size: int = 50,
+        max_batch_chars: int = 100_000,
+        max_retries: int = 3,
+        base_delay: float = 2.0,
+        max_retry_after: float = 60.0,
+        timeout: float = 300.0,
+    ):
+        self.url = f"{base_url.rstrip('/')}/embeddings"
+        self.api_key = api_key
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.max_batch_chars = max_batch_chars
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_retry_after = max_retry_after
+        self.timeout = timeout
+
+        self._client = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._cooldown_until = 0.0
+
+        self._requests = 0
+        self._batches = 0
+        self._texts = 0
+        self._retries = 0
+        self._throttled = 0
+        self._cooldown_s = 0.0
+        self._in_flight = 0
+        self._max_in_flight = 0
+
+    def _ensure_started(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import httpx
+                    limits = httpx.Limits(
+                        max_connections=self.concurrency,
+                        max_keepalive_connections=self.concurrency,
+                    )
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.concurrency, thread_name_prefix="EmbeddingClient"
+                    )
+                    self._client = httpx.Client(timeout=self.timeout, limits=limits)
+
+    def embed(self, texts: List[str], model: str) -> Dict[str, Any]:
+        """
+        Embed texts, batching and sending the batches concurrently.
+
+        Returns:
+            dict with embeddings (in input order), model, request_id (of the
+            last batch), tokens and batches
+        """
+        from .llm_scheduler import current_priority
+        self._ensure_started()
+        priority = current_priority()  # Resolved here: pool threads carry no caller context
+        batches = plan_batches(texts, self.batch_size, self.max_batch_chars)
+        futures = [
+            self._executor.submit(self._embed_batch, texts[start:end], model, priority)
+            for start, end in batches
+        ]
+        results = [future.result() for future in futures]
+
+        vectors: List[List[float]] = []
+        for (start, end), result in zip(batches, results):
+            if len(result["embeddings"]) != end - start:
+                raise RuntimeError(f"Expected {end - start} embeddings, got {len(result['embeddings'])}")
+            vectors.extend(result["embeddings"])
+
+        with self._stats_lock:
+            self._batches += len(batches)
+            self._texts += len(texts)
+
+        last = results[-1] if results else {}
+        return {
+            "embeddings": vectors,
+            "model": last.get("model", model),
+            "request_id": last.get("request_id"),
+            "tokens": sum(r["tokens"] for r in results),
+            "batches": len(batches),
+        }
+
+    def _wait_for_cooldown(self):
+        """Sleep while a 429 Retry-After window is open."""
+        while True:
+            with self._lock:
+                wait = self._cooldown_until - time.time()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def _embed_batch(self, batch_texts: List[str], model: str, priority: Optional[str] = None) -> Dict[str, Any]:
+        import httpx
+        from .blocking_cost import extract_provider_from_model
+        from .llm_scheduler import get_llm_scheduler
+
+        scheduler = get_llm_scheduler()
+        provider = extract_provider_from_model(model)
+        estimated_tokens = sum(len(text) for text in batch_texts) // 4 + 1
+        payload = {"model": model, "input": batch_texts}
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+        for attempt in range(self.max_retries):
+            self._wait_for_cooldown()
+            with self._stats_lock:
+                self._requests += 1
+                self._in_flight += 1
+                self._max_in_flight = max(self._max_in_flight, self._in_flight)
+            try:
+                with scheduler.slot(provider, model, tokens=estimated_tokens, priority=priority) as ticket:
+                    resp = self._client.post(self.url, json=payload, headers=headers)
+                    if resp.status_code < 400:
+                        result = self._parse(resp, model)
+                        ticket.complete(result["tokens"] or None)
+                        return result
+                    delay = self.base_delay * (2 ** attempt)
+                    if resp.status_code == 429:
+                        retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                        if retry_after is not None:
+                            delay = min(retry_after, self.max_retry_after)
+                        ticket.throttled(delay)
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                error, delay = e, self.base_delay * (2 ** attempt)
+            else:
+                error = RuntimeError(f"HTTP {resp.status_code}: {resp.text[:500]}")
+                if resp.status_code not in RETRYABLE_STATUS:
+                    raise RuntimeError(f"Embedding request failed: {error}")
+                if resp.status_code == 429:
+                    with self._lock:
+                        self._cooldown_until = max(self._cooldown_until, time.time() + delay)
+                    with self._stats_lock:
+                        self._throttled += 1
+                        self._cooldown_s += delay
+            finally:
+                with self._stats_lock:
+                    self._in_flight -= 1
+
+            if attempt == self.max_retries - 1:
+                raise RuntimeError(f"Embedding failed after {self.max_retries} retries: {error}") from error
+            with self._stats_lock:
+                self._retries += 1
+            log.info(f"[Embed] Retry {attempt + 1}/{self.max_retries} after {delay:.1f}s: {error}")
+            time.sleep(delay)
+
+    @staticmethod
+    def _parse(resp, model: str) -> Dict[str, Any]:
+        try:
+            data = resp.json()
+        except Exception as e:
+            raise RuntimeError(f"Failed to parse embedding response as JSON. Status: {resp.status_code}, Body: {resp.text[:500]}") from e
+
+        embeddings_data = data.get("data", [])
+        if not embeddings_data:
+            raise RuntimeError(f"No embedding data returned: {data}")
+
+        # OpenAI-compatible responses carry an index per item; don't rely on order
+        embeddings_data = sorted(embeddings_data, key=lambda d: d.get("index", 0))
+        vectors = [d["embedding"] for d in embeddings_data]
+        if not vectors or not vectors[0]:
+            raise RuntimeError("Empty embedding response")
+
+        return {
+            "embeddings": vectors,
+            "model": data.get("model", model),
+            "request_id": data.get("id"),
+            "tokens": (data.get("usage") or {}).get("total_tokens", 0),
+        }
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "concurrency": self.concurrency,
+                "requests": self._requests,
+                "batches": self._batches,
+                "texts": self._texts,
+                "retries": self._retries,
+                "throttled": self._throttled,
+                "cooldown_s": round(self._cooldown_s, 3),
+                "in_flight": self._in_flight,
+                "max_in_flight": self._max_in_flight,
+            }
+
+
+_embedding_client: Optional[EmbeddingClient] = None
+_embedding_client_key: Optional[tuple] = None
+_embedding_client_lock = threading.Lock()
+
+
+def get_embedding_client(config=None) -> EmbeddingClient:
+    """Process-wide EmbeddingClient for the configured provider (rebuilt if the provider changes)."""
+    global _embedding_client, _embedding_client_key
+    if config is None:
+        from .config import get_config
+        config = get_config()
+    key = (config.provider_base_url, config.provider_api_key)
+    with _embedding_client_lock:
+        if _embedding_client is None or _embedding_client_key != key:
+            if _embedding_client is not None:
+                _embedding_client.close()
+            _embedding_client = EmbeddingClient(
+                config.provider_base_url,
+                config.provider_api_key,
+                concurrency=config.embed_concurrency,
+                batch_size=config.embed_batch_size,
+                max_batch_chars=config.embed_batch_max_chars,
+            )
+            _embedding_client_key = key
+        return _embedding_client
+
+
+def get_embedding_client_stats() -> Optional[Dict[str, Any]]:
+    """Stats of the process-wide client, or None if nothing was embedded yet."""
+    return _embedding_client.get_stats() if _embedding_client is not None else None
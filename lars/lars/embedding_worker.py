@@ -12,7 +12,7 @@ All embedding API costs are logged under:
 - cascade_id: "system_embedding_worker"
 
 So you can query total embedding costs:
-    SELECT SUM(cost) FROM unified_logs WHERE cascade_id = 'system_embedding_worker'
+    SELECT SUM(cost) FROM unified_logs_costed WHERE cascade_id = 'system_embedding_worker'
 """
 
 import os
@@ -347,7 +347,7 @@ def get_embedding_costs() -> Dict[str, Any]:
             SUM(cost) as total_cost,
             SUM(tokens_in) as total_tokens,
             COUNT(*) as call_count
-        FROM unified_logs
+        FROM unified_logs_costed
         WHERE cascade_id = '{EMBEDDING_CASCADE_ID}'
           AND node_type = 'embedding'
     """
@@ -448,7 +448,7 @@ def get_unevaluated_takes(limit: int = 50) -> pd.DataFrame:
                 timestamp,
                 cost,
                 tokens_out
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE take_index IS NOT NULL
               AND role = 'assistant'
               AND content_json IS NOT NULL
@@ -542,7 +542,7 @@ def get_take_group(session_id: str, cell_name: str) -> Dict:
                 model,
                 mutation_applied,
                 full_request_json
-            FROM unified_logs
+            FROM unified_logs_costed_session(sid = '{session_id}')
             WHERE session_id = '{session_id}'
               AND cell_name = '{cell_name}'
               AND take_index IS NOT NULL
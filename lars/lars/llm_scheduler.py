@@ -0,0 +1,483 @@
+"""
+Process-wide scheduler for LLM provider requests.
+
+Every Agent.run() completion and every embeddings batch asks the scheduler for
+a slot before it goes on the wire. Thread pools stay where they are (parallel
+cells, takes, vectorized UDFs, map-reduce aggregates), but however deeply they
+nest, the number of requests actually in flight is capped per provider, so a
+takes cascade inside a vectorized UDF inside a parallel cell queues here
+instead of collecting 429s.
+
+Limits are kept per lane:
+- One lane per provider (extract_provider_from_model), always
+- One lane per model, when LARS_LLM_LIMITS has an entry for that model
+Each lane has a concurrency cap, a requests/min and a tokens/min bucket
+(0 = unlimited) and a cooldown opened by 429 responses.
+
+Waiting requests are served by priority class, then arrival order:
+- interactive: Studio, CLI and anything without a caller context
+- bulk: SQL queries (caller origin 'sql')
+A request never overtakes an earlier request of the same or higher priority
+on a lane it is blocked on.
+
+A slot only covers the provider call itself, never a whole cascade, so nested
+pools cannot deadlock on it. Coroutines (Agent.arun) use aslot(), which
+waits without blocking their event loop.
+
+Usage:
+    from lars.llm_scheduler import get_llm_scheduler
+
+    with get_llm_scheduler().slot("openai", "openai/gpt-4o", tokens=1200) as ticket:
+        response = litellm.completion(**args)
+        ticket.complete(tokens=response.usage.total_tokens)
+"""
+
+import asyncio
+import bisect
+import contextvars
+import itertools
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, Iterable, List, Optional
+
+log = logging.getLogger(__name__)
+
+PRIORITIES = {"interactive": 0, "bulk": 1}
+
+# Longest a waiter sleeps before re-checking the rate buckets itself
+MAX_POLL_S = 0.5
+
+_priority: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("llm_priority", default=None)
+
+
+@contextmanager
+def llm_priority(priority: str):
+    """Run the enclosed LLM calls (on this thread) with the given priority class."""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown LLM priority {priority!r}, expected one of {sorted(PRIORITIES)}")
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority(default: str = "interactive") -> str:
+    """
+    Priority class of the current thread: an explicit llm_priority() block,
+    else 'bulk' for SQL callers, else the default.
+    """
+    priority = _priority.get()
+    if priority:
+        return priority
+    from .caller_context import get_local_invocation_metadata
+    metadata = get_local_invocation_metadata()
+    if metadata and metadata.get("origin") == "sql":
+        return "bulk"
+    return default
+
+
+def estimate_tokens(messages: Iterable[Dict[str, Any]]) -> int:
+    """Rough prompt size (~4 characters per token) used to charge the tokens/min bucket up front."""
+    chars = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            chars += len(content)
+        elif isinstance(content, list):
+            for part in content:
+                if isinstance(part, dict) and isinstance(part.get("text"), str):
+                    chars += len(part["text"])
+    return chars // 4 + 1
+
+
+class _Bucket:
+    """Token bucket refilled continuously at `per_minute` per minute."""
+
+    def __init__(self, per_minute: int, now: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = now
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def cost(self, amount: float) -> float:
+        # A single request bigger than the bucket waits for a full bucket
+        return min(float(amount), self.capacity)
+
+    def wait_for(self, amount: float) -> float:
+        missing = self.cost(amount) - self.level
+        return 0.0 if missing <= 0 else missing / self.rate
+
+
+class _Lane:
+    """Concurrency cap, rate buckets and counters of one provider or model."""
+
+    def __init__(self, name: str, concurrency: int = 0, rpm: int = 0, tpm: int = 0, now: float = 0.0):
+        self.name = name
+        self.concurrency = max(0, concurrency)
+        self.rpm = max(0, rpm)
+        self.tpm = max(0, tpm)
+        self.requests = _Bucket(self.rpm, now) if self.rpm else None
+        self.tokens = _Bucket(self.tpm, now) if self.tpm else None
+        self.cooldown_until = 0.0
+
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.granted = 0
+        self.throttled = 0
+        self.tokens_used = 0
+
+    def wait_time(self, tokens: int, now: float) -> float:
+        """Seconds until a request of `tokens` can start here (inf while at the concurrency cap)."""
+        wait = max(0.0, self.cooldown_until - now)
+        if self.concurrency and self.in_flight >= self.concurrency:
+            return math.inf
+        if self.requests is not None:
+            self.requests.refill(now)
+            wait = max(wait, self.requests.wait_for(1))
+        if self.tokens is not None:
+            self.tokens.refill(now)
+            wait = max(wait, self.tokens.wait_for(tokens))
+        return wait
+
+    def acquire(self, tokens: int):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.granted += 1
+        if self.requests is not None:
+            self.requests.level -= 1
+        if self.tokens is not None:
+            self.tokens.level -= self.tokens.cost(tokens)
+
+    def release(self, estimated: int, actual: Optional[int]):
+        self.in_flight -= 1
+        if actual is not None:
+            self.tokens_used += actual
+            if self.tokens is not None:
+                # Settle the estimate against real usage (the bucket may go into debt)
+                self.tokens.level -= actual - self.tokens.cost(estimated)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "rpm": self.rpm,
+            "tpm": self.tpm,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "granted": self.granted,
+            "throttled": self.throttled,
+            "tokens": self.tokens_used,
+        }
+
+
+class _LoopEvent:
+    """Sets an asyncio.Event from whichever thread grants the slot."""
+
+    def __init__(self, loop, event):
+        self.loop = loop
+        self.event = event
+
+    def set(self):
+        self.loop.call_soon_threadsafe(self.event.set)
+
+
+class _Waiter:
+    __slots__ = ("order", "lanes", "tokens", "priority", "enqueued", "event", "granted", "queued")
+
+    def __init__(self, order, lanes, tokens, priority, enqueued, event):
+        self.order = order  # (priority rank, arrival sequence)
+        self.lanes = lanes
+        self.tokens = tokens
+        self.priority = priority
+        self.enqueued = enqueued
+        self.event = event  # threading.Event or _LoopEvent
+        self.granted = False
+        self.queued = False
+
+    def __lt__(self, other):
+        return self.order < other.order
+
+
+class Ticket:
+    """A granted slot. Report usage and throttling through it before it is released."""
+
+    def __init__(self, scheduler: "LLMScheduler", lanes: List[_Lane], tokens: int, priority: str, wait_s: float):
+        self._scheduler = scheduler
+        self._lanes = lanes
+        self.tokens = tokens
+        self.priority = priority
+        self.wait_s = wait_s
+        self.actual_tokens: Optional[int] = None
+
+    def complete(self, tokens: Optional[int] = None):
+        """Record the tokens the request really used (settles the tokens/min estimate)."""
+        self.actual_tokens = tokens
+
+    def throttled(self, retry_after: Optional[float] = None):
+        """Report a 429: pause every request on this ticket's lanes for retry_after seconds."""
+        self._scheduler._throttle(self._lanes, retry_after)
+
+
+class LLMScheduler:
+    """Admission control for LLM requests with per-provider/model limits and priority classes."""
+
+    WAIT_SAMPLES = 1000  # Recent queue waits kept per priority for percentiles
+
+    def __init__(
+        self,
+        concurrency: int = 16,
+        rpm: int = 0,
+        tpm: int = 0,
+        limits: Optional[Dict[str, Dict[str, int]]] = None,
+        default_retry_after: float = 5.0,
+    ):
+        """
+        Args:
+            concurrency: Default in-flight cap per provider (0 = unlimited)
+            rpm: Default requests/min per provider (0 = unlimited)
+            tpm: Default tokens/min per provider (0 = unlimited)
+            limits: Overrides by provider or model name, e.g.
+                {"ollama": {"concurrency": 2}, "anthropic/claude-sonnet-4": {"rpm": 50}}
+            default_retry_after: Cooldown for a 429 without Retry-After
+        """
+        self.defaults = {"concurrency": concurrency, "rpm": rpm, "tpm": tpm}
+        self.limits = limits or {}
+        self.default_retry_after = default_retry_after
+
+        self._lock = threading.Lock()
+        self._lanes: Dict[str, _Lane] = {}
+        self._waiting: List[_Waiter] = []  # Sorted by (priority, arrival)
+        self._sequence = itertools.count()
+
+        self._waits = {p: deque(maxlen=self.WAIT_SAMPLES) for p in PRIORITIES}
+        self._requests = dict.fromkeys(PRIORITIES, 0)
+        self._queued = dict.fromkeys(PRIORITIES, 0)
+        self._wait_total = dict.fromkeys(PRIORITIES, 0.0)
+        self._wait_max = dict.fromkeys(PRIORITIES, 0.0)
+
+    def _lanes_for(self, provider: str, model: Optional[str], now: float) -> List[_Lane]:
+        lanes = []
+        for name, limits in ((provider, {**self.defaults, **self.limits.get(provider, {})}),
+                             (model, self.limits.get(model) if model and model != provider else None)):
+            if limits is None:
+                continue
+            lane = self._lanes.get(name)
+            if lane is None:
+                lane = self._lanes[name] = _Lane(name, now=now, **limits)
+            lanes.append(lane)
+        return lanes
+
+    @contextmanager
+    def slot(self, provider: str, model: Optional[str] = None, tokens: int = 0, priority: Optional[str] = None):
+        """
+        Wait for capacity on the provider (and model) lanes, hold it for the
+        enclosed request and release it on exit.
+
+        Args:
+            provider: Provider lane, e.g. 'openai', 'ollama'
+            model: Model name; gets its own lane if LARS_LLM_LIMITS configures it
+            tokens: Estimated tokens, charged against tokens/min until
+                ticket.complete() reports the real figure
+            priority: 'interactive' or 'bulk' (default: current_priority())
+        """
+        waiter, poll = self._enqueue(provider, model, tokens, priority, threading.Event())
+        try:
+            while not waiter.granted:
+                waiter.event.wait(min(poll, MAX_POLL_S))
+                if not waiter.granted:
+                    with self._lock:
+                        poll = self._dispatch(time.monotonic())
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+        ticket = self._admitted(waiter)
+        try:
+            yield ticket
+        finally:
+            self._release(ticket)
+
+    @asynccontextmanager
+    async def aslot(self, provider: str, model: Optional[str] = None, tokens: int = 0, priority: Optional[str] = None):
+        """slot() for coroutines: waits without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        waiter, poll = self._enqueue(
+            provider, model, tokens, priority, _LoopEvent(loop, event)
+        )
+        try:
+            while not waiter.granted:
+                try:
+                    await asyncio.wait_for(event.wait(), min(poll, MAX_POLL_S))
+                except asyncio.TimeoutError:
+                    pass
+                if not waiter.granted:
+                    with self._lock:
+                        poll = self._dispatch(time.monotonic())
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+        ticket = self._admitted(waiter)
+        try:
+            yield ticket
+        finally:
+            self._release(ticket)
+
+    def _enqueue(self, provider, model, tokens, priority, event):
+        priority = priority or current_priority()
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown LLM priority {priority!r}, expected one of {sorted(PRIORITIES)}")
+
+        enqueued = time.monotonic()
+        with self._lock:
+            lanes = self._lanes_for(provider or "unknown", model, enqueued)
+            waiter = _Waiter((PRIORITIES[priority], next(self._sequence)), lanes, tokens, priority, enqueued, event)
+            bisect.insort(self._waiting, waiter)
+            poll = self._dispatch(enqueued)
+            waiter.queued = not waiter.granted
+        return waiter, poll
+
+    def _admitted(self, waiter: "_Waiter") -> "Ticket":
+        priority = waiter.priority
+        wait_s = time.monotonic() - waiter.enqueued
+        with self._lock:
+            self._requests[priority] += 1
+            if waiter.queued:
+                self._queued[priority] += 1
+            self._wait_total[priority] += wait_s
+            self._wait_max[priority] = max(self._wait_max[priority], wait_s)
+            self._waits[priority].append(wait_s)
+        return Ticket(self, waiter.lanes, waiter.tokens, priority, wait_s)
+
+    def _abandon(self, waiter: "_Waiter"):
+        """Drop a waiter whose caller stopped waiting (cancelled, interrupted), returning any slot it was granted."""
+        with self._lock:
+            if waiter.granted:
+                for lane in waiter.lanes:
+                    lane.release(waiter.tokens, None)
+            else:
+                self._waiting.remove(waiter)
+            self._dispatch(time.monotonic())
+
+    def _release(self, ticket: "Ticket"):
+        with self._lock:
+            for lane in ticket._lanes:
+                lane.release(ticket.tokens, ticket.actual_tokens)
+            self._dispatch(time.monotonic())
+
+    def _dispatch(self, now: float) -> float:
+        """
+        Grant every waiter that fits, in priority order. Called with the lock
+        held. Returns the seconds until a rate bucket or cooldown could admit
+        the next blocked waiter.
+        """
+        blocked = set()
+        next_check = MAX_POLL_S
+        for waiter in list(self._waiting):
+            if any(id(lane) in blocked for lane in waiter.lanes):
+                continue
+            waits = [lane.wait_time(waiter.tokens, now) for lane in waiter.lanes]
+            if max(waits) <= 0:
+                for lane in waiter.lanes:
+                    lane.acquire(waiter.tokens)
+                self._waiting.remove(waiter)
+                waiter.granted = True
+                waiter.event.set()
+                continue
+            for lane, wait in zip(waiter.lanes, waits):
+                if wait > 0:
+                    # Later (or lower-priority) requests must not overtake on this lane
+                    blocked.add(id(lane))
+                    if wait != math.inf:
+                        next_check = min(next_check, wait)
+        return max(next_check, 0.001)
+
+    def _throttle(self, lanes: List[_Lane], retry_after: Optional[float]):
+        delay = self.default_retry_after if retry_after is None else retry_after
+        until = time.monotonic() + delay
+        with self._lock:
+            for lane in lanes:
+                lane.cooldown_until = max(lane.cooldown_until, until)
+                lane.throttled += 1
+        log.info(f"[LLMScheduler] 429 on {', '.join(l.name for l in lanes)}: pausing {delay:.1f}s")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            priorities = {}
+            for name in PRIORITIES:
+                waits = sorted(self._waits[name])
+                requests = self._requests[name]
+                priorities[name] = {
+                    "requests": requests,
+                    "queued": self._queued[name],
+                    "avg_wait_ms": round(1000 * self._wait_total[name] / requests, 2) if requests else 0.0,
+                    "p50_wait_ms": round(1000 * waits[len(waits) // 2], 2) if waits else 0.0,
+                    "p95_wait_ms": round(1000 * waits[min(len(waits) - 1, int(len(waits) * 0.95))], 2) if waits else 0.0,
+                    "max_wait_ms": round(1000 * self._wait_max[name], 2),
+                }
+            waiting = {}
+            for waiter in self._waiting:
+                for lane in waiter.lanes:
+                    waiting[lane.name] = waiting.get(lane.name, 0) + 1
+            return {
+                "defaults": dict(self.defaults),
+                "waiting": len(self._waiting),
+                "lanes": {name: {**lane.stats(), "waiting": waiting.get(name, 0)} for name, lane in self._lanes.items()},
+                "priorities": priorities,
+            }
+
+
+class _UnlimitedScheduler:
+    """Stand-in used when LARS_LLM_SCHEDULER=false: slots are granted immediately."""
+
+    @contextmanager
+    def slot(self, provider, model=None, tokens=0, priority=None):
+        yield Ticket(self, [], tokens, priority or "interactive", 0.0)
+
+    @asynccontextmanager
+    async def aslot(self, provider, model=None, tokens=0, priority=None):
+        yield Ticket(self, [], tokens, priority or "interactive", 0.0)
+
+    def _throttle(self, lanes, retry_after):
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"enabled": False}
+
+
+_llm_scheduler = None
+_llm_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler():
+    """Process-wide scheduler configured by LARS_LLM_* settings."""
+    global _llm_scheduler
+    if _llm_scheduler is None:
+        with _llm_scheduler_lock:
+            if _llm_scheduler is None:
+                from .config import get_config
+                config = get_config()
+                if not config.llm_scheduler:
+                    _llm_scheduler = _UnlimitedScheduler()
+                else:
+                    _llm_scheduler = LLMScheduler(
+                        concurrency=config.llm_max_concurrency,
+                        rpm=config.llm_rpm,
+                        tpm=config.llm_tpm,
+                        limits=config.llm_limits,
+                    )
+    return _llm_scheduler
+
+
+def get_llm_scheduler_stats() -> Optional[Dict[str, Any]]:
+    """Stats of the process-wide scheduler, or None if no request went through it yet."""
+    return _llm_scheduler.get_stats() if _llm_scheduler is not None else None
@@ -20,6 +20,42 @@ def load_config_file(path: Union[str, Path]) -> Dict[str, Any]:
     """
     Load a configuration file (JSON or YAML) based on file extension.
 
+    Paths are resolved with resolve_config_path().
+
+    Args:
+        path: Path to the configuration file
+
+    Returns:
+        Parsed configuration as a dictionary
+
+    Raises:
+        FileNotFoundError: If file doesn't exist in any search location
+        ValueError: If file format is unsupported or parsing fails
+    """
+    resolved_path = resolve_config_path(path)
+
+    # Use the resolved path for reading
+    with open(resolved_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    suffix = resolved_path.suffix.lower()
+
+    if suffix in ('.yaml', '.yml'):
+        return _load_yaml(content, resolved_path)
+    elif suffix == '.json':
+        return _load_json(content, resolved_path)
+    else:
+        # Try JSON first, then YAML as fallback for extensionless files
+        try:
+            return _load_json(content, resolved_path)
+        except ValueError:
+            return _load_yaml(content, resolved_path)
+
+
+def resolve_config_path(path: Union[str, Path]) -> Path:
+    """
+    Find the configuration file a (possibly relative) path refers to.
+
     Resolves relative paths with the following search order:
     1. Absolute path or current directory (direct)
     2. User LARS_ROOT locations:
@@ -39,16 +75,14 @@ def load_config_file(path: Union[str, Path]) -> Dict[str, Any]:
         path: Path to the configuration file
 
     Returns:
-        Parsed configuration as a dictionary
+        Path of the file that exists
 
     Raises:
         FileNotFoundError: If file doesn't exist in any search location
-        ValueError: If file format is unsupported or parsing fails
     """
     from .config import get_config
 
     path = Path(path)
-    suffix = path.suffix.lower()
 
     # If absolute path or exists in current directory, use it directly
     if path.is_absolute() or path.exists():
@@ -104,23 +138,7 @@ def load_config_file(path: Union[str, Path]) -> Dict[str, Any]:
     if not resolved_path.exists():
         raise FileNotFoundError(f"Configuration file not found: {resolved_path}")
 
-    # Use the resolved path for reading
-    with open(resolved_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # Update suffix based on resolved path
-    suffix = resolved_path.suffix.lower()
-
-    if suffix in ('.yaml', '.yml'):
-        return _load_yaml(content, resolved_path)
-    elif suffix == '.json':
-        return _load_json(content, resolved_path)
-    else:
-        # Try JSON first, then YAML as fallback for extensionless files
-        try:
-            return _load_json(content, resolved_path)
-        except ValueError:
-            return _load_yaml(content, resolved_path)
+    return resolved_path
 
 
 def _load_json(content: str, path: Path) -> Dict[str, Any]:
@@ -0,0 +1,12 @@
+-- Migration: 035_sql_query_log_udf_dedup
+-- Description: Add vectorized UDF de-dup columns to sql_query_log (rows vs. distinct calls)
+-- Author: LARS
+-- Date: 2026-10-16
+--
+-- Vectorized semantic UDFs collapse identical cache-miss rows into one cascade call:
+-- - udf_rows: Rows processed by vectorized UDFs during the query
+-- - udf_distinct_calls: Distinct cascade executions actually made for those rows
+
+ALTER TABLE sql_query_log ADD COLUMN IF NOT EXISTS udf_rows UInt32 DEFAULT 0 AFTER cache_misses;
+
+ALTER TABLE sql_query_log ADD COLUMN IF NOT EXISTS udf_distinct_calls UInt32 DEFAULT 0 AFTER udf_rows;
@@ -0,0 +1,15 @@
+-- Migration: 036_sql_query_log_pack
+-- Description: Add multi-row prompt packing columns to sql_query_log
+-- Author: LARS
+-- Date: 2026-10-16
+--
+-- `-- @ pack: N` answers up to N scalar operator rows with one LLM call:
+-- - packed_rows: Rows answered by packed prompts during the query
+-- - packed_calls: Packed prompt calls made for those rows
+-- - pack_tokens_saved: Estimated prompt tokens saved vs. one prompt per row
+
+ALTER TABLE sql_query_log ADD COLUMN IF NOT EXISTS packed_rows UInt32 DEFAULT 0 AFTER udf_distinct_calls;
+
+ALTER TABLE sql_query_log ADD COLUMN IF NOT EXISTS packed_calls UInt32 DEFAULT 0 AFTER packed_rows;
+
+ALTER TABLE sql_query_log ADD COLUMN IF NOT EXISTS pack_tokens_saved Int64 DEFAULT 0 AFTER packed_calls;
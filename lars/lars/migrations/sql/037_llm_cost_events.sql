@@ -0,0 +1,48 @@
+-- Migration: 037_llm_cost_events
+-- Description: Append-only cost events for LLM calls, merged into unified_logs at read time
+-- Author: LARS
+-- Date: 2026-10-16
+
+-- Cost and token data fetched after the fact (OpenRouter reports cost 3-5s
+-- after a call) used to be written back with one ALTER TABLE unified_logs
+-- UPDATE per message. Each of those is a mutation that rewrites whole parts,
+-- so under steady LLM traffic the mutation queue grew without bound.
+--
+-- The cost worker now INSERTs one row per call here instead. ReplacingMergeTree
+-- keyed by trace_id keeps the latest event if a call is reported twice.
+
+CREATE TABLE IF NOT EXISTS llm_cost_events (
+    trace_id String,
+    role LowCardinality(String) DEFAULT 'assistant',   -- Row of the trace the cost belongs to
+    request_id String DEFAULT '',
+    session_id String DEFAULT '',
+
+    cost Nullable(Float64),
+    tokens_in Nullable(Int32),
+    tokens_out Nullable(Int32),
+    tokens_reasoning Nullable(Int32),
+    total_tokens Nullable(Int32),
+    provider Nullable(String),
+    model Nullable(String),
+
+    created_at DateTime64(3) DEFAULT now64(3)
+)
+ENGINE = ReplacingMergeTree(created_at)
+ORDER BY trace_id;
+
+-- unified_logs with cost events applied. Readers that aggregate cost or
+-- tokens select from this view instead of unified_logs.
+CREATE VIEW IF NOT EXISTS unified_logs_costed AS
+SELECT
+    l.* REPLACE (
+        coalesce(c.cost, l.cost) AS cost,
+        coalesce(c.tokens_in, l.tokens_in) AS tokens_in,
+        coalesce(c.tokens_out, l.tokens_out) AS tokens_out,
+        coalesce(c.tokens_reasoning, l.tokens_reasoning) AS tokens_reasoning,
+        coalesce(c.total_tokens, l.total_tokens) AS total_tokens,
+        coalesce(c.provider, l.provider) AS provider,
+        coalesce(c.model, l.model) AS model
+    )
+FROM unified_logs AS l
+LEFT JOIN (SELECT * FROM llm_cost_events FINAL) AS c
+    ON l.trace_id = c.trace_id AND l.role = c.role;
@@ -0,0 +1,30 @@
+-- Migration: 038_sql_query_progress
+-- Description: Append-only progress snapshots for running SQL queries
+-- Author: LARS
+-- Date: 2026-10-16
+
+-- increment_llm_call() used to run ALTER TABLE sql_query_log UPDATE
+-- llm_calls_count = llm_calls_count + 1 for every LLM call, one mutation per
+-- row a semantic query processed. Per-query counters now live in memory and
+-- are written to sql_query_log once, in log_query_complete(). Long-running
+-- queries append a counter snapshot here periodically instead.
+
+CREATE TABLE IF NOT EXISTS sql_query_progress (
+    query_id String,
+    caller_id String,
+    snapshot_at DateTime64(3) DEFAULT now64(3),
+    elapsed_ms Float64,
+
+    llm_calls UInt32 DEFAULT 0,
+    tokens_in Int64 DEFAULT 0,
+    tokens_out Int64 DEFAULT 0,
+    cost Float64 DEFAULT 0,             -- Cost known so far (late costs excluded)
+    cache_hits UInt32 DEFAULT 0,
+    cache_misses UInt32 DEFAULT 0,
+    udf_rows UInt32 DEFAULT 0,          -- Rows processed by vectorized UDFs
+    udf_distinct_calls UInt32 DEFAULT 0,
+    packed_rows UInt32 DEFAULT 0
+)
+ENGINE = MergeTree()
+ORDER BY (caller_id, snapshot_at)
+TTL toDateTime(snapshot_at) + INTERVAL 30 DAY;
@@ -0,0 +1,19 @@
+-- Migration: 039_embedding_cache
+-- Description: Persistent content-addressed cache for text embeddings
+-- Author: LARS
+-- Date: 2026-10-16
+
+-- Agent.embed() looks each text up by (model, sha256(text)) before calling the
+-- embeddings endpoint, so re-running EMBED / SIMILAR_TO / VECTOR_SEARCH over
+-- the same rows only pays for text that was never embedded with that model.
+
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    model LowCardinality(String),
+    text_hash String,                   -- sha256 hex of the embedded text
+    embedding Array(Float32),
+    dim UInt16,
+    text_chars UInt32,
+    created_at DateTime64(3) DEFAULT now64(3)
+)
+ENGINE = ReplacingMergeTree(created_at)
+ORDER BY (model, text_hash);
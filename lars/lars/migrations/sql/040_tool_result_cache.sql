@@ -0,0 +1,19 @@
+-- Migration: 040_tool_result_cache
+-- Description: Persistent tier for the shared tool result cache
+-- Author: LARS
+-- Date: 2026-10-16
+
+-- Cascades with tool_caching.storage = clickhouse keep deterministic tool
+-- results here, so they survive restarts and are shared between processes.
+-- Rows are keyed by ToolCache._generate_key; policy TTLs are applied on read
+-- and the table TTL bounds how long unread results are kept.
+
+CREATE TABLE IF NOT EXISTS tool_result_cache (
+    cache_key String,                   -- ToolCache._generate_key (tool:hash)
+    tool LowCardinality(String),
+    result String,                      -- JSON-encoded tool result
+    created_at Float64                  -- Unix time the result was produced
+)
+ENGINE = ReplacingMergeTree(created_at)
+ORDER BY (tool, cache_key)
+TTL toDateTime(created_at) + INTERVAL 30 DAY;
@@ -0,0 +1,28 @@
+-- Migration: 041_unified_logs_costed_session
+-- Description: Session-scoped variant of unified_logs_costed
+-- Author: LARS
+-- Date: 2026-10-16
+
+-- unified_logs_costed LEFT JOINs the whole llm_cost_events table, so every
+-- read (including Studio polling one session) pays for the full cost history.
+-- This parameterized view joins only the cost events of the session's traces
+-- (llm_cost_events is ordered by trace_id):
+--   SELECT * FROM unified_logs_costed_session(sid = '<session_id>')
+
+CREATE VIEW IF NOT EXISTS unified_logs_costed_session AS
+SELECT
+    l.* REPLACE (
+        coalesce(c.cost, l.cost) AS cost,
+        coalesce(c.tokens_in, l.tokens_in) AS tokens_in,
+        coalesce(c.tokens_out, l.tokens_out) AS tokens_out,
+        coalesce(c.tokens_reasoning, l.tokens_reasoning) AS tokens_reasoning,
+        coalesce(c.total_tokens, l.total_tokens) AS total_tokens,
+        coalesce(c.provider, l.provider) AS provider,
+        coalesce(c.model, l.model) AS model
+    )
+FROM (SELECT * FROM unified_logs WHERE session_id = {sid:String}) AS l
+LEFT JOIN (
+    SELECT * FROM llm_cost_events FINAL
+    WHERE trace_id IN (SELECT trace_id FROM unified_logs WHERE session_id = {sid:String})
+) AS c
+    ON l.trace_id = c.trace_id AND l.role = c.role;
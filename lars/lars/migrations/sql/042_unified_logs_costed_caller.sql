@@ -0,0 +1,28 @@
+-- Migration: 042_unified_logs_costed_caller
+-- Description: Caller-scoped variant of unified_logs_costed
+-- Author: LARS
+-- Date: 2026-10-16
+
+-- aggregate_query_costs() rolls up the cost of every SQL query when it
+-- completes. Through unified_logs_costed that meant a join over the full
+-- llm_cost_events history per query; this view joins only the cost events
+-- of the caller's traces:
+--   SELECT * FROM unified_logs_costed_caller(cid = '<caller_id>')
+
+CREATE VIEW IF NOT EXISTS unified_logs_costed_caller AS
+SELECT
+    l.* REPLACE (
+        coalesce(c.cost, l.cost) AS cost,
+        coalesce(c.tokens_in, l.tokens_in) AS tokens_in,
+        coalesce(c.tokens_out, l.tokens_out) AS tokens_out,
+        coalesce(c.tokens_reasoning, l.tokens_reasoning) AS tokens_reasoning,
+        coalesce(c.total_tokens, l.total_tokens) AS total_tokens,
+        coalesce(c.provider, l.provider) AS provider,
+        coalesce(c.model, l.model) AS model
+    )
+FROM (SELECT * FROM unified_logs WHERE caller_id = {cid:String}) AS l
+LEFT JOIN (
+    SELECT * FROM llm_cost_events FINAL
+    WHERE trace_id IN (SELECT trace_id FROM unified_logs WHERE caller_id = {cid:String})
+) AS c
+    ON l.trace_id = c.trace_id AND l.role = c.role;
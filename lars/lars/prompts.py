@@ -1,7 +1,10 @@
 import os
 import json
-from jinja2 import Environment, FileSystemLoader, BaseLoader
-from typing import Any, Dict
+import hashlib
+import threading
+from collections import OrderedDict
+from jinja2 import Environment, FileSystemLoader, BaseLoader, Template
+from typing import Any, Dict, Optional, Tuple
 
 
 def _from_json(value):
@@ -204,6 +207,77 @@ def _fingerprint(value: str, method: str = 'hybrid', include_lengths: bool = Fal
     return compute_fingerprint(str(value), fp_method, include_lengths)
 
 
+class CompiledTemplateCache:
+    """
+    Bounded LRU of compiled Jinja templates.
+
+    Per-row semantic operators render the same cell instructions for every
+    row; compiling them once per process instead of once per render is most
+    of the render cost.
+
+    Keys:
+    - inline templates: hash of the template source
+    - @file templates: (absolute path, mtime_ns, size) - editing the file invalidates
+    """
+
+    MAX_ENTRIES = 1024
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Template]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def source_key(source: str) -> Tuple:
+        return ("inline", hashlib.sha1(source.encode("utf-8")).hexdigest())
+
+    @staticmethod
+    def file_key(path: str) -> Optional[Tuple]:
+        """Key for a template file, or None if it doesn't exist."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return ("file", os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+    def get(self, key: Tuple) -> Optional[Template]:
+        with self._lock:
+            template = self._entries.get(key)
+            if template is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return template
+
+    def put(self, key: Tuple, template: Template):
+        with self._lock:
+            self._entries[key] = template
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
 class PromptEngine:
     def __init__(self, template_dirs: list[str] = None):
         # Use CWD if not specified, plus standard prompt locations
@@ -232,7 +306,10 @@ class PromptEngine:
         self.env.filters['totoon'] = _to_toon   # Alias for convenience
         self.env.filters['structure'] = _structure  # JSON structure extraction for sql_execute mode
         self.env.filters['fingerprint'] = _fingerprint  # String format fingerprinting for structural caching
-        
+
+        # Compiled inline and @file templates (from_string doesn't cache)
+        self.templates = CompiledTemplateCache()
+
     def render(self, template_str_or_path: str, context: Dict[str, Any]) -> str:
         """
         Renders a prompt. 
@@ -244,13 +321,11 @@ class PromptEngine:
             path = template_str_or_path[1:] # strip @
             # We might need to handle absolute paths vs relative to template_dirs
             # For simplicity, if it exists locally, use it directly via string loading if outside loader path
-            if os.path.exists(path):
-                with open(path, 'r') as f:
-                    content = f.read()
-                template = self.env.from_string(content)
+            template = self._compile_file(path)
+            if template is not None:
                 return template.render(**context)
             else:
-                # Try loader
+                # Try loader (Jinja caches these itself, reloading changed files)
                 try:
                     template = self.env.get_template(path)
                     return template.render(**context)
@@ -259,11 +334,38 @@ class PromptEngine:
                     return f"Error: Template not found {path}"
         else:
             # Inline
-            template = self.env.from_string(template_str_or_path)
-            return template.render(**context)
+            return self.compile(template_str_or_path).render(**context)
+
+    def compile(self, source: str) -> Template:
+        """Compiled template for an inline template string (cached by source hash)."""
+        key = CompiledTemplateCache.source_key(source)
+        template = self.templates.get(key)
+        if template is None:
+            template = self.env.from_string(source)
+            self.templates.put(key, template)
+        return template
+
+    def _compile_file(self, path: str) -> Optional[Template]:
+        """Compiled template for a file path (cached by path and mtime), or None if missing."""
+        key = CompiledTemplateCache.file_key(path)
+        if key is None:
+            return None
+        template = self.templates.get(key)
+        if template is None:
+            with open(path, 'r') as f:
+                content = f.read()
+            template = self.env.from_string(content)
+            self.templates.put(key, template)
+        return template
 
 _engine = PromptEngine()
 
+
+def get_prompt_engine() -> PromptEngine:
+    """Get the process-wide prompt engine."""
+    return _engine
+
+
 def render_instruction(instruction: str, context: Dict[str, Any]) -> str:
     # Debug logging for branching sessions
     if 'state' in context and context['state'].get('conversation_history'):
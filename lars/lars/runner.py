@@ -74,6 +74,97 @@ def _safe_json_dumps(obj: Any, **kwargs) -> str:
     return json.dumps(obj, default=default_handler, **kwargs)
 
 
+_schema_validators: Dict[str, Any] = {}
+
+
+def _schema_validator(schema: Dict[str, Any]):
+    """Checked, compiled jsonschema validator for a schema (memoized by content)."""
+    key = json.dumps(schema, sort_keys=True, default=str)
+    validator = _schema_validators.get(key)
+    if validator is None:
+        from jsonschema.validators import validator_for
+        cls = validator_for(schema)
+        cls.check_schema(schema)
+        validator = cls(schema)
+        if len(_schema_validators) >= 256:
+            _schema_validators.clear()
+        _schema_validators[key] = validator
+    return validator
+
+
+def parse_schema_output(response_content: str, schema: Dict[str, Any]) -> Any:
+    """
+    Extract JSON from an LLM response and validate it against a cell's output_schema.
+
+    Accepts bare JSON, fenced ```json blocks, or the first JSON array/object in
+    the text. LLMs sometimes wrap scalars in dicts like {"type": false} when the
+    schema has "type: boolean"; such wrappers are unwrapped if that validates.
+
+    Raises:
+        json.JSONDecodeError: If no JSON can be found
+        jsonschema.ValidationError: If the JSON doesn't match the schema
+    """
+    from jsonschema import ValidationError
+
+    validator = _schema_validator(schema)
+
+    try:
+        # First try to parse the entire response as JSON
+        output_data = json.loads(response_content)
+    except json.JSONDecodeError:
+        # If that fails, try to extract JSON from markdown code blocks
+        # Try to match arrays first (for list-based schemas)
+        json_match = re.search(r'```(?:json)?\s*(\[.*?\])\s*```', response_content, re.DOTALL)
+        if json_match:
+            output_data = json.loads(json_match.group(1))
+        else:
+            # Try to match objects
+            json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', response_content, re.DOTALL)
+            if json_match:
+                output_data = json.loads(json_match.group(1))
+            else:
+                # Try to find any JSON array in the response (without fences)
+                json_match = re.search(r'\[\s*\{.*?\}\s*\]', response_content, re.DOTALL)
+                if json_match:
+                    output_data = json.loads(json_match.group(0))
+                else:
+                    # Try to find any JSON object in the response
+                    json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', response_content, re.DOTALL)
+                    if json_match:
+                        output_data = json.loads(json_match.group(0))
+                    else:
+                        # No JSON found
+                        raise json.JSONDecodeError("No valid JSON found in response", response_content, 0)
+
+    try:
+        validator.validate(output_data)
+    except ValidationError as ve:
+        unwrapped = None
+        if isinstance(output_data, dict):
+            # Common wrapper keys LLMs use when confused by schema syntax
+            wrapper_keys = ("value", "result", "type", "score", "output", "answer", "year")
+            for key in wrapper_keys:
+                if key in output_data:
+                    unwrapped = output_data[key]
+                    break
+            else:
+                # Single-key dict: extract the value
+                if len(output_data) == 1:
+                    unwrapped = next(iter(output_data.values()))
+
+        if unwrapped is None:
+            # Not a dict or no wrapper key found - raise original error
+            raise ve
+        try:
+            validator.validate(unwrapped)
+        except ValidationError:
+            # Unwrapped also fails - raise original error
+            raise ve
+        output_data = unwrapped
+
+    return output_data
+
+
 # Context variable for current hooks - allows tools to call hook methods
 _current_hooks: ContextVar[Optional['LARSHooks']] = ContextVar('current_hooks', default=None)
 
@@ -107,10 +198,11 @@ from .console_style import S
 console = Console()
 
 from .agent import Agent
+from .caller_context import CallerContext, submit_with_caller_context
 from .utils import get_tool_schema, encode_image_base64, compute_species_hash
 from .tracing import TraceNode, set_current_trace
 from .visualizer import generate_mermaid
-from .prompts import render_instruction
+from .prompts import get_prompt_engine, render_instruction
 from .artifact_resolver import enrich_outputs_with_artifacts, convert_to_multimodal_content
 from .state import update_cell_progress, clear_cell_progress
 from .session_state import (
@@ -305,6 +397,10 @@ class LARSRunner:
         self._heartbeat_running = False
         self._heartbeat_interval = 30  # seconds
 
+    def _worker_caller_context(self) -> CallerContext:
+        """Caller context to bind in this runner's worker threads (LLM priority, SQL Trail)."""
+        return CallerContext(self.caller_id, self.invocation_metadata)
+
     def _log(self, **kwargs):
         """Helper to log with automatic caller tracking fields."""
         from .unified_logs import log_unified
@@ -671,6 +767,7 @@ class LARSRunner:
                     runnable.append(cell_name)
             return runnable
 
+        caller_ctx = self._worker_caller_context()
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             while len(completed) < len(self.config.cells):
                 # Check for cancellation
@@ -684,7 +781,7 @@ class LARSRunner:
                 # Submit runnable cells
                 for cell_name in runnable:
                     console.print(f"{indent}  [cyan][EXEC] Starting: {cell_name}[/cyan]")
-                    future = executor.submit(execute_single_cell, cell_name, input_data)
+                    future = submit_with_caller_context(executor, execute_single_cell, cell_name, input_data, ctx=caller_ctx)
                     running[cell_name] = future
 
                 if not running:
@@ -4149,8 +4246,9 @@ To call this tool, output a JSON code block:
 
         # Execute takes in parallel
         take_results = []
+        caller_ctx = self._worker_caller_context()
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {executor.submit(run_single_cascade_take, i): i for i in range(factor)}
+            futures = {submit_with_caller_context(executor, run_single_cascade_take, i, ctx=caller_ctx): i for i in range(factor)}
 
             for future in as_completed(futures):
                 result = future.result()
@@ -4475,8 +4573,9 @@ Refinement directive: {reforge_config.honing_prompt}
 
             # Execute refinements in parallel
             reforge_results = []
+            caller_ctx = self._worker_caller_context()
             with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = {executor.submit(run_single_refinement, i): i for i in range(factor_per_step)}
+                futures = {submit_with_caller_context(executor, run_single_refinement, i, ctx=caller_ctx): i for i in range(factor_per_step)}
 
                 for future in as_completed(futures):
                     result = future.result()
@@ -5036,6 +5135,9 @@ Refinement directive: {reforge_config.honing_prompt}
 
                     def run_analytics():
                         try:
+                            # Analytics reads this session's rows back from unified_logs
+                            from .unified_logs import flush_logs
+                            flush_logs()
                             #print(f"[ANALYTICS_THREAD] Starting analysis for {self.session_id}")
                             result = analyze_cascade_execution(self.session_id)
                             #print(f"[ANALYTICS_THREAD] Completed: {result.get('success') if result else 'None'}")
@@ -5065,10 +5167,12 @@ Refinement directive: {reforge_config.honing_prompt}
                     try:
                         # Query total cost for this cascade from unified_logs
                         from .db_adapter import get_db
+                        from .unified_logs import flush_logs
+                        flush_logs()  # This run's rows may still be queued
                         db = get_db()
                         cost_result = db.query(f"""
                             SELECT COALESCE(SUM(cost), 0) as total_cost
-                            FROM unified_logs
+                            FROM unified_logs_costed_session(sid = '{self.session_id}')
                             WHERE session_id = '{self.session_id}'
                         """)
                         cascade_cost = float(cost_result[0][0]) if cost_result else 0
@@ -7547,8 +7651,9 @@ Use only numbers 0-100 for scores."""
 
         # Execute takes in parallel - all logs go to same session
         take_results = []
+        caller_ctx = self._worker_caller_context()
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {executor.submit(run_single_take, i): i for i in range(factor)}
+            futures = {submit_with_caller_context(executor, run_single_take, i, ctx=caller_ctx): i for i in range(factor)}
 
             for future in as_completed(futures):
                 result = future.result()
@@ -8870,8 +8975,9 @@ Refinement directive: {reforge_config.honing_prompt}
 
             # Execute refinements in parallel - all logs go to same session
             reforge_results = []
+            caller_ctx = self._worker_caller_context()
             with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = {executor.submit(run_single_refinement, i): i for i in range(factor_per_step)}
+                futures = {submit_with_caller_context(executor, run_single_refinement, i, ctx=caller_ctx): i for i in range(factor_per_step)}
 
                 for future in as_completed(futures):
                     result = future.result()
@@ -9970,9 +10076,10 @@ Return ONLY the corrected Python code. No explanations, no markdown code blocks,
                 return error_info
 
         # Execute in parallel
+        caller_ctx = self._worker_caller_context()
         with ThreadPoolExecutor(max_workers=min(config.max_parallel, total_rows)) as executor:
             futures = {
-                executor.submit(process_single_row, i, row): i
+                submit_with_caller_context(executor, process_single_row, i, row, ctx=caller_ctx): i
                 for i, row in enumerate(rows)
             }
 
@@ -12401,71 +12508,9 @@ Return ONLY the corrected Python code. No explanations, no markdown code blocks,
                 schema_trace = trace.create_child("schema_validation", "output_schema")
 
                 try:
-                    import jsonschema
                     from jsonschema import ValidationError
 
-                    # Try to parse response as JSON
-                    try:
-                        # First try to parse the entire response as JSON
-                        output_data = json.loads(response_content)
-                    except json.JSONDecodeError:
-                        # If that fails, try to extract JSON from markdown code blocks
-                        import re
-                        # Try to match arrays first (for list-based schemas)
-                        json_match = re.search(r'```(?:json)?\s*(\[.*?\])\s*```', response_content, re.DOTALL)
-                        if json_match:
-                            output_data = json.loads(json_match.group(1))
-                        else:
-                            # Try to match objects
-                            json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', response_content, re.DOTALL)
-                            if json_match:
-                                output_data = json.loads(json_match.group(1))
-                            else:
-                                # Try to find any JSON array in the response (without fences)
-                                json_match = re.search(r'\[\s*\{.*?\}\s*\]', response_content, re.DOTALL)
-                                if json_match:
-                                    output_data = json.loads(json_match.group(0))
-                                else:
-                                    # Try to find any JSON object in the response
-                                    json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', response_content, re.DOTALL)
-                                    if json_match:
-                                        output_data = json.loads(json_match.group(0))
-                                    else:
-                                        # No JSON found
-                                        raise json.JSONDecodeError("No valid JSON found in response", response_content, 0)
-
-                    # Validate against schema
-                    # LLMs sometimes wrap scalar values in dicts like {"type": false} when
-                    # the schema has "type: boolean". Try unwrapping if direct validation fails.
-                    try:
-                        jsonschema.validate(instance=output_data, schema=cell.output_schema)
-                    except ValidationError as ve:
-                        unwrapped = None
-                        if isinstance(output_data, dict):
-                            # Common wrapper keys LLMs use when confused by schema syntax
-                            wrapper_keys = ("value", "result", "type", "score", "output", "answer", "year")
-                            for key in wrapper_keys:
-                                if key in output_data:
-                                    unwrapped = output_data[key]
-                                    break
-                            else:
-                                # Single-key dict: extract the value
-                                if len(output_data) == 1:
-                                    unwrapped = next(iter(output_data.values()))
-
-                        if unwrapped is not None:
-                            # Try validating the unwrapped value
-                            try:
-                                jsonschema.validate(instance=unwrapped, schema=cell.output_schema)
-                                # Unwrapped value passes - use it instead
-                                output_data = unwrapped
-                                console.print(f"{indent}  [dim]↳ Unwrapped LLM wrapper dict[/dim]")
-                            except ValidationError:
-                                # Unwrapped also fails - raise original error
-                                raise ve
-                        else:
-                            # Not a dict or no wrapper key found - raise original error
-                            raise ve
+                    output_data = parse_schema_output(response_content, cell.output_schema)
 
                     console.print(f"{indent}  [bold green][OK] Schema Validation Passed[/bold green]")
                     log_message(self.session_id, "schema_validation", "Schema validation passed",
@@ -12925,6 +12970,363 @@ Return ONLY the corrected Python code. No explanations, no markdown code blocks,
 
         return chosen_next_cell if chosen_next_cell else response_content
 
+# ========== ROW MODE ==========
+# Semantic SQL operators (MEANS, ABOUT, IMPLIES, ...) are one-cell cascades
+# executed once per row. For those, the full LARSRunner machinery (Echo, trace
+# tree, session state, heartbeat, hooks, graph) costs more than the prompt.
+
+_ROW_MODE_CASCADE_FIELDS = {"cascade_id", "description", "inputs_schema", "internal", "sql_function", "explorer", "cells"}
+_ROW_MODE_CELL_FIELDS = {
+    "name", "instructions", "model", "rules", "output_schema",
+    "use_training", "training_strategy", "training_limit", "training_min_confidence",
+    "training_verified_only", "training_format",
+}
+_ROW_MODE_RULE_FIELDS = {"max_turns", "max_attempts"}
+
+_row_mode_eligibility: Dict[int, Tuple[CascadeConfig, bool]] = {}
+
+# Training examples are fetched from ClickHouse; in row mode they're reused
+# for a short window instead of being queried once per row
+_ROW_MODE_TRAINING_TTL = 30.0
+_row_mode_training_cache: Dict[Tuple, Tuple[float, List[Dict]]] = {}
+
+
+def is_row_mode_eligible(config: CascadeConfig) -> bool:
+    """
+    True if a cascade can run on the lean row-mode path.
+
+    Eligible cascades have a single LLM cell with a single turn and nothing
+    else configured: no tools/skills, takes, wards, context, RAG, validators,
+    handoffs, token budget, memory or narrator. Results are memoized per
+    config object (configs are shared via the compiled cascade cache).
+    """
+    cached = _row_mode_eligibility.get(id(config))
+    if cached is not None and cached[0] is config:
+        return cached[1]
+
+    eligible = False
+    if len(config.cells) == 1:
+        cell = config.cells[0]
+        cascade_fields = set(config.model_dump(exclude_defaults=True))
+        cell_fields = set(cell.model_dump(exclude_defaults=True))
+        rule_fields = set(cell.rules.model_dump(exclude_defaults=True)) if cell.rules else set()
+        eligible = (
+            bool(cell.instructions)
+            and cascade_fields <= _ROW_MODE_CASCADE_FIELDS
+            and cell_fields <= _ROW_MODE_CELL_FIELDS
+            and rule_fields <= _ROW_MODE_RULE_FIELDS
+            and (cell.rules is None or (cell.rules.max_turns or 1) == 1)
+        )
+
+    if len(_row_mode_eligibility) >= 1024:
+        _row_mode_eligibility.clear()
+    _row_mode_eligibility[id(config)] = (config, eligible)
+    return eligible
+
+
+class RowModeFallback(Exception):
+    """Raised by RowModeRunner when a row needs the full runner (e.g. schema retry)."""
+
+
+class RowModeRunner:
+    """
+    Lean executor for single-cell, no-tools, no-takes cascades.
+
+    Renders the cell prompt, makes one model call, validates output_schema if
+    set, and writes a single unified_logs record. Returns a result dict shaped
+    like LARSRunner.run() (session_id, lineage, history, state, status) so
+    callers can extract output the same way.
+
+    Anything the lean path can't handle (schema mismatch, empty response)
+    raises RowModeFallback; the caller re-runs the row with LARSRunner, which
+    has the retry/validation loop.
+    """
+
+    def __init__(self, config_path: str | dict | CascadeConfig, session_id: str = "default",
+                 caller_id: str | None = None, invocation_metadata: dict | None = None):
+        self.config_path = config_path
+        self.config = load_cascade_config(config_path)
+        if not is_row_mode_eligible(self.config):
+            raise ValueError(f"Cascade {self.config.cascade_id} is not eligible for row mode")
+        self.session_id = session_id
+        self.caller_id = caller_id
+        self.invocation_metadata = invocation_metadata
+
+    def run(self, input_data: dict | None = None) -> dict:
+        import time
+
+        agent, user_msg = self._prepare(input_data)
+        start = time.time()
+        response_dict = agent.run(None, context_messages=[user_msg])
+        return self._finish(response_dict, (time.time() - start) * 1000)
+
+    async def arun(self, input_data: dict | None = None) -> dict:
+        """
+        run() with the model call awaited (Agent.arun), for batches on the shared LLM loop.
+
+        Only the model call runs on the loop. _prepare (training-example fetch)
+        and _finish (log_unified, which can block on writer backpressure) run
+        on worker threads so one slow row doesn't stall every other batch.
+        """
+        import asyncio
+        import time
+
+        agent, user_msg = await asyncio.to_thread(self._prepare, input_data)
+        start = time.time()
+        response_dict = await agent.arun(None, context_messages=[user_msg])
+        return await asyncio.to_thread(self._finish, response_dict, (time.time() - start) * 1000)
+
+    def _prepare(self, input_data: dict | None) -> Tuple[Agent, dict]:
+        """Agent and user message for one row."""
+        cell = self.config.cells[0]
+        cfg = get_config()
+        instructions = self._render_prompt(input_data or {})
+
+        agent = Agent(
+            model=cell.model or cfg.default_model,
+            system_prompt="",
+            base_url=cfg.provider_base_url,
+            api_key=cfg.provider_api_key,
+        )
+        return agent, {"role": "user", "content": convert_to_multimodal_content(instructions)}
+
+    def _finish(self, response_dict: dict, duration_ms: float) -> dict:
+        """Validate one row's response, log it and shape the result like LARSRunner.run()."""
+        from .unified_logs import log_unified
+
+        cell = self.config.cells[0]
+        cell_model = cell.model or get_config().default_model
+
+        content = response_dict.get("content")
+        if not content or (isinstance(content, str) and not content.strip()):
+            raise RowModeFallback(f"Empty response from {cell_model}")
+
+        if cell.output_schema:
+            from jsonschema import ValidationError
+            try:
+                parse_schema_output(content, cell.output_schema)
+            except (json.JSONDecodeError, ValidationError) as e:
+                raise RowModeFallback(f"Output schema not satisfied: {e}")
+
+        # One compact record: no cascade/cell config dumps, traces or echo history
+        log_unified(
+            session_id=self.session_id,
+            caller_id=self.caller_id,
+            invocation_metadata=self.invocation_metadata,
+            node_type="agent",
+            role="assistant",
+            cascade_id=self.config.cascade_id,
+            cascade_file=self.config_path if isinstance(self.config_path, str) else None,
+            cell_name=cell.name,
+            model=response_dict.get("model", cell_model),
+            model_requested=cell_model,
+            request_id=response_dict.get("id"),
+            provider=response_dict.get("provider", "unknown"),
+            duration_ms=duration_ms,
+            tokens_in=response_dict.get("tokens_in", 0),
+            tokens_out=response_dict.get("tokens_out", 0),
+            cost=response_dict.get("cost"),
+            content=content,
+            full_request=response_dict.get("full_request"),
+            full_response=response_dict.get("full_response"),
+            metadata={"row_mode": True, "cell_name": cell.name, "cascade_id": self.config.cascade_id},
+            **_extract_toon_telemetry(response_dict),
+        )
+
+        return {
+            "session_id": self.session_id,
+            "state": {},
+            "history": [],
+            "lineage": [{"cell": cell.name, "output": content, "trace_id": None}],
+            "errors": [],
+            "has_errors": False,
+            "status": "success",
+        }
+
+    def run_packed(self, items: List[dict]) -> Tuple[List[Any], Dict[str, Any]]:
+        """
+        Evaluate several rows with one model call (multi-row prompt packing).
+
+        Inputs shared by every item are rendered into the cell prompt once;
+        inputs that vary are rendered as [ITEM.<name>] placeholders and the
+        items are listed as JSON with ids. The model must answer with a JSON
+        array of {"id", "result"} objects.
+
+        Returns:
+            (results, stats) - results[i] is the validated result for items[i],
+            or None if it was missing or invalid (the caller re-runs those rows
+            individually). stats has tokens_in, tokens_out and tokens_saved
+            (estimated prompt tokens of the resolved rows run one by one, minus
+            the packed prompt's tokens).
+
+        Raises:
+            RowModeFallback: If the response isn't a JSON array at all
+        """
+        import time
+        from jsonschema import ValidationError
+        from .unified_logs import estimate_tokens, log_unified
+
+        cell = self.config.cells[0]
+        cfg = get_config()
+        cell_model = cell.model or cfg.default_model
+
+        keys = list(dict.fromkeys(k for item in items for k in item))
+        varying = [
+            k for k in keys
+            if len({json.dumps(item.get(k), sort_keys=True, default=str) for item in items}) > 1
+        ] or keys
+        template_input = {k: (f"[ITEM.{k}]" if k in varying else items[0].get(k)) for k in keys}
+        packed_items = [{"id": i, **{k: item.get(k) for k in varying}} for i, item in enumerate(items)]
+
+        instructions = self._render_prompt(template_input, schema_requirement=False)
+        instructions += (
+            f"\n\n---\n**BATCH MODE:**\nApply the task above to each of the {len(items)} items below "
+            f"independently. Wherever the task shows [ITEM.<field>], use that item's <field> value.\n\n"
+            f"ITEMS:\n```json\n{json.dumps(packed_items, ensure_ascii=False, default=str)}\n```\n\n"
+            f'Respond with ONLY a JSON array containing one object per item, in the same order: '
+            f'[{{"id": <item id>, "result": <result for that item>}}, ...]'
+        )
+        if cell.output_schema:
+            schema_json = json.dumps(cell.output_schema, indent=2)
+            instructions += f'\nEach "result" must be valid JSON matching this schema:\n```json\n{schema_json}\n```'
+        instructions += "\n---"
+
+        agent = Agent(
+            model=cell_model,
+            system_prompt="",
+            base_url=cfg.provider_base_url,
+            api_key=cfg.provider_api_key,
+        )
+        user_msg = {"role": "user", "content": convert_to_multimodal_content(instructions)}
+
+        start = time.time()
+        response_dict = agent.run(None, context_messages=[user_msg])
+        duration_ms = (time.time() - start) * 1000
+
+        content = response_dict.get("content")
+        if not content or (isinstance(content, str) and not content.strip()):
+            raise RowModeFallback(f"Empty packed response from {cell_model}")
+        try:
+            answers = parse_schema_output(content, {"type": "array"})
+        except (json.JSONDecodeError, ValidationError) as e:
+            raise RowModeFallback(f"Packed response is not a JSON array: {e}")
+
+        validator = _schema_validator(cell.output_schema) if cell.output_schema else None
+        results: List[Any] = [None] * len(items)
+        for answer in answers:
+            if not isinstance(answer, dict) or "result" not in answer:
+                continue
+            idx = answer.get("id")
+            if isinstance(idx, str) and idx.strip().isdigit():
+                idx = int(idx)
+            if not isinstance(idx, int) or isinstance(idx, bool) or not 0 <= idx < len(items):
+                continue
+            if results[idx] is not None:
+                continue  # Duplicate id: keep the first answer
+            value = answer["result"]
+            if validator is not None and not validator.is_valid(value):
+                continue
+            results[idx] = value
+
+        tokens_in = response_dict.get("tokens_in", 0) or estimate_tokens(instructions)
+        individual_tokens = sum(
+            estimate_tokens(self._render_prompt(item))
+            for item, result in zip(items, results) if result is not None
+        )
+
+        log_unified(
+            session_id=self.session_id,
+            caller_id=self.caller_id,
+            invocation_metadata=self.invocation_metadata,
+            node_type="agent",
+            role="assistant",
+            cascade_id=self.config.cascade_id,
+            cascade_file=self.config_path if isinstance(self.config_path, str) else None,
+            cell_name=cell.name,
+            model=response_dict.get("model", cell_model),
+            model_requested=cell_model,
+            request_id=response_dict.get("id"),
+            provider=response_dict.get("provider", "unknown"),
+            duration_ms=duration_ms,
+            tokens_in=response_dict.get("tokens_in", 0),
+            tokens_out=response_dict.get("tokens_out", 0),
+            cost=response_dict.get("cost"),
+            content=content,
+            full_request=response_dict.get("full_request"),
+            full_response=response_dict.get("full_response"),
+            metadata={
+                "row_mode": True,
+                "packed_rows": len(items),
+                "packed_resolved": sum(1 for r in results if r is not None),
+                "cell_name": cell.name,
+                "cascade_id": self.config.cascade_id,
+            },
+            **_extract_toon_telemetry(response_dict),
+        )
+
+        stats = {
+            "tokens_in": response_dict.get("tokens_in", 0),
+            "tokens_out": response_dict.get("tokens_out", 0),
+            "tokens_saved": individual_tokens - tokens_in,
+        }
+        return results, stats
+
+    def _render_prompt(self, input_data: dict, schema_requirement: bool = True) -> str:
+        """Render the cell prompt for one input (training examples and schema requirement included)."""
+        cell = self.config.cells[0]
+        render_context = {
+            "input": input_data,
+            "state": {},
+            "history": [],
+            "outputs": {},
+            "lineage": [],
+            "take_index": 0,
+            "take_factor": 1,
+            "is_take": False,
+        }
+        # Straight to the engine (compiled-template cache, no per-row debug output)
+        instructions = get_prompt_engine().render(cell.instructions, render_context)
+        if cell.use_training:
+            instructions = self._inject_training_examples(cell, instructions)
+        if cell.output_schema and schema_requirement:
+            schema_json = json.dumps(cell.output_schema, indent=2)
+            schema_attempts = cell.rules.max_attempts if cell.rules and cell.rules.max_attempts else 1
+            instructions += f"\n\n---\n**OUTPUT FORMAT REQUIREMENT:**\nYour response must contain valid JSON matching this schema:\n```json\n{schema_json}\n```\nYou have {schema_attempts} attempt(s) to produce valid output.\n---"
+        return instructions
+
+    def _inject_training_examples(self, cell: CellConfig, instructions: str) -> str:
+        import time
+        try:
+            from .training_system import get_training_examples, inject_training_examples_into_instructions
+
+            key = (self.config.cascade_id, cell.name, cell.training_strategy, cell.training_limit,
+                   cell.training_min_confidence, cell.training_verified_only)
+            cached = _row_mode_training_cache.get(key)
+            if cached is not None and time.time() - cached[0] < _ROW_MODE_TRAINING_TTL:
+                examples = cached[1]
+            else:
+                examples = get_training_examples(
+                    cascade_id=self.config.cascade_id,
+                    cell_name=cell.name,
+                    strategy=cell.training_strategy,
+                    limit=cell.training_limit,
+                    min_confidence=cell.training_min_confidence,
+                    verified_only=cell.training_verified_only
+                )
+                _row_mode_training_cache[key] = (time.time(), examples)
+
+            if examples:
+                return inject_training_examples_into_instructions(
+                    original_instructions=instructions,
+                    examples=examples,
+                    format=cell.training_format
+                )
+        except Exception as e:
+            # Non-blocking, same as the full runner
+            logger.warning(f"[training] Failed to inject examples for {cell.name}: {e}")
+        return instructions
+
+
 def run_cascade(config_path: str | dict, input_data: dict | None = None, session_id: str = "default", overrides: dict | None = None,
                 depth: int = 0, parent_trace: TraceNode | None = None, hooks: LARSHooks | None = None, parent_session_id: str | None = None,
                 take_index: int | None = None, caller_id: str | None = None, invocation_metadata: dict | None = None) -> dict:
@@ -1250,6 +1250,15 @@ CREATE TABLE IF NOT EXISTS sql_query_log (
     cache_hits UInt32 DEFAULT 0,
     cache_misses UInt32 DEFAULT 0,
 
+    -- Vectorized UDF de-dup (rows processed vs. distinct cascade calls)
+    udf_rows UInt32 DEFAULT 0,
+    udf_distinct_calls UInt32 DEFAULT 0,
+
+    -- Multi-row prompt packing (-- @ pack: N)
+    packed_rows UInt32 DEFAULT 0,
+    packed_calls UInt32 DEFAULT 0,
+    pack_tokens_saved Int64 DEFAULT 0,
+
     -- Error Info
     error_message Nullable(String),
 
@@ -1274,6 +1283,200 @@ SETTINGS index_granularity = 8192;
 """
 
 
+# =============================================================================
+# LLM COST EVENTS - Append-only cost backfill
+# =============================================================================
+# Cost/token data fetched after a call (OpenRouter reports it 3-5s late) is
+# appended here instead of mutating unified_logs with ALTER TABLE UPDATE.
+# The unified_logs_costed view merges it back in at read time.
+
+LLM_COST_EVENTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cost_events (
+    trace_id String,
+    role LowCardinality(String) DEFAULT 'assistant',   -- Row of the trace the cost belongs to
+    request_id String DEFAULT '',
+    session_id String DEFAULT '',
+
+    cost Nullable(Float64),
+    tokens_in Nullable(Int32),
+    tokens_out Nullable(Int32),
+    tokens_reasoning Nullable(Int32),
+    total_tokens Nullable(Int32),
+    provider Nullable(String),
+    model Nullable(String),
+
+    created_at DateTime64(3) DEFAULT now64(3)
+)
+ENGINE = ReplacingMergeTree(created_at)
+ORDER BY trace_id;
+"""
+
+UNIFIED_LOGS_COSTED_VIEW_SCHEMA = """
+CREATE VIEW IF NOT EXISTS unified_logs_costed AS
+SELECT
+    l.* REPLACE (
+        coalesce(c.cost, l.cost) AS cost,
+        coalesce(c.tokens_in, l.tokens_in) AS tokens_in,
+        coalesce(c.tokens_out, l.tokens_out) AS tokens_out,
+        coalesce(c.tokens_reasoning, l.tokens_reasoning) AS tokens_reasoning,
+        coalesce(c.total_tokens, l.total_tokens) AS total_tokens,
+        coalesce(c.provider, l.provider) AS provider,
+        coalesce(c.model, l.model) AS model
+    )
+FROM unified_logs AS l
+LEFT JOIN (SELECT * FROM llm_cost_events FINAL) AS c
+    ON l.trace_id = c.trace_id AND l.role = c.role;
+"""
+
+# unified_logs_costed builds its join over the whole llm_cost_events table on
+# every read. Session-scoped readers use this parameterized view instead,
+# which only reads the session's cost events:
+#   SELECT * FROM unified_logs_costed_session(sid = '<session_id>')
+UNIFIED_LOGS_COSTED_SESSION_VIEW_SCHEMA = """
+CREATE VIEW IF NOT EXISTS unified_logs_costed_session AS
+SELECT
+    l.* REPLACE (
+        coalesce(c.cost, l.cost) AS cost,
+        coalesce(c.tokens_in, l.tokens_in) AS tokens_in,
+        coalesce(c.tokens_out, l.tokens_out) AS tokens_out,
+        coalesce(c.tokens_reasoning, l.tokens_reasoning) AS tokens_reasoning,
+        coalesce(c.total_tokens, l.total_tokens) AS total_tokens,
+        coalesce(c.provider, l.provider) AS provider,
+        coalesce(c.model, l.model) AS model
+    )
+FROM (SELECT * FROM unified_logs WHERE session_id = {sid:String}) AS l
+LEFT JOIN (
+    SELECT * FROM llm_cost_events FINAL
+    WHERE trace_id IN (SELECT trace_id FROM unified_logs WHERE session_id = {sid:String})
+) AS c
+    ON l.trace_id = c.trace_id AND l.role = c.role;
+"""
+
+# Same for caller-scoped readers (per-query cost rollups in sql_trail):
+#   SELECT * FROM unified_logs_costed_caller(cid = '<caller_id>')
+UNIFIED_LOGS_COSTED_CALLER_VIEW_SCHEMA = """
+CREATE VIEW IF NOT EXISTS unified_logs_costed_caller AS
+SELECT
+    l.* REPLACE (
+        coalesce(c.cost, l.cost) AS cost,
+        coalesce(c.tokens_in, l.tokens_in) AS tokens_in,
+        coalesce(c.tokens_out, l.tokens_out) AS tokens_out,
+        coalesce(c.tokens_reasoning, l.tokens_reasoning) AS tokens_reasoning,
+        coalesce(c.total_tokens, l.total_tokens) AS total_tokens,
+        coalesce(c.provider, l.provider) AS provider,
+        coalesce(c.model, l.model) AS model
+    )
+FROM (SELECT * FROM unified_logs WHERE caller_id = {cid:String}) AS l
+LEFT JOIN (
+    SELECT * FROM llm_cost_events FINAL
+    WHERE trace_id IN (SELECT trace_id FROM unified_logs WHERE caller_id = {cid:String})
+) AS c
+    ON l.trace_id = c.trace_id AND l.role = c.role;
+"""
+
+
+def costed_logs_where(where: str) -> str:
+    """
+    unified_logs_costed restricted to the unified_logs rows matching `where`,
+    as a subquery to select FROM.
+
+    The filter is applied to unified_logs and, through the trace_ids it
+    selects, to llm_cost_events, so only the matching cost events are joined.
+    `where` may only reference unified_logs columns; filters on the merged
+    cost/token columns belong in the outer query.
+
+    Example:
+        f"SELECT SUM(cost) FROM {costed_logs_where('cascade_id = %(cascade_id)s')} WHERE cost > 0"
+    """
+    return f"""(
+        SELECT
+            l.* REPLACE (
+                coalesce(c.cost, l.cost) AS cost,
+                coalesce(c.tokens_in, l.tokens_in) AS tokens_in,
+                coalesce(c.tokens_out, l.tokens_out) AS tokens_out,
+                coalesce(c.tokens_reasoning, l.tokens_reasoning) AS tokens_reasoning,
+                coalesce(c.total_tokens, l.total_tokens) AS total_tokens,
+                coalesce(c.provider, l.provider) AS provider,
+                coalesce(c.model, l.model) AS model
+            )
+        FROM (SELECT * FROM unified_logs WHERE {where}) AS l
+        LEFT JOIN (
+            SELECT * FROM llm_cost_events FINAL
+            WHERE trace_id IN (SELECT trace_id FROM unified_logs WHERE {where})
+        ) AS c
+            ON l.trace_id = c.trace_id AND l.role = c.role
+    )"""
+
+
+# =============================================================================
+# SQL QUERY PROGRESS - Append-only counter snapshots of running SQL queries
+# =============================================================================
+# Per-query counters are accumulated in memory and written to sql_query_log
+# once at completion; long-running queries append a snapshot here every few
+# seconds so progress is visible without mutating sql_query_log.
+
+SQL_QUERY_PROGRESS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sql_query_progress (
+    query_id String,
+    caller_id String,
+    snapshot_at DateTime64(3) DEFAULT now64(3),
+    elapsed_ms Float64,
+
+    llm_calls UInt32 DEFAULT 0,
+    tokens_in Int64 DEFAULT 0,
+    tokens_out Int64 DEFAULT 0,
+    cost Float64 DEFAULT 0,             -- Cost known so far (late costs excluded)
+    cache_hits UInt32 DEFAULT 0,
+    cache_misses UInt32 DEFAULT 0,
+    udf_rows UInt32 DEFAULT 0,          -- Rows processed by vectorized UDFs
+    udf_distinct_calls UInt32 DEFAULT 0,
+    packed_rows UInt32 DEFAULT 0
+)
+ENGINE = MergeTree()
+ORDER BY (caller_id, snapshot_at)
+TTL toDateTime(snapshot_at) + INTERVAL 30 DAY;
+"""
+
+
+# =============================================================================
+# EMBEDDING CACHE - Content-addressed embeddings keyed by (model, text hash)
+# =============================================================================
+# Persistent tier behind Agent.embed()'s in-memory LRU; only texts missing
+# here are sent to the embeddings endpoint.
+
+EMBEDDING_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    model LowCardinality(String),
+    text_hash String,                   -- sha256 hex of the embedded text
+    embedding Array(Float32),
+    dim UInt16,
+    text_chars UInt32,
+    created_at DateTime64(3) DEFAULT now64(3)
+)
+ENGINE = ReplacingMergeTree(created_at)
+ORDER BY (model, text_hash);
+"""
+
+
+# =============================================================================
+# TOOL RESULT CACHE - Persistent results for cascades with tool_caching
+# =============================================================================
+# Persistent tier behind the process-wide tool result LRU (storage: clickhouse);
+# keyed by ToolCache._generate_key, TTLs are applied by the reader's policy.
+
+TOOL_RESULT_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tool_result_cache (
+    cache_key String,                   -- ToolCache._generate_key (tool:hash)
+    tool LowCardinality(String),
+    result String,                      -- JSON-encoded tool result
+    created_at Float64                  -- Unix time the result was produced
+)
+ENGINE = ReplacingMergeTree(created_at)
+ORDER BY (tool, cache_key)
+TTL toDateTime(created_at) + INTERVAL 30 DAY;
+"""
+
+
 # =============================================================================
 # SESSION SUMMARY MATERIALIZED VIEW (Optional - for performance)
 # =============================================================================
@@ -1355,6 +1558,10 @@ def get_all_schemas() -> dict:
         "sql_query_log": SQL_QUERY_LOG_SCHEMA,
         "semantic_sql_cache": SEMANTIC_SQL_CACHE_SCHEMA,
         "caller_context_active": CALLER_CONTEXT_ACTIVE_SCHEMA,
+        "llm_cost_events": LLM_COST_EVENTS_SCHEMA,
+        "sql_query_progress": SQL_QUERY_PROGRESS_SCHEMA,
+        "embedding_cache": EMBEDDING_CACHE_SCHEMA,
+        "tool_result_cache": TOOL_RESULT_CACHE_SCHEMA,
     }
 
 
@@ -1370,13 +1577,28 @@ def get_materialized_views() -> dict:
     }
 
 
+def get_views() -> dict:
+    """
+    Get all (non-materialized) view schemas.
+
+    Returns:
+        Dict mapping view names to CREATE statements
+    """
+    return {
+        "unified_logs_costed": UNIFIED_LOGS_COSTED_VIEW_SCHEMA,
+        "unified_logs_costed_session": UNIFIED_LOGS_COSTED_SESSION_VIEW_SCHEMA,
+        "unified_logs_costed_caller": UNIFIED_LOGS_COSTED_CALLER_VIEW_SCHEMA,
+    }
+
+
 def get_all_ddl() -> list:
     """
-    Get all DDL statements in order (tables first, then MVs).
+    Get all DDL statements in order (tables first, then views and MVs).
 
     Returns:
         List of DDL statements
     """
     ddl = list(get_all_schemas().values())
+    ddl.extend(get_views().values())
     ddl.extend(get_materialized_views().values())
     return ddl
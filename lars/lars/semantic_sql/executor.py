@@ -132,6 +132,36 @@ def _extract_source_context_from_inputs(
     return cleaned_inputs, source_column, source_row_index, source_table
 
 
+# Pattern for multi-row prompt packing embedded in inputs
+# Format: __LARS_PACK:25__ (from `-- @ pack: 25`); may follow other prefixes
+_PACK_PATTERN = re.compile(r'__LARS_PACK:(\d+)__\s*')
+
+
+def _extract_pack_from_inputs(inputs: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[int]]:
+    """
+    Extract the pack size from input strings and return cleaned inputs.
+
+    Packing is only acted on by the vectorized UDF wrapper (see
+    semantic_sql/packing.py); single-row paths just strip the prefix so it
+    never reaches prompts or cache keys.
+
+    Returns:
+        (cleaned_inputs, pack_size) - inputs with prefix stripped, and the pack size (or None)
+    """
+    pack_size = None
+    cleaned_inputs = {}
+
+    for key, value in inputs.items():
+        if isinstance(value, str) and '__LARS_PACK:' in value:
+            match = _PACK_PATTERN.search(value)
+            if match:
+                pack_size = int(match.group(1))
+                value = value[:match.start()] + value[match.end():]
+        cleaned_inputs[key] = value
+
+    return cleaned_inputs, pack_size
+
+
 def _auto_format_inputs_as_toon(inputs: Dict[str, Any]) -> Dict[str, Any]:
     """
     Auto-format large arrays in inputs as TOON for token efficiency.
@@ -335,6 +365,26 @@ def _inject_overrides_into_cascade(cascade_path: str, overrides_config: Dict[str
 _inject_takes_into_cascade = _inject_overrides_into_cascade
 
 
+def _with_source_metadata(
+    invocation_metadata: Dict[str, Any] | None,
+    source_column: str | None = None,
+    source_row_index: int | None = None,
+    source_table: str | None = None,
+) -> Dict[str, Any]:
+    """Copy of invocation_metadata with the SQL lineage source (column/row/table) added."""
+    enriched_metadata = invocation_metadata.copy() if invocation_metadata else {}
+    if source_column is not None or source_row_index is not None or source_table is not None:
+        if 'source' not in enriched_metadata:
+            enriched_metadata['source'] = {}
+        if source_column is not None:
+            enriched_metadata['source']['column'] = source_column
+        if source_row_index is not None:
+            enriched_metadata['source']['row_index'] = source_row_index
+        if source_table is not None:
+            enriched_metadata['source']['table'] = source_table
+    return enriched_metadata
+
+
 def _run_cascade_sync(
     cascade_path_or_config: Union[str, Dict[str, Any]],
     session_id: str,
@@ -360,16 +410,16 @@ def _run_cascade_sync(
     from ..runner import LARSRunner
 
     # Enrich invocation_metadata with source context if provided
-    enriched_metadata = invocation_metadata.copy() if invocation_metadata else {}
-    if source_column is not None or source_row_index is not None or source_table is not None:
-        if 'source' not in enriched_metadata:
-            enriched_metadata['source'] = {}
-        if source_column is not None:
-            enriched_metadata['source']['column'] = source_column
-        if source_row_index is not None:
-            enriched_metadata['source']['row_index'] = source_row_index
-        if source_table is not None:
-            enriched_metadata['source']['table'] = source_table
+    enriched_metadata = _with_source_metadata(invocation_metadata, source_column, source_row_index, source_table)
+
+    # Single-cell, no-tools, no-takes cascades skip the full runner
+    result = _try_row_mode(
+        cascade_path_or_config, session_id, inputs,
+        caller_id=caller_id,
+        invocation_metadata=enriched_metadata if enriched_metadata else None,
+    )
+    if result is not None:
+        return result
 
     # LARSRunner takes session_id AND caller_id for proper tracking
     runner = LARSRunner(
@@ -381,6 +431,192 @@ def _run_cascade_sync(
     return runner.run(input_data=inputs)
 
 
+def _try_row_mode(
+    cascade_path_or_config: Union[str, Dict[str, Any]],
+    session_id: str,
+    inputs: Dict[str, Any],
+    caller_id: str | None = None,
+    invocation_metadata: Dict[str, Any] | None = None,
+) -> Dict[str, Any] | None:
+    """Run a cascade on the lean row-mode path if it's eligible.
+
+    Returns None when the cascade isn't eligible, row mode is disabled
+    (LARS_SQL_ROW_MODE=false), or the row needs the full runner (schema
+    retry, empty response, provider error) - the caller then uses LARSRunner.
+    """
+    from ..config import get_config
+    from ..cascade import load_cascade_config
+    from ..runner import RowModeRunner, RowModeFallback, is_row_mode_eligible
+
+    if not get_config().sql_row_mode:
+        return None
+
+    try:
+        config = load_cascade_config(cascade_path_or_config)
+    except Exception:
+        return None  # Let LARSRunner surface the load error
+    if not is_row_mode_eligible(config):
+        return None
+
+    try:
+        runner = RowModeRunner(
+            cascade_path_or_config if isinstance(cascade_path_or_config, str) else config,
+            session_id=session_id,
+            caller_id=caller_id,
+            invocation_metadata=invocation_metadata,
+        )
+        return runner.run(input_data=inputs)
+    except RowModeFallback as e:
+        log.debug(f"[row_mode] {config.cascade_id} falling back to full runner: {e}")
+    except Exception as e:
+        log.debug(f"[row_mode] {config.cascade_id} failed, retrying with full runner: {e}")
+    return None
+
+
+def run_row_mode_batch(
+    cascade_path_or_config: Union[str, Dict[str, Any]],
+    inputs_list: List[Dict[str, Any]],
+    session_ids: List[str],
+    caller_id: str | None = None,
+    invocation_metadata_list: List[Dict[str, Any] | None] | None = None,
+    concurrency: int | None = None,
+) -> List[Dict[str, Any] | None]:
+    """Run many rows of a cascade on the row-mode path as coroutines.
+
+    All rows share the process-wide LLM event loop and its keep-alive
+    clients (lars.async_llm) instead of holding a thread each. At most
+    `concurrency` rows are in flight (default LARS_LLM_ASYNC_CONCURRENCY).
+
+    Returns:
+        One entry per input: the RowModeRunner result, or None where the row
+        needs the full runner. All None when the cascade isn't eligible or
+        LARS_SQL_ROW_MODE / LARS_LLM_ASYNC is off.
+    """
+    from ..async_llm import run_batch
+    from ..config import get_config
+    from ..cascade import load_cascade_config
+    from ..runner import RowModeRunner, is_row_mode_eligible
+
+    cfg = get_config()
+    if not inputs_list or not (cfg.sql_row_mode and cfg.llm_async):
+        return [None] * len(inputs_list)
+    try:
+        config = load_cascade_config(cascade_path_or_config)
+    except Exception:
+        return [None] * len(inputs_list)
+    if not is_row_mode_eligible(config):
+        return [None] * len(inputs_list)
+
+    source = cascade_path_or_config if isinstance(cascade_path_or_config, str) else config
+    metadata_list = invocation_metadata_list or [None] * len(inputs_list)
+
+    async def run_row(i):
+        runner = RowModeRunner(
+            source,
+            session_id=session_ids[i],
+            caller_id=caller_id,
+            invocation_metadata=metadata_list[i] or None,
+        )
+        return await runner.arun(input_data=inputs_list[i])
+
+    results = run_batch(run_row, range(len(inputs_list)), concurrency=concurrency)
+    for i, result in enumerate(results):
+        if isinstance(result, BaseException):
+            log.debug(f"[row_mode] {config.cascade_id} row {i} falling back to full runner: {result}")
+            results[i] = None
+    return results
+
+
+def execute_cascade_udf_batch(
+    cascade_id: str,
+    inputs_list: List[Dict[str, Any]],
+    use_cache: bool = True,
+    caller_id_override: str | None = None,
+) -> List[str | None]:
+    """
+    execute_cascade_udf() for many rows at once, over the async row-mode path.
+
+    Used by the vectorized UDF wrapper for its cache misses. Rows this path
+    can't serve get None and should go through execute_cascade_udf(): takes
+    hints, rows another query is already computing (single-flight
+    followers), rows that need the full runner, and every row of functions
+    with fingerprint caching or a non-'value' output_mode.
+
+    Returns:
+        One entry per input: the same string execute_cascade_udf() would
+        return, or None
+    """
+    from .registry import get_sql_function, set_cached_result
+    from ..session_naming import generate_woodland_id
+    from ..caller_context import get_caller_context
+    from ..sql_trail import register_cascade_execution, increment_cache_miss
+    from ..sql_tools.cache_adapter import get_cache
+
+    results: List[str | None] = [None] * len(inputs_list)
+    fn = get_sql_function(cascade_id)
+    if not fn or fn.output_mode != "value":
+        return results
+    if (fn.cache_key_config or {}).get("strategy", "content") == "fingerprint" and fn.fingerprint_args:
+        return results
+
+    caller_id, invocation_metadata = get_caller_context()
+    caller_id = caller_id_override or caller_id
+
+    rows = []  # (index, cleaned_inputs, session_id, metadata, flight)
+    try:
+        for i, inputs in enumerate(inputs_list):
+            inputs, _ = _extract_pack_from_inputs(inputs)
+            cleaned_inputs, takes_config = _extract_takes_from_inputs(inputs)
+            if takes_config:
+                continue
+            cleaned_inputs, source_column, source_row_index, source_table = _extract_source_context_from_inputs(cleaned_inputs)
+            cleaned_inputs = _auto_format_inputs_as_toon(cleaned_inputs)
+
+            flight = None
+            if use_cache and fn.cache_enabled:
+                flight = get_cache().begin_flight(fn.cache_name, cleaned_inputs)
+                if not flight.is_leader:
+                    continue  # execute_cascade_udf waits for the leader
+            rows.append((
+                i,
+                cleaned_inputs,
+                f"sql_fn_{cascade_id}_{generate_woodland_id()}",
+                _with_source_metadata(invocation_metadata, source_column, source_row_index, source_table),
+                flight,
+            ))
+
+        outputs = run_row_mode_batch(
+            fn.cascade_path,
+            [row[1] for row in rows],
+            [row[2] for row in rows],
+            caller_id=caller_id,
+            invocation_metadata_list=[row[3] for row in rows],
+        )
+
+        for (i, cleaned_inputs, session_id, _, _), result in zip(rows, outputs):
+            if result is None:
+                continue
+            if caller_id:
+                increment_cache_miss(caller_id)
+                register_cascade_execution(
+                    caller_id=caller_id,
+                    cascade_id=cascade_id,
+                    cascade_path=fn.cascade_path,
+                    session_id=session_id,
+                    inputs=cleaned_inputs,
+                )
+            output = _coerce_value_output(_extract_cascade_output(result), fn.returns)
+            if use_cache:
+                set_cached_result(fn.cache_name, cleaned_inputs, output)
+            results[i] = json.dumps(output) if isinstance(output, (dict, list)) else str(output)
+    finally:
+        for row in rows:
+            if row[4] is not None:
+                row[4].release()
+
+    return results
+
+
 def _strip_markdown_fences(text: str) -> str:
     """
     Strip markdown code fences from LLM output.
@@ -483,6 +719,27 @@ def _extract_cascade_output(result: Dict[str, Any]) -> Any:
     return output
 
 
+def _coerce_value_output(output: Any, returns: str) -> Any:
+    """Coerce an extracted cascade output to the function's declared return type (output_mode: value)."""
+    if returns == "BOOLEAN":
+        if isinstance(output, str):
+            output = output.lower().strip() in ("true", "yes", "1")
+        output = bool(output)
+    elif returns == "DOUBLE":
+        if isinstance(output, str):
+            try:
+                output = float(output.strip())
+            except ValueError:
+                output = 0.0
+    elif returns == "INTEGER":
+        if isinstance(output, str):
+            try:
+                output = int(float(output.strip()))
+            except ValueError:
+                output = 0
+    return output
+
+
 def execute_cascade_udf(
     cascade_id: str,
     inputs_json: str,
@@ -522,10 +779,16 @@ def execute_cascade_udf(
     # Use override if provided (for parallel execution), otherwise get from context
     caller_id = caller_id_override if caller_id_override else get_caller_id()
 
+    # Single-flight handle for this call's cache key (released in finally)
+    flight = None
+
     try:
         # Parse inputs
         inputs = json.loads(inputs_json) if inputs_json else {}
 
+        # Strip pack hints (packing happens in the vectorized wrapper, not per row)
+        inputs, _ = _extract_pack_from_inputs(inputs)
+
         # Extract takes config from inputs (embedded as special prefix)
         cleaned_inputs, takes_config = _extract_takes_from_inputs(inputs)
 
@@ -584,6 +847,20 @@ def execute_cascade_udf(
                 # Use content-based cache lookup
                 found, cached = get_cached_result(cache_name, cleaned_inputs)
 
+            # Coalesce with an in-flight computation of the same key (another
+            # query, the prewarm sidecar): wait for it, then re-read the cache
+            use_fingerprint_key = bool(use_fingerprint_cache and fingerprint_cache_key)
+            if not found and (use_fingerprint_key or fn.cache_enabled):
+                cache = get_cache()
+                flight_args = (
+                    {"__fingerprint_key__": fingerprint_cache_key} if use_fingerprint_key else cleaned_inputs
+                )
+                flight = cache.begin_flight(cache_name, flight_args)
+                if not flight.is_leader and flight.wait():
+                    found, cached, _ = cache.get(cache_name, flight_args)
+                    if found:
+                        log.debug(f"[cascade_udf] Coalesced onto in-flight call for {cascade_id}")
+
             if found:
                 log.debug(f"[cascade_udf] Cache hit for {cascade_id} (cache_name={cache_name})")
                 # Track cache hit for SQL Trail
@@ -715,22 +992,7 @@ def execute_cascade_udf(
             return sql_raw
 
         # Post-process based on return type (for output_mode: value)
-        if fn.returns == "BOOLEAN":
-            if isinstance(output, str):
-                output = output.lower().strip() in ("true", "yes", "1")
-            output = bool(output)
-        elif fn.returns == "DOUBLE":
-            if isinstance(output, str):
-                try:
-                    output = float(output.strip())
-                except ValueError:
-                    output = 0.0
-        elif fn.returns == "INTEGER":
-            if isinstance(output, str):
-                try:
-                    output = int(float(output.strip()))
-                except ValueError:
-                    output = 0
+        output = _coerce_value_output(output, fn.returns)
 
         # Cache result (but not takes runs - they're for fresh sampling)
         if use_cache and not takes_config:
@@ -751,6 +1013,10 @@ def execute_cascade_udf(
         log.error(f"[cascade_udf] Error executing {cascade_id}: {e}")
         return json.dumps({"error": str(e)})
 
+    finally:
+        if flight is not None:
+            flight.release()
+
 
 def semantic_matches_cascade(text: str, criterion: str) -> bool:
     """
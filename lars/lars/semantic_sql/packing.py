@@ -0,0 +1,191 @@
+"""
+Multi-row prompt packing for scalar semantic operators.
+
+With a `-- @ pack: 25` annotation, the vectorized UDF wrapper groups up to 25
+distinct cache-miss rows into one model call instead of one call per row:
+
+    -- @ pack: 25
+    SELECT * FROM reviews WHERE review_text MEANS 'complains about shipping'
+
+The cell prompt is rendered once with the shared inputs (the criterion) and
+the varying inputs (the row text) listed as JSON items with ids; the model
+answers with a JSON array of {"id", "result"}. Each result is validated
+against the cell's output_schema. Rows whose result is missing, malformed or
+invalid - and whole packs that fail - are re-run one row at a time through
+execute_cascade_udf, so packing never changes which rows get an answer.
+
+Only cascades that qualify for row mode (one LLM cell, one turn, no tools or
+takes) and return a plain value are packed.
+"""
+
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from .executor import (
+    _coerce_value_output,
+    _extract_pack_from_inputs,
+    _extract_source_context_from_inputs,
+    _extract_takes_from_inputs,
+)
+
+log = logging.getLogger(__name__)
+
+# Upper bound on rows per packed prompt, whatever the annotation says
+MAX_PACK_SIZE = 100
+
+
+def strip_pack_hint(rows: List[Dict[str, Any]]) -> Optional[int]:
+    """
+    Remove __LARS_PACK:N__ prefixes from a batch of row args (in place).
+
+    Returns the requested pack size (capped at MAX_PACK_SIZE), or None if no
+    row carries a pack hint.
+    """
+    pack_size = None
+    for i, args in enumerate(rows):
+        cleaned, size = _extract_pack_from_inputs(args)
+        if size is not None:
+            rows[i] = cleaned
+            pack_size = size
+    if pack_size is None:
+        return None
+    return max(1, min(pack_size, MAX_PACK_SIZE))
+
+
+def is_pack_eligible(fn) -> bool:
+    """True if a SQL function's cascade can answer several rows in one prompt."""
+    from ..cascade import load_cascade_config
+    from ..runner import is_row_mode_eligible
+
+    if fn is None or fn.output_mode != "value" or fn.fingerprint_args:
+        return False
+    if fn.shape.upper() != "SCALAR" or fn.returns.upper() == "TABLE":
+        return False
+    try:
+        return is_row_mode_eligible(load_cascade_config(fn.cascade_path))
+    except Exception:
+        return False
+
+
+def pack_misses(
+    func_name: str,
+    misses: Dict[str, Tuple[Dict[str, Any], list]],
+    pack_size: int,
+    caller_id: Optional[str],
+    max_workers: int = 8,
+) -> Dict[str, str]:
+    """
+    Resolve cache misses of a vectorized UDF batch with packed prompts.
+
+    Args:
+        func_name: The SQL function name
+        misses: cache_key -> (args, row_indices), as built by the vectorized wrapper
+        pack_size: Rows per packed prompt
+        caller_id: Caller ID for SQL Trail and cost tracking
+        max_workers: Max packs in flight at once
+
+    Returns:
+        cache_key -> result string (the same form execute_cascade_udf returns)
+        for every miss that was resolved. Keys not in the result must be run
+        individually by the caller.
+    """
+    from .registry import get_sql_function
+
+    fn = get_sql_function(func_name)
+    if pack_size < 2 or len(misses) < 2 or not is_pack_eligible(fn):
+        return {}
+
+    items = [(cache_key, args) for cache_key, (args, _) in misses.items()]
+    chunks = [items[i:i + pack_size] for i in range(0, len(items), pack_size)]
+
+    from ..caller_context import capture_caller_context
+    caller_ctx = capture_caller_context()
+
+    resolved: Dict[str, str] = {}
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(chunks))),
+        thread_name_prefix=f"UDF-pack-{func_name}",
+    ) as pool:
+        for chunk_results in pool.map(lambda chunk: caller_ctx.run(_run_pack, fn, chunk, caller_id), chunks):
+            resolved.update(chunk_results)
+    return resolved
+
+
+def _run_pack(fn, chunk: List[Tuple[str, Dict[str, Any]]], caller_id: Optional[str]) -> Dict[str, str]:
+    """Run one packed prompt; returns cache_key -> result string for resolved rows."""
+    from ..runner import RowModeFallback, RowModeRunner
+    from ..session_naming import generate_woodland_id
+    from ..sql_tools.cache_adapter import get_cache
+    from ..sql_trail import increment_cache_hit, increment_cache_miss, record_pack, register_cascade_execution
+    from .registry import set_cached_result
+
+    # Inputs as execute_cascade_udf would see them (prefixes stripped)
+    pending: List[Tuple[str, Dict[str, Any]]] = []
+    for cache_key, args in chunk:
+        cleaned, takes_config = _extract_takes_from_inputs(args)
+        if takes_config:
+            return {}  # Takes runs sample per row; never pack them
+        cleaned, _, _, _ = _extract_source_context_from_inputs(cleaned)
+        pending.append((cache_key, cleaned))
+
+    resolved: Dict[str, str] = {}
+
+    # Rows that differ only in lineage prefixes may already be cached by content
+    if fn.cache_enabled:
+        cache = get_cache()
+        cached = cache.get_batch(fn.cache_name, [cleaned for _, cleaned in pending], track_hit=True)
+        remaining = []
+        for cache_key, cleaned in pending:
+            found, value, _ = cached.get(cache.make_cache_key(fn.cache_name, cleaned), (False, None, ""))
+            if found:
+                resolved[cache_key] = json.dumps(value) if isinstance(value, (dict, list)) else str(value)
+                if caller_id:
+                    increment_cache_hit(caller_id)
+            else:
+                remaining.append((cache_key, cleaned))
+        pending = remaining
+
+    if len(pending) < 2:
+        return resolved  # A single row gains nothing from packing
+
+    session_id = f"sql_fn_{fn.name}_{generate_woodland_id()}"
+    try:
+        runner = RowModeRunner(fn.cascade_path, session_id=session_id, caller_id=caller_id)
+        results, stats = runner.run_packed([cleaned for _, cleaned in pending])
+    except RowModeFallback as e:
+        log.debug(f"[pack] {fn.name}: pack of {len(pending)} falling back to per-row: {e}")
+        return resolved
+    except Exception as e:
+        log.warning(f"[pack] {fn.name}: pack of {len(pending)} failed, running rows individually: {e}")
+        return resolved
+
+    packed_rows = 0
+    for (cache_key, cleaned), result in zip(pending, results):
+        if result is None:
+            continue
+        if isinstance(result, dict) and "result" in result:
+            result = result["result"]
+        output = _coerce_value_output(result, fn.returns)
+        set_cached_result(fn.cache_name, cleaned, output)
+        resolved[cache_key] = json.dumps(output) if isinstance(output, (dict, list)) else str(output)
+        packed_rows += 1
+
+    if caller_id:
+        for _ in range(packed_rows):
+            increment_cache_miss(caller_id)
+        register_cascade_execution(
+            caller_id=caller_id,
+            cascade_id=fn.name,
+            cascade_path=fn.cascade_path,
+            session_id=session_id,
+            inputs={"packed_rows": len(pending)},
+        )
+        record_pack(caller_id, rows=packed_rows, calls=1, tokens_saved=stats.get("tokens_saved", 0))
+
+    log.debug(
+        f"[pack] {fn.name}: {packed_rows}/{len(pending)} rows answered in one call "
+        f"(~{stats.get('tokens_saved', 0)} prompt tokens saved)"
+    )
+    return resolved
@@ -541,16 +541,40 @@ async def execute_sql_function(
     Returns:
         Function result (from cascade output)
 
+    Concurrent cache misses on the same key (from any caller in the process,
+    including execute_cascade_udf) are coalesced: one caller runs the cascade,
+    the others wait and are served from the cache.
+
     Raises:
         ValueError: If function not found
         Exception: If cascade execution fails
     """
-    from .executor import _extract_takes_from_inputs, _inject_takes_into_cascade
+    flights: List[Any] = []
+    try:
+        return await _execute_sql_function(name, args, session_id, flights)
+    finally:
+        for flight in flights:
+            flight.release()
+
+
+async def _execute_sql_function(
+    name: str,
+    args: Dict[str, Any],
+    session_id: Optional[str],
+    flights: List[Any],
+) -> Any:
+    """Body of execute_sql_function; single-flight handles are appended to flights."""
+    from .executor import (
+        _extract_pack_from_inputs, _extract_takes_from_inputs, _inject_takes_into_cascade, _try_row_mode
+    )
 
     fn = get_sql_function(name)
     if not fn:
         raise ValueError(f"SQL function not found: {name}")
 
+    # Pack hints only apply to vectorized batches; drop them for single calls
+    args, _ = _extract_pack_from_inputs(args)
+
     # Extract takes config from args (embedded as special prefix in criterion strings)
     cleaned_args, takes_config = _extract_takes_from_inputs(args)
 
@@ -626,6 +650,22 @@ async def execute_sql_function(
             # Default: content-based cache key
             found, cached = get_cached_result(cache_name, cleaned_args)
 
+        # Coalesce with an in-flight computation of the same key (another
+        # query, the prewarm sidecar): wait for it, then re-read the cache
+        if not found:
+            if use_fingerprint_cache:
+                flight_args = {"__fingerprint_key__": cache_key}
+            elif use_structure_cache:
+                flight_args = {"__structure_key__": cache_key}
+            else:
+                flight_args = cleaned_args
+            flight = cache.begin_flight(cache_name, flight_args)
+            flights.append(flight)
+            if not flight.is_leader and flight.wait():
+                found, cached, _ = cache.get(cache_name, flight_args)
+                if found:
+                    log.debug(f"[sql_fn] Coalesced onto in-flight call for {name}")
+
         if found:
             log.debug(f"[sql_fn] Cache hit for {name}")
             # Track cache hit for SQL Trail
@@ -728,14 +768,18 @@ async def execute_sql_function(
     else:
         # Create runner with session_id AND caller_id for proper tracking
         print(f"[sql_fn] [EXEC] Running {name} (mode={output_mode})")
-        runner = LARSRunner(
-            fn.cascade_path,
-            session_id=session_id,
-            caller_id=caller_id  # Pass caller_id so Echo gets it and propagates to all logs!
-        )
+        runner = None
+        result = _try_row_mode(fn.cascade_path, session_id, cascade_inputs, caller_id=caller_id)
+        if result is None:
+            runner = LARSRunner(
+                fn.cascade_path,
+                session_id=session_id,
+                caller_id=caller_id  # Pass caller_id so Echo gets it and propagates to all logs!
+            )
 
     # Execute cascade with prepared inputs
-    result = runner.run(input_data=cascade_inputs)
+    if runner is not None:
+        result = runner.run(input_data=cascade_inputs)
 
     # Extract result from cascade output using proper parsing
     from .executor import _extract_cascade_output
@@ -13,7 +13,7 @@ This is sufficient for 95% of SQL tools (DBeaver, psql, DataGrip, Tableau).
 """
 
 import struct
-from typing import Tuple, Optional, List, Any
+from typing import Tuple, Optional, List, Any, Iterator
 
 
 class MessageType:
@@ -39,6 +39,7 @@ class MessageType:
     COMMAND_COMPLETE = ord('C')
     ERROR_RESPONSE = ord('E')
     NOTICE_RESPONSE = ord('N')
+    PORTAL_SUSPENDED = ord('s')
 
 
 class PostgresMessage:
@@ -369,6 +370,19 @@ class RowDescription:
             return RowDescription.TYPES['VARCHAR']
 
 
+# DataRows are written to the socket in chunks of about this many bytes
+DATA_ROW_FLUSH_BYTES = 64 * 1024
+
+# Rows converted per column pass (bounds the memory held by encoded cells)
+DATA_ROW_ENCODE_BATCH = 4096
+
+# Text values that are sent as NULL (pandas/NumPy missing-value spellings)
+_NULL_TEXT = frozenset(('<NA>', 'None', 'nan', 'NaT'))
+_NULL_CELL = struct.pack('!i', -1)
+_pack_length = struct.Struct('!I').pack
+_pack_row_header = struct.Struct('!cIH').pack
+
+
 class DataRow:
     """DataRow message - one row of query results."""
 
@@ -398,6 +412,53 @@ class DataRow:
                 elements.append(str(item))
         return '{' + ','.join(elements) + '}'
 
+    @staticmethod
+    def _text(value: str) -> Optional[bytes]:
+        """Text-format bytes for a string value (None = NULL)."""
+        if value in _NULL_TEXT:
+            return None
+        if value.startswith('[') and value.endswith(']'):
+            # Python list reprs become PG arrays; valid JSON arrays pass through as-is
+            import json
+            try:
+                json.loads(value)
+            except (json.JSONDecodeError, ValueError):
+                try:
+                    import ast
+                    parsed = ast.literal_eval(value)
+                    if isinstance(parsed, (list, tuple)):
+                        value = DataRow._to_pg_array(parsed)
+                except (ValueError, SyntaxError):
+                    pass  # Keep original string if parsing fails
+        return value.encode('utf-8')
+
+    @staticmethod
+    def encode_value(value: Any) -> Optional[bytes]:
+        """
+        Convert one column value to PostgreSQL text format.
+
+        Returns:
+            UTF-8 bytes, or None for NULL (None, NaN, pandas NA/NaT)
+        """
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return DataRow._text(value)
+        if isinstance(value, bool):
+            return b't' if value else b'f'  # PostgreSQL boolean format
+        if isinstance(value, float):
+            return None if value != value else str(value).encode('ascii')
+        if isinstance(value, int):
+            return str(value).encode('ascii')
+        if isinstance(value, bytes):
+            return value.decode('utf-8', errors='replace').encode('utf-8')
+        if isinstance(value, (list, tuple)):
+            return DataRow._to_pg_array(value).encode('utf-8')
+        # DuckDB returns numpy.ndarray for array columns
+        if type(value).__name__ == 'ndarray':
+            return DataRow._to_pg_array(value.tolist()).encode('utf-8')
+        return DataRow._text(str(value))
+
     @staticmethod
     def encode(values: List[Any]) -> bytes:
         """
@@ -409,64 +470,73 @@ class DataRow:
         Format:
         [2 bytes: column count] [per column: [4 bytes: value length] [N bytes: value]]
         """
-        payload = struct.pack('!H', len(values))  # Column count
+        parts = [struct.pack('!H', len(values))]  # Column count
 
         for value in values:
-            # Check for various NULL representations
-            is_null = (
-                value is None or
-                (isinstance(value, float) and str(value) == 'nan') or
-                str(value) == '<NA>' or  # pandas NA
-                str(value) == 'None' or
-                str(value) == 'nan'
-            )
-
-            if is_null:
+            value_bytes = DataRow.encode_value(value)
+            if value_bytes is None:
                 # NULL value: length = -1
-                payload += struct.pack('!i', -1)
+                parts.append(_NULL_CELL)
             else:
-                # Convert to string (text format)
-                # Handle different Python types
-                if isinstance(value, bool):
-                    value_str = 't' if value else 'f'  # PostgreSQL boolean format
-                elif isinstance(value, (int, float)):
-                    value_str = str(value)
-                elif isinstance(value, bytes):
-                    value_str = value.decode('utf-8', errors='replace')
-                elif isinstance(value, (list, tuple)):
-                    # Convert Python list/tuple to PostgreSQL array format
-                    value_str = DataRow._to_pg_array(value)
-                else:
-                    # Check for numpy array (DuckDB returns numpy.ndarray for array columns)
-                    value_type = type(value).__name__
-                    if value_type == 'ndarray':
-                        # Convert numpy array to list, then to PostgreSQL array format
-                        value_str = DataRow._to_pg_array(value.tolist())
-                    else:
-                        # Check if string looks like a Python list representation
-                        # BUT: Don't convert valid JSON arrays - they should pass through as-is
-                        value_str = str(value)
-                        if value_str.startswith('[') and value_str.endswith(']'):
-                            # First check if it's valid JSON - if so, leave it alone
-                            try:
-                                import json
-                                json.loads(value_str)
-                                # Valid JSON - don't convert to PG array format
-                            except (json.JSONDecodeError, ValueError):
-                                # Not valid JSON - try to convert Python list string to PostgreSQL array format
-                                try:
-                                    import ast
-                                    parsed = ast.literal_eval(value_str)
-                                    if isinstance(parsed, (list, tuple)):
-                                        value_str = DataRow._to_pg_array(parsed)
-                                except (ValueError, SyntaxError):
-                                    pass  # Keep original string if parsing fails
-
-                value_bytes = value_str.encode('utf-8')
-                payload += struct.pack('!I', len(value_bytes))
-                payload += value_bytes
-
-        return PostgresMessage.build_message(MessageType.DATA_ROW, payload)
+                parts.append(_pack_length(len(value_bytes)))
+                parts.append(value_bytes)
+
+        return PostgresMessage.build_message(MessageType.DATA_ROW, b''.join(parts))
+
+    @staticmethod
+    def _column_source(series):
+        """Whole-column values in the cheapest form to slice and convert: NumPy for plain numerics, else a list."""
+        import numpy as np
+
+        if isinstance(series.dtype, np.dtype) and series.dtype.kind in ('i', 'u', 'f', 'b'):
+            return series.dtype.kind, series.to_numpy()
+        return None, series.tolist()
+
+    @staticmethod
+    def _encode_cells(kind: Optional[str], values) -> List[bytes]:
+        """Length-prefixed text cells for a slice of one column."""
+        if kind in ('i', 'u'):
+            texts = [str(v).encode('ascii') for v in values.tolist()]
+        elif kind == 'f':
+            texts = [None if v != v else str(v).encode('ascii') for v in values.tolist()]
+        elif kind == 'b':
+            texts = [b't' if v else b'f' for v in values.tolist()]
+        else:
+            encode_value = DataRow.encode_value
+            texts = [encode_value(v) for v in values]
+        return [_NULL_CELL if t is None else _pack_length(len(t)) + t for t in texts]
+
+    @staticmethod
+    def iter_chunks(result_df, start: int = 0, stop: Optional[int] = None,
+                    chunk_bytes: int = DATA_ROW_FLUSH_BYTES) -> Iterator[bytes]:
+        """
+        Encode DataFrame rows [start, stop) as DataRow messages, column by column.
+
+        Each column slice is converted in one pass (NumPy for numeric columns,
+        per-value conversion otherwise) and rows are assembled into a reusable
+        buffer that is yielded whenever it reaches chunk_bytes.
+
+        Yields:
+            bytes chunks of concatenated DataRow messages
+        """
+        n_rows = len(result_df) if stop is None else min(stop, len(result_df))
+        n_cols = len(result_df.columns)
+        sources = [DataRow._column_source(result_df.iloc[:, j]) for j in range(n_cols)]
+
+        buf = bytearray()
+        data_row = bytes([MessageType.DATA_ROW])
+        for batch_start in range(start, n_rows, DATA_ROW_ENCODE_BATCH):
+            batch_stop = min(batch_start + DATA_ROW_ENCODE_BATCH, n_rows)
+            columns = [DataRow._encode_cells(kind, values[batch_start:batch_stop]) for kind, values in sources]
+            for cells in zip(*columns) if n_cols else ((),) * (batch_stop - batch_start):
+                body = b''.join(cells)
+                buf += _pack_row_header(data_row, len(body) + 6, n_cols)
+                buf += body
+                if len(buf) >= chunk_bytes:
+                    yield bytes(buf)
+                    buf.clear()
+        if buf:
+            yield bytes(buf)
 
 
 class CommandComplete:
@@ -842,6 +912,175 @@ class NoData:
         return PostgresMessage.build_message(ord('n'), b'')
 
 
+class PortalSuspended:
+    """PortalSuspended message - Execute hit max_rows; the portal can be executed again for more rows."""
+
+    @staticmethod
+    def encode() -> bytes:
+        """Build PortalSuspended message (code 's')."""
+        return PostgresMessage.build_message(MessageType.PORTAL_SUSPENDED, b'')
+
+
+# ============================================================================
+# Result Streams
+# ============================================================================
+
+# Rows per Arrow record batch pulled from DuckDB when streaming a result
+RESULT_STREAM_BATCH_ROWS = 16384
+
+
+def _arrow_batch_to_frame(batch):
+    """
+    Convert an Arrow record batch to pandas with the dtypes fetchdf() would give.
+
+    Integer columns keep pandas nullable dtypes (no float upcast on NULL) and
+    DECIMAL becomes DOUBLE.
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if any(pa.types.is_decimal(field.type) for field in batch.schema):
+        batch = pa.RecordBatch.from_arrays(
+            [pc.cast(col, pa.float64()) if pa.types.is_decimal(col.type) else col for col in batch.columns],
+            names=batch.schema.names,
+        )
+    int_dtypes = {
+        pa.int8(): pd.Int8Dtype(), pa.int16(): pd.Int16Dtype(),
+        pa.int32(): pd.Int32Dtype(), pa.int64(): pd.Int64Dtype(),
+        pa.uint8(): pd.UInt8Dtype(), pa.uint16(): pd.UInt16Dtype(),
+        pa.uint32(): pd.UInt32Dtype(), pa.uint64(): pd.UInt64Dtype(),
+    }
+    return batch.to_pandas(types_mapper=int_dtypes.get)
+
+
+class ResultStream:
+    """
+    Rows of a query result, consumed in order.
+
+    Wraps either a materialized DataFrame or a DuckDB result read as Arrow
+    record batches, so a result never has to be held in memory whole. Each
+    call to frames() continues where the last one stopped, which is what an
+    Extended Query portal needs for Execute with max_rows.
+
+    Up to retain_rows rows are also kept (as `retained`) for callers that need
+    the full result afterwards, such as auto-materialization; larger results
+    are not retained.
+    """
+
+    def __init__(self, frames, schema_frame, retain_rows: int = 0, streaming: bool = False):
+        self._frames = iter(frames)
+        self._pending = None
+        self._retain_rows = retain_rows
+        self._retained: List[Any] = []
+        self._retain_overflow = False
+        self.schema_frame = schema_frame
+        self.streaming = streaming
+        self.rows_sent = 0
+        self.exhausted = False
+
+    @classmethod
+    def from_dataframe(cls, result_df, retain_rows: int = 0) -> 'ResultStream':
+        # PostgreSQL-style boolean text values ('t'/'f') are sent as integers (1/0)
+        result_df = _convert_pg_booleans(result_df)
+        return cls([result_df], result_df.head(0), retain_rows=retain_rows)
+
+    @classmethod
+    def from_duckdb(cls, result, batch_rows: int = RESULT_STREAM_BATCH_ROWS, retain_rows: int = 0) -> 'ResultStream':
+        """
+        Stream a DuckDB result (the cursor returned by execute()) in Arrow record batches.
+
+        The first batch is read up front so column types are known for
+        RowDescription; the rest are read as the client consumes rows.
+        """
+        to_reader = getattr(result, 'to_arrow_reader', None) or result.fetch_record_batch
+        reader = to_reader(batch_rows)
+        frames = (_convert_pg_booleans(_arrow_batch_to_frame(batch)) for batch in reader)
+        stream = cls(frames, None, retain_rows=retain_rows, streaming=True)
+        stream._pending = stream._next_frame()
+        if stream._pending is not None:
+            stream.schema_frame = stream._pending.head(0)
+        else:
+            stream.schema_frame = _convert_pg_booleans(_arrow_batch_to_frame(reader.schema.empty_table()))
+        return stream
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.schema_frame.columns)
+
+    @property
+    def retained(self):
+        """All rows sent so far as one DataFrame, or None if more than retain_rows were sent."""
+        import pandas as pd
+
+        if self._retain_overflow or not self._retain_rows:
+            return None
+        if not self._retained:
+            return self.schema_frame
+        return pd.concat(self._retained, ignore_index=True) if len(self._retained) > 1 else self._retained[0]
+
+    def detach(self):
+        """
+        Read the rest of a streamed result into memory.
+
+        A DuckDB connection has one open result at a time; a suspended
+        portal must be detached before anything else runs on its connection.
+        """
+        if self.streaming and not self.exhausted:
+            self._frames = iter(list(self._frames))
+        self.streaming = False
+
+    def close(self):
+        """Drop the unread rows, releasing the DuckDB reader behind a streamed result."""
+        close = getattr(self._frames, 'close', None)
+        if close is not None:
+            close()
+        self._frames = iter(())
+        self._pending = None
+        self.streaming = False
+
+    def _next_frame(self):
+        if self._pending is not None:
+            frame, self._pending = self._pending, None
+            return frame
+        for frame in self._frames:
+            if len(frame):
+                return frame
+        return None
+
+    def frames(self, max_rows: int = 0) -> Iterator[Any]:
+        """
+        Yield the next DataFrame slices, up to max_rows rows in total (0 = all remaining).
+
+        Sets `exhausted` once the last row has been yielded.
+        """
+        remaining = max_rows if max_rows > 0 else None
+        while remaining is None or remaining > 0:
+            frame = self._next_frame()
+            if frame is None:
+                self.exhausted = True
+                return
+            if remaining is not None and len(frame) > remaining:
+                frame, self._pending = frame.iloc[:remaining], frame.iloc[remaining:]
+            if remaining is not None:
+                remaining -= len(frame)
+            self.rows_sent += len(frame)
+            self._retain(frame)
+            yield frame
+        # Look ahead so a result ending exactly at max_rows completes instead of suspending
+        self._pending = self._next_frame()
+        self.exhausted = self._pending is None
+
+    def _retain(self, frame):
+        if not self._retain_rows or self._retain_overflow:
+            return
+        if self.rows_sent > self._retain_rows:
+            self._retained = []
+            self._retain_overflow = True
+        else:
+            self._retained.append(frame)
+
+
 # ============================================================================
 # Helper Functions
 # ============================================================================
@@ -932,27 +1171,8 @@ def _convert_pg_booleans(result_df):
     return df
 
 
-def send_query_results(sock, result_df, transaction_status='I'):
-    """
-    Send query results to client.
-
-    Sequence:
-    1. RowDescription (column metadata)
-    2. DataRow (one per result row)
-    3. CommandComplete
-    4. ReadyForQuery
-
-    Args:
-        sock: Client socket
-        result_df: pandas DataFrame with query results
-        transaction_status: 'I' = idle, 'T' = in transaction, 'E' = error (default: 'I')
-    """
-    import pandas as pd
-
-    # Convert PostgreSQL-style boolean text values ('t'/'f') to integers (1/0)
-    result_df = _convert_pg_booleans(result_df)
-
-    # 1. Send RowDescription (column metadata)
+def _describe_columns(result_df) -> List[Tuple[str, str]]:
+    """Map DataFrame dtypes to (column_name, duckdb_type) pairs for RowDescription."""
     columns = []
     for col_name, dtype in zip(result_df.columns, result_df.dtypes):
         # Map pandas dtype to DuckDB type name
@@ -974,21 +1194,70 @@ def send_query_results(sock, result_df, transaction_status='I'):
             duckdb_type = 'VARCHAR'
 
         columns.append((col_name, duckdb_type))
+    return columns
 
-    sock.sendall(RowDescription.encode(columns))
 
-    # 2. Send DataRow for each row
-    for idx, row in result_df.iterrows():
-        values = [row[col] for col in result_df.columns]
-        sock.sendall(DataRow.encode(values))
+def _send_rows(sock, stream: ResultStream, max_rows: int = 0, head: bytes = b'') -> bytes:
+    """
+    Send up to max_rows rows (0 = all) of a stream as DataRows in ~DATA_ROW_FLUSH_BYTES chunks.
 
-    # 3. Send CommandComplete
-    row_count = len(result_df)
-    command_tag = f"SELECT {row_count}"
-    sock.sendall(CommandComplete.encode(command_tag))
+    head is sent in front of the first chunk. Returns the unsent remainder so
+    the caller can append its trailing messages and send everything in one
+    sendall() - small results go out in a single send.
 
-    # 4. Send ReadyForQuery
-    sock.sendall(ReadyForQuery.encode(transaction_status))
+    For streamed DuckDB results, buffered rows are also flushed before the
+    next record batch is pulled, so the client sees rows while the query is
+    still producing them.
+    """
+    pending = head
+    for frame in stream.frames(max_rows):
+        for chunk in DataRow.iter_chunks(frame):
+            if pending and len(pending) + len(chunk) > DATA_ROW_FLUSH_BYTES:
+                sock.sendall(pending)
+                pending = chunk
+            else:
+                pending += chunk
+        if stream.streaming and pending:
+            sock.sendall(pending)
+            pending = b''
+    return pending
+
+
+def send_query_results(sock, result_df, transaction_status='I'):
+    """
+    Send query results to client.
+
+    Sequence:
+    1. RowDescription (column metadata)
+    2. DataRow (one per result row)
+    3. CommandComplete
+    4. ReadyForQuery
+
+    Args:
+        sock: Client socket
+        result_df: pandas DataFrame with query results
+        transaction_status: 'I' = idle, 'T' = in transaction, 'E' = error (default: 'I')
+    """
+    send_query_stream(sock, ResultStream.from_dataframe(result_df), transaction_status)
+
+
+def send_query_stream(sock, stream: ResultStream, transaction_status='I'):
+    """
+    Send a result stream to the client (Simple Query Protocol).
+
+    Same sequence as send_query_results; rows are encoded batch by batch, so
+    a streamed DuckDB result is never materialized as a whole DataFrame.
+
+    Args:
+        sock: Client socket
+        stream: ResultStream over the query result
+        transaction_status: 'I' = idle, 'T' = in transaction, 'E' = error (default: 'I')
+    """
+    # 1. RowDescription (column metadata), 2. DataRows, 3. CommandComplete,
+    # 4. ReadyForQuery - written in ~64KB chunks rather than one send per row
+    head = RowDescription.encode(_describe_columns(stream.schema_frame))
+    pending = _send_rows(sock, stream, head=head)
+    sock.sendall(pending + CommandComplete.encode(f"SELECT {stream.rows_sent}") + ReadyForQuery.encode(transaction_status))
 
 
 def send_error(sock, message: str, detail: str | None = None, severity: str = 'ERROR', transaction_status='E'):
@@ -1030,42 +1299,35 @@ def send_execute_results(sock, result_df, send_row_description=True):
         result_df: pandas DataFrame with query results
         send_row_description: If True, send RowDescription (default)
     """
-    import pandas as pd
+    send_execute_stream(sock, ResultStream.from_dataframe(result_df), send_row_description=send_row_description)
 
-    # Convert PostgreSQL-style boolean text values ('t'/'f') to integers (1/0)
-    result_df = _convert_pg_booleans(result_df)
 
-    # 1. Optionally send RowDescription (if Describe didn't send it)
-    if send_row_description:
-        columns = []
-        for col_name, dtype in zip(result_df.columns, result_df.dtypes):
-            dtype_str = str(dtype).upper()
-            if 'INT64' in dtype_str:
-                duckdb_type = 'BIGINT'
-            elif 'INT32' in dtype_str or 'INT' in dtype_str:
-                duckdb_type = 'INTEGER'
-            elif 'FLOAT64' in dtype_str or 'FLOAT' in dtype_str:
-                duckdb_type = 'DOUBLE'
-            elif 'BOOL' in dtype_str:
-                duckdb_type = 'BOOLEAN'
-            elif 'DATETIME' in dtype_str:
-                duckdb_type = 'TIMESTAMP'
-            elif 'OBJECT' in dtype_str:
-                duckdb_type = 'VARCHAR'
-            else:
-                duckdb_type = 'VARCHAR'
-            columns.append((col_name, duckdb_type))
-
-        sock.sendall(RowDescription.encode(columns))
+def send_execute_stream(sock, stream: ResultStream, max_rows: int = 0, send_row_description=True) -> bool:
+    """
+    Send the next rows of a portal's result stream (Extended Query Protocol).
 
-    # 2. Send DataRow for each row
-    for idx, row in result_df.iterrows():
-        values = [row[col] for col in result_df.columns]
-        sock.sendall(DataRow.encode(values))
+    Honours Execute's max_rows: if rows remain after max_rows, the portal is
+    suspended (PortalSuspended instead of CommandComplete) and the next
+    Execute on it continues from the same stream.
 
-    # 3. Send CommandComplete
-    row_count = len(result_df)
-    command_tag = f"SELECT {row_count}"
-    sock.sendall(CommandComplete.encode(command_tag))
+    Args:
+        sock: Client socket
+        stream: The portal's ResultStream
+        max_rows: Execute.max_rows (0 = no limit)
+        send_row_description: If True, send RowDescription first
 
+    Returns:
+        True if the portal was suspended, False if the result is complete
+    """
+    # 1. Optionally RowDescription (if Describe didn't send it), 2. DataRows,
+    # 3. CommandComplete or PortalSuspended - written in ~64KB chunks
     # 4. NO ReadyForQuery! (Extended Query Protocol sends that after Sync)
+    head = b''
+    if send_row_description:
+        head = RowDescription.encode(_describe_columns(stream.schema_frame))
+    pending = _send_rows(sock, stream, max_rows=max_rows, head=head)
+    if stream.exhausted:
+        sock.sendall(pending + CommandComplete.encode(f"SELECT {stream.rows_sent}"))
+        return False
+    sock.sendall(pending + PortalSuspended.encode())
+    return True
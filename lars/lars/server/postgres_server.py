@@ -40,7 +40,10 @@ from .postgres_protocol import (
     send_startup_response,
     send_query_results,
     send_execute_results,
+    send_query_stream,
+    send_execute_stream,
     send_error,
+    ResultStream,
     # Extended Query Protocol classes
     ParseMessage,
     BindMessage,
@@ -67,6 +70,9 @@ class ClientConnection:
     - Dedicated socket
     """
 
+    # Largest result kept in memory while streaming for auto-materialization
+    MATERIALIZE_MAX_ROWS = 100000
+
     def __init__(self, sock, addr, session_prefix='pg_client'):
         self.sock = sock
         self.addr = addr
@@ -85,6 +91,7 @@ class ClientConnection:
         # Extended Query Protocol state
         self.prepared_statements = {}  # name → {query, param_types, param_count}
         self.portals = {}               # name → {statement_name, params, result_formats, query}
+        self._streaming_portal = None   # Suspended portal still reading from the DuckDB connection
 
         # Lazy attach manager (initialized in setup_session)
         self._lazy_attach = None
@@ -1761,7 +1768,7 @@ class ClientConnection:
             return None
 
         # Skip if results are too large (configurable threshold)
-        max_rows = 100000  # Could make this configurable
+        max_rows = self.MATERIALIZE_MAX_ROWS
         if len(result_df) > max_rows:
             styled_print(f"[{self.session_id}]   {S.WARN}  Skipping auto-materialize: {len(result_df)} rows > {max_rows} limit")
             return None
@@ -3904,6 +3911,8 @@ class ClientConnection:
             protocol="postgresql_wire",
             triggered_by="postgres_server"
         )
+        # Captured once per query: UDF threads find it in the in-process registry
+        # and pass it explicitly to their workers (ClickHouse is only a fallback)
         set_caller_context(caller_id, metadata, connection_id=self.session_id)
 
         # Set up DuckDB attachments for sql_statement mode
@@ -3922,13 +3931,58 @@ class ClientConnection:
 
         return query_id, query_start_time, caller_id
 
+    def _release_duckdb_connection(self):
+        """
+        Buffer the unread rows of the suspended portal streaming from DuckDB, if any.
+
+        A DuckDB connection has one open result at a time, so only the portal
+        whose stream is still reading from it blocks the next query. Call this
+        right before running something on the connection.
+        """
+        name, self._streaming_portal = self._streaming_portal, None
+        portal = self.portals.get(name) if name is not None else None
+        if portal is not None and 'stream' in portal:
+            portal['stream'].detach()
+
+    def _close_portal(self, name):
+        """
+        Remove a portal. A suspended portal's stream is closed and its query
+        logged as complete with the rows sent so far.
+        """
+        portal = self.portals.pop(name, None)
+        if portal is None:
+            return
+        if name == self._streaming_portal:
+            self._streaming_portal = None
+        stream = portal.pop('stream', None)
+        if stream is not None:
+            stream.close()
+            self._finish_result_stream(stream, *portal.pop('stream_tracking'))
+
+    def _finish_result_stream(self, stream, query, query_id, query_start_time, caller_id):
+        """
+        Materialize and log a result that has been fully streamed to the client.
+
+        Results larger than MATERIALIZE_MAX_ROWS are not retained while
+        streaming, so only smaller results are auto-materialized.
+        """
+        result_df = stream.retained
+        result_location = None
+        if result_df is not None:
+            result_location = self._maybe_materialize_result(query, result_df, query_id, caller_id)
+        self._complete_query_tracking(
+            query_id, query_start_time, caller_id, result_df,
+            result_location=result_location, rows_output=stream.rows_sent
+        )
+
     def _complete_query_tracking(
         self,
         query_id,
         query_start_time,
         caller_id,
         result_df,
-        result_location=None
+        result_location=None,
+        rows_output=None
     ):
         """
         Log query completion for SQL Trail.
@@ -3942,6 +3996,7 @@ class ClientConnection:
             caller_id: The caller_id returned from _setup_query_tracking
             result_df: The result DataFrame (for row count)
             result_location: Optional dict with {db_name, db_path, schema_name, table_name}
+            rows_output: Row count override (streamed results may not be retained)
         """
         if not query_id or not query_start_time:
             return
@@ -3951,7 +4006,7 @@ class ClientConnection:
             from lars.sql_trail import (
                 log_query_complete,
                 get_cascade_paths, get_cascade_summary, clear_cascade_executions,
-                get_and_clear_cache_counts
+                get_and_clear_cache_counts, get_and_clear_udf_batch_counts, get_and_clear_pack_counts
             )
             from lars.caller_context import clear_caller_context
 
@@ -3960,8 +4015,10 @@ class ClientConnection:
             cascade_paths = get_cascade_paths(caller_id) if caller_id else []
             cascade_summary = get_cascade_summary(caller_id) if caller_id else {}
 
-            # Get accumulated cache counts for this query
+            # Get accumulated cache and UDF de-dup counts for this query
             cache_hits, cache_misses = get_and_clear_cache_counts(caller_id)
+            udf_rows, udf_distinct_calls = get_and_clear_udf_batch_counts(caller_id)
+            packed_rows, packed_calls, pack_tokens_saved = get_and_clear_pack_counts(caller_id)
 
             result_kwargs = {}
             if result_location:
@@ -3983,12 +4040,17 @@ class ClientConnection:
             log_query_complete(
                 query_id=query_id,
                 status='completed',
-                rows_output=len(result_df) if result_df is not None else 0,
+                rows_output=rows_output if rows_output is not None else (len(result_df) if result_df is not None else 0),
                 duration_ms=duration_ms,
                 cascade_paths=cascade_paths,
                 cascade_count=cascade_summary.get('cascade_count', 0),
                 cache_hits=cache_hits,
                 cache_misses=cache_misses,
+                udf_rows=udf_rows,
+                udf_distinct_calls=udf_distinct_calls,
+                packed_rows=packed_rows,
+                packed_calls=packed_calls,
+                pack_tokens_saved=pack_tokens_saved,
                 **result_kwargs
             )
 
@@ -4044,6 +4106,10 @@ class ClientConnection:
         """
         self.query_count += 1
 
+        # A simple Query closes the unnamed portal and runs on the DuckDB connection
+        self._close_portal('')
+        self._release_duckdb_connection()
+
         # Clean query (remove null terminators, whitespace)
         query = query.strip()
 
@@ -4389,28 +4455,25 @@ class ClientConnection:
             if result is None:
                 # Query returned no result object (e.g., empty after rewrite)
                 import pandas as pd
-                result_df = pd.DataFrame()
-            else:
+                stream = ResultStream.from_dataframe(pd.DataFrame())
+            elif 'save_as' in lars_hints:
+                # Arrow syntax: save result as named table (needs the whole result)
                 result_df = result.fetchdf()
-
-            # Auto-materialize for query insurance (uses original query for detection)
-            _result_location = self._maybe_materialize_result(original_query, result_df, _current_query_id, _caller_id)
-
-            # Arrow syntax: save result as named table if save_as hint present
-            if 'save_as' in lars_hints:
                 self._save_result_as(lars_hints['save_as'], result_df)
+                stream = ResultStream.from_dataframe(result_df, retain_rows=len(result_df) or 1)
+            else:
+                # Stream record batches to the client instead of fetchdf():
+                # bounded memory, and rows go out while DuckDB is still producing them
+                stream = ResultStream.from_duckdb(result, retain_rows=self.MATERIALIZE_MAX_ROWS)
 
             # Send results back to client (with current transaction status)
-            send_query_results(self.sock, result_df, self.transaction_status)
+            send_query_stream(self.sock, stream, self.transaction_status)
 
-            styled_print(f"[{self.session_id}]   {S.OK} Returned {len(result_df)} rows")
+            styled_print(f"[{self.session_id}]   {S.OK} Returned {stream.rows_sent} rows")
 
-            # Log query completion for SQL Trail (if we started tracking)
-            # Uses unified helper for consistent logging
-            self._complete_query_tracking(
-                _current_query_id, _query_start_time, _caller_id, result_df,
-                result_location=_result_location
-            )
+            # Auto-materialize for query insurance (uses original query for detection)
+            # and log query completion for SQL Trail (if we started tracking)
+            self._finish_result_stream(stream, original_query, _current_query_id, _query_start_time, _caller_id)
 
         except Exception as e:
             # Send error to client
@@ -5653,7 +5716,10 @@ class ClientConnection:
         job_id = f"job-{generate_woodland_id()}"
 
         # Log query start (also generates internal UUID query_id)
-        from ..sql_trail import log_query_start, log_query_complete, log_query_error, get_and_clear_cache_counts
+        from ..sql_trail import (
+            log_query_start, log_query_complete, log_query_error,
+            get_and_clear_cache_counts, get_and_clear_udf_batch_counts, get_and_clear_pack_counts
+        )
         internal_query_id = log_query_start(
             caller_id=job_id,  # Use job_id as caller_id for lookup
             query_raw=query,
@@ -5758,6 +5824,8 @@ class ClientConnection:
                 # Log completion
                 duration_ms = (time.time() - bg_start) * 1000
                 cache_hits, cache_misses = get_and_clear_cache_counts(job_id)
+                udf_rows, udf_distinct_calls = get_and_clear_udf_batch_counts(job_id)
+                packed_rows, packed_calls, pack_tokens_saved = get_and_clear_pack_counts(job_id)
                 log_query_complete(
                     query_id=internal_query_id,
                     status='completed',
@@ -5769,6 +5837,11 @@ class ClientConnection:
                     result_table=result_location.get('table_name') if result_location else None,
                     cache_hits=cache_hits,
                     cache_misses=cache_misses,
+                    udf_rows=udf_rows,
+                    udf_distinct_calls=udf_distinct_calls,
+                    packed_rows=packed_rows,
+                    packed_calls=packed_calls,
+                    pack_tokens_saved=pack_tokens_saved,
                 )
 
                 styled_print(f"[{session_id}] {S.DONE} Background job {job_id} completed: {len(result_df)} rows in {duration_ms:.0f}ms")
@@ -5865,7 +5938,10 @@ class ClientConnection:
         job_id = f"analysis-{generate_woodland_id()}"
 
         # Log query start
-        from ..sql_trail import log_query_start, log_query_complete, log_query_error, get_and_clear_cache_counts
+        from ..sql_trail import (
+            log_query_start, log_query_complete, log_query_error,
+            get_and_clear_cache_counts, get_and_clear_udf_batch_counts, get_and_clear_pack_counts
+        )
         internal_query_id = log_query_start(
             caller_id=job_id,
             query_raw=f"ANALYZE '{prompt}' {query}",
@@ -6101,6 +6177,8 @@ class ClientConnection:
                 # Log completion
                 duration_ms = (time.time() - bg_start) * 1000
                 cache_hits, cache_misses = get_and_clear_cache_counts(job_id)
+                udf_rows, udf_distinct_calls = get_and_clear_udf_batch_counts(job_id)
+                packed_rows, packed_calls, pack_tokens_saved = get_and_clear_pack_counts(job_id)
                 log_query_complete(
                     query_id=internal_query_id,
                     status='completed',
@@ -6112,6 +6190,11 @@ class ClientConnection:
                     result_table=result_location.get('table_name') if result_location else None,
                     cache_hits=cache_hits,
                     cache_misses=cache_misses,
+                    udf_rows=udf_rows,
+                    udf_distinct_calls=udf_distinct_calls,
+                    packed_rows=packed_rows,
+                    packed_calls=packed_calls,
+                    pack_tokens_saved=pack_tokens_saved,
                 )
 
                 styled_print(f"[{session_id}] {S.DONE} Analysis job {job_id} completed in {duration_ms:.0f}ms")
@@ -6569,6 +6652,9 @@ class ClientConnection:
             # Rewrite LARS MAP/RUN syntax to standard SQL BEFORE preparing
             from lars.sql_rewriter import rewrite_lars_syntax
             original_query = query
+            if query.lstrip()[:7].upper() == 'EXPLAIN':
+                # EXPLAIN of a LARS statement is analyzed on the DuckDB connection
+                self._release_duckdb_connection()
             query = rewrite_lars_syntax(query, duckdb_conn=self.duckdb_conn)
 
             if query != original_query:
@@ -6686,8 +6772,9 @@ class ClientConnection:
                                 # If that fails, just use the bytes as-is
                                 params.append(value_bytes)
 
-            # Store portal
+            # Store portal (replacing a previous one of the same name)
             # NOTE: original_query is used for SQL Trail detection/logging in _handle_execute
+            self._close_portal(portal_name)
             self.portals[portal_name] = {
                 'statement_name': stmt_name,
                 'params': params,
@@ -6742,6 +6829,10 @@ class ClientConnection:
                 params = portal['params']
                 query_upper = query.upper().strip()
 
+                # Describing a portal may run its query (LIMIT 0) on the DuckDB connection
+                if name != self._streaming_portal:
+                    self._release_duckdb_connection()
+
                 # For non-SELECT queries (SET, BEGIN, COMMIT, DDL, DML, etc.), return NoData
                 is_non_select = (
                     # Transaction control
@@ -7350,6 +7441,21 @@ class ClientConnection:
                 raise Exception(f"Portal '{portal_name}' does not exist")
 
             portal = self.portals[portal_name]
+
+            # Suspended portal (earlier Execute hit max_rows): continue the same stream
+            if 'stream' in portal:
+                stream = portal['stream']
+                suspended = send_execute_stream(self.sock, stream, max_rows=max_rows, send_row_description=False)
+                styled_print(f"[{self.session_id}]      {S.OK} Resumed portal, {stream.rows_sent} rows sent so far")
+                if not suspended:
+                    del portal['stream']
+                    if self._streaming_portal == portal_name:
+                        self._streaming_portal = None
+                    self._finish_result_stream(stream, *portal.pop('stream_tracking'))
+                return
+
+            self._release_duckdb_connection()
+
             query = portal['query']
             params = portal['params']
             original_query = portal.get('original_query')  # For SQL Trail detection
@@ -8066,18 +8172,15 @@ class ClientConnection:
                 except Exception:
                     pass
 
-            # Execute with parameters
-            result_df = self.duckdb_conn.execute(duckdb_query, params).fetchdf()
-
-            # Limit rows if max_rows > 0
-            if max_rows > 0:
-                result_df = result_df.head(max_rows)
+            # Execute with parameters; rows are streamed from Arrow record batches
+            result = self.duckdb_conn.execute(duckdb_query, params)
+            stream = ResultStream.from_duckdb(result, retain_rows=self.MATERIALIZE_MAX_ROWS)
 
             # Safety check: if Describe already sent column info, verify column count matches
             # If mismatch, force re-sending RowDescription to prevent ArrayIndexOutOfBoundsException
             actual_send_row_desc = send_row_desc
             described_col_count = None
-            actual_col_count = len(result_df.columns)
+            actual_col_count = len(stream.columns)
             if not send_row_desc and portal_name in self.portals:
                 portal = self.portals[portal_name]
                 described_col_count = portal.get('described_columns')
@@ -8086,36 +8189,39 @@ class ClientConnection:
                     styled_print(f"[{self.session_id}]      {S.WARN}  COLUMN MISMATCH DETECTED!")
                     print(f"[{self.session_id}]         Query: {query[:200]}...")
                     print(f"[{self.session_id}]         Described: {described_col_count} cols, Actual: {actual_col_count} cols")
-                    print(f"[{self.session_id}]         Actual columns: {list(result_df.columns)}")
+                    print(f"[{self.session_id}]         Actual columns: {stream.columns}")
                     actual_send_row_desc = True
 
-            # Send results - only include RowDescription if Describe didn't already send it
-            send_execute_results(self.sock, result_df, send_row_description=actual_send_row_desc)
+            # Send results - only include RowDescription if Describe didn't already send it.
+            # With max_rows > 0 the portal may be suspended; later Executes resume the stream.
+            suspended = send_execute_stream(
+                self.sock, stream, max_rows=max_rows, send_row_description=actual_send_row_desc
+            )
 
             # Debug: log column counts for tracking ArrayIndexOutOfBounds issues
             desc_count = described_col_count if described_col_count is not None else '?'
             if not actual_send_row_desc:
-                styled_print(f"[{self.session_id}]      {S.OK} Executed, {len(result_df)} rows × {actual_col_count} cols (desc: {desc_count}, row_desc=skip)")
+                styled_print(f"[{self.session_id}]      {S.OK} Executed, {stream.rows_sent} rows × {actual_col_count} cols (desc: {desc_count}, row_desc=skip)")
             else:
-                styled_print(f"[{self.session_id}]      {S.OK} Executed, {len(result_df)} rows × {actual_col_count} cols (row_desc=sent)")
+                styled_print(f"[{self.session_id}]      {S.OK} Executed, {stream.rows_sent} rows × {actual_col_count} cols (row_desc=sent)")
+
+            if suspended:
+                styled_print(f"[{self.session_id}]      {S.PAUSE} Portal suspended after {stream.rows_sent} rows (max_rows={max_rows})")
+                portal['stream'] = stream
+                portal['stream_tracking'] = (original_query or query, _query_id, _query_start_time, _caller_id)
+                self._streaming_portal = portal_name
+                return
 
             # CRITICAL DEBUG: Log 0-row results - DataGrip may expect data from these queries
-            if len(result_df) == 0:
+            if stream.rows_sent == 0:
                 styled_print(f"[{self.session_id}]      {S.WARN}  ZERO ROWS returned for query (first 300 chars):")
                 print(f"[{self.session_id}]         {query[:300]}...")
                 # Also log the rewritten query
                 print(f"[{self.session_id}]         Rewritten (first 200 chars): {duckdb_query[:200]}...")
 
-            # Auto-materialize for query insurance (Extended Query Protocol)
-            _result_location = self._maybe_materialize_result(
-                original_query or query, result_df, _query_id, _caller_id
-            )
-
-            # Log query completion for SQL Trail (Extended Query Protocol)
-            self._complete_query_tracking(
-                _query_id, _query_start_time, _caller_id, result_df,
-                result_location=_result_location
-            )
+            # Auto-materialize for query insurance and log query completion for
+            # SQL Trail (Extended Query Protocol)
+            self._finish_result_stream(stream, original_query or query, _query_id, _query_start_time, _caller_id)
 
         except Exception as e:
             error_str = str(e)
@@ -8186,7 +8292,7 @@ class ClientConnection:
                     styled_print(f"[{self.session_id}]      {S.OK} Statement closed")
             elif close_type == 'P':  # Portal
                 if name in self.portals:
-                    del self.portals[name]
+                    self._close_portal(name)
                     styled_print(f"[{self.session_id}]      {S.OK} Portal closed")
 
             # Send CloseComplete
@@ -8325,6 +8431,13 @@ class ClientConnection:
         """
         print(f"[{self.session_id}] 🧹 Cleaning up ({self.query_count} queries executed)")
 
+        # 0. Close open portals so partly fetched queries are logged as complete
+        for name in list(self.portals):
+            try:
+                self._close_portal(name)
+            except Exception as e:
+                styled_print(f"[{self.session_id}]   {S.WARN} Portal cleanup warning: {e}")
+
         # 1. Try to rollback any open transaction to leave DuckDB in clean state
         if self.duckdb_conn:
             try:
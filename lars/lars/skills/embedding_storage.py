@@ -35,14 +35,16 @@ Example:
     ```
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import json
 import logging
+import threading
+import time
 import numpy as np
 
 from ..skill_registry import register_skill
 from ..agent import Agent
-from ..db_adapter import get_db_adapter
+from ..db_adapter import get_db_adapter, vector_literal
 from ..config import get_config
 
 logger = logging.getLogger(__name__)
@@ -204,7 +206,7 @@ def clickhouse_store_embedding(
     """
 
     try:
-        db.client.execute(create_table_sql)
+        db.execute(create_table_sql)
     except Exception as e:
         logger.warning(f"Table creation warning (may already exist): {e}")
 
@@ -240,12 +242,149 @@ def clickhouse_store_embedding(
 # Tool 3: Vector Search in ClickHouse
 # ============================================================================
 
+# HNSW indexes need a fixed dimension, so each embedding size gets its own
+# lars_embeddings_ann_<dim> copy fed by a materialized view. The table comment
+# records whether the backfill finished; until it has, searches stay exact.
+ANN_READY_COMMENT = "lars:ann ready"
+ANN_BUILDING_COMMENT = "lars:ann building"
+ANN_COUNT_RECHECK_SECONDS = 60.0  # How long a below-threshold row count is trusted
+
+_ann_tables: set = set()
+_ann_sources: set = set()
+_ann_unavailable: set = set()
+_ann_builds: Dict[int, threading.Thread] = {}
+_ann_row_counts: Dict[Tuple[str, int], Tuple[float, int]] = {}
+_ann_lock = threading.Lock()
+
+
+def ann_table_name(dim: int) -> str:
+    """Name of the ANN-indexed copy of lars_embeddings for one dimension."""
+    return f"lars_embeddings_ann_{int(dim)}"
+
+
+def ensure_ann_index(dim: int, db=None) -> str:
+    """
+    Create (or finish) the HNSW-indexed table for `dim`-sized embeddings, blocking until it's ready.
+
+    The table mirrors lars_embeddings (rows of other dimensions are skipped),
+    is kept current by a materialized view, and is backfilled from existing
+    rows. Only after the backfill completes is the table marked ready; a table
+    left unmarked by an interrupted build is emptied and backfilled again.
+    Requires ClickHouse 25.8+ (vector_similarity).
+
+    Returns:
+        Name of the ANN table
+    """
+    dim = int(dim)
+    table = ann_table_name(dim)
+    if dim in _ann_tables:
+        return table
+
+    db = db or get_db_adapter()
+    with _ann_lock:
+        if dim in _ann_tables:
+            return table
+
+        existing = db.query(
+            f"SELECT comment FROM system.tables "
+            f"WHERE database = currentDatabase() AND name = '{table}'",
+            output_format="dict",
+        )
+        if not existing or existing[0].get("comment") != ANN_READY_COMMENT:
+            if not existing:
+                db.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        source_table LowCardinality(String),
+                        source_id String,
+                        text String,
+                        embedding Array(Float32),
+                        metadata String DEFAULT '{{}}',
+                        created_at DateTime64(3) DEFAULT now64(3),
+
+                        INDEX ann embedding TYPE vector_similarity('hnsw', 'cosineDistance', {dim}) GRANULARITY 100000000
+                    )
+                    ENGINE = ReplacingMergeTree(created_at)
+                    ORDER BY (source_table, source_id)
+                    COMMENT '{ANN_BUILDING_COMMENT}'
+                """)
+            else:
+                # An earlier build stopped part-way: backfill again from scratch
+                logger.info(f"ANN index table {table} is incomplete, rebuilding")
+                db.execute(f"TRUNCATE TABLE {table}")
+            db.execute(f"""
+                CREATE MATERIALIZED VIEW IF NOT EXISTS {table}_mv TO {table} AS
+                SELECT source_table, source_id, text, embedding, metadata, created_at
+                FROM lars_embeddings
+                WHERE length(embedding) = {dim}
+            """)
+            db.execute(f"""
+                INSERT INTO {table}
+                SELECT source_table, source_id, text, embedding, metadata, created_at
+                FROM lars_embeddings
+                WHERE length(embedding) = {dim}
+                SETTINGS max_execution_time = 0
+            """)
+            db.execute(f"ALTER TABLE {table} MODIFY COMMENT '{ANN_READY_COMMENT}'")
+            logger.info(f"Built ANN index table {table}")
+
+        _ann_tables.add(dim)
+    return table
+
+
+def _build_ann_index_in_background(dim: int, db):
+    """Start ensure_ann_index on a thread (once per dimension); searches stay exact meanwhile."""
+    with _ann_lock:
+        if dim in _ann_builds or dim in _ann_unavailable:
+            return
+
+        def build():
+            try:
+                ensure_ann_index(dim, db)
+            except Exception as e:
+                # Servers without vector_similarity support keep exact search
+                logger.warning(f"ANN index unavailable for dim {dim}, using exact search: {e}")
+                _ann_unavailable.add(dim)
+
+        thread = threading.Thread(target=build, name=f"ann-index-{dim}", daemon=True)
+        _ann_builds[dim] = thread
+    thread.start()
+
+
+def _use_ann_index(db, source_table: str, dim: int) -> bool:
+    """Pick ANN vs exact search per config.vector_index ('auto' goes by row count)."""
+    mode = (get_config().vector_index or "auto").lower()
+    if mode != "auto":
+        return mode == "ann"
+    if dim in _ann_unavailable:
+        return False
+    if (source_table, dim) in _ann_sources:
+        return True
+
+    key = (source_table, dim)
+    checked = _ann_row_counts.get(key)
+    if checked is not None and time.time() - checked[0] < ANN_COUNT_RECHECK_SECONDS:
+        n = checked[1]
+    else:
+        rows = db.query(
+            f"SELECT count() AS n FROM lars_embeddings "
+            f"WHERE source_table = '{source_table}' AND embedding_dim = {int(dim)}",
+            output_format="dict",
+        )
+        n = int(rows[0].get("n", 0)) if rows else 0
+        _ann_row_counts[key] = (time.time(), n)
+    if n >= get_config().vector_ann_min_rows:
+        _ann_sources.add(key)
+        return True
+    return False
+
+
 def clickhouse_vector_search(
     query_embedding: List[float],
     source_table: str,
     limit: int = 10,
     threshold: Optional[float] = None,
-    metadata_filter: Optional[str] = None
+    metadata_filter: Optional[str] = None,
+    index: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Semantic search using ClickHouse cosineDistance function.
@@ -253,10 +392,21 @@ def clickhouse_vector_search(
     Searches the lars_embeddings table for vectors similar to the query.
     Uses ClickHouse's native cosineDistance() function for fast similarity.
 
+    Two search paths:
+        - exact: brute-force ORDER BY cosineDistance over lars_embeddings
+        - ann: the same query against lars_embeddings_ann_<dim>, whose HNSW
+          vector_similarity index answers ORDER BY ... LIMIT k approximately
+
+    With LARS_VECTOR_INDEX=auto (default) the ANN path is used once the
+    source table has LARS_VECTOR_ANN_MIN_ROWS embeddings of the query's
+    dimension, so VECTOR_SEARCH picks it up without any SQL changes. The
+    index is then built in the background and searches stay exact until its
+    backfill has finished.
+
     Performance:
-        - ~50ms for 1M vectors (with proper indexing)
+        - exact: linear in rows (4096 floats read per row)
+        - ann: sublinear; recall tuned by LARS_VECTOR_ANN_EF_SEARCH
         - No Python-side similarity calculation
-        - Native C++ implementation in ClickHouse
 
     Args:
         query_embedding: 4096-dim query vector
@@ -264,6 +414,7 @@ def clickhouse_vector_search(
         limit: Max results to return (default: 10)
         threshold: Min similarity threshold 0-1 (optional, e.g., 0.7)
         metadata_filter: SQL WHERE clause on metadata (optional)
+        index: Force 'ann' or 'exact' (default: config.vector_index)
 
     Returns:
         {
@@ -277,7 +428,8 @@ def clickhouse_vector_search(
                 },
                 ...
             ],
-            "count": int
+            "count": int,
+            "index": str                    # 'ann' or 'exact'
         }
 
     Example:
@@ -294,40 +446,55 @@ def clickhouse_vector_search(
         True
     """
     db = get_db_adapter()
-
-    # Build query vector string for ClickHouse
-    # ClickHouse expects: [0.1, 0.2, 0.3, ...]
-    vec_str = f"[{','.join(str(v) for v in query_embedding)}]"
-
-    # Build WHERE clause
-    where_parts = [f"source_table = '{source_table}'"]
-
-    if threshold is not None:
-        # similarity = 1 - distance
-        # So if we want similarity >= threshold, we need distance <= (1 - threshold)
-        max_distance = 1.0 - threshold
-        where_parts.append(f"cosineDistance(embedding, {vec_str}) <= {max_distance}")
-
-    if metadata_filter:
-        where_parts.append(metadata_filter)
-
-    where_clause = " AND ".join(where_parts)
-
-    # SQL query using ClickHouse's native cosineDistance()
-    sql = f"""
-        SELECT
-            source_id,
-            text,
-            metadata,
-            cosineDistance(embedding, {vec_str}) AS distance,
-            1 - cosineDistance(embedding, {vec_str}) AS similarity
-        FROM lars_embeddings
-        WHERE {where_clause}
-        ORDER BY distance ASC
-        LIMIT {limit}
-    """
+    source_table = source_table.replace("'", "\\'")
+    dim = len(query_embedding)
 
     try:
+        use_ann = index == "ann" if index else _use_ann_index(db, source_table, dim)
+        table = "lars_embeddings"
+        if use_ann and index == "ann":
+            table = ensure_ann_index(dim, db)
+        elif use_ann and dim in _ann_tables:
+            table = ann_table_name(dim)
+        elif use_ann:
+            # Build outside the query path; exact search until the backfill is done
+            _build_ann_index_in_background(dim, db)
+            use_ann = False
+
+        where_parts = [f"source_table = '{source_table}'"]
+        if metadata_filter:
+            where_parts.append(metadata_filter)
+        where_clause = " AND ".join(where_parts)
+
+        # The threshold is applied after ORDER BY ... LIMIT, which is the shape
+        # the ANN index can serve; results are sorted, so this is equivalent to
+        # filtering first.
+        outer_where = ""
+        if threshold is not None:
+            # similarity = 1 - distance
+            # So if we want similarity >= threshold, we need distance <= (1 - threshold)
+            outer_where = f"WHERE distance <= {1.0 - threshold}"
+
+        settings = ""
+        if use_ann:
+            settings = f"SETTINGS hnsw_candidate_list_size_for_search = {get_config().vector_ann_ef_search}"
+
+        # The query vector is sent once and bound to q
+        sql = f"""
+            WITH {vector_literal(query_embedding)} AS q
+            SELECT source_id, text, metadata, distance, 1 - distance AS similarity
+            FROM (
+                SELECT source_id, text, metadata, cosineDistance(embedding, q) AS distance
+                FROM {table}
+                WHERE {where_clause}
+                ORDER BY distance ASC
+                LIMIT {int(limit)}
+            )
+            {outer_where}
+            ORDER BY distance ASC
+            {settings}
+        """
+
         rows = db.query(sql, output_format="dict")
 
         # Parse metadata JSON
@@ -337,11 +504,13 @@ def clickhouse_vector_search(
             except:
                 row['metadata'] = {}
 
-        logger.info(f"Vector search returned {len(rows)} results for {source_table}")
+        index_used = "ann" if use_ann else "exact"
+        logger.info(f"Vector search returned {len(rows)} results for {source_table} ({index_used})")
 
         return {
             "results": rows,
-            "count": len(rows)
+            "count": len(rows),
+            "index": index_used
         }
 
     except Exception as e:
@@ -285,7 +285,7 @@ def _fetch_session_entries(session_id: str) -> list:
 
         # Query using the unified adapter (works with both ClickHouse and DuckDB)
         result = db.query(f"""
-            SELECT * FROM unified_logs
+            SELECT * FROM unified_logs_costed_session(sid = '{session_id}')
             WHERE session_id = '{session_id}'
             ORDER BY timestamp
         """)
@@ -932,26 +932,27 @@ def _get_historical_aggregate_stats(impl_function: str) -> Optional[Dict[str, An
     """
     try:
         from lars.db_adapter import get_db
+        from lars.schema import costed_logs_where
         db = get_db()
 
         # Look for calls where the cell_name or caller_id suggests this aggregate
         # The impl functions are called from within the aggregate framework
-        query = """
+        aggregate_calls = costed_logs_where("""
+            cell_name LIKE %(pattern1)s
+            OR cell_name LIKE %(pattern2)s
+            OR caller_id LIKE %(pattern1)s
+            OR udf_type = 'llm_aggregate'
+        """)
+        query = f"""
             SELECT
                 COUNT(*) as run_count,
                 AVG(cost) as avg_cost,
                 stddevPop(cost) as stddev_cost,
                 AVG(tokens_in + tokens_out) as avg_tokens,
                 AVG(duration_ms) as avg_duration_ms
-            FROM unified_logs
-            WHERE (
-                cell_name LIKE %(pattern1)s
-                OR cell_name LIKE %(pattern2)s
-                OR caller_id LIKE %(pattern1)s
-                OR udf_type = 'llm_aggregate'
-            )
-            AND cost IS NOT NULL
-            AND cost > 0
+            FROM {aggregate_calls}
+            WHERE cost IS NOT NULL
+              AND cost > 0
         """
 
         # Try to match by impl function name patterns
@@ -1069,10 +1070,11 @@ def _get_historical_cascade_stats(cascade_id: str) -> Optional[Dict[str, Any]]:
     """
     try:
         from lars.db_adapter import get_db
+        from lars.schema import costed_logs_where
         db = get_db()
 
         # Query aggregated session-level costs
-        query = """
+        query = f"""
             SELECT
                 COUNT(DISTINCT session_id) as run_count,
                 AVG(session_cost) as avg_cost,
@@ -1085,9 +1087,8 @@ def _get_historical_cascade_stats(cascade_id: str) -> Optional[Dict[str, Any]]:
                     SUM(cost) as session_cost,
                     SUM(tokens_in + tokens_out) as session_tokens,
                     dateDiff('millisecond', MIN(timestamp), MAX(timestamp)) as session_duration_ms
-                FROM unified_logs
-                WHERE cascade_id = %(cascade_id)s
-                  AND cost IS NOT NULL
+                FROM {costed_logs_where("cascade_id = %(cascade_id)s")}
+                WHERE cost IS NOT NULL
                   AND cost > 0
                 GROUP BY session_id
             )
@@ -2,11 +2,11 @@
 Persistent Cache Adapter for Semantic SQL operations.
 
 Provides a two-tier caching system:
-- L1: In-memory dict (fast, volatile)
+- L1: In-memory LRU bounded by entry count and bytes (fast, volatile)
 - L2: ClickHouse table (persistent, queryable)
 
 Features:
-- Write-through: Writes go to both L1 and L2
+- Write-through: Writes go to L1 immediately and to L2 via a batching background writer
 - Read-through: L1 miss -> L2 lookup -> populate L1
 - TTL support with automatic expiration
 - Analytics tracking (hit counts, last access)
@@ -29,17 +29,451 @@ Usage:
     cache.clear()  # Clear all
 """
 
+import atexit
 import json
 import hashlib
+from collections import OrderedDict
 import time
 import threading
 import logging
 from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 
+from ..batch_writer import BatchTableWriter
+
 log = logging.getLogger(__name__)
 
 
+class L1Cache:
+    """
+    In-memory LRU for the L1 tier, bounded by entry count and total bytes.
+
+    All operations are O(1): entries live in an OrderedDict ordered by recency,
+    and each function name keeps its own recency segment so optional
+    per-function limits can evict that function's least recently used entries
+    without scanning the rest of the cache.
+
+    Entry tuple: (result, result_type, created_at, expires_at, function_name, size_bytes)
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        function_limits: Optional[Dict[str, Dict[str, int]]] = None
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._function_limits: Dict[str, Dict[str, int]] = dict(function_limits or {})
+        self._entries: "OrderedDict[str, Tuple[Any, str, float, Optional[float], str, int]]" = OrderedDict()
+        self._segments: Dict[str, "OrderedDict[str, None]"] = {}
+        self._segment_bytes: Dict[str, int] = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejected = 0
+
+    @staticmethod
+    def estimate_size(cache_key: str, result: Any) -> int:
+        """Approximate memory cost of an entry (key + result payload)."""
+        if isinstance(result, (str, bytes)):
+            size = len(result)
+        elif result is None or isinstance(result, (bool, int, float)):
+            size = 8
+        else:
+            try:
+                size = len(json.dumps(result, default=str))
+            except Exception:
+                size = len(str(result))
+        return len(cache_key) + size
+
+    def configure(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        function_limits: Optional[Dict[str, Dict[str, int]]] = None
+    ):
+        """Update global and per-function limits, evicting if now over."""
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            if function_limits is not None:
+                self._function_limits = dict(function_limits)
+            for function_name in list(self._segments):
+                self._enforce_function_limit(function_name)
+            self._enforce_global_limit()
+
+    def set_function_limit(
+        self,
+        function_name: str,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ):
+        """Set (or remove, if both are None) the L1 limits for one function."""
+        with self._lock:
+            if max_entries is None and max_bytes is None:
+                self._function_limits.pop(function_name, None)
+                return
+            limit = {}
+            if max_entries is not None:
+                limit["max_entries"] = max_entries
+            if max_bytes is not None:
+                limit["max_bytes"] = max_bytes
+            self._function_limits[function_name] = limit
+            self._enforce_function_limit(function_name)
+
+    def get(self, cache_key: str, now: Optional[float] = None):
+        """Return the entry and mark it most recently used, or None on miss/expiry."""
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at = entry[3]
+            if expires_at is not None and (now or time.time()) > expires_at:
+                self._remove(cache_key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(cache_key)
+            self._segments[entry[4]].move_to_end(cache_key)
+            self.hits += 1
+            return entry
+
+    def set(
+        self,
+        cache_key: str,
+        function_name: str,
+        result: Any,
+        result_type: str,
+        created_at: float,
+        expires_at: Optional[float]
+    ):
+        """Insert or replace an entry as most recently used, then evict to fit."""
+        size = self.estimate_size(cache_key, result)
+        with self._lock:
+            if cache_key in self._entries:
+                self._remove(cache_key)
+
+            limit = self._function_limits.get(function_name, {})
+            max_bytes = min(self.max_bytes, limit.get("max_bytes", self.max_bytes))
+            if size > max_bytes:
+                # A single oversized result would flush everything else out
+                self.rejected += 1
+                return
+
+            self._entries[cache_key] = (result, result_type, created_at, expires_at, function_name, size)
+            self._segments.setdefault(function_name, OrderedDict())[cache_key] = None
+            self._segment_bytes[function_name] = self._segment_bytes.get(function_name, 0) + size
+            self._total_bytes += size
+
+            self._enforce_function_limit(function_name)
+            self._enforce_global_limit()
+
+    def pop(self, cache_key: str) -> bool:
+        with self._lock:
+            if cache_key not in self._entries:
+                return False
+            self._remove(cache_key)
+            return True
+
+    def remove_where(self, predicate) -> int:
+        """Remove every entry for which predicate(cache_key, entry) is true."""
+        with self._lock:
+            keys = [k for k, entry in self._entries.items() if predicate(k, entry)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._segments.clear()
+            self._segment_bytes.clear()
+            self._total_bytes = 0
+            return count
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, cache_key: str) -> bool:
+        return cache_key in self._entries
+
+    def _remove(self, cache_key: str):
+        entry = self._entries.pop(cache_key)
+        function_name, size = entry[4], entry[5]
+        segment = self._segments.get(function_name)
+        if segment is not None:
+            segment.pop(cache_key, None)
+            if not segment:
+                del self._segments[function_name]
+        remaining = self._segment_bytes.get(function_name, 0) - size
+        if remaining > 0:
+            self._segment_bytes[function_name] = remaining
+        else:
+            self._segment_bytes.pop(function_name, None)
+        self._total_bytes -= size
+
+    def _enforce_function_limit(self, function_name: str):
+        limit = self._function_limits.get(function_name)
+        if not limit:
+            return
+        segment = self._segments.get(function_name)
+        max_entries = limit.get("max_entries")
+        max_bytes = limit.get("max_bytes")
+        while segment and (
+            (max_entries is not None and len(segment) > max_entries)
+            or (max_bytes is not None and self._segment_bytes.get(function_name, 0) > max_bytes)
+        ):
+            oldest = next(iter(segment))
+            self._remove(oldest)
+            self.evictions += 1
+            segment = self._segments.get(function_name)
+
+    def _enforce_global_limit(self):
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_size": self.max_entries,
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "rejected": self.rejected,
+                "by_function": {
+                    name: {
+                        "entries": len(segment),
+                        "bytes": self._segment_bytes.get(name, 0),
+                        **({"limits": self._function_limits[name]} if name in self._function_limits else {}),
+                    }
+                    for name, segment in self._segments.items()
+                },
+            }
+
+
+
+class SemanticCacheWriter(BatchTableWriter):
+    """
+    Single background writer for L2 (ClickHouse) cache writes and hit counts.
+
+    Replaces one thread + one single-row INSERT per write/hit with:
+    - A bounded queue (never blocks the caller; overflow is dropped and counted)
+    - Coalescing: repeated writes to the same key keep the latest, repeated hits
+      are summed into one hit_count increment
+    - Batched inserts, flushed when BATCH_SIZE items are pending or every
+      FLUSH_INTERVAL seconds, and once more at process exit
+    """
+
+    # Batch settings
+    QUEUE_MAX_SIZE = 50000  # Pending writes + hits before new ones are dropped
+    BATCH_SIZE = 500  # Items coalesced into one batch
+    FLUSH_INTERVAL = 1.0  # Flush every N seconds regardless of batch size
+    LOOKUP_CHUNK_SIZE = 1000  # Max keys per IN (...) when re-reading rows for hits
+
+    def __init__(self, get_db):
+        super().__init__(
+            get_db, "semantic_sql_cache", batch_size=self.BATCH_SIZE,
+            flush_interval=self.FLUSH_INTERVAL, queue_max=self.QUEUE_MAX_SIZE,
+            overflow="drop_newest", name="SemanticCacheWriter",
+        )
+        self._hits_applied = 0
+
+        atexit.register(self.shutdown)
+
+    def write(self, row: Dict[str, Any]):
+        """Queue a full semantic_sql_cache row for insertion."""
+        super().write(("set", row))
+
+    def record_hit(self, cache_key: str):
+        """Queue a hit_count increment for a cache key."""
+        super().write(("hit", cache_key))
+
+    def _write_items(self, db, items: List[Tuple[str, Any]]) -> int:
+        sets: Dict[str, Dict[str, Any]] = {}
+        hits: Dict[str, int] = {}
+        for kind, payload in items:
+            if kind == "set":
+                sets[payload["cache_key"]] = payload
+            else:
+                hits[payload] = hits.get(payload, 0) + 1
+        return self._write_batch(db, sets, hits)
+
+    def _write_batch(self, db, sets: Dict[str, Dict[str, Any]], hits: Dict[str, int]) -> int:
+        now = datetime.now()
+        hits_applied = 0
+
+        # Hits on keys written in this same batch fold into the new row
+        for cache_key, row in sets.items():
+            count = hits.pop(cache_key, 0)
+            if count:
+                row["hit_count"] = (row.get("hit_count") or 0) + count
+                row["last_hit_at"] = now
+                hits_applied += count
+
+        # ReplacingMergeTree doesn't allow UPDATE on version column (last_hit_at).
+        # Re-read the current rows once and re-insert them with incremented counts.
+        hit_rows = []
+        hit_keys = list(hits.keys())
+        query = """
+            SELECT
+                cache_key, function_name, args_json, args_preview,
+                result, result_type, created_at, expires_at, ttl_seconds,
+                hit_count, result_bytes, first_session_id, first_caller_id
+            FROM semantic_sql_cache
+            WHERE cache_key IN %(cache_keys)s
+            ORDER BY last_hit_at DESC
+            LIMIT 1 BY cache_key
+        """
+        columns = [
+            "cache_key", "function_name", "args_json", "args_preview",
+            "result", "result_type", "created_at", "expires_at", "ttl_seconds",
+            "hit_count", "result_bytes", "first_session_id", "first_caller_id",
+        ]
+        for start in range(0, len(hit_keys), self.LOOKUP_CHUNK_SIZE):
+            chunk = tuple(hit_keys[start:start + self.LOOKUP_CHUNK_SIZE])
+            rows = db.query(query, {"cache_keys": chunk})
+            for row in rows or []:
+                # Handle both dict and tuple formats
+                if not isinstance(row, dict):
+                    row = dict(zip(columns, row))
+                new_row = {col: row.get(col) for col in columns}
+                count = hits.get(new_row["cache_key"], 0)
+                new_row["hit_count"] = (new_row.get("hit_count") or 0) + count
+                new_row["last_hit_at"] = now
+                hit_rows.append(new_row)
+                hits_applied += count
+
+        rows_to_insert = list(sets.values()) + hit_rows
+        if rows_to_insert:
+            db.insert_rows("semantic_sql_cache", rows_to_insert)
+
+        with self._stats_lock:
+            self._hits_applied += hits_applied
+        log.debug(
+            f"[SemanticCacheWriter] Flushed {len(sets)} writes, "
+            f"{len(hit_rows)} hit updates in one batch"
+        )
+        return len(rows_to_insert)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and write counters."""
+        stats = super().get_stats()
+        with self._stats_lock:
+            stats["hits_applied"] = self._hits_applied
+        return stats
+
+
+class InFlight:
+    """
+    One caller's handle on a single-flight key.
+
+    The leader computes and writes the cache; followers wait() and then re-read
+    the cache instead of paying for the same LLM call. The leader must call
+    release() when done (a cache write for the key also releases waiters).
+    """
+
+    def __init__(self, registry: "InFlightRegistry", key: str, event: threading.Event, is_leader: bool):
+        self._registry = registry
+        self.key = key
+        self._event = event
+        self.is_leader = is_leader
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the leader finishes. Returns False on timeout."""
+        if self.is_leader:
+            return True
+        done = self._event.wait(timeout if timeout is not None else self._registry.WAIT_TIMEOUT)
+        self._registry._record_wait(done)
+        return done
+
+    def release(self):
+        """Finish this flight (leader only; idempotent)."""
+        if self.is_leader:
+            self._registry.complete(self.key, event=self._event)
+
+
+class InFlightRegistry:
+    """
+    Process-wide single-flight registry keyed by semantic cache key.
+
+    When several callers (pgwire connections, the prewarm sidecar, parallel UDF
+    workers) miss the cache on the same key at the same time, only the first
+    becomes the leader; the rest wait for it and are served from the cache.
+    """
+
+    WAIT_TIMEOUT = 300.0  # Max seconds a follower waits before computing itself
+
+    def __init__(self):
+        self._flights: Dict[str, Tuple[threading.Event, int]] = {}
+        self._lock = threading.Lock()
+
+        self.leaders = 0
+        self.coalesced = 0
+        self.timeouts = 0
+
+    def join(self, key: str) -> InFlight:
+        """Become the leader for key, or a follower of the in-flight leader."""
+        thread_id = threading.get_ident()
+        with self._lock:
+            existing = self._flights.get(key)
+            if existing is not None:
+                event, owner = existing
+                if owner != thread_id:
+                    return InFlight(self, key, event, is_leader=False)
+                # Re-entrant call from the leader's own thread: don't wait on ourselves.
+                # The private event never matches the registered flight, so
+                # release() on this handle is a no-op.
+                return InFlight(self, key, threading.Event(), is_leader=True)
+            event = threading.Event()
+            self._flights[key] = (event, thread_id)
+            self.leaders += 1
+            return InFlight(self, key, event, is_leader=True)
+
+    def complete(self, key: str, event: Optional[threading.Event] = None):
+        """Release waiters on key (if event is given, only if it's still that flight)."""
+        with self._lock:
+            existing = self._flights.get(key)
+            if existing is None or (event is not None and existing[0] is not event):
+                return
+            del self._flights[key]
+        existing[0].set()
+
+    def _record_wait(self, done: bool):
+        with self._lock:
+            if done:
+                self.coalesced += 1
+            else:
+                self.timeouts += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "in_flight": len(self._flights),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "timeouts": self.timeouts,
+            }
+
+
 class SemanticCache:
     """
     Two-tier cache for semantic SQL operations.
@@ -51,26 +485,71 @@ class SemanticCache:
     _instance = None
     _lock = threading.Lock()
 
-    # L1 cache: Dict[cache_key, (result, result_type, created_at, expires_at)]
-    _l1_cache: Dict[str, Tuple[Any, str, float, Optional[float]]] = {}
-    _l1_lock = threading.Lock()
+    # Configuration
+    DEFAULT_TTL_SECONDS = 0  # 0 = infinite (no expiration)
+    L1_MAX_SIZE = 10000  # Max entries in L1 before LRU eviction
+    L1_MAX_BYTES = 256 * 1024 * 1024  # Max total result bytes in L1 before LRU eviction
+    L2_BATCH_CHUNK_SIZE = 1000  # Max keys per IN (...) lookup in get_batch
+
+    # L1 cache: LRU of cache_key -> (result, result_type, created_at, expires_at, function_name, size)
+    _l1_cache: L1Cache = L1Cache(L1_MAX_SIZE, L1_MAX_BYTES)
+    _l1_configured = False
 
     # ClickHouse connection (lazy initialized)
     _db = None
     _db_initialized = False
     _table_ensured = False
 
-    # Configuration
-    DEFAULT_TTL_SECONDS = 0  # 0 = infinite (no expiration)
-    L1_MAX_SIZE = 10000  # Max entries in L1 before eviction
+    # Background L2 writer (lazily initialized)
+    _writer: Optional[SemanticCacheWriter] = None
+
+    # Concurrent misses on the same key wait on one computation
+    _inflight: InFlightRegistry = InFlightRegistry()
 
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
             with cls._lock:
                 if cls._instance is None:
                     cls._instance = super().__new__(cls)
+                    cls._configure_l1()
         return cls._instance
 
+    @classmethod
+    def _configure_l1(cls):
+        """Apply L1 limits from config (once per process)."""
+        if cls._l1_configured:
+            return
+        cls._l1_configured = True
+        try:
+            from ..config import get_config
+            config = get_config()
+            cls._l1_cache.configure(
+                max_entries=config.semantic_cache_l1_max_entries,
+                max_bytes=config.semantic_cache_l1_max_bytes,
+                function_limits=config.semantic_cache_l1_function_limits,
+            )
+        except Exception as e:
+            log.debug(f"[SemanticCache] Using default L1 limits: {e}")
+
+    def configure_l1(
+        self,
+        function_name: Optional[str] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ):
+        """
+        Adjust L1 limits at runtime.
+
+        Args:
+            function_name: If provided, set limits for this function only
+            max_entries: Max entries (globally or for function_name)
+            max_bytes: Max total result bytes (globally or for function_name)
+        """
+        if function_name:
+            self._l1_cache.set_function_limit(function_name, max_entries, max_bytes)
+        else:
+            self._l1_cache.configure(max_entries=max_entries, max_bytes=max_bytes)
+
     @classmethod
     def get_instance(cls) -> "SemanticCache":
         """Get the singleton cache instance."""
@@ -92,6 +571,19 @@ class SemanticCache:
                 self._db_initialized = True  # Don't retry
         return self._db
 
+    def _get_writer(self) -> SemanticCacheWriter:
+        """Lazily create the background L2 writer."""
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = SemanticCacheWriter(self._get_db)
+        return self._writer
+
+    def flush(self):
+        """Write all queued L2 writes and hit counts now (blocking)."""
+        if self._writer is not None:
+            self._writer.flush()
+
     def _ensure_table(self):
         """Ensure the cache table exists in ClickHouse."""
         if self._table_ensured or not self._db:
@@ -143,18 +635,13 @@ class SemanticCache:
         """
         cache_key = self.make_cache_key(function_name, args)
 
-        # Try L1 first
+        # Try L1 first (expired entries are dropped and reported as misses)
         l1_result = self._get_l1(cache_key)
         if l1_result is not None:
             result, result_type, created_at, expires_at = l1_result
-
-            # Check expiration
-            if expires_at is not None and time.time() > expires_at:
-                self._evict_l1(cache_key)
-            else:
-                if track_hit:
-                    self._record_hit_async(cache_key)
-                return True, result, result_type
+            if track_hit:
+                self._record_hit_async(cache_key)
+            return True, result, result_type
 
         # Try L2
         l2_result = self._get_l2(cache_key)
@@ -167,7 +654,7 @@ class SemanticCache:
                 return False, None, ""
 
             # Populate L1
-            self._set_l1(cache_key, result, result_type, created_at, expires_at)
+            self._set_l1(cache_key, result, result_type, created_at, expires_at, function_name)
 
             if track_hit:
                 self._record_hit_async(cache_key)
@@ -176,6 +663,22 @@ class SemanticCache:
 
         return False, None, ""
 
+    def begin_flight(self, function_name: str, args: Dict[str, Any]) -> InFlight:
+        """
+        Join the single-flight group for a cache miss on (function_name, args).
+
+        Usage on a cache miss:
+            flight = cache.begin_flight(name, args)
+            if not flight.is_leader:
+                flight.wait()
+                found, result, _ = cache.get(name, args)  # served by the leader
+            ...
+            flight.release()  # leader, in a finally block
+
+        A set() for the same key also releases followers.
+        """
+        return self._inflight.join(self.make_cache_key(function_name, args))
+
     def get_batch(
         self,
         function_name: str,
@@ -185,19 +688,56 @@ class SemanticCache:
         """
         Get multiple cached results at once for batch operations.
 
+        L1 is checked per key; all L1 misses are then resolved against L2 with
+        chunked ``WHERE cache_key IN (...)`` queries instead of one round trip
+        per row.
+
         Args:
             function_name: The semantic SQL function name
             args_list: List of argument dictionaries
             track_hit: Whether to increment hit counter (default True)
 
         Returns:
-            Dict mapping cache keys to (found, result, result_type) tuples
+            Dict mapping cache keys to (found, result, result_type) tuples.
+            Every key derived from args_list is present (misses have found=False).
         """
-        results = {}
+        results: Dict[str, Tuple[bool, Any, str]] = {}
+        l1_misses: List[str] = []
+        now = time.time()
+
         for args in args_list:
             cache_key = self.make_cache_key(function_name, args)
-            found, result, result_type = self.get(function_name, args, track_hit=track_hit)
-            results[cache_key] = (found, result, result_type)
+            if cache_key in results:
+                continue
+
+            l1_result = self._get_l1(cache_key, now)
+            if l1_result is not None:
+                result, result_type, created_at, expires_at = l1_result
+                results[cache_key] = (True, result, result_type)
+                if track_hit:
+                    self._record_hit_async(cache_key)
+                continue
+
+            results[cache_key] = (False, None, "")
+            l1_misses.append(cache_key)
+
+        if not l1_misses:
+            return results
+
+        l2_results = self._get_l2_batch(l1_misses)
+        for cache_key, l2_result in l2_results.items():
+            result, result_type, created_at, expires_at, ttl_seconds = l2_result
+
+            # Expired in L2, will be cleaned up by TTL
+            if expires_at is not None and now > expires_at:
+                continue
+
+            self._set_l1(cache_key, result, result_type, created_at, expires_at, function_name)
+            results[cache_key] = (True, result, result_type)
+
+            if track_hit:
+                self._record_hit_async(cache_key)
+
         return results
 
     def set_batch(
@@ -266,7 +806,10 @@ class SemanticCache:
             expires_at = created_at + ttl_seconds
 
         # Set L1
-        self._set_l1(cache_key, result, result_type, created_at, expires_at)
+        self._set_l1(cache_key, result, result_type, created_at, expires_at, function_name)
+
+        # Wake any callers coalesced onto this key
+        self._inflight.complete(cache_key)
 
         # Set L2 (async, fire-and-forget)
         self._set_l2_async(
@@ -284,10 +827,16 @@ class SemanticCache:
 
         return cache_key
 
-    def _get_l1(self, cache_key: str) -> Optional[Tuple[Any, str, float, Optional[float]]]:
-        """Get from L1 cache."""
-        with self._l1_lock:
-            return self._l1_cache.get(cache_key)
+    def _get_l1(
+        self,
+        cache_key: str,
+        now: Optional[float] = None
+    ) -> Optional[Tuple[Any, str, float, Optional[float]]]:
+        """Get from L1 cache (marks the entry most recently used)."""
+        entry = self._l1_cache.get(cache_key, now)
+        if entry is None:
+            return None
+        return entry[:4]
 
     def _set_l1(
         self,
@@ -295,25 +844,15 @@ class SemanticCache:
         result: Any,
         result_type: str,
         created_at: float,
-        expires_at: Optional[float]
+        expires_at: Optional[float],
+        function_name: str = ""
     ):
-        """Set in L1 cache with LRU-style eviction."""
-        with self._l1_lock:
-            # Simple size-based eviction if needed
-            if len(self._l1_cache) >= self.L1_MAX_SIZE and cache_key not in self._l1_cache:
-                # Evict oldest 10%
-                items = list(self._l1_cache.items())
-                items.sort(key=lambda x: x[1][2])  # Sort by created_at
-                evict_count = self.L1_MAX_SIZE // 10
-                for key, _ in items[:evict_count]:
-                    del self._l1_cache[key]
-
-            self._l1_cache[cache_key] = (result, result_type, created_at, expires_at)
+        """Set in L1 cache (O(1) LRU eviction by entry count and bytes)."""
+        self._l1_cache.set(cache_key, function_name, result, result_type, created_at, expires_at)
 
     def _evict_l1(self, cache_key: str):
         """Remove from L1 cache."""
-        with self._l1_lock:
-            self._l1_cache.pop(cache_key, None)
+        self._l1_cache.pop(cache_key)
 
     def _get_l2(self, cache_key: str) -> Optional[Tuple[Any, str, float, Optional[float], int]]:
         """Get from L2 (ClickHouse) cache."""
@@ -331,34 +870,7 @@ class SemanticCache:
             rows = db.query(query, {"cache_key": cache_key})
 
             if rows and len(rows) > 0:
-                row = rows[0]
-                # Handle both dict and tuple formats from ClickHouse driver
-                if isinstance(row, dict):
-                    result = row.get("result")
-                    result_type = row.get("result_type")
-                    created_at_raw = row.get("created_at")
-                    expires_at_raw = row.get("expires_at")
-                    ttl_seconds = row.get("ttl_seconds", 0)
-                else:
-                    result = row[0]
-                    result_type = row[1]
-                    created_at_raw = row[2]
-                    expires_at_raw = row[3]
-                    ttl_seconds = row[4]
-
-                created_at = created_at_raw.timestamp() if hasattr(created_at_raw, 'timestamp') else float(created_at_raw)
-
-                # Handle far-future "never expires" sentinel
-                if self._is_far_future(expires_at_raw):
-                    expires_at = None
-                elif expires_at_raw and hasattr(expires_at_raw, 'timestamp'):
-                    expires_at = expires_at_raw.timestamp()
-                elif expires_at_raw:
-                    expires_at = float(expires_at_raw)
-                else:
-                    expires_at = None
-
-                return (result, result_type, created_at, expires_at, ttl_seconds)
+                return self._parse_l2_row(rows[0])
 
             return None
 
@@ -366,6 +878,86 @@ class SemanticCache:
             log.debug(f"[SemanticCache] L2 get error: {e}")
             return None
 
+    def _get_l2_batch(
+        self,
+        cache_keys: List[str]
+    ) -> Dict[str, Tuple[Any, str, float, Optional[float], int]]:
+        """
+        Get many keys from L2 (ClickHouse) in as few round trips as possible.
+
+        Keys are looked up in chunks of L2_BATCH_CHUNK_SIZE using IN (...).
+        Keys not present in L2 are simply absent from the returned dict.
+        """
+        db = self._get_db()
+        if not db or not cache_keys:
+            return {}
+
+        found: Dict[str, Tuple[Any, str, float, Optional[float], int]] = {}
+        query = """
+            SELECT cache_key, result, result_type, created_at, expires_at, ttl_seconds
+            FROM semantic_sql_cache
+            WHERE cache_key IN %(cache_keys)s
+            LIMIT 1 BY cache_key
+        """
+
+        for start in range(0, len(cache_keys), self.L2_BATCH_CHUNK_SIZE):
+            chunk = tuple(cache_keys[start:start + self.L2_BATCH_CHUNK_SIZE])
+            try:
+                rows = db.query(query, {"cache_keys": chunk})
+            except Exception as e:
+                log.debug(f"[SemanticCache] L2 batch get error: {e}")
+                continue
+
+            for row in rows or []:
+                if isinstance(row, dict):
+                    cache_key = row.get("cache_key")
+                    values = (
+                        row.get("result"),
+                        row.get("result_type"),
+                        row.get("created_at"),
+                        row.get("expires_at"),
+                        row.get("ttl_seconds", 0),
+                    )
+                else:
+                    cache_key = row[0]
+                    values = tuple(row[1:6])
+                try:
+                    found[cache_key] = self._parse_l2_row(values)
+                except Exception as e:
+                    log.debug(f"[SemanticCache] L2 batch row error: {e}")
+
+        return found
+
+    def _parse_l2_row(self, row) -> Tuple[Any, str, float, Optional[float], int]:
+        """Normalize an L2 row (dict or tuple) to (result, result_type, created_at, expires_at, ttl_seconds)."""
+        # Handle both dict and tuple formats from ClickHouse driver
+        if isinstance(row, dict):
+            result = row.get("result")
+            result_type = row.get("result_type")
+            created_at_raw = row.get("created_at")
+            expires_at_raw = row.get("expires_at")
+            ttl_seconds = row.get("ttl_seconds", 0)
+        else:
+            result = row[0]
+            result_type = row[1]
+            created_at_raw = row[2]
+            expires_at_raw = row[3]
+            ttl_seconds = row[4]
+
+        created_at = created_at_raw.timestamp() if hasattr(created_at_raw, 'timestamp') else float(created_at_raw)
+
+        # Handle far-future "never expires" sentinel
+        if self._is_far_future(expires_at_raw):
+            expires_at = None
+        elif expires_at_raw and hasattr(expires_at_raw, 'timestamp'):
+            expires_at = expires_at_raw.timestamp()
+        elif expires_at_raw:
+            expires_at = float(expires_at_raw)
+        else:
+            expires_at = None
+
+        return (result, result_type, created_at, expires_at, ttl_seconds)
+
     # Far future date for "never expires" (year 2100)
     FAR_FUTURE = datetime(2100, 1, 1)
 
@@ -382,124 +974,52 @@ class SemanticCache:
         session_id: str,
         caller_id: str
     ):
-        """Set in L2 (ClickHouse) cache asynchronously."""
-        # Run in thread to not block
-        def _write():
-            db = self._get_db()
-            if not db:
-                return
-
-            try:
-                args_json = json.dumps(args, sort_keys=True, default=str)
-                args_preview = args_json[:200]
-                result_str = json.dumps(result, default=str) if not isinstance(result, str) else result
-                result_bytes = len(result_str.encode('utf-8'))
-
-                # Convert timestamps to datetime
-                created_dt = datetime.fromtimestamp(created_at)
-                # Use far future date for "never expires" (TTL requires non-nullable DateTime)
-                expires_dt = datetime.fromtimestamp(expires_at) if expires_at else self.FAR_FUTURE
-
-                # Use INSERT with ON DUPLICATE KEY UPDATE semantics via ReplacingMergeTree
-                # ClickHouse will handle deduplication
-                row = {
-                    "cache_key": cache_key,
-                    "function_name": function_name,
-                    "args_json": args_json,
-                    "args_preview": args_preview,
-                    "result": result_str,
-                    "result_type": result_type,
-                    "created_at": created_dt,
-                    "expires_at": expires_dt,
-                    "ttl_seconds": ttl_seconds,
-                    "hit_count": 1,
-                    "last_hit_at": created_dt,
-                    "result_bytes": result_bytes,
-                    "first_session_id": session_id,
-                    "first_caller_id": caller_id,
-                }
-
-                db.insert_rows("semantic_sql_cache", [row])
-                log.debug(f"[SemanticCache] L2 set: {function_name} -> {cache_key[:8]}...")
+        """Queue an L2 (ClickHouse) cache write for the background writer."""
+        try:
+            args_json = json.dumps(args, sort_keys=True, default=str)
+            args_preview = args_json[:200]
+            result_str = json.dumps(result, default=str) if not isinstance(result, str) else result
+            result_bytes = len(result_str.encode('utf-8'))
+
+            # Convert timestamps to datetime
+            created_dt = datetime.fromtimestamp(created_at)
+            # Use far future date for "never expires" (TTL requires non-nullable DateTime)
+            expires_dt = datetime.fromtimestamp(expires_at) if expires_at else self.FAR_FUTURE
+
+            # Use INSERT with ON DUPLICATE KEY UPDATE semantics via ReplacingMergeTree
+            # ClickHouse will handle deduplication
+            row = {
+                "cache_key": cache_key,
+                "function_name": function_name,
+                "args_json": args_json,
+                "args_preview": args_preview,
+                "result": result_str,
+                "result_type": result_type,
+                "created_at": created_dt,
+                "expires_at": expires_dt,
+                "ttl_seconds": ttl_seconds,
+                "hit_count": 1,
+                "last_hit_at": created_dt,
+                "result_bytes": result_bytes,
+                "first_session_id": session_id,
+                "first_caller_id": caller_id,
+            }
 
-            except Exception as e:
-                log.debug(f"[SemanticCache] L2 set error: {e}")
+            self._get_writer().write(row)
+            log.debug(f"[SemanticCache] L2 set queued: {function_name} -> {cache_key[:8]}...")
 
-        # Fire and forget
-        threading.Thread(target=_write, daemon=True).start()
+        except Exception as e:
+            log.debug(f"[SemanticCache] L2 set error: {e}")
 
     def _record_hit_async(self, cache_key: str):
         """
         Record a cache hit in L2 asynchronously.
 
-        Uses INSERT to add a new row with incremented hit_count.
+        Hits are coalesced by the background writer, which re-inserts each hit
+        row once per batch with hit_count incremented by the number of hits.
         ReplacingMergeTree will dedupe by cache_key, keeping the row with latest last_hit_at.
         """
-        def _update():
-            db = self._get_db()
-            if not db:
-                return
-
-            try:
-                # ReplacingMergeTree doesn't allow UPDATE on version column (last_hit_at)
-                # Instead, we fetch the current row and re-insert with updated values
-                # This is eventually consistent - the ReplacingMergeTree will dedupe
-
-                query = """
-                    SELECT
-                        cache_key, function_name, args_json, args_preview,
-                        result, result_type, created_at, expires_at, ttl_seconds,
-                        hit_count, result_bytes, first_session_id, first_caller_id
-                    FROM semantic_sql_cache
-                    WHERE cache_key = %(cache_key)s
-                    LIMIT 1
-                """
-                rows = db.query(query, {"cache_key": cache_key})
-
-                if rows and len(rows) > 0:
-                    row = rows[0]
-                    # Handle both dict and tuple formats
-                    if isinstance(row, dict):
-                        new_row = {
-                            "cache_key": row.get("cache_key"),
-                            "function_name": row.get("function_name"),
-                            "args_json": row.get("args_json"),
-                            "args_preview": row.get("args_preview"),
-                            "result": row.get("result"),
-                            "result_type": row.get("result_type"),
-                            "created_at": row.get("created_at"),
-                            "expires_at": row.get("expires_at"),
-                            "ttl_seconds": row.get("ttl_seconds"),
-                            "hit_count": (row.get("hit_count") or 0) + 1,  # Increment
-                            "last_hit_at": datetime.now(),  # Update
-                            "result_bytes": row.get("result_bytes"),
-                            "first_session_id": row.get("first_session_id"),
-                            "first_caller_id": row.get("first_caller_id"),
-                        }
-                    else:
-                        new_row = {
-                            "cache_key": row[0],
-                            "function_name": row[1],
-                            "args_json": row[2],
-                            "args_preview": row[3],
-                            "result": row[4],
-                            "result_type": row[5],
-                            "created_at": row[6],
-                            "expires_at": row[7],
-                            "ttl_seconds": row[8],
-                            "hit_count": row[9] + 1,  # Increment
-                            "last_hit_at": datetime.now(),  # Update
-                            "result_bytes": row[10],
-                            "first_session_id": row[11],
-                            "first_caller_id": row[12],
-                        }
-                    db.insert_rows("semantic_sql_cache", [new_row])
-
-            except Exception as e:
-                log.debug(f"[SemanticCache] Hit record error: {e}")
-
-        # Fire and forget
-        threading.Thread(target=_update, daemon=True).start()
+        self._get_writer().record_hit(cache_key)
 
     def clear(
         self,
@@ -521,40 +1041,29 @@ class SemanticCache:
         cleared_count = 0
 
         # Clear L1
-        with self._l1_lock:
-            if cache_key:
-                if cache_key in self._l1_cache:
-                    del self._l1_cache[cache_key]
-                    cleared_count += 1
-            elif function_name or older_than_days:
-                # Need to iterate and filter
-                keys_to_delete = []
-                cutoff_time = time.time() - (older_than_days * 86400) if older_than_days else None
-
-                for key, (result, result_type, created_at, expires_at) in self._l1_cache.items():
-                    should_delete = True
-
-                    if older_than_days and created_at > cutoff_time:
-                        should_delete = False
-
-                    # Note: L1 doesn't store function_name, so we can't filter by it in L1
-                    # This is a limitation - L1 will be fully cleared if function_name is specified
-
-                    if should_delete:
-                        keys_to_delete.append(key)
-
-                for key in keys_to_delete:
-                    del self._l1_cache[key]
-                cleared_count += len(keys_to_delete)
-            else:
-                # Clear all
-                cleared_count = len(self._l1_cache)
-                self._l1_cache.clear()
-
-        # Clear L2
+        if cache_key:
+            if self._l1_cache.pop(cache_key):
+                cleared_count += 1
+        elif function_name or older_than_days:
+            cutoff_time = time.time() - (older_than_days * 86400) if older_than_days else None
+
+            def should_delete(key, entry):
+                if function_name and entry[4] != function_name:
+                    return False
+                if older_than_days and entry[2] > cutoff_time:
+                    return False
+                return True
+
+            cleared_count += self._l1_cache.remove_where(should_delete)
+        else:
+            # Clear all
+            cleared_count = self._l1_cache.clear()
+
+        # Clear L2 (land queued writes first so they can't resurrect cleared rows)
         db = self._get_db()
         if db:
             try:
+                self.flush()
                 conditions = []
                 params = {}
 
@@ -591,10 +1100,9 @@ class SemanticCache:
             Dictionary with cache statistics
         """
         stats = {
-            "l1": {
-                "entries": len(self._l1_cache),
-                "max_size": self.L1_MAX_SIZE,
-            },
+            "l1": self._l1_cache.get_stats(),
+            "writer": self._get_writer().get_stats(),
+            "inflight": self._inflight.get_stats(),
             "l2": {
                 "available": False,
                 "entries": 0,
@@ -853,19 +1361,12 @@ class SemanticCache:
         Returns:
             Number of L1 entries pruned
         """
-        pruned = 0
         now = time.time()
 
         # Prune L1
-        with self._l1_lock:
-            keys_to_delete = []
-            for key, (result, result_type, created_at, expires_at) in self._l1_cache.items():
-                if expires_at is not None and now > expires_at:
-                    keys_to_delete.append(key)
-
-            for key in keys_to_delete:
-                del self._l1_cache[key]
-            pruned = len(keys_to_delete)
+        pruned = self._l1_cache.remove_where(
+            lambda key, entry: entry[3] is not None and now > entry[3]
+        )
 
         # L2 pruning happens automatically via TTL, but we can trigger OPTIMIZE
         db = self._get_db()
@@ -2034,8 +2034,11 @@ def _map_reduce_summarize(
             max_tokens=200
         )
 
+    # Caller context carried into workers (SQL Trail attribution, bulk LLM priority)
+    from ..caller_context import capture_caller_context, submit_with_caller_context
+    caller_ctx = capture_caller_context()
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = [executor.submit(summarize_chunk, chunk) for chunk in chunks]
+        futures = [submit_with_caller_context(executor, summarize_chunk, chunk, ctx=caller_ctx) for chunk in chunks]
         for future in as_completed(futures):
             try:
                 partial_summaries.append(future.result())
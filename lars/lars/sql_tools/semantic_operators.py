@@ -127,6 +127,7 @@ class SemanticAnnotation:
     line_start: int = 0                   # Line number where annotation starts
     line_end: int = 0                     # Line number where annotation ends
     takes: Optional[Dict[str, Any]] = None  # Takes config for cascade-level sampling
+    pack: Optional[int] = None            # Rows per packed prompt for scalar operators
 
 
 def _parse_annotations(query: str) -> List[Tuple[int, int, SemanticAnnotation]]:
@@ -140,6 +141,7 @@ def _parse_annotations(query: str) -> List[Tuple[int, int, SemanticAnnotation]]:
         -- @ More prompt text (consecutive lines merge)
         -- @ model: anthropic/claude-haiku
         -- @ threshold: 0.7
+        -- @ pack: 25
     """
     annotations = []
     lines = query.split('\n')
@@ -198,6 +200,11 @@ def _parse_annotations(query: str) -> List[Tuple[int, int, SemanticAnnotation]]:
                         current_annotation.batch_size = int(value)
                     except ValueError:
                         pass
+                elif key == 'pack':
+                    try:
+                        current_annotation.pack = int(value)
+                    except ValueError:
+                        pass
                 elif key == 'parallel_scope':
                     if value.lower() in ('query', 'operator'):
                         current_annotation.parallel_scope = value.lower()
@@ -1018,6 +1025,9 @@ def _rewrite_line(line: str, annotation: Optional[SemanticAnnotation]) -> str:
         takes_prefix = f"__LARS_TAKES:{json.dumps(annotation.takes)}__"
         annotation_prefix = takes_prefix + annotation_prefix
         print(f"[semantic_operators] 💉 Injecting takes prefix for line-level rewrite: {takes_prefix}")
+    # Multi-row prompt packing hint (stripped by the executor)
+    if annotation and annotation.pack:
+        annotation_prefix = f"__LARS_PACK:{annotation.pack}__ " + annotation_prefix
 
     # Get threshold from annotation or use default
     default_threshold = 0.5
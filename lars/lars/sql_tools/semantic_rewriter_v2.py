@@ -315,7 +315,8 @@ def _parse_annotation(comment_text: str) -> Optional[_Annotation]:
     """
     Parse a single `-- @ ...` comment line.
 
-    v0: support a prompt prefix (free-form, prompt:, model:) and a threshold override.
+    v0: support a prompt prefix (free-form, prompt:, model:), a threshold override and
+    a pack size (carried in the prompt prefix as __LARS_PACK:N__).
 
     Non-prompt keys like parallel/batch_size are intentionally ignored here so they can
     be handled by the legacy rewriter (e.g. UNION ALL splitting).
@@ -338,6 +339,14 @@ def _parse_annotation(comment_text: str) -> Optional[_Annotation]:
         if key in ("parallel", "batch_size", "parallel_scope"):
             return _Annotation(prompt_prefix="")
 
+        # Multi-row prompt packing rides along with the prompt prefix; the
+        # executor strips it wherever it lands in the string.
+        if key == "pack":
+            try:
+                return _Annotation(prompt_prefix=f"__LARS_PACK:{int(value)}__ ")
+            except ValueError:
+                return _Annotation(prompt_prefix="")
+
         if key == "threshold":
             try:
                 return _Annotation(prompt_prefix="", threshold=float(value))
@@ -21,7 +21,7 @@ The UDF:
 
 import hashlib
 import json
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, List, Tuple
 import duckdb
 
 from ..console_style import S, styled_print
@@ -404,6 +404,127 @@ def lars_udf_impl(
         return f"ERROR: {str(e)[:50]}"
 
 
+def _split_source_context(inputs: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str], Optional[int], Optional[str]]:
+    """Split the _lars_source_* lineage keys off cascade inputs: (cleaned_inputs, column, row_index, table)."""
+    source_column = None
+    source_row_index = None
+    source_table = None
+    cleaned_inputs = {}
+
+    for key, value in inputs.items():
+        if key == '_lars_source_column':
+            source_column = str(value) if value is not None else None
+        elif key == '_lars_source_row':
+            try:
+                source_row_index = int(value) if value is not None else None
+            except (ValueError, TypeError):
+                pass
+        elif key == '_lars_source_table':
+            source_table = str(value) if value is not None else None
+        else:
+            cleaned_inputs[key] = value
+
+    return cleaned_inputs, source_column, source_row_index, source_table
+
+
+def _resolve_cascade_file(cascade_path: str) -> Optional[str]:
+    """Absolute path of a cascade file (relative to cwd, extension optional), or None if missing."""
+    import os
+
+    resolved_path = cascade_path
+    if not os.path.isabs(cascade_path):
+        resolved_path = os.path.join(os.getcwd(), cascade_path)
+
+    if not os.path.exists(resolved_path):
+        for ext in [".yaml", ".yml", ".json"]:
+            if os.path.exists(resolved_path + ext):
+                resolved_path = resolved_path + ext
+                break
+
+    return resolved_path if os.path.exists(resolved_path) else None
+
+
+def _cascade_udf_json_result(result: Dict[str, Any], session_id: str) -> str:
+    """Serialize a cascade result for SQL: per-cell outputs, state and status."""
+    outputs = {}
+    for cell_item in result.get("lineage", []):
+        cell_name = cell_item.get("cell")
+        cell_output = cell_item.get("output")
+        if cell_name:
+            outputs[cell_name] = cell_output
+
+    return json.dumps({
+        "outputs": outputs,
+        "state": result.get("state", {}),
+        "status": result.get("status", "unknown"),
+        "session_id": session_id,
+        "has_errors": result.get("has_errors", False)
+    })
+
+
+def _cascade_udf_batch(
+    cascade_path: str,
+    rows: List[Dict[str, Any]],
+    max_workers: Optional[int] = None,
+) -> List[Optional[str]]:
+    """
+    lars_cascade_udf_impl() for many rows of a row-mode cascade at once.
+
+    Uncached rows run as coroutines on the shared async LLM loop (see
+    run_row_mode_batch), at most max_workers at a time. Returns the JSON result per row, or None for rows
+    lars_cascade_udf_impl() should handle: cache hits, rows needing the full
+    runner, and every row when the cascade isn't row-mode eligible or
+    LARS_LLM_ASYNC is off.
+    """
+    from ..config import get_config
+
+    results: List[Optional[str]] = [None] * len(rows)
+    if not rows or not get_config().llm_async:
+        return results
+    resolved_path = _resolve_cascade_file(cascade_path)
+    if resolved_path is None:
+        return results
+
+    from ..caller_context import get_caller_context
+    from ..semantic_sql.executor import _with_source_metadata, run_row_mode_batch
+    from ..session_naming import generate_woodland_id
+    from ..sql_trail import increment_cache_miss
+
+    caller_id, invocation_metadata = get_caller_context()
+
+    pending = []  # (index, inputs, cache_key, session_id, metadata)
+    for i, row in enumerate(rows):
+        if not isinstance(row, dict):
+            continue
+        inputs, source_column, source_row_index, source_table = _split_source_context(row)
+        cache_key = _make_cascade_cache_key(cascade_path, inputs)
+        if _cache_get(_cascade_udf_cache, cache_key, track_sql_trail=False) is not None:
+            continue  # Served (and counted) by lars_cascade_udf_impl
+        pending.append((
+            i, inputs, cache_key, f"udf-{generate_woodland_id()}",
+            _with_source_metadata(invocation_metadata, source_column, source_row_index, source_table) or None,
+        ))
+
+    outputs = run_row_mode_batch(
+        resolved_path,
+        [p[1] for p in pending],
+        [p[3] for p in pending],
+        caller_id=caller_id,
+        invocation_metadata_list=[p[4] for p in pending],
+        concurrency=max_workers,
+    )
+    for (i, _, cache_key, session_id, _), result in zip(pending, outputs):
+        if result is None:
+            continue
+        json_result = _cascade_udf_json_result(result, session_id)
+        if caller_id:
+            increment_cache_miss(caller_id)
+        _cache_set(_cascade_udf_cache, cache_key, json_result, ttl=None)
+        results[i] = json_result
+
+    return results
+
+
 def lars_cascade_udf_impl(
     cascade_path: str,
     inputs_json: str,
@@ -459,27 +580,9 @@ def lars_cascade_udf_impl(
         else:
             inputs = inputs_json
 
-        # Extract source lineage context from inputs (special _lars_* keys)
-        source_column = None
-        source_row_index = None
-        source_table = None
-        cleaned_inputs = {}
-
-        for key, value in inputs.items():
-            if key == '_lars_source_column':
-                source_column = str(value) if value is not None else None
-            elif key == '_lars_source_row':
-                try:
-                    source_row_index = int(value) if value is not None else None
-                except (ValueError, TypeError):
-                    pass
-            elif key == '_lars_source_table':
-                source_table = str(value) if value is not None else None
-            else:
-                cleaned_inputs[key] = value
-
+        # Extract source lineage context from inputs (special _lars_* keys).
         # Use cleaned inputs (without _lars_* keys) for cascade and caching
-        inputs = cleaned_inputs
+        inputs, source_column, source_row_index, source_table = _split_source_context(inputs)
 
         # Create cache key
         cache_key = _make_cascade_cache_key(cascade_path, inputs)
@@ -508,19 +611,9 @@ def lars_cascade_udf_impl(
 
                 return cached_result
 
-        # Resolve cascade path
-        resolved_path = cascade_path
-        if not os.path.isabs(cascade_path):
-            resolved_path = os.path.join(os.getcwd(), cascade_path)
-
-        # Add extension if needed
-        if not os.path.exists(resolved_path):
-            for ext in [".yaml", ".yml", ".json"]:
-                if os.path.exists(resolved_path + ext):
-                    resolved_path = resolved_path + ext
-                    break
-
-        if not os.path.exists(resolved_path):
+        # Resolve cascade path (adding the extension if needed)
+        resolved_path = _resolve_cascade_file(cascade_path)
+        if resolved_path is None:
             return json.dumps({"error": f"Cascade not found: {cascade_path}", "status": "failed"})
 
         # Generate unique session ID using woodland naming system
@@ -536,16 +629,8 @@ def lars_cascade_udf_impl(
         caller_id, invocation_metadata = get_caller_context()
 
         # Enrich invocation_metadata with source lineage context
-        enriched_metadata = invocation_metadata.copy() if invocation_metadata else {}
-        if source_column is not None or source_row_index is not None or source_table is not None:
-            if 'source' not in enriched_metadata:
-                enriched_metadata['source'] = {}
-            if source_column is not None:
-                enriched_metadata['source']['column'] = source_column
-            if source_row_index is not None:
-                enriched_metadata['source']['row_index'] = source_row_index
-            if source_table is not None:
-                enriched_metadata['source']['table'] = source_table
+        from ..semantic_sql.executor import _with_source_metadata
+        enriched_metadata = _with_source_metadata(invocation_metadata, source_column, source_row_index, source_table)
 
         # Run cascade with caller tracking
         from ..runner import run_cascade
@@ -559,21 +644,7 @@ def lars_cascade_udf_impl(
         )
 
         # Serialize relevant outputs as JSON
-        # We want to return something useful for SQL queries
-        outputs = {}
-        for cell_item in result.get("lineage", []):
-            cell_name = cell_item.get("cell")
-            cell_output = cell_item.get("output")
-            if cell_name:
-                outputs[cell_name] = cell_output
-
-        json_result = json.dumps({
-            "outputs": outputs,
-            "state": result.get("state", {}),
-            "status": result.get("status", "unknown"),
-            "session_id": session_id,
-            "has_errors": result.get("has_errors", False)
-        })
+        json_result = _cascade_udf_json_result(result, session_id)
 
         # Debug: Print completion
         state_output = result.get("state", {}).get("output_extract", "N/A")
@@ -770,11 +841,16 @@ def lars_run_parallel_batch(
         # Process rows in parallel
         results = [None] * len(rows)  # Preserve order
 
-        def process_row(index, row):
+        # Row-mode cascades: uncached rows run as coroutines on the shared
+        # async LLM loop; the rest go through the thread pool below
+        batch_results = _cascade_udf_batch(cascade_path, rows, max_workers=max_workers)
+
+        def process_row(index, row, result_json=None):
             """Process single row, return (index, enriched_row)."""
             try:
-                row_json = json_module.dumps(row)
-                result_json = lars_cascade_udf_impl(cascade_path, row_json, use_cache=True)
+                if result_json is None:
+                    row_json = json_module.dumps(row)
+                    result_json = lars_cascade_udf_impl(cascade_path, row_json, use_cache=True)
                 result_obj = json_module.loads(result_json)
 
                 # Extract useful value
@@ -788,9 +864,17 @@ def lars_run_parallel_batch(
             except Exception as e:
                 return index, {**row, "result": f"ERROR: {str(e)}"}
 
-        # Execute in parallel with ThreadPoolExecutor
+        # Execute in parallel with ThreadPoolExecutor (caller context carried into workers)
+        from ..caller_context import capture_caller_context, submit_with_caller_context
+        caller_ctx = capture_caller_context()
+        for i, result_json in enumerate(batch_results):
+            if result_json is not None:
+                results[i] = process_row(i, rows[i], result_json)[1]
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {executor.submit(process_row, i, row): i for i, row in enumerate(rows)}
+            futures = {
+                submit_with_caller_context(executor, process_row, i, row, ctx=caller_ctx): i
+                for i, row in enumerate(rows) if results[i] is None
+            }
             for future in as_completed(futures):
                 index, result = future.result()
                 results[index] = result
@@ -879,11 +963,13 @@ def lars_map_parallel_exec(
                 # On error, return row with error message in result column
                 return index, {**row, result_column: f"ERROR: {str(e)[:100]}"}
 
-        # Execute in parallel with ThreadPoolExecutor
+        # Execute in parallel with ThreadPoolExecutor (caller context carried into workers)
+        from ..caller_context import capture_caller_context, submit_with_caller_context
+        caller_ctx = capture_caller_context()
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             # Submit all tasks
             futures = {
-                executor.submit(process_row, i, row): i
+                submit_with_caller_context(executor, process_row, i, row, ctx=caller_ctx): i
                 for i, row in enumerate(rows)
             }
 
@@ -959,12 +1045,73 @@ def lars_materialize_table(
         return json_module.dumps({"error": str(e), "status": "failed"})
 
 
+def embed_text_column(texts, model: str | None = None):
+    """
+    Embed a column of texts for the Arrow semantic_embed UDF.
+
+    DuckDB hands over a whole chunk (up to 2048 rows) per call. Distinct
+    non-empty texts go to Agent.embed() in one call, which serves cached texts
+    and sends the rest in provider-sized batches concurrently. Vectors come
+    back as a list<float32> column (FLOAT[]); empty/NULL texts and failures
+    give NULL.
+
+    Args:
+        texts: pyarrow string array (or list of str/None)
+        model: Embedding model (default: LARS_DEFAULT_EMBED_MODEL)
+
+    Returns:
+        pyarrow ListArray of float32, one entry per input row
+    """
+    import logging
+    import uuid
+    import numpy as np
+    import pyarrow as pa
+    from ..agent import Agent
+    from ..caller_context import capture_caller_context
+
+    log = logging.getLogger(__name__)
+    values = texts.to_pylist() if hasattr(texts, "to_pylist") else list(texts)
+    distinct = list(dict.fromkeys(v for v in values if v is not None and v.strip()))
+
+    matrix = None
+    if distinct:
+        caller_id = capture_caller_context().caller_id
+        try:
+            result = Agent.embed(
+                texts=distinct,
+                model=model,
+                session_id=f"embed_{uuid.uuid4().hex[:8]}",
+                cascade_id="semantic_embed",
+                caller_id=caller_id,
+            )
+            matrix = np.asarray(result["embeddings"], dtype=np.float32)
+        except Exception as e:
+            log.error(f"semantic_embed failed for {len(distinct)} texts: {e}")
+
+        if caller_id:
+            try:
+                from ..sql_trail import record_udf_batch
+                record_udf_batch(caller_id, rows=len(values), distinct_calls=len(distinct))
+            except Exception as e:
+                log.debug(f"semantic_embed: failed to track batch dedup: {e}")
+
+    # Row -> distinct index (-1 for NULL rows), then one gather into a flat buffer
+    position = {text: i for i, text in enumerate(distinct)} if matrix is not None else {}
+    index = np.array([position.get(v, -1) for v in values], dtype=np.int64)
+    valid = index >= 0
+    dim = matrix.shape[1] if matrix is not None and matrix.ndim == 2 else 0
+    flat = matrix[index[valid]].ravel() if dim else np.empty(0, dtype=np.float32)
+    offsets = np.zeros(len(values) + 1, dtype=np.int32)
+    np.cumsum(np.where(valid, dim, 0), out=offsets[1:])
+    return pa.ListArray.from_arrays(pa.array(offsets), pa.array(flat, type=pa.float32()), mask=pa.array(~valid))
+
+
 def register_embedding_udfs(connection: duckdb.DuckDBPyConnection, existing: set | None = None):
     """
     Register embedding-based UDFs for Semantic SQL.
 
     Registers:
-        - semantic_embed(text, model?) → DOUBLE[]
+        - semantic_embed(text) → FLOAT[] (Arrow vectorized, see embed_text_column)
         - vector_search_json(query, table, limit?, threshold?) → VARCHAR (JSON)
         - similar_to(text1, text2) → DOUBLE
 
@@ -1017,81 +1164,12 @@ def register_embedding_udfs(connection: duckdb.DuckDBPyConnection, existing: set
         return
 
     # =========================================================================
-    # UDF 1: semantic_embed(text, model?) → DOUBLE[]
+    # UDF 1: semantic_embed(text) → FLOAT[] (Arrow, whole column per call)
     # =========================================================================
 
-    def semantic_embed_udf_1(text: str):
-        """Generate 4096-dim embedding via cascade (1-arg version)."""
-        if text is None or text.strip() == "":
-            logger.warning("semantic_embed called with empty text, returning NULL")
-            return None
-
-        try:
-            logger.debug(f"Calling semantic_embed cascade for text: {text[:50]}...")
-
-            result = execute_sql_function_sync(
-                "semantic_embed",
-                {"text": text, "model": None}
-            )
-
-            logger.debug(f"Cascade result type: {type(result)}, value: {str(result)[:100]}...")
-
-            # Handle both dict result (from tool output) and list result (from python_data)
-            if isinstance(result, dict):
-                # Check if error
-                if result.get('_route') == 'error':
-                    logger.error(f"Cascade error: {result.get('error')}")
-                    return None
-
-                # Extract embedding from tool result
-                if 'embedding' in result:
-                    embedding = result['embedding']
-                    if isinstance(embedding, list):
-                        result = embedding
-                    else:
-                        logger.error(f"embedding field is not a list: {type(embedding)}")
-                        return None
-                else:
-                    logger.error(f"No 'embedding' field in result: {result.keys()}")
-                    return None
-
-            # Result should be list of floats (4096 dims)
-            if not isinstance(result, list):
-                logger.error(f"semantic_embed returned non-list: {type(result)}, value: {result}")
-                return None
-
-            if len(result) != 4096:
-                logger.warning(f"Unexpected embedding dimension: {len(result)} (expected 4096)")
-
-            return result
-
-        except Exception as e:
-            logger.error(f"semantic_embed failed with exception: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
-            return None
-
-    def semantic_embed_udf_2(text: str, model: str):
-        """Generate 4096-dim embedding via cascade (2-arg version with model)."""
-        if text is None or text.strip() == "":
-            return None
-
-        try:
-            result = execute_sql_function_sync(
-                "semantic_embed",
-                {"text": text, "model": model}
-            )
-
-            # Result is list of floats (4096 dims)
-            if not isinstance(result, list):
-                logger.error(f"semantic_embed returned non-list: {type(result)}")
-                return None
-
-            return result
-
-        except Exception as e:
-            logger.error(f"semantic_embed failed: {e}")
-            return None
+    def semantic_embed_vectorized(texts):
+        """Embed a column of texts in one Agent.embed() call (see embed_text_column)."""
+        return embed_text_column(texts)
 
     def semantic_embed_with_storage_udf(text: str, model: str, source_table: str, column_name: str, source_id: str):
         """Generate embedding with table/column/ID tracking (5-arg version for auto-storage)."""
@@ -1135,10 +1213,13 @@ def register_embedding_udfs(connection: duckdb.DuckDBPyConnection, existing: set
             logger.error(traceback.format_exc())
             return None
 
-    # Register 1-arg version (default model, no storage)
-    if safe_create_function(connection, "semantic_embed", semantic_embed_udf_1, existing,
-                            return_type="DOUBLE[]", null_handling="special"):
-        logger.debug("Registered semantic_embed UDF (1-arg version)")
+    # Register 1-arg version (default model, no storage), plus the EMBED short
+    # name so the generic cascade wrapper doesn't claim it
+    for embed_name in ("semantic_embed", "embed"):
+        if safe_create_function(connection, embed_name, semantic_embed_vectorized, existing,
+                                parameters=["VARCHAR"], return_type="FLOAT[]",
+                                type="arrow", null_handling="special"):
+            logger.debug(f"Registered {embed_name} UDF (Arrow, FLOAT[])")
 
     # Register 4-arg version (with table/ID for auto-storage)
     if safe_create_function(connection, "semantic_embed_with_storage", semantic_embed_with_storage_udf, existing,
@@ -1668,7 +1749,7 @@ def _register_job_status_udfs(connection: duckdb.DuckDBPyConnection, existing: s
                     SUM(cost) as total_cost,
                     COUNT(*) as messages,
                     countIf(request_id IS NOT NULL AND request_id != '' OR cost > 0) as requests
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE caller_id = '{job_id}'
                 GROUP BY caller_id
             ) agg ON agg.caller_id = q.caller_id
@@ -1771,7 +1852,7 @@ def _register_job_status_udfs(connection: duckdb.DuckDBPyConnection, existing: s
                         SUM(cost) as total_cost,
                         COUNT(*) as messages,
                         countIf(request_id IS NOT NULL AND request_id != '' OR cost > 0) as requests
-                    FROM unified_logs
+                    FROM unified_logs_costed
                     WHERE caller_id IN (
                         SELECT caller_id FROM sql_query_log
                         WHERE protocol = 'postgresql_wire_background'
@@ -1917,7 +1998,7 @@ def _register_job_status_udfs(connection: duckdb.DuckDBPyConnection, existing: s
                     substring(content, 1, 500) as content_preview,
                     JSONExtractString(tool_calls, '$[0].function.name') as tool_name,
                     error_message
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE caller_id = '{caller_id}'
                 ORDER BY timestamp DESC
                 LIMIT 1000
@@ -2101,6 +2182,13 @@ def get_udf_cache_stats() -> Dict[str, Any]:
     except Exception:
         persistent_stats = None
 
+    # L1 LRU counters (hits, misses, evictions) are available without ClickHouse
+    try:
+        from .cache_adapter import SemanticCache
+        semantic_l1_stats = SemanticCache._l1_cache.get_stats()
+    except Exception:
+        semantic_l1_stats = None
+
     # Build stats from in-memory caches (legacy view)
     stats = {
         "simple_udf": {
@@ -2125,6 +2213,16 @@ def get_udf_cache_stats() -> Dict[str, Any]:
     # Add persistent cache stats if available
     if persistent_stats:
         stats["persistent"] = persistent_stats
+    if semantic_l1_stats:
+        stats["semantic_l1"] = semantic_l1_stats
+
+    # Parsed cascade configs reused across per-row runner construction
+    from ..cascade import get_compiled_cascade_cache
+    stats["compiled_cascades"] = get_compiled_cascade_cache().get_stats()
+
+    # Compiled prompt templates reused across per-row renders
+    from ..prompts import get_prompt_engine
+    stats["compiled_templates"] = get_prompt_engine().templates.get_stats()
 
     return stats
 
@@ -2159,6 +2257,7 @@ def make_vectorized_wrapper(
     func_name: str,
     fn_entry,
     execute_fn,
+    execute_batch_fn=None,
 ):
     """
     Create an Arrow vectorized UDF wrapper for parallel batch execution.
@@ -2172,6 +2271,8 @@ def make_vectorized_wrapper(
         func_name: The function name (for cache keys and logging)
         fn_entry: The SQL function registry entry with args, returns, etc.
         execute_fn: The function to call for each row (execute_cascade_udf)
+        execute_batch_fn: Optional function answering many rows at once
+            (execute_cascade_udf_batch); rows it returns None for go to execute_fn
 
     Returns:
         A wrapper function compatible with DuckDB's Arrow UDF interface
@@ -2184,7 +2285,7 @@ def make_vectorized_wrapper(
         from concurrent.futures import ThreadPoolExecutor, as_completed
         from ..config import get_config
         from .cache_adapter import get_cache, SemanticCache
-        from ..caller_context import get_caller_id
+        from ..caller_context import capture_caller_context, submit_with_caller_context
 
         # Helper to coerce result to expected type
         def coerce_result(result, return_type):
@@ -2236,9 +2337,10 @@ def make_vectorized_wrapper(
         config = get_config()
         max_workers = config.parallel_workers
 
-        # Get caller_id ONCE at the start - this will read from ClickHouse
-        # which works reliably across threads. We pass it explicitly to workers.
-        caller_id = get_caller_id()
+        # Capture the caller context ONCE at the start (in-process lookup) and
+        # pass it explicitly to worker threads.
+        caller_ctx = capture_caller_context()
+        caller_id = caller_ctx.caller_id
         if not caller_id:
             log.warning(f"[VectorizedUDF] {func_name}: No caller_id available for SQL trail tracking")
 
@@ -2268,15 +2370,21 @@ def make_vectorized_wrapper(
                     row_args[name] = val.as_py() if hasattr(val, 'as_py') else val
             rows.append(row_args)
 
+        # `-- @ pack: N` hint: strip it so cache keys match unpacked runs
+        from ..semantic_sql.packing import strip_pack_hint
+        pack_size = strip_pack_hint(rows)
+
         # Compute cache keys for all rows
         cache = get_cache()
         cache_keys = [SemanticCache.make_cache_key(func_name, args) for args in rows]
 
-        # Batch cache lookup
+        # Batch cache lookup (L1 per key, L2 misses resolved with chunked IN queries)
         cached_results = cache.get_batch(func_name, rows, track_hit=True)
 
-        # Identify cache misses and coerce cache hits
-        misses = []
+        # Identify cache misses and coerce cache hits.
+        # Misses are collapsed by cache key so each distinct input runs once and
+        # its result is fanned back out to every row position that shares it.
+        misses: Dict[str, Tuple[Dict[str, Any], list]] = {}
         results = [None] * n_rows
         return_type = fn_entry.returns
         cache_hit_count = 0
@@ -2286,8 +2394,12 @@ def make_vectorized_wrapper(
                 # Coerce cached result to expected type
                 results[i] = coerce_result(result, return_type)
                 cache_hit_count += 1
+            elif cache_key in misses:
+                misses[cache_key][1].append(i)
             else:
-                misses.append((i, args, cache_key))
+                misses[cache_key] = (args, [i])
+
+        miss_row_count = n_rows - cache_hit_count
 
         # Track cache hits in SQL trail (execute_cascade_udf only handles misses)
         if cache_hit_count > 0 and caller_id:
@@ -2298,59 +2410,113 @@ def make_vectorized_wrapper(
             except Exception as e:
                 log.debug(f"[VectorizedUDF] Failed to track cache hits: {e}")
 
+        # Track rows vs. distinct calls in SQL trail
+        if caller_id:
+            try:
+                from ..sql_trail import record_udf_batch
+                record_udf_batch(caller_id, rows=n_rows, distinct_calls=len(misses))
+            except Exception as e:
+                log.debug(f"[VectorizedUDF] Failed to track batch dedup: {e}")
+
         # Log cache stats for debugging
-        if cache_hit_count > 0 or len(misses) > 0:
-            log.debug(f"[VectorizedUDF] {func_name}: {cache_hit_count} cache hits, {len(misses)} to execute")
+        if cache_hit_count > 0 or misses:
+            log.debug(
+                f"[VectorizedUDF] {func_name}: {cache_hit_count} cache hits, "
+                f"{miss_row_count} misses -> {len(misses)} distinct calls"
+            )
 
-        # Execute cache misses in parallel
+        # Execute distinct cache misses in parallel
         if misses and not is_shutdown_requested():
             new_cache_items = []
+            result_type_str = return_type if return_type in ("BOOLEAN", "DOUBLE", "INTEGER") else "VARCHAR"
 
-            # Use thread_name_prefix for easier debugging
-            executor = ThreadPoolExecutor(
-                max_workers=min(max_workers, len(misses)),
-                thread_name_prefix=f"UDF-{func_name}"
-            )
-            try:
-                futures = {}
-                for i, args, cache_key in misses:
-                    # Check shutdown before submitting each task
-                    if is_shutdown_requested():
-                        log.info(f"[VectorizedUDF] Shutdown requested, stopping submission")
-                        break
-                    import json
-                    # Pass caller_id explicitly to ensure cost tracking works in worker threads
-                    future = executor.submit(execute_fn, func_name, json.dumps(args), True, caller_id)
-                    futures[future] = (i, args, cache_key)
-
-                for future in as_completed(futures, timeout=300):  # 5 min timeout per batch
-                    # Check shutdown during result collection
-                    if is_shutdown_requested():
-                        log.info(f"[VectorizedUDF] Shutdown requested, cancelling remaining futures")
-                        for f in futures:
-                            f.cancel()
-                        break
-
-                    i, args, cache_key = futures[future]
-                    try:
-                        result = future.result(timeout=60)  # 60s timeout per result
+            # Multi-row prompt packing: answer groups of misses with one call each.
+            # Anything a pack didn't resolve falls through to the per-row path.
+            if pack_size:
+                try:
+                    from ..semantic_sql.packing import pack_misses
+                    packed = pack_misses(func_name, misses, pack_size, caller_id, max_workers)
+                except Exception as e:
+                    log.warning(f"[VectorizedUDF] {func_name}: packing failed, running rows individually: {e}")
+                    packed = {}
+                for cache_key, result in packed.items():
+                    args, row_indices = misses.pop(cache_key)
+                    coerced = coerce_result(result, return_type)
+                    for i in row_indices:
+                        results[i] = coerced
+                    new_cache_items.append((args, result, result_type_str))
 
-                        # Coerce result using helper
-                        coerced = coerce_result(result, return_type)
+            # Row-mode cascades: all misses as coroutines on the shared async
+            # LLM loop. Rows it can't serve fall through to the thread pool.
+            if misses and execute_batch_fn is not None and config.llm_async:
+                keys = list(misses)
+                try:
+                    batch_results = caller_ctx.run(
+                        execute_batch_fn, func_name, [misses[k][0] for k in keys], True, caller_id
+                    )
+                except Exception as e:
+                    log.warning(f"[VectorizedUDF] {func_name}: async batch failed, running rows on threads: {e}")
+                    batch_results = [None] * len(keys)
+                for cache_key, result in zip(keys, batch_results):
+                    if result is None:
+                        continue
+                    args, row_indices = misses.pop(cache_key)
+                    coerced = coerce_result(result, return_type)
+                    for i in row_indices:
                         results[i] = coerced
+                    new_cache_items.append((args, result, result_type_str))
 
-                        # Queue for batch cache write (store raw result, coerce on read)
-                        result_type_str = return_type if return_type in ("BOOLEAN", "DOUBLE", "INTEGER") else "VARCHAR"
-                        new_cache_items.append((args, result, result_type_str))
+            if misses:
+                # Use thread_name_prefix for easier debugging
+                executor = ThreadPoolExecutor(
+                    max_workers=min(max_workers, len(misses)),
+                    thread_name_prefix=f"UDF-{func_name}"
+                )
+                try:
+                    futures = {}
+                    for cache_key, (args, row_indices) in misses.items():
+                        # Check shutdown before submitting each task
+                        if is_shutdown_requested():
+                            log.info(f"[VectorizedUDF] Shutdown requested, stopping submission")
+                            break
+                        import json
+                        # Pass caller_id explicitly to ensure cost tracking works in worker threads,
+                        # and bind the context for anything downstream that looks it up
+                        future = submit_with_caller_context(
+                            executor, execute_fn, func_name, json.dumps(args), True, caller_id, ctx=caller_ctx
+                        )
+                        futures[future] = (row_indices, args, cache_key)
+
+                    for future in as_completed(futures, timeout=300):  # 5 min timeout per batch
+                        # Check shutdown during result collection
+                        if is_shutdown_requested():
+                            log.info(f"[VectorizedUDF] Shutdown requested, cancelling remaining futures")
+                            for f in futures:
+                                f.cancel()
+                            break
+
+                        row_indices, args, cache_key = futures[future]
+                        try:
+                            result = future.result(timeout=60)  # 60s timeout per result
+
+                            # Coerce result using helper and fan out to all matching rows
+                            coerced = coerce_result(result, return_type)
+                            for i in row_indices:
+                                results[i] = coerced
 
-                    except Exception as e:
-                        log.warning(f"[VectorizedUDF] Error processing row {i}: {e}")
-                        # Return error indicator based on type
-                        results[i] = coerce_result(f"ERROR: {e}", return_type)
+                            # Queue for batch cache write (store raw result, coerce on read)
+                            new_cache_items.append((args, result, result_type_str))
 
-            finally:
-                # Shutdown executor - use wait=False if shutdown requested for faster exit
-                executor.shutdown(wait=not is_shutdown_requested(), cancel_futures=is_shutdown_requested())
+                        except Exception as e:
+                            log.warning(f"[VectorizedUDF] Error processing rows {row_indices[:5]}: {e}")
+                            # Return error indicator based on type
+                            error_value = coerce_result(f"ERROR: {e}", return_type)
+                            for i in row_indices:
+                                results[i] = error_value
+
+                finally:
+                    # Shutdown executor - use wait=False if shutdown requested for faster exit
+                    executor.shutdown(wait=not is_shutdown_requested(), cancel_futures=is_shutdown_requested())
 
             # Batch store new results
             if new_cache_items and not is_shutdown_requested():
@@ -2407,7 +2573,7 @@ def register_dynamic_sql_functions(connection, existing: set | None = None):
     """
     try:
         from ..semantic_sql.registry import initialize_registry, get_sql_function_registry
-        from ..semantic_sql.executor import execute_cascade_udf
+        from ..semantic_sql.executor import execute_cascade_udf, execute_cascade_udf_batch
 
         # Initialize registry to discover all cascades
         initialize_registry(force=True)
@@ -2534,7 +2700,9 @@ def register_dynamic_sql_functions(connection, existing: set | None = None):
 
                 if use_arrow:
                     # Create Arrow vectorized wrapper for parallel execution
-                    udf_func = make_vectorized_wrapper(name, entry, execute_cascade_udf)
+                    udf_func = make_vectorized_wrapper(
+                        name, entry, execute_cascade_udf, execute_batch_fn=execute_cascade_udf_batch
+                    )
 
                     # Register as Arrow UDF
                     connection.create_function(
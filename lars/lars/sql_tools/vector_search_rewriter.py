@@ -8,6 +8,7 @@ FOUR SEARCH FUNCTIONS:
 1. VECTOR_SEARCH - Pure semantic (ClickHouse, fastest)
    VECTOR_SEARCH('query', table.column, limit[, min_score])
    → read_json_auto(vector_search_json_3/4(...)) WHERE metadata.column_name = 'column'
+   (clickhouse_vector_search switches to the HNSW index for large tables)
 
 2. ELASTIC_SEARCH - Pure semantic (Elastic)
    ELASTIC_SEARCH('query', table.column, limit[, min_score])
@@ -11,11 +11,20 @@ Core Functions:
 - log_query_error(query_id, error) - Update with error
 - increment_cache_hit(caller_id) - Atomic counter increment
 - increment_cache_miss(caller_id) - Atomic counter increment
+- record_llm_call(caller_id, tokens_in, tokens_out, cost) - LLM call counters
+- record_udf_batch(caller_id, rows, distinct_calls) - Vectorized UDF de-dup counters
+- record_pack(caller_id, rows, calls, tokens_saved) - Multi-row prompt packing counters
+
+All per-query counters are accumulated in memory and written to sql_query_log
+once, at completion. Running queries append periodic counter snapshots to
+sql_query_progress (no ALTER TABLE UPDATE on the hot path).
 """
 
 import hashlib
 import logging
 import re
+import threading
+import time
 import uuid
 from datetime import datetime, timezone
 from threading import Lock
@@ -42,9 +51,28 @@ _cascade_lock = Lock()
 _cache_counters: Dict[str, Dict[str, int]] = {}  # caller_id -> {hits: n, misses: n}
 _cache_counter_lock = Lock()
 
+# Vectorized UDF batch counters: rows seen vs. distinct cascade calls made
+# after in-batch de-duplication. Same lifecycle as the cache counters.
+_udf_batch_counters: Dict[str, Dict[str, int]] = {}  # caller_id -> {rows: n, calls: n}
+
+# Multi-row prompt packing counters: rows answered by packed prompts, packed
+# calls made, and estimated prompt tokens saved. Same lifecycle again.
+_pack_counters: Dict[str, Dict[str, int]] = {}  # caller_id -> {rows: n, calls: n, tokens_saved: n}
+
+# LLM call counters: calls made, tokens, and cost known at call time (late
+# OpenRouter costs arrive via llm_cost_events). Same lifecycle again.
+_llm_counters: Dict[str, Dict[str, float]] = {}  # caller_id -> {calls, tokens_in, tokens_out, cost}
+
+# Running queries for progress snapshots: query_id -> {caller_id, started_at, last}
+_running_queries: Dict[str, Dict[str, Any]] = {}
+_running_lock = Lock()
+_progress_thread: Optional[threading.Thread] = None
+
 # Cache for schema checks
 _cascade_columns_exist: Optional[bool] = None
 _result_columns_exist: Optional[bool] = None
+_udf_batch_columns_exist: Optional[bool] = None
+_pack_columns_exist: Optional[bool] = None
 
 
 def _has_result_columns(db, force_check: bool = False) -> bool:
@@ -107,6 +135,64 @@ def _has_cascade_columns(db) -> bool:
     return _cascade_columns_exist
 
 
+def _has_udf_batch_columns(db) -> bool:
+    """
+    Check if sql_query_log has vectorized UDF de-dup columns.
+
+    Caches result to avoid repeated DESCRIBE queries.
+    Returns True if udf_rows and udf_distinct_calls columns exist.
+    """
+    global _udf_batch_columns_exist
+
+    if _udf_batch_columns_exist is not None:
+        return _udf_batch_columns_exist
+
+    try:
+        result = db.execute("DESCRIBE TABLE sql_query_log")
+        columns = {row[0] for row in result}
+        _udf_batch_columns_exist = 'udf_rows' in columns and 'udf_distinct_calls' in columns
+
+        if not _udf_batch_columns_exist:
+            logger.info(
+                "SQL Trail: udf_rows/udf_distinct_calls columns not found. "
+                "Run migration 035_sql_query_log_udf_dedup"
+            )
+    except Exception as e:
+        logger.debug(f"SQL Trail: Could not check for UDF batch columns: {e}")
+        _udf_batch_columns_exist = False
+
+    return _udf_batch_columns_exist
+
+
+def _has_pack_columns(db) -> bool:
+    """
+    Check if sql_query_log has prompt packing columns.
+
+    Caches result to avoid repeated DESCRIBE queries.
+    Returns True if packed_rows, packed_calls and pack_tokens_saved columns exist.
+    """
+    global _pack_columns_exist
+
+    if _pack_columns_exist is not None:
+        return _pack_columns_exist
+
+    try:
+        result = db.execute("DESCRIBE TABLE sql_query_log")
+        columns = {row[0] for row in result}
+        _pack_columns_exist = {'packed_rows', 'packed_calls', 'pack_tokens_saved'} <= columns
+
+        if not _pack_columns_exist:
+            logger.info(
+                "SQL Trail: packed_rows/packed_calls/pack_tokens_saved columns not found. "
+                "Run migration 036_sql_query_log_pack"
+            )
+    except Exception as e:
+        logger.debug(f"SQL Trail: Could not check for pack columns: {e}")
+        _pack_columns_exist = False
+
+    return _pack_columns_exist
+
+
 # Try to import sqlglot for AST-based fingerprinting
 try:
     import sqlglot
@@ -465,6 +551,7 @@ def log_query_start(
         }])
 
         logger.debug(f"SQL Trail: Started query {query_id[:8]} ({query_type})")
+        _register_running_query(query_id, caller_id)
         return query_id
 
     except Exception as e:
@@ -484,17 +571,23 @@ def log_query_complete(
     result_schema: Optional[str] = None,
     result_table: Optional[str] = None,
     cache_hits: Optional[int] = None,
-    cache_misses: Optional[int] = None
+    cache_misses: Optional[int] = None,
+    udf_rows: Optional[int] = None,
+    udf_distinct_calls: Optional[int] = None,
+    packed_rows: Optional[int] = None,
+    packed_calls: Optional[int] = None,
+    pack_tokens_saved: Optional[int] = None
 ):
     """
     Update query log with completion data.
 
     Called after query execution finishes (successfully or with error).
-    Uses ClickHouse ALTER TABLE UPDATE for in-place modification.
+    Uses one ClickHouse ALTER TABLE UPDATE for the whole row; the LLM call
+    counters accumulated for the query's caller_id are written here too.
 
-    NOTE: Cost/token data is NOT set here. Cost data arrives asynchronously
-    via the cost worker (~3-5s after LLM calls complete). The API queries
-    join with unified_logs or mv_sql_query_costs for live cost aggregation.
+    NOTE: total_cost/total_tokens_* are what was known when the query
+    finished. OpenRouter costs arrive asynchronously (~3-5s after LLM calls
+    complete), so the API still derives live costs from unified_logs_costed.
 
     Args:
         query_id: The query_id returned from log_query_start
@@ -509,6 +602,11 @@ def log_query_complete(
         result_table: Table name within schema (e.g., 'q_abc12345')
         cache_hits: Number of UDF cache hits during query execution
         cache_misses: Number of UDF cache misses during query execution
+        udf_rows: Rows processed by vectorized semantic UDFs
+        udf_distinct_calls: Distinct cascade calls made for those rows (after de-dup)
+        packed_rows: Rows answered by multi-row packed prompts
+        packed_calls: Packed prompt calls made for those rows
+        pack_tokens_saved: Estimated prompt tokens saved by packing
     """
     if not query_id:
         return
@@ -518,14 +616,16 @@ def log_query_complete(
         db = get_db()
 
         # Build SET clause dynamically
-        # NOTE: We intentionally do NOT set cost/token fields here.
-        # They remain NULL in sql_query_log - the API derives them from
-        # unified_logs via live aggregation or the mv_sql_query_costs MV.
         updates = [f"status = '{status}'", "completed_at = now64(6)"]
 
         if duration_ms is not None:
             updates.append(f"duration_ms = {duration_ms}")
 
+        # LLM call counters, tokens and cost known at call time (accumulated in
+        # memory during query execution). Costs resolved later by the cost
+        # worker only reach unified_logs, which the API aggregates from.
+        updates.extend(_llm_count_updates(_finish_running_query(query_id)))
+
         # Cache metrics (accumulated during query execution)
         if cache_hits is not None and cache_hits > 0:
             updates.append(f"cache_hits = {cache_hits}")
@@ -533,6 +633,15 @@ def log_query_complete(
             updates.append(f"cache_misses = {cache_misses}")
         if rows_output is not None:
             updates.append(f"rows_output = {rows_output}")
+        # Vectorized UDF de-dup metrics (rows vs. distinct calls)
+        if udf_rows and _has_udf_batch_columns(db):
+            updates.append(f"udf_rows = {int(udf_rows)}")
+            updates.append(f"udf_distinct_calls = {int(udf_distinct_calls or 0)}")
+        # Multi-row prompt packing metrics
+        if packed_rows and _has_pack_columns(db):
+            updates.append(f"packed_rows = {int(packed_rows)}")
+            updates.append(f"packed_calls = {int(packed_calls or 0)}")
+            updates.append(f"pack_tokens_saved = {int(pack_tokens_saved or 0)}")
         # Cascade tracking columns (added in later migration)
         # Check if columns exist before adding to update
         if cascade_paths or cascade_count is not None:
@@ -613,6 +722,13 @@ def log_query_error(
         if duration_ms is not None:
             updates.append(f"duration_ms = {duration_ms}")
 
+        # LLM calls made before the error; drop the query's other counters
+        caller_id = _finish_running_query(query_id)
+        updates.extend(_llm_count_updates(caller_id))
+        get_and_clear_cache_counts(caller_id)
+        get_and_clear_udf_batch_counts(caller_id)
+        get_and_clear_pack_counts(caller_id)
+
         set_clause = ', '.join(updates)
 
         db.execute(f"""
@@ -687,40 +803,291 @@ def get_and_clear_cache_counts(caller_id: Optional[str]) -> Tuple[int, int]:
         return 0, 0
 
 
+def record_udf_batch(caller_id: Optional[str], rows: int, distinct_calls: int):
+    """
+    Record one vectorized UDF batch: rows processed vs. distinct calls made.
+
+    Identical cache-miss rows in a batch are executed once and fanned back
+    out, so distinct_calls <= rows. Accumulates in memory - written to
+    ClickHouse at query completion.
+
+    Args:
+        caller_id: The caller_id for the current SQL query
+        rows: Number of rows in the batch
+        distinct_calls: Number of distinct cascade executions for the batch
+    """
+    if not caller_id:
+        return
+
+    with _cache_counter_lock:
+        if caller_id not in _udf_batch_counters:
+            _udf_batch_counters[caller_id] = {'rows': 0, 'calls': 0}
+        _udf_batch_counters[caller_id]['rows'] += rows
+        _udf_batch_counters[caller_id]['calls'] += distinct_calls
+
+
+def get_and_clear_udf_batch_counts(caller_id: Optional[str]) -> Tuple[int, int]:
+    """
+    Get and clear accumulated vectorized UDF batch counts for a caller_id.
+
+    Args:
+        caller_id: The caller_id for the current SQL query
+
+    Returns:
+        Tuple of (udf_rows, udf_distinct_calls)
+    """
+    if not caller_id:
+        return 0, 0
+
+    with _cache_counter_lock:
+        if caller_id in _udf_batch_counters:
+            counts = _udf_batch_counters.pop(caller_id)
+            return counts['rows'], counts['calls']
+        return 0, 0
+
+
+def record_pack(caller_id: Optional[str], rows: int, calls: int, tokens_saved: int):
+    """
+    Record multi-row prompt packing for a query.
+
+    Accumulates in memory - written to ClickHouse at query completion.
+
+    Args:
+        caller_id: The caller_id for the current SQL query
+        rows: Rows answered by the packed calls
+        calls: Packed prompt calls made
+        tokens_saved: Estimated prompt tokens saved vs. one prompt per row
+    """
+    if not caller_id:
+        return
+
+    with _cache_counter_lock:
+        if caller_id not in _pack_counters:
+            _pack_counters[caller_id] = {'rows': 0, 'calls': 0, 'tokens_saved': 0}
+        _pack_counters[caller_id]['rows'] += rows
+        _pack_counters[caller_id]['calls'] += calls
+        _pack_counters[caller_id]['tokens_saved'] += tokens_saved
+
+
+def get_and_clear_pack_counts(caller_id: Optional[str]) -> Tuple[int, int, int]:
+    """
+    Get and clear accumulated prompt packing counts for a caller_id.
+
+    Args:
+        caller_id: The caller_id for the current SQL query
+
+    Returns:
+        Tuple of (packed_rows, packed_calls, pack_tokens_saved)
+    """
+    if not caller_id:
+        return 0, 0, 0
+
+    with _cache_counter_lock:
+        if caller_id in _pack_counters:
+            counts = _pack_counters.pop(caller_id)
+            return counts['rows'], counts['calls'], counts['tokens_saved']
+        return 0, 0, 0
+
+
+def record_llm_call(
+    caller_id: Optional[str],
+    tokens_in: int = 0,
+    tokens_out: int = 0,
+    cost: Optional[float] = None,
+):
+    """
+    Record one LLM call made on behalf of a query.
+
+    Accumulates in memory - written to ClickHouse at query completion.
+
+    Args:
+        caller_id: The caller_id for the current SQL query
+        tokens_in: Prompt tokens reported with the response
+        tokens_out: Completion tokens reported with the response
+        cost: Cost if known at call time (None for costs fetched later)
+    """
+    if not caller_id:
+        return
+
+    with _cache_counter_lock:
+        if caller_id not in _llm_counters:
+            _llm_counters[caller_id] = {'calls': 0, 'tokens_in': 0, 'tokens_out': 0, 'cost': 0.0}
+        counts = _llm_counters[caller_id]
+        counts['calls'] += 1
+        counts['tokens_in'] += tokens_in or 0
+        counts['tokens_out'] += tokens_out or 0
+        counts['cost'] += cost or 0.0
+
+
 def increment_llm_call(caller_id: Optional[str]):
     """
     Increment llm_calls_count counter for a query.
 
     Called when a UDF makes an LLM call.
-    Uses ClickHouse atomic increment.
+    Accumulates in memory - written to ClickHouse at query completion.
+
+    Args:
+        caller_id: The caller_id for the current SQL query
+    """
+    record_llm_call(caller_id)
+
+
+def get_and_clear_llm_counts(caller_id: Optional[str]) -> Tuple[int, int, int, float]:
+    """
+    Get and clear accumulated LLM call counts for a caller_id.
 
     Args:
         caller_id: The caller_id for the current SQL query
+
+    Returns:
+        Tuple of (llm_calls, tokens_in, tokens_out, cost)
     """
     if not caller_id:
-        return
+        return 0, 0, 0, 0.0
+
+    with _cache_counter_lock:
+        if caller_id in _llm_counters:
+            counts = _llm_counters.pop(caller_id)
+            return counts['calls'], counts['tokens_in'], counts['tokens_out'], counts['cost']
+        return 0, 0, 0, 0.0
 
+
+def get_query_counters(caller_id: Optional[str]) -> Dict[str, Any]:
+    """
+    Snapshot (without clearing) of every in-memory counter for a caller_id.
+
+    Args:
+        caller_id: The caller_id for the current SQL query
+
+    Returns:
+        Dict with llm_calls, tokens_in, tokens_out, cost, cache_hits,
+        cache_misses, udf_rows, udf_distinct_calls, packed_rows
+    """
+    with _cache_counter_lock:
+        llm = _llm_counters.get(caller_id, {})
+        cache = _cache_counters.get(caller_id, {})
+        udf = _udf_batch_counters.get(caller_id, {})
+        pack = _pack_counters.get(caller_id, {})
+        return {
+            'llm_calls': llm.get('calls', 0),
+            'tokens_in': llm.get('tokens_in', 0),
+            'tokens_out': llm.get('tokens_out', 0),
+            'cost': llm.get('cost', 0.0),
+            'cache_hits': cache.get('hits', 0),
+            'cache_misses': cache.get('misses', 0),
+            'udf_rows': udf.get('rows', 0),
+            'udf_distinct_calls': udf.get('calls', 0),
+            'packed_rows': pack.get('rows', 0),
+        }
+
+
+def _llm_count_updates(caller_id: Optional[str]) -> List[str]:
+    """SET clauses for the LLM counters of a finished query (clears them)."""
+    calls, tokens_in, tokens_out, cost = get_and_clear_llm_counts(caller_id)
+    if not calls:
+        return []
+    updates = [f"llm_calls_count = {int(calls)}"]
+    if tokens_in or tokens_out:
+        updates.append(f"total_tokens_in = {int(tokens_in)}")
+        updates.append(f"total_tokens_out = {int(tokens_out)}")
+    if cost:
+        updates.append(f"total_cost = {float(cost)}")
+    return updates
+
+
+# ============================================================================
+# Progress Snapshots (append-only)
+# ============================================================================
+
+def _progress_interval() -> float:
     try:
-        from .db_adapter import get_db
-        db = get_db()
+        from .config import get_config
+        return get_config().sql_trail_progress_interval_s
+    except Exception:
+        return 0.0
 
-        db.execute(f"""
-            ALTER TABLE sql_query_log
-            UPDATE llm_calls_count = llm_calls_count + 1
-            WHERE caller_id = '{caller_id}'
-        """)
 
-    except Exception as e:
-        # Fire-and-forget - don't fail the main path
-        logger.debug(f"SQL Trail: Failed to increment LLM call count: {e}")
+def _register_running_query(query_id: str, caller_id: str):
+    """Track a started query (completion counters, progress snapshots)."""
+    global _progress_thread
+
+    interval = _progress_interval()
+    with _running_lock:
+        _running_queries[query_id] = {'caller_id': caller_id, 'started_at': time.time(), 'last': None}
+        if interval > 0 and (_progress_thread is None or not _progress_thread.is_alive()):
+            _progress_thread = threading.Thread(
+                target=_progress_loop, args=(interval,), daemon=True, name="SQLTrailProgress"
+            )
+            _progress_thread.start()
+
+
+def _finish_running_query(query_id: str) -> Optional[str]:
+    """Stop tracking a query; returns its caller_id (or None if it was not tracked)."""
+    with _running_lock:
+        entry = _running_queries.pop(query_id, None)
+    return entry['caller_id'] if entry else None
+
+
+def write_progress_snapshots(min_age_s: float = 0.0) -> int:
+    """
+    Append a counter snapshot to sql_query_progress for each running query.
+
+    Only queries older than min_age_s whose counters changed since their
+    last snapshot are written.
+
+    Returns:
+        Number of snapshot rows written
+    """
+    now = time.time()
+    rows = []
+    with _running_lock:
+        running = list(_running_queries.items())
+
+    for query_id, entry in running:
+        if now - entry['started_at'] < min_age_s:
+            continue
+        counters = get_query_counters(entry['caller_id'])
+        if counters == entry['last']:
+            continue
+        entry['last'] = counters
+        rows.append({
+            'query_id': query_id,
+            'caller_id': entry['caller_id'],
+            'snapshot_at': datetime.now(timezone.utc),
+            'elapsed_ms': (now - entry['started_at']) * 1000,
+            **counters,
+        })
+
+    if rows:
+        try:
+            from .db_adapter import get_db
+            get_db().insert_rows('sql_query_progress', rows)
+        except Exception as e:
+            logger.debug(f"SQL Trail: Failed to write progress snapshots: {e}")
+            return 0
+    return len(rows)
+
+
+def _progress_loop(interval: float):
+    """Background thread: snapshot long-running queries every `interval` seconds."""
+    while True:
+        time.sleep(interval)
+        with _running_lock:
+            if not _running_queries:
+                continue
+        try:
+            write_progress_snapshots(min_age_s=interval)
+        except Exception as e:
+            logger.debug(f"SQL Trail: Progress snapshot error: {e}")
 
 
 def aggregate_query_costs(caller_id: str) -> dict:
     """
     Aggregate costs from all LLM calls spawned by a SQL query.
 
-    Queries unified_logs to sum up costs, tokens, and call counts
-    for all sessions/messages with the given caller_id.
+    Queries unified_logs (through the caller-scoped unified_logs_costed_caller
+    view, so costs fetched after the call are included) to sum up costs, tokens, and call
+    counts for all sessions/messages with the given caller_id.
 
     Only counts rows with request_id set (actual LLM API calls),
     not all log messages (user, system, tool, etc.).
@@ -733,6 +1100,8 @@ def aggregate_query_costs(caller_id: str) -> dict:
     """
     try:
         from .db_adapter import get_db
+        from .unified_logs import flush_logs
+        flush_logs()
         db = get_db()
 
         result = db.query(f"""
@@ -741,9 +1110,8 @@ def aggregate_query_costs(caller_id: str) -> dict:
                 SUM(tokens_in) as total_tokens_in,
                 SUM(tokens_out) as total_tokens_out,
                 COUNT(*) as llm_calls_count
-            FROM unified_logs
-            WHERE caller_id = '{caller_id}'
-              AND request_id IS NOT NULL AND request_id != ''
+            FROM unified_logs_costed_caller(cid = '{caller_id}')
+            WHERE request_id IS NOT NULL AND request_id != ''
         """)
 
         if result:
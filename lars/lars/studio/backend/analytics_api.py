@@ -150,7 +150,7 @@ def get_cost_timeline():
                 SUM(cost) as total_cost,
                 SUM(tokens_in) as tokens_in,
                 SUM(tokens_out) as tokens_out
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE {where_clause} AND role = 'assistant'
             GROUP BY time_bucket, effective_model
             ORDER BY time_bucket DESC
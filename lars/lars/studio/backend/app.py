@@ -648,7 +648,7 @@ def get_cascade_definitions():
                     MIN(timestamp) as run_start,
                     MAX(timestamp) as run_end,
                     MAX(timestamp) - MIN(timestamp) as duration_seconds
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE cascade_id IS NOT NULL AND cascade_id != ''
                 GROUP BY cascade_id, session_id
             ),
@@ -657,7 +657,7 @@ def get_cascade_definitions():
                     cascade_id,
                     session_id,
                     SUM(cost) as total_cost
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE cost IS NOT NULL AND cost > 0 AND role = 'assistant'
                 GROUP BY cascade_id, session_id
             ),
@@ -687,7 +687,7 @@ def get_cascade_definitions():
                     cascade_id,
                     cell_name,
                     AVG(cost) as avg_cost
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE cascade_id IS NOT NULL AND cascade_id != ''
                   AND cell_name IS NOT NULL
                   AND cost IS NOT NULL AND cost > 0
@@ -1022,7 +1022,7 @@ def get_cascade_instances(cascade_id):
                 MIN(timestamp) as start_time,
                 MAX(timestamp) as end_time,
                 MAX(timestamp) - MIN(timestamp) as duration_seconds
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE cascade_id = ?
               AND (parent_session_id IS NULL OR parent_session_id = '')
             GROUP BY session_id, cascade_id
@@ -1037,7 +1037,7 @@ def get_cascade_instances(cascade_id):
                 MIN(l.timestamp) as start_time,
                 MAX(l.timestamp) as end_time,
                 MAX(l.timestamp) - MIN(l.timestamp) as duration_seconds
-            FROM unified_logs l
+            FROM unified_logs_costed l
             INNER JOIN parent_sessions p ON l.parent_session_id = p.session_id
             WHERE l.parent_session_id IS NOT NULL AND l.parent_session_id != ''
             GROUP BY l.session_id, l.parent_session_id
@@ -1055,7 +1055,7 @@ def get_cascade_instances(cascade_id):
             SELECT
                 session_id,
                 SUM(cost) as total_cost
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE cost IS NOT NULL AND cost > 0 AND role = 'assistant'
             GROUP BY session_id
         )
@@ -1191,7 +1191,7 @@ def get_cascade_instances(cascade_id):
                     session_id,
                     cell_name,
                     SUM(cost) as total_cost
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE session_id IN ({})
                   AND cell_name IS NOT NULL
                   AND cost IS NOT NULL
@@ -1218,7 +1218,7 @@ def get_cascade_instances(cascade_id):
                         session_id,
                         MIN(timestamp) as start_time,
                         MAX(timestamp) as end_time
-                    FROM unified_logs
+                    FROM unified_logs_costed
                     WHERE session_id IN ({})
                     GROUP BY session_id
                 ),
@@ -1228,7 +1228,7 @@ def get_cascade_instances(cascade_id):
                         CAST((l.timestamp - st.start_time) / ((st.end_time - st.start_time + 1) / 20.0) AS INTEGER) as bucket,
                         SUM(l.tokens_in) as tokens_in,
                         SUM(l.tokens_out) as tokens_out
-                    FROM unified_logs l
+                    FROM unified_logs_costed l
                     JOIN session_times st ON l.session_id = st.session_id
                     WHERE l.session_id IN ({})
                       AND (l.tokens_in IS NOT NULL OR l.tokens_out IS NOT NULL)
@@ -1294,7 +1294,7 @@ def get_cascade_instances(cascade_id):
                     model,
                     SUM(cost) as total_cost,
                     (MAX(timestamp) - MIN(timestamp)) as duration_seconds
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE session_id IN ({})
                   AND model IS NOT NULL AND model != ''
                   AND role = 'assistant'
@@ -1385,7 +1385,7 @@ def get_cascade_instances(cascade_id):
                         take_index,
                         turn_number,
                         SUM(cost) as turn_cost
-                    FROM unified_logs
+                    FROM unified_logs_costed
                     WHERE session_id IN ({})
                       AND cell_name IS NOT NULL AND cost IS NOT NULL AND cost > 0
                       AND role = 'assistant'
@@ -1400,7 +1400,7 @@ def get_cascade_instances(cascade_id):
                         take_index,
                         0 as turn_number,
                         SUM(cost) as turn_cost
-                    FROM unified_logs
+                    FROM unified_logs_costed
                     WHERE session_id IN ({})
                       AND cell_name IS NOT NULL AND cost IS NOT NULL AND cost > 0
                       AND role = 'assistant'
@@ -1480,7 +1480,7 @@ def get_cascade_instances(cascade_id):
                     MAX(CASE WHEN is_winner = true THEN 1 ELSE 0 END) as is_winner,
                     SUM(CASE WHEN role = 'assistant' THEN cost ELSE 0 END) as total_cost,
                     {model_select}
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE session_id IN ({','.join('?' * len(session_ids))})
                   AND take_index IS NOT NULL
                 GROUP BY session_id, cell_name, take_index
@@ -1865,10 +1865,14 @@ def get_cascade_instances(cascade_id):
 def get_session_detail(session_id):
     """Get detailed data for a specific session from ClickHouse."""
     try:
+        # Rows logged by cascades running in this process may still be queued
+        from lars.unified_logs import flush_logs
+        flush_logs()
+
         conn = get_db_connection()
 
-        query = "SELECT * FROM unified_logs WHERE session_id = ? ORDER BY timestamp"
-        result = conn.execute(query, [session_id]).fetchall()
+        query = "SELECT * FROM unified_logs_costed_session(sid = ?) WHERE session_id = ? ORDER BY timestamp"
+        result = conn.execute(query, [session_id, session_id]).fetchall()
 
         # Get column names
         columns = conn.execute("SELECT name FROM system.columns WHERE table = 'unified_logs' AND database = currentDatabase()").fetchall()
@@ -1953,13 +1957,13 @@ def get_session_execution_flow(session_id):
                 SUBSTRING(toString(content_json), 1, 500) as content_preview,
                 image_paths,
                 timestamp
-            FROM unified_logs
+            FROM unified_logs_costed_session(sid = ?)
             WHERE session_id = ?
               AND cell_name IS NOT NULL
               AND cell_name != ''
             ORDER BY timestamp ASC
         """
-        rows = conn.execute(query, [session_id]).fetchall()
+        rows = conn.execute(query, [session_id, session_id]).fetchall()
 
         if not rows:
             conn.close()
@@ -2201,13 +2205,13 @@ def get_session_cost(session_id):
         # but we only want to count it once (the assistant row is the final response)
         query = """
             SELECT SUM(cost) as total_cost
-            FROM unified_logs
+            FROM unified_logs_costed_session(sid = ?)
             WHERE session_id = ?
               AND cost IS NOT NULL
               AND cost > 0
               AND role = 'assistant'
         """
-        result = conn.execute(query, [session_id]).fetchone()
+        result = conn.execute(query, [session_id, session_id]).fetchone()
         conn.close()
 
         cost = result[0] if result and result[0] else None
@@ -2292,8 +2296,8 @@ def dump_session(session_id):
     try:
         conn = get_db_connection()
 
-        query = "SELECT * FROM unified_logs WHERE session_id = ? ORDER BY timestamp"
-        result = conn.execute(query, [session_id]).fetchall()
+        query = "SELECT * FROM unified_logs_costed_session(sid = ?) WHERE session_id = ? ORDER BY timestamp"
+        result = conn.execute(query, [session_id, session_id]).fetchall()
 
         if not result:
             return jsonify({'error': 'Session not found'}), 404
@@ -2368,13 +2372,13 @@ def get_takes_tree(session_id):
             mutation_type,
             mutation_template,
             full_request_json
-        FROM unified_logs
+        FROM unified_logs_costed_session(sid = ?)
         WHERE session_id = ?
           AND take_index IS NOT NULL
           AND node_type IN ('take_attempt', 'take_error', 'agent')
         ORDER BY timestamp, reforge_step, take_index, turn_number
         """
-        df = conn.execute(query, [session_id]).fetchdf()
+        df = conn.execute(query, [session_id, session_id]).fetchdf()
         conn.close()
 
         if df.empty:
@@ -4150,7 +4154,7 @@ def get_model_costs():
                 avg(cost) as avg_cost,
                 avg(duration_ms) as avg_duration_ms,
                 count(*) as usage_count
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE cost > 0 AND model IS NOT NULL
             GROUP BY model
             ORDER BY usage_count DESC
@@ -4246,7 +4250,7 @@ def playground_session_stream(session_id):
                 content_hash,
                 context_hashes,
                 estimated_tokens
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE (startsWith(session_id, '{session_id}') OR parent_session_id = '{session_id}')
               AND timestamp > '{after}'
             ORDER BY timestamp ASC
@@ -4359,7 +4363,7 @@ def playground_session_stream(session_id):
         # This ensures the UI shows accurate total regardless of pagination/polling
         cost_query = f"""
             SELECT SUM(cost) as total
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE startsWith(session_id, '{session_id}')
               AND cost > 0
         """
@@ -5718,7 +5722,7 @@ def debug_schema():
             COUNT(*) as msg_count,
             COUNT(DISTINCT cell_name) as cell_count,
             SUM(CASE WHEN cost IS NOT NULL AND cost > 0 THEN cost ELSE 0 END) as total_cost
-        FROM unified_logs
+        FROM unified_logs_costed
         WHERE cascade_id IS NOT NULL
         GROUP BY session_id, cascade_id
         ORDER BY MIN(timestamp) DESC
@@ -6211,7 +6215,7 @@ if __name__ == '__main__':
                 COUNT(DISTINCT cascade_id) as cascades,
                 COUNT(*) as messages,
                 SUM(CASE WHEN cost IS NOT NULL AND cost > 0 THEN cost ELSE 0 END) as total_cost
-            FROM unified_logs
+            FROM unified_logs_costed
         """).fetchone()
 
         print(f"📊 ClickHouse Data:")
@@ -6564,11 +6568,11 @@ def save_research_session_api():
 
         # Get entries
         entries_query = """
-            SELECT * FROM unified_logs
+            SELECT * FROM unified_logs_costed_session(sid = ?)
             WHERE session_id = ?
             ORDER BY timestamp
         """
-        entries_result = conn.execute(entries_query, [session_id]).fetchall()
+        entries_result = conn.execute(entries_query, [session_id, session_id]).fetchall()
 
         # Get column names for entries
         entries_columns = conn.execute(
@@ -106,7 +106,7 @@ def get_budget_status(session_id):
             tokens_out,
             node_type,
             role
-        FROM unified_logs
+        FROM unified_logs_costed_session(sid = %(session_id)s)
         WHERE session_id = %(session_id)s
           AND tokens_in IS NOT NULL
           AND tokens_in > 0
@@ -123,6 +123,9 @@ def get_message_flow(session_id):
     - Actual messages sent to LLM (from full_request_json)
     """
     try:
+        from lars.unified_logs import flush_logs
+        flush_logs()
+
         db = get_db()
 
         # Query all messages for this session
@@ -146,7 +149,7 @@ def get_message_flow(session_id):
             content_hash,
             context_hashes,
             estimated_tokens
-        FROM unified_logs
+        FROM unified_logs_costed_session(sid = '{session_id}')
         WHERE session_id = '{session_id}'
         ORDER BY timestamp
         """
@@ -547,7 +550,7 @@ def get_running_sessions():
             toUnixTimestamp(MAX(timestamp)) as last_activity,
             COUNT(*) as message_count,
             SUM(cost) as total_cost
-        FROM unified_logs
+        FROM unified_logs_costed
         WHERE timestamp > subtractMinutes(now64(), 10)
         GROUP BY session_id
         ORDER BY start_time DESC
@@ -174,7 +174,7 @@ def get_swimlanes():
                 max(timestamp) as latest_run,
                 sum(cost) as total_cost,
                 argMax(session_id, timestamp) as latest_session_id
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE cascade_id IS NOT NULL
                 AND cascade_id != ''
                 AND cost > 0
@@ -208,7 +208,7 @@ def get_swimlanes():
                         has_images,
                         images_json,
                         content_type
-                    FROM unified_logs
+                    FROM unified_logs_costed_session(sid = '{latest_session_id}')
                     WHERE session_id = '{latest_session_id}'
                         AND cost > 0
                         AND role = 'assistant'
@@ -355,7 +355,7 @@ def get_cascade_ids():
             SELECT
                 cascade_id,
                 count(DISTINCT session_id) as run_count
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE cascade_id IS NOT NULL
                 AND cascade_id != ''
                 AND cost > 0
@@ -422,7 +422,7 @@ def get_cell_detail(message_id):
                 tokens_in,
                 tokens_out,
                 content_type
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE message_id = '{message_id}'
             LIMIT 1
         """
@@ -575,7 +575,7 @@ def get_cascade_runs(cascade_id):
                 max(timestamp) as end_time,
                 sum(cost) as total_cost,
                 count(*) as message_count
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE cascade_id = '{cascade_id}'
                 AND cost > 0
                 AND role = 'assistant'
@@ -590,7 +590,7 @@ def get_cascade_runs(cascade_id):
         # Get cell names for column headers (from most recent run)
         cell_names_query = f"""
             SELECT DISTINCT cell_name, min(timestamp) as first_seen
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE cascade_id = '{cascade_id}'
                 AND cost > 0
                 AND role = 'assistant'
@@ -620,7 +620,7 @@ def get_cascade_runs(cascade_id):
                     has_images,
                     images_json,
                     content_type
-                FROM unified_logs
+                FROM unified_logs_costed_session(sid = '{session_id}')
                 WHERE session_id = '{session_id}'
                     AND cost > 0
                     AND role = 'assistant'
@@ -775,7 +775,7 @@ def get_content_type_stats():
             SELECT
                 content_type,
                 count(*) as cnt
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE role = 'assistant'
                 AND cost > 0
                 AND content_type IS NOT NULL
@@ -1118,7 +1118,7 @@ def get_tags_for_output(message_id):
                 # Check if this message is the latest for its cascade+cell
                 latest_query = f"""
                     SELECT message_id
-                    FROM unified_logs
+                    FROM unified_logs_costed
                     WHERE cascade_id = '{cascade_id}'
                       AND cell_name = '{cell_name}'
                       AND role = 'assistant'
@@ -1235,7 +1235,7 @@ def get_tagged_outputs():
                 if cascade_id and cell_name:
                     latest_query = f"""
                         SELECT message_id
-                        FROM unified_logs
+                        FROM unified_logs_costed
                         WHERE cascade_id = '{cascade_id}'
                           AND cell_name = '{cell_name}'
                           AND role = 'assistant'
@@ -1270,7 +1270,7 @@ def get_tagged_outputs():
                     has_images,
                     images_json,
                     content_type
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE message_id = '{message_id}'
                 LIMIT 1
             """
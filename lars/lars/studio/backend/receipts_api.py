@@ -102,7 +102,7 @@ def get_overview():
             SELECT
                 SUM(cost) as total_cost_sum,
                 COUNT(DISTINCT session_id) as session_count
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE timestamp >= toDateTime('{current_start.strftime('%Y-%m-%d %H:%M:%S')}')
               AND cost > 0
               AND role = 'assistant'
@@ -139,7 +139,7 @@ def get_overview():
             SELECT
                 SUM(cost) as total_cost_sum,
                 COUNT(DISTINCT session_id) as session_count
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE timestamp >= toDateTime('{prev_start.strftime('%Y-%m-%d %H:%M:%S')}')
               AND timestamp < toDateTime('{prev_end.strftime('%Y-%m-%d %H:%M:%S')}')
               AND cost > 0
@@ -624,7 +624,7 @@ def get_context_breakdown():
                     cell_name,
                     take_index,
                     any(is_winner) as is_winner
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE node_type = 'agent'
                   AND take_index IS NOT NULL
                 GROUP BY session_id, cell_name, take_index
@@ -791,7 +791,7 @@ def get_time_series():
                 {bucket_func} as bucket,
                 SUM(cost) as cost_sum,
                 COUNT(DISTINCT session_id) as run_count
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE timestamp >= toDateTime('{current_start.strftime('%Y-%m-%d %H:%M:%S')}')
               AND cost > 0
               AND role = 'assistant'
@@ -871,7 +871,7 @@ def get_by_cascade():
         # cascade_analytics only has completed sessions, missing long-running cascades like Calliope
         total_query = f"""
             SELECT SUM(cost) as grand_total
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE timestamp >= toDateTime('{current_start.strftime('%Y-%m-%d %H:%M:%S')}')
               AND cost > 0
               AND role = 'assistant'
@@ -886,7 +886,7 @@ def get_by_cascade():
                 SUM(cost) as cost_sum,
                 COUNT(DISTINCT session_id) as run_count,
                 SUM(cost) / COUNT(DISTINCT session_id) as avg_cost
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE timestamp >= toDateTime('{current_start.strftime('%Y-%m-%d %H:%M:%S')}')
               AND cost > 0
               AND role = 'assistant'
@@ -961,7 +961,7 @@ def get_by_model():
         # IMPORTANT: Query unified_logs for total to include ALL sessions (including in-progress)
         total_query = f"""
             SELECT SUM(cost) as grand_total
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE timestamp >= toDateTime('{current_start.strftime('%Y-%m-%d %H:%M:%S')}')
               AND cost > 0
               AND role = 'assistant'
@@ -977,7 +977,7 @@ def get_by_model():
                 SUM(cost) as cost_sum,
                 COUNT(*) as call_count,
                 SUM(tokens_in + tokens_out) as tokens_sum
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE timestamp >= toDateTime('{current_start.strftime('%Y-%m-%d %H:%M:%S')}')
               AND cost > 0
               AND role = 'assistant'
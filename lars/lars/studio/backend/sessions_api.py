@@ -259,7 +259,7 @@ def _enrich_sessions_with_metrics(sessions: list) -> list:
                     session_id,
                     SUM(cost) as total_cost,
                     COUNT(*) as message_count
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE session_id IN ('{fallback_ids_str}')
                 GROUP BY session_id
             """
@@ -422,7 +422,7 @@ def _include_virtual_sessions(existing_sessions: list, cascade_id_filter: str |
                 SUM(cost) as total_cost,
                 COUNT(*) as message_count,
                 groupArray(DISTINCT model) as models
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE timestamp > now() - INTERVAL 7 DAY
             {cascade_filter}
             GROUP BY session_id, cascade_id
@@ -794,7 +794,7 @@ def get_console_kpis():
             SELECT
                 SUM(cost) as total,
                 COUNT(DISTINCT session_id) as session_count
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE timestamp > now() - INTERVAL 1 DAY
               AND cost > 0
               AND role = 'assistant'
@@ -808,7 +808,7 @@ def get_console_kpis():
             SELECT
                 SUM(cost) as total,
                 COUNT(DISTINCT session_id) as session_count
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE timestamp BETWEEN now() - INTERVAL 2 DAY AND now() - INTERVAL 1 DAY
               AND cost > 0
               AND role = 'assistant'
@@ -48,7 +48,7 @@ def list_cascades_with_takes():
                 MIN(timestamp) as first_run,
                 MAX(timestamp) as last_run,
                 SUM(CASE WHEN role = 'assistant' THEN cost ELSE 0 END) as total_cost
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE take_index IS NOT NULL
               AND cascade_id IS NOT NULL
               AND cascade_id != ''
@@ -106,7 +106,7 @@ def list_species(cascade_id, cell_name):
                 MIN(sa.timestamp) as first_seen,
                 MAX(sa.timestamp) as last_seen,
                 SUM(CASE WHEN agent.role = 'assistant' THEN agent.cost ELSE 0 END) as total_cost
-            FROM unified_logs sa
+            FROM unified_logs_costed sa
             LEFT JOIN unified_logs agent ON
                 agent.session_id = sa.session_id
                 AND agent.take_index = sa.take_index
@@ -283,7 +283,7 @@ def analyze_cascade(cascade_id):
                     COUNT(*) as attempts,
                     AVG(CASE WHEN cost > 0 THEN cost ELSE NULL END) as avg_cost,
                     AVG(CASE WHEN duration_ms > 0 THEN duration_ms ELSE NULL END) as avg_duration
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE cascade_id = '{cascade_id}'
                   AND cell_name = '{cell_name}'
                   AND node_type = 'take_attempt'
@@ -448,10 +448,10 @@ def winner_loser_analysis(cascade_id, cell_name):
                 s.mutation_type AS mutation_type,
                 s.species_hash AS species_hash,
                 a.timestamp
-            FROM unified_logs a
+            FROM unified_logs_costed a
             INNER JOIN (
                 SELECT take_index, is_winner, session_id, mutation_type, species_hash
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE cascade_id = '{cascade_id}'
                   AND cell_name = '{cell_name}'
                   AND node_type = 'take_attempt'
@@ -494,10 +494,10 @@ def winner_loser_analysis(cascade_id, cell_name):
                 s.mutation_type AS mutation_type,
                 s.species_hash AS species_hash,
                 a.timestamp
-            FROM unified_logs a
+            FROM unified_logs_costed a
             INNER JOIN (
                 SELECT take_index, is_winner, session_id, mutation_type, species_hash
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE cascade_id = '{cascade_id}'
                   AND cell_name = '{cell_name}'
                   AND node_type = 'take_attempt'
@@ -950,7 +950,7 @@ def get_winning_samples(cascade_id, cell_name):
                 model,
                 species_hash,
                 timestamp
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE cascade_id = '{cascade_id}'
               AND cell_name = '{cell_name}'
               AND is_winner = true
@@ -1050,10 +1050,10 @@ def embedding_hotspots(cascade_id, cell_name):
                 a.cost,
                 a.species_hash,
                 s.is_winner AS is_winner
-            FROM unified_logs a
+            FROM unified_logs_costed a
             INNER JOIN (
                 SELECT take_index, is_winner, session_id
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE cascade_id = '{cascade_id}'
                   AND cell_name = '{cell_name}'
                   AND node_type = 'take_attempt'
@@ -1940,10 +1940,10 @@ def prompt_patterns(cascade_id, cell_name):
                 a.cost,
                 s.is_winner AS is_winner,
                 s.species_hash AS species_hash
-            FROM unified_logs a
+            FROM unified_logs_costed a
             INNER JOIN (
                 SELECT take_index, is_winner, session_id, species_hash
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE cascade_id = '{cascade_id}'
                   AND cell_name = '{cell_name}'
                   AND node_type = 'take_attempt'
@@ -2517,7 +2517,7 @@ def get_prompt_evolution(session_id):
                 SUM(CASE WHEN agent.role = 'assistant' THEN agent.cost ELSE 0 END) as cost,
                 any(user_msg.content_json) as baseline_prompt_json
                 {future_filter.replace('timestamp', 'sa.timestamp') if future_filter else ''}
-            FROM unified_logs sa
+            FROM unified_logs_costed sa
             LEFT JOIN unified_logs agent ON
                 agent.session_id = sa.session_id
                 AND agent.take_index = sa.take_index
@@ -2815,7 +2815,7 @@ def get_species_info(session_id):
                     COUNT(DISTINCT take_index) as take_count,
                     SUM(CASE WHEN is_winner = true THEN 1 ELSE 0 END) as winner_count,
                     SUM(CASE WHEN role = 'assistant' THEN cost ELSE 0 END) as total_cost
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE cascade_id = '{cascade_id}'
                 AND cell_name = '{cell_name}'
                 AND species_hash = '{species_hash}'
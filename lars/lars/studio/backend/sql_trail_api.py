@@ -11,6 +11,7 @@ Routes:
 - /api/sql-trail/patterns - Query fingerprints grouped by pattern
 - /api/sql-trail/cache-stats - Cache hit/miss analytics
 - /api/sql-trail/time-series - Query count and cost over time
+- /api/sql-trail/llm-scheduler - Live LLM request scheduler lanes and queue waits
 """
 
 import os
@@ -125,7 +126,7 @@ def get_overview():
                     caller_id,
                     SUM(cost) as total_cost,
                     COUNT(*) as llm_calls_count
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE caller_id LIKE 'sql-%%'
                   AND timestamp >= toDateTime('{current_start.strftime('%Y-%m-%d %H:%M:%S')}')
                   AND request_id IS NOT NULL AND request_id != ''
@@ -199,7 +200,7 @@ def get_overview():
                 SELECT
                     caller_id,
                     SUM(cost) as total_cost
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE caller_id LIKE 'sql-%%'
                   AND timestamp >= toDateTime('{current_start.strftime('%Y-%m-%d %H:%M:%S')}')
                   AND request_id IS NOT NULL AND request_id != ''
@@ -229,7 +230,7 @@ def get_overview():
                 SELECT
                     caller_id,
                     SUM(cost) as total_cost
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE caller_id LIKE 'sql-%%'
                   AND timestamp >= toDateTime('{current_start.strftime('%Y-%m-%d %H:%M:%S')}')
                   AND request_id IS NOT NULL AND request_id != ''
@@ -367,6 +368,11 @@ def get_queries():
                 q.cache_misses,
                 q.rows_input,
                 q.rows_output,
+                q.udf_rows,
+                q.udf_distinct_calls,
+                q.packed_rows,
+                q.packed_calls,
+                q.pack_tokens_saved,
                 COALESCE(c.llm_calls_count, 0) as llm_calls_count,
                 q.cascade_count,
                 q.cascade_paths,
@@ -378,7 +384,7 @@ def get_queries():
                     caller_id,
                     SUM(cost) as total_cost,
                     COUNT(*) as llm_calls_count
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE caller_id LIKE 'sql-%%'
                   AND request_id IS NOT NULL AND request_id != ''
                 GROUP BY caller_id
@@ -416,6 +422,11 @@ def get_queries():
                 'cache_rate': round(cache_rate, 1),
                 'rows_input': safe_int(row.get('rows_input')),
                 'rows_output': safe_int(row.get('rows_output')),
+                'udf_rows': safe_int(row.get('udf_rows')),
+                'udf_distinct_calls': safe_int(row.get('udf_distinct_calls')),
+                'packed_rows': safe_int(row.get('packed_rows')),
+                'packed_calls': safe_int(row.get('packed_calls')),
+                'pack_tokens_saved': safe_int(row.get('pack_tokens_saved')),
                 'llm_calls_count': safe_int(row.get('llm_calls_count')),
                 'cascade_count': safe_int(row.get('cascade_count')),
                 'cascade_paths': row.get('cascade_paths', []),
@@ -467,7 +478,7 @@ def get_query_detail(caller_id: str):
                     SUM(tokens_in) as total_tokens_in,
                     SUM(tokens_out) as total_tokens_out,
                     COUNT(*) as llm_calls_count
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE caller_id = '{caller_id}'
                   AND request_id IS NOT NULL AND request_id != ''
                 GROUP BY caller_id
@@ -526,7 +537,7 @@ def get_query_detail(caller_id: str):
                 MIN(timestamp) as started_at,
                 MAX(timestamp) as completed_at,
                 COUNT(*) as message_count
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE caller_id = '{caller_id}'
               AND session_id != ''
             GROUP BY session_id, cascade_id
@@ -542,7 +553,7 @@ def get_query_detail(caller_id: str):
                 SUM(cost) as total_cost,
                 SUM(tokens_in) as tokens_in,
                 SUM(tokens_out) as tokens_out
-            FROM unified_logs
+            FROM unified_logs_costed
             WHERE caller_id = '{caller_id}'
               AND model IS NOT NULL
               AND model != ''
@@ -566,6 +577,11 @@ def get_query_detail(caller_id: str):
                 'duration_ms': round(safe_float(query_row.get('duration_ms')), 2),
                 'rows_input': safe_int(query_row.get('rows_input')),
                 'rows_output': safe_int(query_row.get('rows_output')),
+                'udf_rows': safe_int(query_row.get('udf_rows')),
+                'udf_distinct_calls': safe_int(query_row.get('udf_distinct_calls')),
+                'packed_rows': safe_int(query_row.get('packed_rows')),
+                'packed_calls': safe_int(query_row.get('packed_calls')),
+                'pack_tokens_saved': safe_int(query_row.get('pack_tokens_saved')),
                 'total_cost': round(safe_float(query_row.get('mv_total_cost')), 4),
                 'total_tokens_in': safe_int(query_row.get('mv_total_tokens_in')),
                 'total_tokens_out': safe_int(query_row.get('mv_total_tokens_out')),
@@ -682,7 +698,7 @@ def get_patterns():
                 SELECT
                     caller_id,
                     SUM(cost) as total_cost
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE caller_id LIKE 'sql-%%'
                   AND timestamp >= toDateTime('{current_start.strftime('%Y-%m-%d %H:%M:%S')}')
                   AND request_id IS NOT NULL AND request_id != ''
@@ -775,7 +791,7 @@ def get_cache_stats():
             FROM sql_query_log q
             LEFT JOIN (
                 SELECT caller_id, SUM(cost) as total_cost
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE caller_id LIKE 'sql-%%'
                   AND timestamp >= toDateTime('{current_start.strftime('%Y-%m-%d %H:%M:%S')}')
                   AND request_id IS NOT NULL AND request_id != ''
@@ -808,7 +824,7 @@ def get_cache_stats():
             FROM sql_query_log q
             LEFT JOIN (
                 SELECT caller_id, SUM(cost) as total_cost
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE caller_id LIKE 'sql-%%'
                   AND timestamp >= toDateTime('{current_start.strftime('%Y-%m-%d %H:%M:%S')}')
                   AND request_id IS NOT NULL AND request_id != ''
@@ -949,7 +965,7 @@ def get_time_series():
                     caller_id,
                     SUM(cost) as total_cost,
                     COUNT(*) as llm_calls_count
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE caller_id LIKE 'sql-%%'
                   AND timestamp >= toDateTime('{current_start.strftime('%Y-%m-%d %H:%M:%S')}')
                   AND request_id IS NOT NULL AND request_id != ''
@@ -998,6 +1014,28 @@ def get_time_series():
         return jsonify({'error': str(e)}), 500
 
 
+@sql_trail_bp.route('/api/sql-trail/llm-scheduler', methods=['GET'])
+def get_llm_scheduler_stats():
+    """
+    Live stats of this process's LLM request scheduler.
+
+    Returns:
+        {
+            defaults: {concurrency, rpm, tpm},
+            waiting: int,
+            lanes: {name: {in_flight, max_in_flight, waiting, granted, throttled, tokens, ...}},
+            priorities: {interactive|bulk: {requests, queued, avg_wait_ms, p50_wait_ms, p95_wait_ms, max_wait_ms}},
+            async_loop: {running, clients, max_connections, batches, tasks, in_flight, max_in_flight} | null
+        }
+    """
+    try:
+        from lars.async_llm import get_llm_loop_stats
+        from lars.llm_scheduler import get_llm_scheduler
+        return jsonify({**get_llm_scheduler().get_stats(), 'async_loop': get_llm_loop_stats()})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @sql_trail_bp.route('/api/sql-trail/query/<caller_id>/results', methods=['GET'])
 def get_query_results(caller_id: str):
     """
@@ -1277,7 +1315,7 @@ def get_cell_attribution(caller_id: str):
                         source_column_name,
                         JSONExtractString(invocation_metadata_json, 'source', 'column')
                     ) as source_column_name
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE caller_id = '{safe_caller_id}'
                   AND session_id IS NOT NULL AND session_id != ''
                   AND (
@@ -1331,7 +1369,7 @@ def get_cell_attribution(caller_id: str):
         models_query = f"""
             WITH cell_sessions AS (
                 SELECT DISTINCT session_id
-                FROM unified_logs
+                FROM unified_logs_costed
                 WHERE caller_id = '{safe_caller_id}'
                   AND session_id IS NOT NULL AND session_id != ''
                   AND (
@@ -1440,7 +1478,7 @@ def get_session_messages(session_id: str):
                 timestamp,
                 tool_calls_json,
                 cascade_id
-            FROM unified_logs
+            FROM unified_logs_costed_session(sid = '{safe_session_id}')
             WHERE session_id = '{safe_session_id}'{cell_clause}
             ORDER BY timestamp
             LIMIT {limit}
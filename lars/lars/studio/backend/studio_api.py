@@ -1339,7 +1339,9 @@ def get_session_state(session_id):
     """
     try:
         from lars.db_adapter import get_db
+        from lars.unified_logs import flush_logs
 
+        flush_logs()
         db = get_db()
 
         query = f"""
@@ -1432,7 +1434,7 @@ def get_cell_messages(session_id, cell_name):
                 trace_id,
                 images_json,
                 has_images
-            FROM unified_logs
+            FROM unified_logs_costed_session(sid = '{session_id}')
             WHERE session_id = '{session_id}'
               AND cell_name = '{cell_name}'
               AND role IN ('user', 'assistant', 'tool', 'system')
@@ -4,6 +4,7 @@ Tool Browser API - Browse and test all available LARS tools
 Provides endpoints for:
 - /api/tools/manifest - Get list of all tools with schemas
 - /api/tools/execute - Execute a tool by creating ephemeral cascade
+- /api/tools/cache-stats - Shared tool result cache stats per tool
 """
 import os
 import sys
@@ -45,6 +46,28 @@ def get_tools_manifest():
         return jsonify({"error": f"Failed to load tool manifest: {str(e)}"}), 500
 
 
+@tool_browser_bp.route('/cache-stats', methods=['GET'])
+def get_tool_cache_stats():
+    """
+    Get stats of the process-wide tool result cache.
+
+    Returns:
+        {
+            "size": 120, "max_size": 10000,
+            "tools": {
+                "tool_name": {"hits": 10, "persistent_hits": 2, "misses": 5,
+                              "sets": 5, "evictions": 0, "hit_rate": 0.7059, "entries": 5}
+            },
+            "persistent": {"sqlite": {"tool_name": 42}}
+        }
+    """
+    try:
+        from lars.tool_cache import get_tool_cache_stats as _get_tool_cache_stats
+        return jsonify(_get_tool_cache_stats())
+    except Exception as e:
+        return jsonify({"error": f"Failed to get tool cache stats: {str(e)}"}), 500
+
+
 @tool_browser_bp.route('/execute', methods=['POST'])
 def execute_tool():
     """
@@ -5,8 +5,13 @@ Prevents context explosion by tracking token usage and enforcing limits
 with multiple strategies (sliding_window, prune_oldest, summarize, fail).
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
+import hashlib
 import logging
+import threading
+
+from .unified_logs import compute_content_hash
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +24,16 @@ except ImportError:
     logger.warning("tiktoken not available, using approximate token counting")
 
 
+# Per-message token counts by (encoding, message content hash), shared by all
+# managers in the process so sub-cascades and re-runs reuse them
+TOKEN_COUNT_CACHE_MAX_ENTRIES = 50000
+_token_counts: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+_token_counts_lock = threading.Lock()
+
+# Below this many uncounted texts, encode() one by one (encode_batch spins up threads)
+ENCODE_BATCH_MIN = 8
+
+
 class TokenBudgetExceeded(Exception):
     """Raised when token budget is exceeded with 'fail' strategy."""
     def __init__(self, status: Dict[str, Any]):
@@ -57,6 +72,15 @@ class TokenBudgetManager:
 
         self.current_usage = 0
 
+        # id(message) -> (message, content, tool_calls, tokens) for the messages
+        # counted last; lets a check skip hashing messages it has already seen
+        self._counted: Dict[int, Tuple[Dict, Any, Any, int]] = {}
+        self.stats = {"messages_seen": 0, "messages_hashed": 0, "messages_tokenized": 0}
+
+    @property
+    def _encoding_name(self) -> str:
+        return self.encoding.name if self.encoding else "approx"
+
     def _normalize_model(self, model: str) -> str:
         """Normalize model name for tiktoken."""
         # OpenRouter format: provider/model -> model
@@ -83,6 +107,11 @@ class TokenBudgetManager:
         """
         Count tokens in message list.
 
+        Counts are kept per message: messages already counted by this manager
+        (same dict, content and tool_calls objects) are not re-hashed, others
+        are looked up by content hash, and only never-seen content is
+        tokenized, in one batch.
+
         Args:
             messages: List of message dicts with role/content/tool_calls
 
@@ -91,34 +120,113 @@ class TokenBudgetManager:
         """
         if not messages:
             return 0
+        return sum(self._message_token_counts(messages))
 
-        total = 0
+    def _message_token_counts(self, messages: List[Dict]) -> List[int]:
+        """Token count of each message (overhead, content and tool calls)."""
+        counts: List[Optional[int]] = []
+        counted: Dict[int, Tuple[Dict, Any, Any, int]] = {}
+        pending: Dict[Tuple[str, str], List[int]] = {}  # cache key -> indexes to fill in
+        pending_messages: Dict[Tuple[str, str], Dict] = {}
 
-        for msg in messages:
+        self.stats["messages_seen"] += len(messages)
+        for i, msg in enumerate(messages):
+            content = msg.get("content")
+            tool_calls = msg.get("tool_calls")
+            seen = self._counted.get(id(msg))
+            if seen is not None and seen[0] is msg and seen[1] is content and seen[2] is tool_calls:
+                counts.append(seen[3])
+                counted[id(msg)] = seen
+                continue
+
+            self.stats["messages_hashed"] += 1
+            key = (self._encoding_name, self._message_key(msg))
+            with _token_counts_lock:
+                tokens = _token_counts.get(key)
+                if tokens is not None:
+                    _token_counts.move_to_end(key)
+            if tokens is None:
+                pending.setdefault(key, []).append(i)
+                pending_messages[key] = msg
+            else:
+                counted[id(msg)] = (msg, content, tool_calls, tokens)
+            counts.append(tokens)
+
+        if pending:
+            keys = list(pending)
+            self.stats["messages_tokenized"] += len(keys)
+            for key, tokens in zip(keys, self._count_messages_uncached([pending_messages[k] for k in keys])):
+                with _token_counts_lock:
+                    _token_counts[key] = tokens
+                    while len(_token_counts) > TOKEN_COUNT_CACHE_MAX_ENTRIES:
+                        _token_counts.popitem(last=False)
+                for i in pending[key]:
+                    msg = messages[i]
+                    counts[i] = tokens
+                    counted[id(msg)] = (msg, msg.get("content"), msg.get("tool_calls"), tokens)
+
+        self._counted = counted
+        return counts
+
+    @staticmethod
+    def _message_key(msg: Dict) -> str:
+        """Content hash of a message (as unified_logs computes it) plus its tool calls."""
+        try:
+            key = compute_content_hash(msg.get("role"), msg.get("content"))
+        except (TypeError, ValueError):
+            key = compute_content_hash(msg.get("role"), str(msg.get("content")))
+        if msg.get("tool_calls"):
+            key += ":" + hashlib.sha256(str(msg["tool_calls"]).encode("utf-8")).hexdigest()[:16]
+        return key
+
+    def _count_messages_uncached(self, messages: List[Dict]) -> List[int]:
+        """Tokenize messages, encoding all of their texts in one batch."""
+        texts: List[str] = []
+        owners: List[int] = []
+        totals = []
+
+        for i, msg in enumerate(messages):
             # Count message overhead (~4 tokens per message)
-            total += 4
+            total = 4
 
             # Count content
             content = msg.get("content")
             if content:
                 if isinstance(content, str):
-                    total += self._count_text(content)
+                    texts.append(content)
+                    owners.append(i)
                 elif isinstance(content, list):
                     # Multi-modal content (text + images)
                     for item in content:
                         if isinstance(item, dict):
                             if item.get("type") == "text":
-                                total += self._count_text(item.get("text", ""))
+                                texts.append(item.get("text", ""))
+                                owners.append(i)
                             elif item.get("type") == "image_url":
                                 # Images are expensive - rough estimate
                                 total += 765  # Average for medium images
 
             # Count tool calls
             if msg.get("tool_calls"):
-                tool_str = str(msg["tool_calls"])
-                total += self._count_text(tool_str)
-
-        return total
+                texts.append(str(msg["tool_calls"]))
+                owners.append(i)
+
+            totals.append(total)
+
+        for owner, tokens in zip(owners, self._count_texts(texts)):
+            totals[owner] += tokens
+        return totals
+
+    def _count_texts(self, texts: List[str]) -> List[int]:
+        """Count tokens in several texts, with one encode_batch call when there are many."""
+        if self.encoding and len(texts) >= ENCODE_BATCH_MIN:
+            nonempty = [i for i, text in enumerate(texts) if text]
+            counts = [0] * len(texts)
+            encoded = self.encoding.encode_batch([texts[i] for i in nonempty])
+            for i, tokens in zip(nonempty, encoded):
+                counts[i] = len(tokens)
+            return counts
+        return [self._count_text(text) for text in texts]
 
     def _count_text(self, text: str) -> int:
         """Count tokens in text string."""
@@ -206,12 +314,12 @@ class TokenBudgetManager:
 
         # Calculate available tokens
         available = self.config.max_total - self.config.reserve_for_output
-        current = self.count_tokens(preserved)
+        counts = self._message_token_counts(messages)
+        current = sum(counts[:start_idx])
 
         # Work backwards from most recent
         recent_msgs = []
-        for msg in reversed(messages[start_idx:]):
-            msg_tokens = self.count_tokens([msg])
+        for msg, msg_tokens in zip(reversed(messages[start_idx:]), reversed(counts[start_idx:])):
             if current + msg_tokens <= available:
                 recent_msgs.insert(0, msg)
                 current += msg_tokens
@@ -243,8 +351,9 @@ class TokenBudgetManager:
         available = self.config.max_total - self.config.reserve_for_output
 
         # Start with all indices
-        kept_indices = list(range(len(messages)))
-        current = self.count_tokens(messages)
+        counts = self._message_token_counts(messages)
+        removed = set()
+        current = sum(counts)
 
         # Remove oldest non-critical messages
         for i in range(len(messages)):
@@ -255,13 +364,10 @@ class TokenBudgetManager:
                 continue
 
             # Remove this message
-            if i in kept_indices:
-                kept_indices.remove(i)
-                # Recalculate tokens
-                kept_messages = [messages[j] for j in kept_indices]
-                current = self.count_tokens(kept_messages)
+            removed.add(i)
+            current -= counts[i]
 
-        result = [messages[i] for i in sorted(kept_indices)]
+        result = [msg for i, msg in enumerate(messages) if i not in removed]
         pruned_count = len(messages) - len(result)
 
         if pruned_count > 0:
@@ -6,12 +6,22 @@ Caches tool results based on input arguments to avoid redundant:
 - SQL executions
 - API calls
 - Any deterministic tool operation
+
+Results live in one process-wide LRU shared by every runner, so SQL UDFs that
+start a new runner per row still hit results cached by earlier rows. With
+tool_caching.storage set to 'sqlite' or 'clickhouse', results that encode as
+JSON are also persisted and survive restarts. TTLs come from the reading
+cascade's ToolCachePolicy.
 """
 
+import atexit
 import hashlib
 import json
+import os
+import sqlite3
+import threading
 import time
-from typing import Any, Dict, Optional, Callable
+from typing import Any, Dict, Optional, Callable, Tuple
 from collections import OrderedDict
 import logging
 
@@ -27,6 +37,299 @@ class CacheEntry:
         self.timestamp = timestamp
 
 
+class SQLiteToolResultStore:
+    """Persistent tool results in a local SQLite file, pruned past the largest policy TTL."""
+
+    PRUNE_INTERVAL = 300.0  # Seconds between expiry sweeps on put
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tool_result_cache ("
+            "cache_key TEXT PRIMARY KEY, tool TEXT NOT NULL, result TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS tool_result_cache_tool ON tool_result_cache (tool)")
+        self._lock = threading.Lock()
+        self.max_ttl = 0.0
+        self._last_prune = 0.0
+
+    def ensure_ttl(self, ttl: float):
+        """Keep rows for at least ttl seconds (the largest policy TTL wins)."""
+        with self._lock:
+            self.max_ttl = max(self.max_ttl, ttl)
+
+    def get(self, tool_name: str, cache_key: str) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, created_at FROM tool_result_cache WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def put(self, tool_name: str, cache_key: str, result_json: str, created_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tool_result_cache (cache_key, tool, result, created_at) VALUES (?, ?, ?, ?)",
+                (cache_key, tool_name, result_json, created_at),
+            )
+            now = time.time()
+            if self.max_ttl and now - self._last_prune >= self.PRUNE_INTERVAL:
+                self._last_prune = now
+                self._conn.execute("DELETE FROM tool_result_cache WHERE created_at < ?", (now - self.max_ttl,))
+
+    def delete_tool(self, tool_name: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM tool_result_cache WHERE tool = ?", (tool_name,))
+
+    def count_by_tool(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT tool, COUNT(*) FROM tool_result_cache GROUP BY tool").fetchall()
+        return {tool: count for tool, count in rows}
+
+
+class ClickHouseToolResultStore:
+    """Persistent tool results in the ClickHouse tool_result_cache table, written in background batches."""
+
+    TABLE = "tool_result_cache"
+
+    def __init__(self, db):
+        from .schema import TOOL_RESULT_CACHE_SCHEMA
+        from .batch_writer import BatchTableWriter
+
+        self._db = db
+        db.ensure_table_exists(self.TABLE, TOOL_RESULT_CACHE_SCHEMA)
+        self._writer = BatchTableWriter(
+            lambda: self._db, self.TABLE, batch_size=200, flush_interval=1.0,
+            overflow="drop_newest", name="ToolCacheWriter",
+        )
+        atexit.register(self._writer.shutdown)
+
+    def ensure_ttl(self, ttl: float):
+        """No-op: the table TTL expires old rows."""
+
+    def get(self, tool_name: str, cache_key: str) -> Optional[Tuple[str, float]]:
+        rows = self._db.query(
+            f"""
+            SELECT result, created_at
+            FROM {self.TABLE}
+            WHERE tool = %(tool)s AND cache_key = %(key)s
+            ORDER BY created_at DESC
+            LIMIT 1
+            """,
+            {"tool": tool_name, "key": cache_key},
+        )
+        if not rows:
+            return None
+        row = rows[0]
+        if isinstance(row, dict):
+            return row["result"], row["created_at"]
+        return row[0], row[1]
+
+    def put(self, tool_name: str, cache_key: str, result_json: str, created_at: float):
+        self._writer.write({
+            "cache_key": cache_key,
+            "tool": tool_name,
+            "result": result_json,
+            "created_at": created_at,
+        })
+
+    def delete_tool(self, tool_name: str):
+        self._writer.flush()
+        self._db.execute(f"DELETE FROM {self.TABLE} WHERE tool = %(tool)s", {"tool": tool_name})
+
+    def count_by_tool(self) -> Dict[str, int]:
+        rows = self._db.query(f"SELECT tool, count() AS entries FROM {self.TABLE} FINAL GROUP BY tool")
+        return {row["tool"]: int(row["entries"]) for row in rows or []}
+
+    def flush(self):
+        self._writer.flush()
+
+
+class SharedToolCache:
+    """
+    Process-wide LRU of tool results with per-tool stats.
+
+    Every ToolCache reads and writes through this, handing in its policy TTL
+    and (optionally) a persistent store consulted on LRU misses.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._tool_stats: Dict[str, Dict[str, int]] = {}
+
+    def ensure_capacity(self, max_entries: int):
+        """Grow the LRU to hold at least max_entries (the largest cascade max_cache_size wins)."""
+        with self._lock:
+            self.max_entries = max(self.max_entries, max_entries)
+
+    def _count(self, tool_name: str, stat: str, n: int = 1):
+        stats = self._tool_stats.get(tool_name)
+        if stats is None:
+            stats = self._tool_stats[tool_name] = {
+                "hits": 0, "persistent_hits": 0, "misses": 0, "sets": 0, "evictions": 0,
+            }
+        stats[stat] += n
+
+    def get(self, tool_name: str, cache_key: str, ttl: float, store=None) -> Tuple[bool, Any]:
+        """
+        Look a result up in the LRU, then the persistent store.
+
+        Returns:
+            (found, result); persistent hits are promoted into the LRU
+        """
+        now = time.time()
+        with self._lock:
+            entry = self.entries.get(cache_key)
+            if entry is not None:
+                if now - entry.timestamp < ttl:
+                    self.entries.move_to_end(cache_key)
+                    self._count(tool_name, "hits")
+                    return True, entry.result
+                del self.entries[cache_key]
+
+        if store is not None:
+            try:
+                row = store.get(tool_name, cache_key)
+            except Exception as e:
+                logger.debug(f"Tool cache persistent lookup failed: {e}")
+                row = None
+            if row is not None and now - row[1] < ttl:
+                result = json.loads(row[0])
+                with self._lock:
+                    self.entries[cache_key] = CacheEntry(tool_name, {}, result, row[1])
+                    self._evict()
+                    self._count(tool_name, "persistent_hits")
+                return True, result
+
+        with self._lock:
+            self._count(tool_name, "misses")
+        return False, None
+
+    def set(self, tool_name: str, cache_key: str, entry: CacheEntry, store=None) -> int:
+        """Store a result; returns how many entries were evicted to make room."""
+        with self._lock:
+            self.entries[cache_key] = entry
+            self.entries.move_to_end(cache_key)
+            evicted = self._evict()
+            self._count(tool_name, "sets")
+
+        if store is not None:
+            try:
+                result_json = json.dumps(entry.result)
+            except (TypeError, ValueError):
+                # Not JSON-encodable: keep it in memory only
+                result_json = None
+            if result_json is not None:
+                try:
+                    store.put(tool_name, cache_key, result_json, entry.timestamp)
+                except Exception as e:
+                    logger.debug(f"Tool cache persistent write failed: {e}")
+        return evicted
+
+    def _evict(self) -> int:
+        evicted = 0
+        while len(self.entries) > self.max_entries:
+            _, entry = self.entries.popitem(last=False)
+            self._count(entry.tool, "evictions")
+            evicted += 1
+        return evicted
+
+    def drop_tool(self, tool_name: str, store=None) -> int:
+        """Remove every cached result of a tool (memory and persistent store)."""
+        with self._lock:
+            keys = [k for k, v in self.entries.items() if v.tool == tool_name]
+            for key in keys:
+                del self.entries[key]
+        if store is not None:
+            try:
+                store.delete_tool(tool_name)
+            except Exception as e:
+                logger.warning(f"Tool cache persistent delete failed for {tool_name}: {e}")
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self._tool_stats.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            tools = {}
+            for tool_name, stats in self._tool_stats.items():
+                hits = stats["hits"] + stats["persistent_hits"]
+                total = hits + stats["misses"]
+                tools[tool_name] = dict(stats, hit_rate=round(hits / total, 4) if total else 0.0)
+            for entry in self.entries.values():
+                tools.setdefault(entry.tool, {}).setdefault("entries", 0)
+                tools[entry.tool]["entries"] += 1
+            return {
+                "size": len(self.entries),
+                "max_size": self.max_entries,
+                "tools": tools,
+            }
+
+
+_shared_cache: Optional[SharedToolCache] = None
+_stores: Dict[str, Any] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_tool_cache() -> SharedToolCache:
+    """Process-wide tool result LRU."""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_lock:
+            if _shared_cache is None:
+                from .config import get_config
+                _shared_cache = SharedToolCache(get_config().tool_cache_max_entries)
+    return _shared_cache
+
+
+def get_tool_result_store(storage: str):
+    """Process-wide persistent store for a tool_caching.storage value, or None for memory-only."""
+    if storage == "memory":
+        return None
+    if storage in _stores:
+        return _stores[storage]
+    with _shared_lock:
+        if storage not in _stores:
+            store = None
+            try:
+                if storage == "sqlite":
+                    from .config import get_config
+                    config = get_config()
+                    path = config.tool_cache_sqlite_path or os.path.join(config.data_dir, "tool_cache.sqlite")
+                    store = SQLiteToolResultStore(path)
+                elif storage == "clickhouse":
+                    from .db_adapter import get_db
+                    store = ClickHouseToolResultStore(get_db())
+                else:
+                    logger.warning(f"Tool cache storage '{storage}' is not supported; using memory only")
+            except Exception as e:
+                logger.warning(f"Tool cache {storage} store unavailable, using memory only: {e}")
+            _stores[storage] = store
+    return _stores[storage]
+
+
+def get_tool_cache_stats() -> Dict[str, Any]:
+    """Shared LRU stats (per tool) plus entry counts of the persistent stores opened in this process."""
+    stats = get_shared_tool_cache().get_stats()
+    persistent = {}
+    for storage, store in list(_stores.items()):
+        if store is None:
+            continue
+        try:
+            persistent[storage] = store.count_by_tool()
+        except Exception as e:
+            persistent[storage] = {"error": str(e)}
+    stats["persistent"] = persistent
+    return stats
+
+
 class ToolCache:
     """Content-addressed cache for deterministic tool results."""
 
@@ -38,7 +341,11 @@ class ToolCache:
             config: ToolCachingConfig instance
         """
         self.config = config
-        self.cache: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.shared = get_shared_tool_cache()
+        self.shared.ensure_capacity(config.max_cache_size)
+        self.store = get_tool_result_store(config.storage)
+        if self.store is not None and config.tools:
+            self.store.ensure_ttl(max(policy.ttl for policy in config.tools.values()))
         self.stats = {
             "hits": 0,
             "misses": 0,
@@ -66,21 +373,11 @@ class ToolCache:
         # Generate cache key
         cache_key = self._generate_key(tool_name, args, policy)
 
-        # Check cache
-        if cache_key in self.cache:
-            entry = self.cache[cache_key]
-
-            # Check expiry
-            if time.time() - entry.timestamp < policy.ttl:
-                # Move to end (LRU)
-                self.cache.move_to_end(cache_key)
-                self.stats["hits"] += 1
-
-                logger.debug(f"Tool cache HIT: {tool_name} ({cache_key[:8]})")
-                return entry.result
-            else:
-                # Expired
-                del self.cache[cache_key]
+        found, result = self.shared.get(tool_name, cache_key, policy.ttl, self.store)
+        if found:
+            self.stats["hits"] += 1
+            logger.debug(f"Tool cache HIT: {tool_name} ({cache_key[:8]})")
+            return result
 
         self.stats["misses"] += 1
         logger.debug(f"Tool cache MISS: {tool_name}")
@@ -113,13 +410,7 @@ class ToolCache:
             timestamp=time.time()
         )
 
-        self.cache[cache_key] = entry
-
-        # Enforce size limit (LRU eviction)
-        while len(self.cache) > self.config.max_cache_size:
-            evicted_key = next(iter(self.cache))
-            del self.cache[evicted_key]
-            self.stats["evictions"] += 1
+        self.stats["evictions"] += self.shared.set(tool_name, cache_key, entry, self.store)
 
         logger.debug(f"Tool cache SET: {tool_name} ({cache_key[:8]})")
 
@@ -127,33 +418,27 @@ class ToolCache:
         """
         Invalidate cached entries based on event.
 
+        Drops every result of the tools whose policy lists the event, for all
+        runners sharing the cache.
+
         Args:
             event: Event name that triggers invalidation
         """
-        keys_to_remove = []
-
-        for key, entry in self.cache.items():
-            policy = self._get_policy(entry.tool)
-            if policy and event in policy.invalidate_on:
-                keys_to_remove.append(key)
-
-        for key in keys_to_remove:
-            del self.cache[key]
-            logger.debug(f"Tool cache INVALIDATED: {key[:8]} (event: {event})")
+        for tool_name, policy in self.config.tools.items():
+            if event in policy.invalidate_on:
+                dropped = self.shared.drop_tool(tool_name, self.store)
+                logger.debug(f"Tool cache INVALIDATED: {tool_name} ({dropped} entries, event: {event})")
 
     def clear(self, tool_name: Optional[str] = None):
         """
         Clear cache for specific tool or all tools.
 
         Args:
-            tool_name: Tool name to clear, or None to clear all
+            tool_name: Tool name to clear, or None to clear all tools this config caches
         """
-        if tool_name:
-            keys_to_remove = [k for k, v in self.cache.items() if v.tool == tool_name]
-            for key in keys_to_remove:
-                del self.cache[key]
-        else:
-            self.cache.clear()
+        tool_names = [tool_name] if tool_name else list(self.config.tools)
+        for name in tool_names:
+            self.shared.drop_tool(name, self.store)
 
     def _get_policy(self, tool_name: str):
         """Get caching policy for tool."""
@@ -210,7 +495,8 @@ class ToolCache:
         Get cache statistics.
 
         Returns:
-            Dict with hits, misses, evictions, hit_rate, size
+            Dict with this instance's hits, misses, evictions and hit_rate,
+            and the shared LRU's size
         """
         total = self.stats["hits"] + self.stats["misses"]
         hit_rate = self.stats["hits"] / total if total > 0 else 0
@@ -220,6 +506,6 @@ class ToolCache:
             "misses": self.stats["misses"],
             "evictions": self.stats["evictions"],
             "hit_rate": hit_rate,
-            "size": len(self.cache),
-            "max_size": self.config.max_cache_size
+            "size": len(self.shared.entries),
+            "max_size": self.shared.max_entries
         }
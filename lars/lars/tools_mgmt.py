@@ -14,6 +14,7 @@ from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
 
 from .config import get_config
 from .db_adapter import get_db
+from .schema import costed_logs_where
 from .skills_manifest import get_skill_manifest
 
 
@@ -403,6 +404,12 @@ def show_usage_stats(days: int = 7):
     # Most used tools
     console.print("[bold]Most Used Tools[/bold]\n")
 
+    tool_results = costed_logs_where(f"""
+        timestamp > now() - INTERVAL {days} DAY
+        AND tool_calls_json != ''
+        AND tool_calls_json IS NOT NULL
+        AND node_type = 'tool_result'
+    """)
     usage_query = f"""
         WITH tool_calls AS (
             SELECT
@@ -410,11 +417,7 @@ def show_usage_stats(days: int = 7):
                 timestamp,
                 session_id,
                 cost
-            FROM unified_logs
-            WHERE timestamp > now() - INTERVAL {days} DAY
-              AND tool_calls_json != ''
-              AND tool_calls_json IS NOT NULL
-              AND node_type = 'tool_result'
+            FROM {tool_results}
         )
         SELECT
             tool_name,
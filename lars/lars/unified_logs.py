@@ -1,15 +1,17 @@
 """
 Unified Logging System - Pure ClickHouse Implementation
 
-Writes directly to ClickHouse with immediate INSERTs:
-1. Each log() call INSERTs immediately (no buffering, ~100ms latency)
-2. Background worker UPDATEs cost data after OpenRouter's 3-5s delay
+Writes directly to ClickHouse with batched INSERTs:
+1. Each log() call queues its row; a background writer INSERTs batches
+   (up to LARS_LOG_BATCH_SIZE rows, at most LARS_LOG_FLUSH_INTERVAL_MS later)
+2. Background worker appends cost data after OpenRouter's 3-5s delay
 3. No Parquet files, no chDB, no DuckDB
 
 This ensures:
-- UI sees data instantly (no buffer lag)
-- Cascade execution is never blocked by cost API calls
-- Cost data is updated in-place via ALTER TABLE UPDATE
+- UI sees data within a few hundred ms (flush() for read-your-writes)
+- Cascade execution is never blocked by INSERTs or cost API calls
+- Cost data is appended to llm_cost_events (no ALTER TABLE UPDATE mutations)
+  and merged back in at read time by the unified_logs_costed view
 """
 
 import os
@@ -27,6 +29,7 @@ if TYPE_CHECKING:
     import pandas as pd
 
 from .content_classifier import classify_content
+from .batch_writer import BatchTableWriter
 
 
 # ============================================================================
@@ -109,13 +112,257 @@ def estimate_tokens(content: Any) -> int:
     return max(1, char_count // 4) if char_count > 0 else 0
 
 
+class UnifiedLogWriter(BatchTableWriter):
+    """
+    Background batching writer for unified_logs rows.
+
+    log() calls only enqueue; rows are INSERTed in batches by the writer
+    thread (see BatchTableWriter for batching and the overflow policies).
+    flush() writes everything queued before it returns, for readers that
+    need to see rows that were just logged.
+    """
+
+    def __init__(
+        self,
+        get_db,
+        batch_size: int = 500,
+        flush_interval: float = 0.25,
+        queue_max: int = 20000,
+        overflow: str = "block",
+        block_timeout: float = 5.0,
+    ):
+        super().__init__(
+            get_db, "unified_logs", batch_size=batch_size, flush_interval=flush_interval,
+            queue_max=queue_max, overflow=overflow, block_timeout=block_timeout,
+            name="UnifiedLogWriter",
+        )
+
+
+def _no_cost(provider: str = "unknown", cost: float | None = None) -> Dict:
+    return {"cost": cost, "tokens_in": 0, "tokens_out": 0, "tokens_reasoning": None, "provider": provider, "model": None}
+
+
+class CostResolver:
+    """
+    Looks up late cost data for LLM calls on OpenRouter's /generation endpoint.
+
+    Lookups run concurrently (at most `concurrency` requests in flight) over one
+    keep-alive requests.Session. A lookup that finds no data yet (404, or stats
+    still empty) is rescheduled `retry_delays[attempt]` seconds later instead of
+    sleeping in line, so a burst of N calls resolves in about one retry schedule
+    rather than N of them.
+    """
+
+    RETRY_DELAYS = (0, 1, 2, 3)
+
+    def __init__(
+        self,
+        base_url: str = "https://openrouter.ai/api/v1",
+        concurrency: int = 16,
+        retry_delays: tuple = RETRY_DELAYS,
+        timeout: float = 5.0,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = max(1, concurrency)
+        self.retry_delays = tuple(retry_delays)
+        self.timeout = timeout
+
+        self._session: Optional[requests.Session] = None
+        self._executor = None
+        self._init_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "lookups": 0,
+            "requests": 0,
+            "retries": 0,
+            "resolved": 0,
+            "cached": 0,      # 404 until the last attempt: cached/free response
+            "unresolved": 0,
+            "last_batch_size": 0,
+            "last_batch_ms": 0.0,
+        }
+
+    def _ensure_client(self):
+        """Create the shared session and worker pool on first use."""
+        if self._executor is not None:
+            return
+        with self._init_lock:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.concurrency, thread_name_prefix="CostResolver"
+                )
+
+    def _fetch(self, request_id: str, api_key: str) -> tuple:
+        """
+        One GET of /generation.
+
+        Returns ('ok', cost_data), ('404', None) or ('empty', None) when the
+        provider has nothing yet, or ('error', None) for any other status.
+        """
+        with self._stats_lock:
+            self._stats["requests"] += 1
+        try:
+            resp = self._session.get(
+                f"{self.base_url}/generation",
+                params={"id": request_id},
+                headers={"Authorization": f"Bearer {api_key}"},
+                timeout=self.timeout,
+            )
+        except Exception:
+            # Request failed - retry
+            return "empty", None
+
+        if resp.status_code == 404:
+            return "404", None
+        if not resp.ok:
+            return "error", None
+
+        try:
+            data = resp.json().get("data", {})
+        except ValueError:
+            return "empty", None
+        cost = data.get("total_cost") or data.get("cost") or 0
+        # Ensure we never return None for tokens - always use 0 as fallback
+        tokens_in = data.get("native_tokens_prompt") or data.get("tokens_prompt") or 0
+        tokens_out = data.get("native_tokens_completion") or data.get("tokens_completion") or 0
+
+        if not (cost > 0 or tokens_in > 0 or tokens_out > 0):
+            # Data empty but OK - retry
+            return "empty", None
+
+        return "ok", {
+            "cost": cost,
+            "tokens_in": tokens_in,
+            "tokens_out": tokens_out,
+            # Reasoning/thinking tokens if available
+            "tokens_reasoning": (
+                data.get("native_tokens_reasoning") or
+                data.get("tokens_reasoning") or
+                data.get("reasoning_tokens") or
+                None
+            ),
+            "provider": data.get("provider") or "unknown",
+            "model": data.get("model"),  # OpenRouter returns the model used
+        }
+
+    def resolve(self, items: List[Dict[str, Any]], api_key: str | None) -> List[tuple]:
+        """
+        Fetch cost data for pending items (dicts with a 'request_id').
+
+        Blocks until every item has resolved or used up its retries, and returns
+        (item, cost_data) pairs. Items that were 404 on every attempt get cost=0
+        (cached/free responses), other failures cost=None.
+        """
+        import heapq
+        from concurrent.futures import FIRST_COMPLETED, wait
+
+        if not items:
+            return []
+        if not api_key:
+            return [(item, _no_cost()) for item in items]
+
+        self._ensure_client()
+        start = time.time()
+        results = []
+        # (due_at, seq, item, attempt, saw_404)
+        schedule = []
+        for seq, item in enumerate(items):
+            if item.get("request_id"):
+                schedule.append((start + self.retry_delays[0], seq, item, 0, False))
+            else:
+                results.append((item, _no_cost()))
+        heapq.heapify(schedule)
+        in_flight = {}
+
+        while schedule or in_flight:
+            now = time.time()
+            while schedule and schedule[0][0] <= now:
+                _, seq, item, attempt, saw_404 = heapq.heappop(schedule)
+                future = self._submit(item["request_id"], api_key)
+                in_flight[future] = (seq, item, attempt, saw_404)
+
+            timeout = max(0.0, schedule[0][0] - now) if schedule else None
+            if not in_flight:
+                time.sleep(timeout)
+                continue
+            done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                seq, item, attempt, saw_404 = in_flight.pop(future)
+                status, cost_data = future.result()
+                saw_404 = saw_404 or status == "404"
+
+                if status == "ok":
+                    results.append((item, cost_data))
+                    self._count("resolved")
+                elif status in ("404", "empty") and attempt + 1 < len(self.retry_delays):
+                    due = time.time() + self.retry_delays[attempt + 1]
+                    heapq.heappush(schedule, (due, seq, item, attempt + 1, saw_404))
+                    self._count("retries")
+                elif saw_404:
+                    # Consistently 404: likely a cached/free response. Use cost=0
+                    # instead of None so it shows as $0.00 in the UI
+                    results.append((item, _no_cost("cached", 0.0)))
+                    self._count("cached")
+                else:
+                    results.append((item, _no_cost()))
+                    self._count("unresolved")
+
+        with self._stats_lock:
+            self._stats["lookups"] += len(items)
+            self._stats["last_batch_size"] = len(items)
+            self._stats["last_batch_ms"] = round((time.time() - start) * 1000, 1)
+        return results
+
+    def _submit(self, request_id: str, api_key: str):
+        """
+        Start a lookup on the pool, or run it inline once the pool can't take work.
+
+        At interpreter exit (atexit -> UnifiedLogger.flush) concurrent.futures
+        refuses new futures; fetching synchronously keeps the last costs.
+        """
+        from concurrent.futures import Future
+
+        try:
+            return self._executor.submit(self._fetch, request_id, api_key)
+        except RuntimeError:
+            future = Future()
+            try:
+                future.set_result(self._fetch(request_id, api_key))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return dict(self._stats, concurrency=self.concurrency)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        if self._session is not None:
+            self._session.close()
+
+
 class UnifiedLogger:
     """
-    Direct ClickHouse logger with immediate INSERTs and UPDATE-based cost tracking.
+    Direct ClickHouse logger with batched INSERTs and append-only cost tracking.
 
     Key features:
-    - Immediate INSERT to ClickHouse (no buffering, ~100ms UI latency)
-    - Background worker UPDATEs cost data after OpenRouter delay
+    - Rows are queued to a UnifiedLogWriter and INSERTed in batches
+    - Background worker appends cost events after OpenRouter delay
     - Real-time queryable data for snappy UI updates
     """
 
@@ -132,6 +379,26 @@ class UnifiedLogger:
         self.cost_max_wait = 15.0  # Max wait time for cost data
         self.cost_batch_interval = 5.0  # Batch cost updates every 5 seconds
 
+        # Batched row writer (size + latency bounded, bounded queue)
+        def get_db():
+            from .db_adapter import get_db
+            return get_db()
+
+        self.writer = UnifiedLogWriter(
+            get_db,
+            batch_size=self.config.log_batch_size,
+            flush_interval=self.config.log_flush_interval_ms / 1000.0,
+            queue_max=self.config.log_queue_max,
+            overflow=self.config.log_overflow,
+            block_timeout=self.config.log_block_timeout_s,
+        )
+
+        # Parallel cost lookups over a shared keep-alive session
+        self.cost_resolver = CostResolver(
+            base_url=self.config.cost_api_base_url,
+            concurrency=self.config.cost_fetch_concurrency,
+        )
+
         # Background cost worker (still needed - OpenRouter delays cost 3-5s)
         self._running = True
         self._cost_worker = threading.Thread(target=self._cost_update_worker, daemon=True)
@@ -142,7 +409,7 @@ class UnifiedLogger:
         Background worker that:
         1. Waits for messages to age (3 seconds for OpenRouter to process)
         2. Fetches cost data from the API
-        3. UPDATEs existing rows with cost data
+        3. Appends the cost data to llm_cost_events
         """
         while self._running:
             try:
@@ -170,26 +437,15 @@ class UnifiedLogger:
                 if not ready:
                     continue
 
-                # Fetch costs and batch UPDATE
-                updates = []
-                for item in ready:
-                    cost_data = self._fetch_cost_with_retry(
-                        item['request_id'],
-                        self.config.provider_api_key
-                    )
-
-                    if cost_data.get('cost') is not None or cost_data.get('tokens_in', 0) > 0:
-                        updates.append({
-                            'trace_id': item['trace_id'],
-                            **cost_data
-                        })
-
-                # Batch UPDATE to ClickHouse
+                # Fetch costs (concurrently) and batch INSERT
+                updates = self._resolve_costs(ready)
+
+                # One batch INSERT of cost events to ClickHouse
                 if updates:
                     try:
                         from .db_adapter import get_db
                         db = get_db()
-                        db.batch_update_costs('unified_logs', updates)
+                        db.insert_cost_events(updates)
                         total_cost = sum(u.get('cost') or 0 for u in updates)
                         print(f"[Unified Log] Updated costs for {len(updates)} messages (${total_cost:.6f})")
                     except Exception as e:
@@ -199,77 +455,18 @@ class UnifiedLogger:
                 print(f"[Unified Log] Cost worker error: {e}")
                 time.sleep(1)
 
-    def _fetch_cost_with_retry(self, request_id: str, api_key: str | None) -> Dict:
-        """Fetch cost data from OpenRouter with retries on 404."""
-        if not api_key or not request_id:
-            return {"cost": None, "tokens_in": 0, "tokens_out": 0, "tokens_reasoning": None, "provider": "unknown", "model": None}
-
-        headers = {"Authorization": f"Bearer {api_key}"}
-        url = f"https://openrouter.ai/api/v1/generation?id={request_id}"
-
-        # Retry schedule: immediate, then 1s, 2s, 3s delays
-        wait_times = [0, 1, 2, 3]
-
-        last_was_404 = False
-
-        for attempt, wait_time in enumerate(wait_times):
-            if wait_time > 0:
-                time.sleep(wait_time)
-
-            try:
-                resp = requests.get(url, headers=headers, timeout=5)
-
-                if resp.ok:
-                    data = resp.json().get("data", {})
-                    cost = data.get("total_cost") or data.get("cost") or 0
-                    # Ensure we never return None for tokens - always use 0 as fallback
-                    tokens_in = data.get("native_tokens_prompt") or data.get("tokens_prompt") or 0
-                    tokens_out = data.get("native_tokens_completion") or data.get("tokens_completion") or 0
-                    provider = data.get("provider") or "unknown"
-
-                    # Extract reasoning/thinking tokens if available
-                    tokens_reasoning = (
-                        data.get("native_tokens_reasoning") or
-                        data.get("tokens_reasoning") or
-                        data.get("reasoning_tokens") or
-                        None
-                    )
-
-                    if cost > 0 or tokens_in > 0 or tokens_out > 0:
-                        model = data.get("model")  # OpenRouter returns the model used
-                        return {
-                            "cost": cost,
-                            "tokens_in": tokens_in,
-                            "tokens_out": tokens_out,
-                            "tokens_reasoning": tokens_reasoning,
-                            "provider": provider,
-                            "model": model
-                        }
-
-                    # Data empty but OK - continue retrying
-                    continue
-
-                elif resp.status_code == 404:
-                    # Data not ready yet - continue retrying
-                    last_was_404 = True
-                    continue
-
-                else:
-                    # Other error - stop retrying
-                    break
-
-            except Exception:
-                # Request failed - continue retrying
-                continue
-
-        # All retries exhausted
-        # If we consistently got 404, this is likely a cached/free response
-        # Set cost=0 instead of None so it shows as $0.00 in the UI
-        if last_was_404:
-            print(f"[Unified Log] Cost fetch 404 for {request_id[:20]}... - likely cached/free response, setting cost=0")
-            return {"cost": 0.0, "tokens_in": 0, "tokens_out": 0, "tokens_reasoning": None, "provider": "cached", "model": None}
-
-        return {"cost": None, "tokens_in": 0, "tokens_out": 0, "tokens_reasoning": None, "provider": "unknown", "model": None}
+    def _resolve_costs(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Look up costs for pending items; returns cost events for those with data."""
+        updates = []
+        for item, cost_data in self.cost_resolver.resolve(items, self.config.provider_api_key):
+            if cost_data.get('cost') is not None or cost_data.get('tokens_in', 0) > 0:
+                updates.append({
+                    'trace_id': item['trace_id'],
+                    'request_id': item['request_id'],
+                    'session_id': item['session_id'],
+                    **cost_data
+                })
+        return updates
 
     def log(
         self,
@@ -572,13 +769,8 @@ class UnifiedLogger:
             "source_table_name": source_table_name,
         }
 
-        # INSERT immediately to ClickHouse (no buffering for snappy UI)
-        try:
-            from .db_adapter import get_db
-            db = get_db()
-            db.insert_rows('unified_logs', [row])
-        except Exception as e:
-            print(f"[Unified Log] INSERT error: {e}")
+        # Queue for the batched INSERT (never blocks unless the queue is full)
+        self.writer.write(row)
 
         # Queue for cost UPDATE if needed (LLM response with no cost yet)
         # If there's a request_id and no cost, try to fetch it from OpenRouter
@@ -606,37 +798,31 @@ class UnifiedLogger:
                 # Debug logging to track what's being queued (uncomment if debugging)
                 # print(f"[Cost Queue] {request_id[:20]}... provider={provider} model={model}", flush=True)
 
+    def flush_rows(self):
+        """Write all queued log rows now (cheap when nothing is queued)."""
+        self.writer.flush()
+
     def flush(self):
         """
-        Process any remaining pending cost items immediately.
+        Write queued log rows, then process any remaining pending cost items immediately.
 
-        Since we now INSERT immediately, this only handles cost updates.
-        Called at program exit to ensure all costs are captured.
+        Called at program exit to ensure all rows and costs are captured.
         """
+        self.writer.flush()
+
         # Process pending cost items (with immediate cost fetch)
         with self.pending_lock:
             pending_items = list(self.pending_cost_buffer)
             self.pending_cost_buffer = []
 
         if pending_items:
-            updates = []
-            for item in pending_items:
-                cost_data = self._fetch_cost_with_retry(
-                    item['request_id'],
-                    self.config.provider_api_key
-                )
-
-                if cost_data.get('cost') is not None or cost_data.get('tokens_in', 0) > 0:
-                    updates.append({
-                        'trace_id': item['trace_id'],
-                        **cost_data
-                    })
+            updates = self._resolve_costs(pending_items)
 
             if updates:
                 try:
                     from .db_adapter import get_db
                     db = get_db()
-                    db.batch_update_costs('unified_logs', updates)
+                    db.insert_cost_events(updates)
                     print(f"[Unified Log] Final cost update for {len(updates)} messages")
                 except Exception as e:
                     print(f"[Unified Log] Final cost update error: {e}")
@@ -876,6 +1062,22 @@ def force_flush():
     _get_logger().flush()
 
 
+def flush_logs():
+    """
+    Write queued unified_logs rows now, without waiting on pending cost lookups.
+
+    For readers that must see rows this process just logged (Studio live views,
+    post-run analytics). A no-op if nothing has been logged in this process.
+    """
+    if _unified_logger is not None:
+        _unified_logger.flush_rows()
+
+
+def get_log_writer_stats() -> Dict[str, Any]:
+    """Counters of the batched unified_logs writer (batch size, lag, drops)."""
+    return _get_logger().writer.get_stats()
+
+
 # ============================================================================
 # Query Functions (now using ClickHouse tables directly)
 # ============================================================================
@@ -896,8 +1098,8 @@ def query_unified(where_clause: str | None = None, order_by: str = "timestamp")
 
     db = get_db()
 
-    # Build query against ClickHouse table
-    base_query = "SELECT * FROM unified_logs"
+    # Build query against ClickHouse (view merges late cost events into the rows)
+    base_query = "SELECT * FROM unified_logs_costed"
 
     if where_clause:
         query = f"{base_query} WHERE {where_clause}"
@@ -974,7 +1176,7 @@ def get_cascade_costs(cascade_id: str) -> 'pd.DataFrame':
         SUM(cost) as total_cost,
         SUM(total_tokens) as total_tokens,
         COUNT(*) as message_count
-    FROM unified_logs
+    FROM unified_logs_costed
     WHERE cascade_id = '{cascade_id}' AND cost IS NOT NULL
     GROUP BY session_id, cell_name
     ORDER BY session_id, cell_name
@@ -995,7 +1197,7 @@ def get_takes_analysis(session_id: str, cell_name: str) -> 'pd.DataFrame':
         SUM(total_tokens) as total_tokens,
         COUNT(*) as turn_count,
         dateDiff('second', MIN(timestamp), MAX(timestamp)) as duration_seconds
-    FROM unified_logs
+    FROM unified_logs_costed_session(sid = '{session_id}')
     WHERE session_id = '{session_id}'
       AND cell_name = '{cell_name}'
       AND take_index IS NOT NULL
@@ -1026,7 +1228,7 @@ def get_cost_timeline(cascade_id: str | None = None, group_by: str = "hour") ->
         SUM(total_tokens) as total_tokens,
         COUNT(DISTINCT session_id) as session_count,
         COUNT(*) as message_count
-    FROM unified_logs
+    FROM unified_logs_costed
     WHERE cost IS NOT NULL {cascade_filter}
     GROUP BY time_bucket
     ORDER BY time_bucket
@@ -1049,7 +1251,7 @@ def get_model_usage_stats() -> 'pd.DataFrame':
         AVG(cost) as avg_cost_per_call,
         SUM(tokens_in) as total_tokens_in,
         SUM(tokens_out) as total_tokens_out
-    FROM unified_logs
+    FROM unified_logs_costed
     WHERE cost IS NOT NULL AND model IS NOT NULL
     GROUP BY model, provider
     ORDER BY total_cost DESC
@@ -1063,7 +1265,12 @@ def mark_take_winner(session_id: str, cell_name: str, winning_index: int):
 
     Called after evaluator selects winner. Updates ALL rows in that
     take thread, not just a single "winner" row.
+
+    The take rows may still be queued in the batching writer, and an
+    ALTER TABLE ... UPDATE does not touch rows inserted after it, so they are
+    flushed first.
     """
     from .db_adapter import get_db
+    flush_logs()
     db = get_db()
     db.mark_take_winner('unified_logs', session_id, cell_name, winning_index)
@@ -0,0 +1,78 @@
+"""
+Shared fixtures for lars tests.
+"""
+
+import time
+from datetime import datetime
+
+import pytest
+
+from lars.sql_tools.cache_adapter import InFlightRegistry, SemanticCache
+
+
+class FakeClickHouse:
+    """Minimal stand-in for ClickHouseAdapter backing semantic_sql_cache."""
+
+    def __init__(self, latency_s: float = 0.0):
+        self.latency_s = latency_s
+        self.rows = {}
+        self.queries = []
+        self.inserts = []
+
+    def put(self, cache_key, result, result_type="VARCHAR", hit_count=1):
+        now = datetime.now()
+        self.rows[cache_key] = {
+            "cache_key": cache_key,
+            "function_name": "fn",
+            "args_json": "{}",
+            "args_preview": "{}",
+            "result": result,
+            "result_type": result_type,
+            "created_at": now,
+            "expires_at": SemanticCache.FAR_FUTURE,
+            "ttl_seconds": 0,
+            "hit_count": hit_count,
+            "last_hit_at": now,
+            "result_bytes": len(result),
+            "first_session_id": "",
+            "first_caller_id": "",
+        }
+
+    def query(self, sql, params=None):
+        self.queries.append((sql, params))
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        params = params or {}
+        if "cache_keys" in params:
+            keys = params["cache_keys"]
+        elif "cache_key" in params:
+            keys = [params["cache_key"]]
+        else:
+            return []
+        return [dict(self.rows[k]) for k in keys if k in self.rows]
+
+    def insert_rows(self, table, rows, columns=None):
+        self.inserts.append((table, rows))
+        for row in rows:
+            self.rows[row["cache_key"]] = dict(row)
+
+    def execute(self, sql, params=None):
+        pass
+
+
+@pytest.fixture
+def cache_with_db():
+    """Fresh SemanticCache instance wired to a FakeClickHouse."""
+    SemanticCache._instance = None
+    cache = SemanticCache()
+    db = FakeClickHouse()
+    cache._db = db
+    cache._db_initialized = True
+    cache._table_ensured = True
+    SemanticCache._l1_cache.clear()
+    SemanticCache._inflight = InFlightRegistry()
+    yield cache, db
+    if cache._writer is not None:
+        cache._writer.shutdown()
+    SemanticCache._l1_cache.clear()
+    SemanticCache._instance = None
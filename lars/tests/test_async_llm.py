@@ -0,0 +1,178 @@
+"""
+Tests for the async LLM path (Agent.arun on the shared LLM event loop).
+
+Requests go to a local OpenAI-compatible stub server, so the real litellm /
+openai / httpx stack is exercised without contacting a provider.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from lars import async_llm, llm_scheduler
+from lars.agent import Agent
+from lars.async_llm import LLMEventLoop, run_batch
+from lars.caller_context import CallerContext, get_caller_id, run_with_caller_context
+from lars.llm_scheduler import LLMScheduler, current_priority
+
+
+class StubServer:
+    """OpenAI-compatible /chat/completions that echoes the last message."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.connections = set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub.lock:
+                    stub.requests += 1
+                    stub.in_flight += 1
+                    stub.peak_in_flight = max(stub.peak_in_flight, stub.in_flight)
+                    stub.connections.add(self.client_address)
+                if stub.delay:
+                    time.sleep(stub.delay)
+                with stub.lock:
+                    stub.in_flight -= 1
+                content = f"echo: {body['messages'][-1]['content']}"
+                payload = json.dumps({
+                    "id": f"chatcmpl-{stub.requests}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body["model"],
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {"prompt_tokens": 7, "completion_tokens": 3, "total_tokens": 10},
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubServer(delay=0.05)
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def llm_loop(monkeypatch):
+    loop = LLMEventLoop(max_connections=4)
+    monkeypatch.setattr(async_llm, "_llm_loop", loop)
+    monkeypatch.setattr(llm_scheduler, "_llm_scheduler", LLMScheduler(concurrency=64))
+    yield loop
+    loop.close()
+
+
+def _agent(stub):
+    return Agent(model="openai/stub-model", system_prompt="", base_url=stub.url, api_key="sk-test")
+
+
+def test_arun_returns_the_run_response_shape(stub, llm_loop):
+    result = llm_loop.run(_agent(stub).arun("hello"))
+
+    assert result["content"] == "echo: hello"
+    assert (result["tokens_in"], result["tokens_out"]) == (7, 3)
+    assert result["role"] == "assistant"
+
+
+def test_batch_shares_a_bounded_keep_alive_pool(stub, llm_loop):
+    agent = _agent(stub)
+
+    results = run_batch(lambda i: agent.arun(f"row {i}"), range(40), concurrency=40)
+
+    assert [r["content"] for r in results] == [f"echo: row {i}" for i in range(40)]
+    assert stub.requests == 40
+    # 40 requests share at most 4 pooled connections, several in flight at once
+    assert len(stub.connections) <= 4
+    assert 1 < stub.peak_in_flight <= 4
+    assert llm_loop.get_stats()["clients"] == 1
+
+
+def test_run_batch_keeps_order_and_returns_exceptions(llm_loop):
+    async def work(i):
+        await asyncio.sleep(0.01)
+        if i == 2:
+            raise ValueError("bad row")
+        return i * 10
+
+    results = run_batch(work, [0, 1, 2, 3], concurrency=2)
+
+    assert results[:2] == [0, 10] and results[3] == 30
+    assert isinstance(results[2], ValueError)
+    stats = llm_loop.get_stats()
+    assert (stats["batches"], stats["tasks"], stats["in_flight"]) == (1, 4, 0)
+    assert stats["max_in_flight"] == 2
+
+
+def test_batch_sees_the_caller_context(llm_loop):
+    sql = CallerContext("sql-async-test", {"origin": "sql"})
+
+    async def context(_):
+        return get_caller_id(), current_priority()
+
+    results = run_with_caller_context(sql, run_batch, context, [0, 1])
+
+    assert results == [("sql-async-test", "bulk")] * 2
+
+
+def test_row_mode_batch_runs_rows_on_the_loop(stub, llm_loop, monkeypatch):
+    from lars.config import get_config
+    from lars.semantic_sql.executor import run_row_mode_batch
+
+    logged = []
+
+    def log_unified(**kwargs):
+        kwargs["thread"] = threading.current_thread().name
+        logged.append(kwargs)
+
+    monkeypatch.setattr("lars.unified_logs.log_unified", log_unified)
+    cfg = get_config()
+    monkeypatch.setattr(cfg, "provider_base_url", stub.url)
+    monkeypatch.setattr(cfg, "provider_api_key", "sk-test")
+    cascade = {
+        "cascade_id": "async_echo",
+        "cells": [{"name": "answer", "instructions": "Echo {{ input.text }}", "model": "openai/stub-model"}],
+    }
+
+    results = run_row_mode_batch(cascade, [{"text": f"t{i}"} for i in range(6)], [f"s{i}" for i in range(6)],
+                                 concurrency=2)
+
+    assert [r["lineage"][0]["output"] for r in results] == [f"echo: Echo t{i}" for i in range(6)]
+    assert llm_loop.get_stats()["max_in_flight"] <= 2  # The caller's max_workers, not the global default
+    assert sorted(entry["session_id"] for entry in logged) == [f"s{i}" for i in range(6)]
+    # Logging (which may block on writer backpressure) stays off the shared loop thread
+    assert "LLMEventLoop" not in {entry["thread"] for entry in logged}
+
+    monkeypatch.setattr(cfg, "llm_async", False)
+    assert run_row_mode_batch(cascade, [{"text": "x"}], ["s"]) == [None]
@@ -0,0 +1,101 @@
+"""
+Tests for in-process caller-context propagation.
+
+The ClickHouse store is replaced by recording fakes, so the tests also check
+that same-process lookups never reach it.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from lars import caller_context
+from lars.caller_context import (
+    CallerContext,
+    capture_caller_context,
+    clear_caller_context,
+    get_caller_context,
+    get_caller_id,
+    set_caller_context,
+    submit_with_caller_context,
+)
+
+
+@pytest.fixture
+def clickhouse(monkeypatch):
+    """Record ClickHouse writes/reads; reads return whatever `stored` holds."""
+    calls = {"writes": [], "reads": 0, "stored": None}
+
+    def read(connection_id=None):
+        calls["reads"] += 1
+        return calls["stored"]
+
+    monkeypatch.setattr(caller_context, "_write_context_to_clickhouse",
+                        lambda cid, caller, meta: calls["writes"].append((cid, caller)))
+    monkeypatch.setattr(caller_context, "_read_context_from_clickhouse", read)
+    monkeypatch.setattr(caller_context, "_active_contexts", {})
+    monkeypatch.setattr(caller_context, "_global_caller_registry", {})
+    yield calls
+    clear_caller_context()
+
+
+def _in_thread(fn):
+    out = []
+    t = threading.Thread(target=lambda: out.append(fn()))
+    t.start()
+    t.join()
+    return out[0]
+
+
+class TestConnectionRegistry:
+    def test_other_threads_resolve_without_clickhouse(self, clickhouse):
+        ctx = set_caller_context("sql-a", {"origin": "sql"}, connection_id="pg_1")
+
+        assert ctx == CallerContext("sql-a", {"origin": "sql"}, "pg_1")
+        assert _in_thread(get_caller_context) == ("sql-a", {"origin": "sql"})
+        assert _in_thread(lambda: get_caller_id("pg_1")) == "sql-a"
+        assert clickhouse["writes"] == [("pg_1", "sql-a")]
+        assert clickhouse["reads"] == 0
+
+    def test_connection_id_selects_its_own_context(self, clickhouse):
+        _in_thread(lambda: set_caller_context("sql-a", {}, connection_id="pg_1"))
+        _in_thread(lambda: set_caller_context("sql-b", {}, connection_id="pg_2"))
+
+        assert _in_thread(lambda: get_caller_id("pg_1")) == "sql-a"
+        assert _in_thread(get_caller_id) == "sql-b"  # Most recent active query
+        assert caller_context._global_caller_registry["pg_1"][0] == "sql-a"
+
+    def test_clear_removes_connection(self, clickhouse):
+        set_caller_context("sql-a", {}, connection_id="pg_1")
+        clear_caller_context(connection_id="pg_1")
+
+        assert _in_thread(get_caller_id) is None
+        assert caller_context._global_caller_registry == {}
+
+    def test_clickhouse_is_cross_process_fallback(self, clickhouse):
+        clickhouse["stored"] = ("sql-other-process", {"origin": "sql"})
+
+        assert _in_thread(lambda: get_caller_id("pg_9")) == "sql-other-process"
+        assert clickhouse["reads"] == 1
+
+
+class TestPropagation:
+    def test_submit_carries_context_into_pool_workers(self, clickhouse):
+        set_caller_context("sql-a", {"origin": "sql"})  # This thread only, no registry entry
+        assert _in_thread(get_caller_id) is None
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [submit_with_caller_context(pool, get_caller_context) for _ in range(4)]
+            assert [f.result() for f in futures] == [("sql-a", {"origin": "sql"})] * 4
+
+            # Nothing leaks into the pooled threads afterwards
+            assert pool.submit(get_caller_id).result() is None
+
+    def test_captured_context_runs_fn(self, clickhouse):
+        set_caller_context("sql-a", {})
+        ctx = capture_caller_context()
+        clear_caller_context()
+
+        assert get_caller_id() is None
+        assert _in_thread(lambda: ctx.run(get_caller_id)) == "sql-a"
@@ -0,0 +1,163 @@
+"""
+Tests for the ClickHouseAdapter client pool.
+
+Clients are fakes that sleep to simulate query latency, so no ClickHouse
+server is needed.
+"""
+
+import threading
+import time
+
+import pytest
+
+from lars.db_adapter import ClickHouseAdapter, ClickHousePool, ConnectionPoolTimeout
+
+
+class FakeClient:
+    def __init__(self, latency_s=0.0):
+        self.latency_s = latency_s
+        self.disconnects = 0
+        self.fail_next = None
+
+    def execute(self, sql, params=None, **kwargs):
+        if self.fail_next:
+            error, self.fail_next = self.fail_next, None
+            raise error
+        time.sleep(self.latency_s)
+        if kwargs.get("with_column_types"):
+            return [(1,)], [("x", "UInt8")]
+        return []
+
+    def disconnect(self):
+        self.disconnects += 1
+
+
+@pytest.fixture(autouse=True)
+def no_query_log(monkeypatch):
+    monkeypatch.setattr("lars.db_adapter.get_query_logger", lambda: None)
+
+
+def _adapter(pool):
+    adapter = object.__new__(ClickHouseAdapter)
+    adapter.pool = pool
+    adapter.database = "lars"
+    return adapter
+
+
+def _run_threads(n, fn):
+    threads = [threading.Thread(target=fn) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+class TestClickHousePool:
+    def test_queries_run_concurrently(self):
+        barrier = threading.Barrier(4, timeout=5)
+
+        class ConcurrentClient(FakeClient):
+            def execute(self, sql, params=None, **kwargs):
+                barrier.wait()  # Passes only once all 4 queries are in flight together
+                return super().execute(sql, params, **kwargs)
+
+        pool = ClickHousePool(ConcurrentClient, size=4, reserved_writes=0)
+        adapter = _adapter(pool)
+
+        _run_threads(4, lambda: adapter.query("SELECT 1"))
+
+        assert not barrier.broken  # Serialized behind one lock the barrier would time out
+        stats = pool.stats()
+        assert stats["created"] == 4
+        assert stats["read_checkouts"] == 4
+        assert stats["in_use"] == 0
+
+    def test_clients_are_reused(self):
+        pool = ClickHousePool(FakeClient, size=4)
+        adapter = _adapter(pool)
+
+        for _ in range(10):
+            adapter.query("SELECT 1")
+            adapter.execute("INSERT INTO t VALUES")
+
+        assert pool.stats()["created"] == 1
+
+    def test_reads_cannot_use_reserved_write_capacity(self):
+        pool = ClickHousePool(FakeClient, size=3, reserved_writes=1, timeout=0.1)
+        r1, r2 = pool.acquire("read"), pool.acquire("read")
+
+        with pytest.raises(ConnectionPoolTimeout):
+            pool.acquire("read")
+        w = pool.acquire("write")
+
+        stats = pool.stats()
+        assert (stats["in_use_reads"], stats["in_use_writes"], stats["timeouts"]) == (2, 1, 1)
+        for client, kind in ((r1, "read"), (r2, "read"), (w, "write")):
+            pool.release(client, kind)
+
+    def test_slow_reads_do_not_block_inserts(self):
+        reads_running = threading.Semaphore(0)
+        finish_reads = threading.Event()
+
+        class SlowReadClient(FakeClient):
+            def execute(self, sql, params=None, **kwargs):
+                if sql.startswith("SELECT"):
+                    reads_running.release()
+                    finish_reads.wait(5)
+                return super().execute(sql, params, **kwargs)
+
+        pool = ClickHousePool(SlowReadClient, size=3, reserved_writes=1)
+        adapter = _adapter(pool)
+        readers = [threading.Thread(target=adapter.query, args=("SELECT sleep(1)",)) for _ in range(4)]
+        for t in readers:
+            t.start()
+        for _ in range(2):
+            assert reads_running.acquire(timeout=5)  # Both read clients are busy
+
+        adapter.insert_rows("unified_logs", [{"session_id": "s", "content_json": "{}"}])
+        stats = pool.stats()
+        finish_reads.set()
+        for t in readers:
+            t.join()
+
+        # The insert got the reserved client while both reads still held theirs
+        assert (stats["in_use_reads"], stats["write_checkouts"]) == (2, 1)
+
+    def test_waiters_get_released_clients(self):
+        pool = ClickHousePool(lambda: FakeClient(latency_s=0.05), size=2, reserved_writes=0)
+        adapter = _adapter(pool)
+
+        _run_threads(8, lambda: adapter.query("SELECT 1"))
+
+        stats = pool.stats()
+        assert stats["created"] == 2
+        assert stats["checkouts"] == 8
+        assert stats["peak_in_use"] == 2
+        assert stats["avg_wait_ms"] > 0
+
+    def test_failed_client_is_disconnected_and_counted(self):
+        client = FakeClient()
+        pool = ClickHousePool(lambda: client, size=1)
+        adapter = _adapter(pool)
+        client.fail_next = EOFError("Unexpected EOF while reading bytes")
+
+        with pytest.raises(EOFError):
+            adapter.execute("INSERT INTO t VALUES")
+        adapter.execute("INSERT INTO t VALUES")
+
+        stats = pool.stats()
+        assert client.disconnects == 1
+        assert (stats["errors"], stats["in_use"], stats["created"]) == (1, 0, 1)
+
+    def test_server_errors_keep_the_connection(self):
+        from clickhouse_driver.errors import ServerException
+
+        client = FakeClient()
+        pool = ClickHousePool(lambda: client, size=1)
+        client.fail_next = ServerException("Syntax error", code=62)
+
+        with pytest.raises(ServerException):
+            _adapter(pool).query("SELEC 1")
+
+        assert client.disconnects == 0
+        assert pool.stats()["errors"] == 1
@@ -0,0 +1,112 @@
+"""
+Tests for the process-wide compiled cascade cache behind load_cascade_config().
+"""
+
+import os
+import time
+
+import pytest
+
+from lars.cascade import CompiledCascadeCache, get_compiled_cascade_cache, load_cascade_config
+
+
+DETERMINISTIC_CASCADE = """\
+cascade_id: {cascade_id}
+inputs_schema:
+  text: Text to transform
+phases:
+  - name: normalize
+    tool: "python:lars.deterministic.transform_data"
+    inputs:
+      data: "{{{{ input.text }}}}"
+    handoffs: [check]
+  - name: check
+    tool: "python:lars.deterministic.transform_data"
+    inputs:
+      data: "{{{{ outputs.normalize }}}}"
+"""
+
+
+@pytest.fixture
+def cascade_cache():
+    cache = get_compiled_cascade_cache()
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+@pytest.fixture
+def cascade_file(tmp_path):
+    path = tmp_path / "deterministic.yaml"
+    path.write_text(DETERMINISTIC_CASCADE.format(cascade_id="bench_deterministic"))
+    return path
+
+
+class TestCompiledCascadeCache:
+    def test_same_path_returns_shared_config(self, cascade_cache, cascade_file):
+        first = load_cascade_config(str(cascade_file))
+        second = load_cascade_config(str(cascade_file))
+
+        assert first is second
+        assert first.cells[0].name == "normalize"  # legacy phases migrated
+        assert cascade_cache.get_stats()["hits"] == 1
+
+    def test_file_change_invalidates(self, cascade_cache, cascade_file):
+        first = load_cascade_config(str(cascade_file))
+
+        cascade_file.write_text(DETERMINISTIC_CASCADE.format(cascade_id="edited_cascade"))
+        stat = cascade_file.stat()
+        os.utime(cascade_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        second = load_cascade_config(str(cascade_file))
+        assert second is not first
+        assert second.cascade_id == "edited_cascade"
+
+    def test_dicts_keyed_by_content(self, cascade_cache):
+        data = {"cascade_id": "inline", "cells": [{"name": "a", "instructions": "hi"}]}
+
+        first = load_cascade_config(data)
+        assert load_cascade_config(dict(data)) is first
+
+        overridden = {**data, "takes": {"factor": 3}}
+        assert load_cascade_config(overridden) is not first
+
+    def test_missing_file_raises(self, cascade_cache, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            load_cascade_config(str(tmp_path / "missing.yaml"))
+
+    def test_bounded(self):
+        cache = CompiledCascadeCache(max_entries=2)
+        for i in range(3):
+            cache.put(("dict", str(i)), load_cascade_config({"cascade_id": str(i), "cells": []}))
+
+        assert cache.get(("dict", "0")) is None
+        assert cache.get(("dict", "2")) is not None
+        assert cache.get_stats()["entries"] == 2
+
+
+@pytest.mark.benchmark
+def test_benchmark_per_row_config_overhead(cascade_cache, cascade_file):
+    """Per-row cost of resolving a no-LLM deterministic cascade, cold vs cached.
+
+    Semantic SQL UDFs construct a LARSRunner per row, which loads the cascade
+    config; this measures that load with the cache cleared every row (the old
+    behaviour) against the cached path.
+    """
+    rows = 200
+    path = str(cascade_file)
+
+    start = time.perf_counter()
+    for _ in range(rows):
+        cascade_cache.clear()
+        load_cascade_config(path)
+    uncached_us = (time.perf_counter() - start) / rows * 1e6
+
+    start = time.perf_counter()
+    for _ in range(rows):
+        load_cascade_config(path)
+    cached_us = (time.perf_counter() - start) / rows * 1e6
+
+    print(f"\nper-row config load: uncached {uncached_us:.0f}us  cached {cached_us:.0f}us  "
+          f"({uncached_us / cached_us:.1f}x)")
+    assert cached_us < uncached_us
@@ -0,0 +1,164 @@
+"""
+Tests for append-only LLM cost events and the unified_logs_costed view.
+
+The schema and migration DDL run in an embedded chDB session, so the view
+SQL is checked against a real ClickHouse engine without a server.
+"""
+
+import io
+import json
+import uuid
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from lars.db_adapter import ClickHouseAdapter
+from lars.migrations.runner import _parse_sql_statements
+from lars.schema import UNIFIED_LOGS_SCHEMA, costed_logs_where
+
+MIGRATIONS = [
+    Path(__file__).parent.parent / "lars" / "migrations" / "sql" / name
+    for name in ("037_llm_cost_events.sql", "041_unified_logs_costed_session.sql", "042_unified_logs_costed_caller.sql")
+]
+
+
+class ChdbDB:
+    """Just enough of ClickHouseAdapter on top of an embedded chDB session."""
+
+    def __init__(self, session):
+        self.session = session
+
+    def query(self, sql, params=None, output_format="dict"):
+        out = self.session.query(sql, "JSONEachRow").bytes().decode()
+        return [json.loads(line) for line in out.splitlines() if line]
+
+    def query_df(self, sql, params=None):
+        return pd.read_json(io.StringIO(self.session.query(sql, "JSONEachRow").bytes().decode()), lines=True)
+
+    def insert_rows(self, table, rows, columns=None):
+        columns = columns or list(rows[0].keys())
+        values = ", ".join(
+            "(" + ", ".join("NULL" if row.get(c) is None else repr(row.get(c)) for c in columns) + ")"
+            for row in rows
+        )
+        self.session.query(f"INSERT INTO {table} ({', '.join(columns)}) VALUES {values}")
+
+    insert_cost_events = ClickHouseAdapter.insert_cost_events
+
+
+@pytest.fixture
+def chdb_db(monkeypatch):
+    session_mod = pytest.importorskip("chdb.session")
+    session = session_mod.Session()
+    session.query("CREATE DATABASE IF NOT EXISTS lars_test")
+    session.query("USE lars_test")
+    session.query(UNIFIED_LOGS_SCHEMA)
+    for migration in MIGRATIONS:
+        with open(migration) as f:
+            for stmt in _parse_sql_statements(f.read()):
+                session.query(stmt)
+
+    db = ChdbDB(session)
+    monkeypatch.setattr("lars.db_adapter.get_db", lambda: db)
+    yield db
+    session.query("DROP DATABASE IF EXISTS lars_test")
+    session.close()
+
+
+def _log(db, trace_id, role, cost=None, tokens_in=None, request_id="", caller_id="sql-1", session_id="s1"):
+    db.insert_rows("unified_logs", [{
+        "message_id": str(uuid.uuid4()), "timestamp_iso": "", "session_id": session_id,
+        "trace_id": trace_id, "node_type": "message", "role": role, "caller_id": caller_id,
+        "cascade_id": "casc", "cell_name": "cell", "request_id": request_id,
+        "cost": cost, "tokens_in": tokens_in,
+    }])
+
+
+class TestInsertCostEvents:
+    def test_appends_rows_instead_of_mutating(self):
+        inserted = []
+        adapter = object.__new__(ClickHouseAdapter)
+        adapter.insert_rows = lambda table, rows, columns=None: inserted.append((table, rows))
+        adapter.update_row = lambda *a, **k: pytest.fail("no ALTER TABLE UPDATE expected")
+
+        adapter.batch_update_costs("unified_logs", [
+            {"trace_id": "t1", "cost": 0.1, "tokens_in": 10, "tokens_out": 5, "provider": "p", "model": "m"},
+            {"trace_id": None, "cost": 1.0},
+        ])
+
+        [(table, rows)] = inserted
+        assert table == "llm_cost_events"
+        assert len(rows) == 1
+        assert rows[0]["role"] == "assistant"
+        assert rows[0]["total_tokens"] == 15
+
+
+class TestCostedView:
+    def test_cost_events_apply_to_assistant_row_only(self, chdb_db):
+        _log(chdb_db, "t1", "assistant", request_id="r1")
+        _log(chdb_db, "t1", "system")
+        chdb_db.insert_cost_events([{"trace_id": "t1", "cost": 0.25, "tokens_in": 100, "tokens_out": 20}])
+
+        rows = chdb_db.query("SELECT role, cost, total_tokens FROM unified_logs_costed ORDER BY role")
+
+        assert rows == [
+            {"role": "assistant", "cost": 0.25, "total_tokens": 120},
+            {"role": "system", "cost": None, "total_tokens": None},
+        ]
+
+    def test_session_view_matches_full_view(self, chdb_db):
+        _log(chdb_db, "t1", "assistant", request_id="r1")
+        _log(chdb_db, "t1", "system")
+        _log(chdb_db, "t2", "assistant", cost=0.5, tokens_in=7, request_id="r2")
+        _log(chdb_db, "t3", "assistant", request_id="r3", session_id="s2")
+        chdb_db.insert_cost_events([
+            {"trace_id": "t1", "cost": 0.25, "tokens_in": 100, "tokens_out": 20},
+            {"trace_id": "t3", "cost": 9.0},
+        ])
+
+        columns = "trace_id, role, cost, tokens_in, total_tokens"
+        full = chdb_db.query(f"SELECT {columns} FROM unified_logs_costed WHERE session_id = 's1' ORDER BY trace_id, role")
+        scoped = chdb_db.query(f"SELECT {columns} FROM unified_logs_costed_session(sid = 's1') ORDER BY trace_id, role")
+
+        assert scoped == full
+        assert [row["cost"] for row in scoped] == [0.25, None, 0.5]
+
+    def test_caller_and_filtered_scopes_match_full_view(self, chdb_db):
+        _log(chdb_db, "t1", "assistant", request_id="r1")
+        _log(chdb_db, "t2", "assistant", cost=0.5, request_id="r2")
+        _log(chdb_db, "t3", "assistant", request_id="r3", caller_id="sql-2")
+        chdb_db.insert_cost_events([
+            {"trace_id": "t1", "cost": 0.25},
+            {"trace_id": "t3", "cost": 9.0},
+        ])
+
+        columns = "trace_id, cost"
+        full = chdb_db.query(f"SELECT {columns} FROM unified_logs_costed WHERE caller_id = 'sql-1' ORDER BY trace_id")
+        caller = chdb_db.query(f"SELECT {columns} FROM unified_logs_costed_caller(cid = 'sql-1') ORDER BY trace_id")
+        scoped = costed_logs_where("caller_id = 'sql-1'")
+        filtered = chdb_db.query(f"SELECT {columns} FROM {scoped} ORDER BY trace_id")
+
+        assert caller == full == filtered
+        assert [row["cost"] for row in caller] == [0.25, 0.5]
+
+    def test_inline_cost_kept_without_event(self, chdb_db):
+        _log(chdb_db, "t2", "assistant", cost=0.5, tokens_in=7, request_id="r2")
+
+        assert chdb_db.query("SELECT cost, tokens_in FROM unified_logs_costed") == [{"cost": 0.5, "tokens_in": 7}]
+
+    def test_aggregate_query_costs_includes_late_costs(self, chdb_db):
+        from lars.sql_trail import aggregate_query_costs
+        from lars.unified_logs import get_cascade_costs
+
+        _log(chdb_db, "t1", "assistant", request_id="r1")
+        _log(chdb_db, "t2", "assistant", cost=0.5, tokens_in=10, request_id="r2")
+        chdb_db.insert_cost_events([{"trace_id": "t1", "cost": 0.25, "tokens_in": 100, "tokens_out": 20}])
+
+        totals = aggregate_query_costs("sql-1")
+        assert totals["total_cost"] == pytest.approx(0.75)
+        assert totals["total_tokens_in"] == 110
+        assert totals["llm_calls_count"] == 2
+
+        costs = get_cascade_costs("casc")
+        assert costs["total_cost"].sum() == pytest.approx(0.75)
@@ -0,0 +1,214 @@
+"""
+Tests for parallel late-cost lookups (CostResolver).
+
+A local ThreadingHTTPServer mimics OpenRouter's /generation endpoint, so the
+real HTTP path (keep-alive session, concurrency limit, retries) is exercised
+without network access.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from lars.unified_logs import CostResolver
+
+FAST_RETRIES = (0, 0.05, 0.1, 0.15)
+
+
+class StubGenerationServer(ThreadingHTTPServer):
+    """
+    /generation?id=<id> stub. Ids choose the behaviour:
+      ok-*       stats available on the first request
+      late<N>-*  404 for the first N requests, then stats
+      missing-*  always 404 (cached/free response)
+      empty-*    200 with empty stats
+      error-*    500
+    """
+
+    daemon_threads = True
+
+    def __init__(self, latency_s=0.0):
+        super().__init__(("127.0.0.1", 0), StubGenerationHandler)
+        self.latency_s = latency_s
+        self.lock = threading.Lock()
+        self.hits = {}
+        self.hit_at = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.connections = set()
+        self.auth = set()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/api/v1"
+
+
+class StubGenerationHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        request_id = parse_qs(urlparse(self.path).query)["id"][0]
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            server.hits[request_id] = hits = server.hits.get(request_id, 0) + 1
+            server.hit_at[request_id] = time.perf_counter()
+            server.connections.add(self.client_address)
+            server.auth.add(self.headers.get("Authorization"))
+        time.sleep(server.latency_s)
+
+        kind = request_id.split("-")[0]
+        if kind == "ok" or (kind.startswith("late") and hits > int(kind[4:])):
+            status, body = 200, {"data": {"total_cost": 0.001, "native_tokens_prompt": 100,
+                                          "native_tokens_completion": 20, "provider": "Stub",
+                                          "model": "stub/model"}}
+        elif kind == "empty":
+            status, body = 200, {"data": {}}
+        elif kind == "error":
+            status, body = 500, {"error": "boom"}
+        else:
+            status, body = 404, {"error": "not found"}
+
+        with server.lock:
+            server.in_flight -= 1
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(latency_s=0.0):
+        server = StubGenerationServer(latency_s)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _resolve(resolver, ids):
+    items = [{"request_id": request_id} for request_id in ids]
+    return {item["request_id"]: data for item, data in resolver.resolve(items, "sk-test")}
+
+
+class TestCostResolver:
+    def test_parses_generation_stats(self, stub):
+        server = stub()
+        resolver = CostResolver(server.base_url, retry_delays=FAST_RETRIES)
+
+        data = _resolve(resolver, ["ok-1"])["ok-1"]
+
+        assert data == {"cost": 0.001, "tokens_in": 100, "tokens_out": 20, "tokens_reasoning": None,
+                        "provider": "Stub", "model": "stub/model"}
+        assert server.auth == {"Bearer sk-test"}
+
+    def test_retries_on_schedule_until_data_arrives(self, stub):
+        server = stub()
+        resolver = CostResolver(server.base_url, retry_delays=FAST_RETRIES)
+
+        results = _resolve(resolver, ["late2-a", "missing-b", "empty-c", "error-d"])
+
+        assert results["late2-a"]["cost"] == 0.001
+        assert (results["missing-b"]["cost"], results["missing-b"]["provider"]) == (0.0, "cached")
+        assert results["empty-c"]["cost"] is None
+        assert results["error-d"]["cost"] is None
+        assert server.hits == {"late2-a": 3, "missing-b": 4, "empty-c": 4, "error-d": 1}
+        stats = resolver.get_stats()
+        assert (stats["resolved"], stats["cached"], stats["unresolved"]) == (1, 1, 2)
+
+    def test_burst_runs_concurrently_over_kept_alive_connections(self, stub):
+        server = stub(latency_s=0.05)
+        resolver = CostResolver(server.base_url, concurrency=8, retry_delays=FAST_RETRIES)
+        ids = [f"ok-{i}" for i in range(80)]
+
+        start = time.perf_counter()
+        results = _resolve(resolver, ids)
+        elapsed = time.perf_counter() - start
+
+        assert len(results) == 80 and all(r["cost"] == 0.001 for r in results.values())
+        assert elapsed < 2.0  # One at a time: 80 * 50ms = 4s
+        assert 1 < server.max_in_flight <= 8
+        assert len(server.connections) <= 8
+
+    def test_waiting_items_do_not_hold_up_others(self, stub):
+        server = stub()
+        resolver = CostResolver(server.base_url, concurrency=2, retry_delays=(0, 0.3, 0.3, 0.3))
+
+        start = time.perf_counter()
+        _resolve(resolver, ["missing-slow"] + [f"ok-{i}" for i in range(10)])
+        served_at = {request_id: t - start for request_id, t in server.hit_at.items()}
+
+        # Sleeping through retries would serialize the other lookups behind 0.9s
+        assert server.hits["missing-slow"] == 4
+        assert served_at["missing-slow"] >= 0.9
+        assert all(served_at[f"ok-{i}"] < 0.5 for i in range(10))
+
+    def test_no_api_key_or_request_id_skips_lookup(self, stub):
+        server = stub()
+        resolver = CostResolver(server.base_url)
+
+        assert resolver.resolve([{"request_id": "ok-1"}], None)[0][1]["cost"] is None
+        assert resolver.resolve([{"request_id": ""}], "sk-test")[0][1]["cost"] is None
+        assert server.hits == {}
+
+    def test_resolves_inline_after_pool_shutdown(self, stub):
+        server = stub()
+        resolver = CostResolver(server.base_url, retry_delays=FAST_RETRIES)
+        resolver._ensure_client()
+        resolver._executor.shutdown(wait=True)  # As at interpreter exit
+
+        results = _resolve(resolver, ["ok-1", "late1-a"])
+
+        assert results["ok-1"]["cost"] == 0.001
+        assert results["late1-a"]["cost"] == 0.001
+
+
+def test_logger_flush_writes_resolved_cost_events(stub, monkeypatch):
+    from lars import unified_logs
+
+    server = stub()
+    events = []
+
+    class FakeDB:
+        def insert_rows(self, table, rows, columns=None):
+            pass
+
+        def insert_cost_events(self, updates):
+            events.extend(updates)
+
+    monkeypatch.setattr("lars.db_adapter.get_db", lambda: FakeDB())
+    logger = unified_logs.UnifiedLogger()
+    monkeypatch.setattr(logger.config, "provider_api_key", "sk-test")
+    logger.cost_resolver = CostResolver(server.base_url, retry_delays=FAST_RETRIES)
+    try:
+        for i in range(3):
+            logger.log(session_id="s1", trace_id=f"t{i}", node_type="message", role="assistant",
+                       request_id=f"ok-{i}", content="hi")
+        logger.log(session_id="s1", trace_id="t9", node_type="message", role="assistant",
+                   request_id="missing-9", content="hi")
+        logger.flush()
+    finally:
+        logger._running = False
+        logger.writer.shutdown()
+
+    by_trace = {e["trace_id"]: e for e in events}
+    assert sorted(by_trace) == ["t0", "t1", "t2", "t9"]
+    assert by_trace["t0"]["request_id"] == "ok-0" and by_trace["t0"]["cost"] == 0.001
+    assert by_trace["t9"]["cost"] == 0.0
@@ -0,0 +1,127 @@
+"""
+Tests for the content-addressed embedding cache used by Agent.embed().
+
+The provider call (Agent._embed_uncached) is replaced by a recorder and the
+ClickHouse tier by an in-memory fake, so no network or server is needed.
+"""
+
+import pytest
+
+from lars import embedding_cache
+from lars.agent import Agent
+from lars.config import get_config
+from lars.embedding_cache import EmbeddingCache
+
+
+class FakeDB:
+    """embedding_cache table kept in a dict; answers the batched IN (...) lookup."""
+
+    def __init__(self):
+        self.rows = {}
+
+    def ensure_table_exists(self, table, ddl):
+        pass
+
+    def insert_rows(self, table, rows, columns=None):
+        for row in rows:
+            self.rows[(row["model"], row["text_hash"])] = row
+
+    def query(self, sql, params=None, output_format="dict"):
+        return [
+            {"text_hash": h, "embedding": self.rows[(params["model"], h)]["embedding"]}
+            for h in params["hashes"] if (params["model"], h) in self.rows
+        ]
+
+
+def _vector(text):
+    return [float(len(text)), float(sum(map(ord, text)) % 97), 0.5]
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    """Record the texts sent to the provider; each gets a vector derived from its text."""
+    sent = []
+
+    def fake_embed(cls, texts, embed_model, cfg):
+        sent.append(list(texts))
+        return {"embeddings": [_vector(t) for t in texts], "model": embed_model,
+                "request_id": f"gen-{len(sent)}", "tokens": 10 * len(texts)}
+
+    monkeypatch.delenv("LARS_EMBED_BACKEND", raising=False)
+    monkeypatch.setattr(Agent, "_embed_uncached", classmethod(fake_embed))
+    monkeypatch.setattr("lars.unified_logs.log_unified", lambda **kwargs: None)
+    return sent
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    db = FakeDB()
+    instance = EmbeddingCache(lambda: db)
+    monkeypatch.setattr(embedding_cache, "_embedding_cache", instance)
+    yield instance
+    if instance._writer is not None:
+        instance._writer.shutdown()
+
+
+class TestAgentEmbed:
+    def test_only_misses_are_sent_and_order_is_kept(self, provider, cache):
+        first = Agent.embed(["alpha", "beta"], model="m1")
+        second = Agent.embed(["gamma", "beta", "alpha", "gamma"], model="m1")
+
+        assert provider == [["alpha", "beta"], ["gamma"]]
+        assert second["embeddings"] == [_vector(t) for t in ["gamma", "beta", "alpha", "gamma"]]
+        assert (first["cache_hits"], second["cache_hits"]) == (0, 2)
+        assert second["tokens"] == 10
+
+    def test_fully_cached_call_skips_provider(self, provider, cache):
+        Agent.embed(["alpha"], model="m1")
+        result = Agent.embed(["alpha", "alpha"], model="m1")
+
+        assert provider == [["alpha"]]
+        assert result["request_id"] is None
+        assert result["dim"] == 3
+
+    def test_models_are_cached_separately(self, provider, cache):
+        Agent.embed(["alpha"], model="m1")
+        Agent.embed(["alpha"], model="m2")
+
+        assert provider == [["alpha"], ["alpha"]]
+
+    def test_persistent_tier_survives_a_new_process_cache(self, provider, cache, monkeypatch):
+        Agent.embed(["alpha", "beta"], model="m1")
+        cache.flush()
+        assert len(cache._db.rows) == 2
+
+        # Same table, empty memory tier (e.g. after a restart)
+        restarted = EmbeddingCache(lambda: cache._db)
+        monkeypatch.setattr(embedding_cache, "_embedding_cache", restarted)
+        result = Agent.embed(["beta", "delta"], model="m1")
+
+        assert provider[-1] == ["delta"]
+        assert result["embeddings"][0] == _vector("beta")
+        stats = restarted.get_stats()
+        assert (stats["l2_hits"], stats["l2_misses"]) == (1, 1)
+
+        Agent.embed(["beta"], model="m1")  # Promoted to memory: no second lookup
+        assert restarted.get_stats()["l1"]["hits"] == 1
+
+    def test_cache_off(self, provider, monkeypatch):
+        monkeypatch.setattr(embedding_cache, "_embedding_cache", None)
+        monkeypatch.setattr(get_config(), "embed_cache", "off")
+
+        Agent.embed(["alpha"], model="m1")
+        Agent.embed(["alpha"], model="m1")
+
+        assert provider == [["alpha"], ["alpha"]]
+
+
+def test_memory_tier_is_bounded_and_float32():
+    cache = EmbeddingCache(None, max_entries=2)
+
+    cache.put_many("m", ["a", "b", "c"], [[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]])
+    found = cache.get_many("m", ["a", "b", "c"])
+
+    assert sorted(found) == [1, 2]
+    assert found[2] == pytest.approx([0.5, 0.6])
+    stats = cache.get_stats()
+    assert (stats["l1"]["entries"], stats["l1"]["bytes"] > 0, stats["l2_enabled"]) == (2, True, False)
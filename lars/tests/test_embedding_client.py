@@ -0,0 +1,203 @@
+"""
+Tests for the pooled, concurrent embeddings client (EmbeddingClient).
+
+A local ThreadingHTTPServer stands in for the provider's /embeddings
+endpoint and answers with Agent._deterministic_embed vectors, so results over
+HTTP can be checked against LARS_EMBED_BACKEND=deterministic offline.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from lars import embedding_cache
+from lars.agent import Agent
+from lars.config import get_config
+from lars.embedding_client import EmbeddingClient, parse_retry_after, plan_batches
+
+
+class StubEmbeddingServer(ThreadingHTTPServer):
+    """
+    POST /embeddings stub. Inputs choose the behaviour:
+      throttle*  first request answered with 429 + Retry-After
+      reject*    400
+      anything else: deterministic vectors
+    """
+
+    daemon_threads = True
+
+    def __init__(self, latency_s=0.0, retry_after="0.2"):
+        super().__init__(("127.0.0.1", 0), StubEmbeddingHandler)
+        self.latency_s = latency_s
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.requests = []  # (time, inputs, status)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.connections = set()
+        self.throttled = set()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/api/v1"
+
+
+class StubEmbeddingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        inputs = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["input"]
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            server.connections.add(self.client_address)
+        time.sleep(server.latency_s)
+
+        headers = {}
+        if inputs[0].startswith("reject"):
+            status, body = 400, {"error": "bad input"}
+        elif inputs[0].startswith("throttle") and inputs[0] not in server.throttled:
+            server.throttled.add(inputs[0])
+            status, body = 429, {"error": "rate limited"}
+            headers["Retry-After"] = server.retry_after
+        else:
+            result = Agent._deterministic_embed(inputs, "stub/embed")
+            status = 200
+            # Reversed to check that items are placed by their index
+            body = {"id": f"gen-{len(server.requests)}", "model": "stub/embed",
+                    "usage": {"total_tokens": len(inputs)},
+                    "data": [{"index": i, "embedding": v} for i, v in reversed(list(enumerate(result["embeddings"])))]}
+
+        with server.lock:
+            server.in_flight -= 1
+            server.requests.append((time.perf_counter(), inputs, status))
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(**kwargs):
+        server = StubEmbeddingServer(**kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def clients():
+    created = []
+
+    def make(server, **kwargs):
+        kwargs.setdefault("base_delay", 0.05)
+        client = EmbeddingClient(server.base_url, "sk-test", **kwargs)
+        created.append(client)
+        return client
+
+    yield make
+    for client in created:
+        client.close()
+
+
+class TestPlanBatches:
+    def test_limits_count_and_characters(self):
+        texts = ["x" * 10] * 7
+        assert plan_batches(texts, max_items=3, max_chars=1000) == [(0, 3), (3, 6), (6, 7)]
+        assert plan_batches(texts, max_items=50, max_chars=25) == [(0, 2), (2, 4), (4, 6), (6, 7)]
+
+    def test_oversized_text_gets_its_own_batch(self):
+        texts = ["a", "b" * 500, "c", "d"]
+        assert plan_batches(texts, max_items=50, max_chars=100) == [(0, 1), (1, 2), (2, 4)]
+        assert plan_batches([], 50, 100) == []
+
+
+class TestEmbeddingClient:
+    def test_matches_deterministic_mode_in_order(self, stub, clients):
+        server = stub()
+        client = clients(server, batch_size=7)
+        texts = [f"row {i} text {i % 13}" for i in range(100)]
+
+        result = client.embed(texts, "stub/embed")
+
+        assert result["embeddings"] == Agent._deterministic_embed(texts, "x")["embeddings"]
+        assert result["batches"] == 15
+        assert result["tokens"] == 100
+
+    def test_batches_run_concurrently_over_pooled_connections(self, stub, clients):
+        server = stub(latency_s=0.05)
+        client = clients(server, concurrency=4, batch_size=5)
+        texts = [f"text {i}" for i in range(80)]  # 16 batches
+
+        client.embed(texts, "stub/embed")
+        client.embed(texts, "stub/embed")
+
+        assert 1 < server.max_in_flight <= 4  # Concurrent, bounded by the pool
+        assert len(server.connections) <= 4  # Kept alive across both calls
+        assert client.get_stats()["requests"] == 32
+
+    def test_429_honours_retry_after_and_pauses_other_batches(self, stub, clients):
+        server = stub(retry_after="0.3")
+        client = clients(server, concurrency=2, batch_size=1)
+
+        start = time.perf_counter()
+        result = client.embed(["throttle me", "other one", "third"], "stub/embed")
+
+        assert len(result["embeddings"]) == 3
+        served = [(t - start, inputs[0], status) for t, inputs, status in server.requests]
+        retry_at = next(t for t, text, status in served if text == "throttle me" and status == 200)
+        assert retry_at >= 0.3
+        # "third" was queued behind the 429 and waited out the same window
+        assert next(t for t, text, _ in served if text == "third") >= 0.25
+        stats = client.get_stats()
+        assert (stats["throttled"], stats["retries"]) == (1, 1)
+
+    def test_client_errors_are_not_retried(self, stub, clients):
+        server = stub()
+        client = clients(server)
+
+        with pytest.raises(RuntimeError, match="HTTP 400"):
+            client.embed(["reject this"], "stub/embed")
+        assert len(server.requests) == 1
+
+    def test_retry_after_formats(self):
+        assert parse_retry_after("2") == 2.0
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+
+
+def test_agent_embed_goes_through_pooled_client(stub, monkeypatch):
+    server = stub()
+    config = get_config()
+    monkeypatch.delenv("LARS_EMBED_BACKEND", raising=False)
+    monkeypatch.setattr(config, "provider_base_url", server.base_url)
+    monkeypatch.setattr(config, "embed_cache", "off")
+    monkeypatch.setattr(embedding_cache, "_embedding_cache", None)
+    monkeypatch.setattr("lars.unified_logs.log_unified", lambda **kwargs: None)
+
+    texts = ["alpha beta", "gamma", "alpha beta"]
+    result = Agent.embed(texts, model="stub/embed")
+
+    assert result["embeddings"] == Agent._deterministic_embed(texts, "x")["embeddings"]
+    assert result["model"] == "stub/embed"
+    assert len(server.requests) == 1  # Duplicate text sent once
@@ -0,0 +1,259 @@
+"""
+Tests for the process-wide LLM request scheduler.
+
+Requests are simulated with sleeps inside scheduler slots; the Agent.run test
+replaces litellm.completion with a stub, so no provider is contacted.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from lars import llm_scheduler
+from lars.agent import Agent
+from lars.caller_context import CallerContext, run_with_caller_context, submit_with_caller_context
+from lars.llm_scheduler import LLMScheduler, current_priority, llm_priority
+
+
+class InFlight:
+    """Counts concurrent requests per provider."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.current = {}
+        self.peak = {}
+
+    def request(self, scheduler, provider, duration=0.01, **kwargs):
+        with scheduler.slot(provider, **kwargs):
+            with self.lock:
+                self.current[provider] = self.current.get(provider, 0) + 1
+                self.peak[provider] = max(self.peak.get(provider, 0), self.current[provider])
+            time.sleep(duration)
+            with self.lock:
+                self.current[provider] -= 1
+
+
+def _hold(scheduler, provider, **kwargs):
+    """Take a slot on a background thread until the returned event is set."""
+    entered, release = threading.Event(), threading.Event()
+
+    def run():
+        with scheduler.slot(provider, **kwargs):
+            entered.set()
+            release.wait(5)
+
+    threading.Thread(target=run, daemon=True).start()
+    assert entered.wait(5)
+    return release
+
+
+def _wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+class TestConcurrency:
+    def test_nested_pools_share_the_provider_cap(self):
+        scheduler = LLMScheduler(concurrency=3)
+        tracker = InFlight()
+
+        # Parallel cells -> takes -> vectorized rows: 4 * 4 * 4 = 64 requests
+        def takes(_):
+            with ThreadPoolExecutor(4) as pool:
+                list(pool.map(rows, range(4)))
+
+        def rows(_):
+            with ThreadPoolExecutor(4) as pool:
+                list(pool.map(lambda _: tracker.request(scheduler, "openai"), range(4)))
+
+        with ThreadPoolExecutor(4) as pool:
+            list(pool.map(takes, range(4)))
+
+        assert tracker.peak["openai"] == 3
+        lane = scheduler.get_stats()["lanes"]["openai"]
+        assert (lane["granted"], lane["in_flight"], lane["max_in_flight"]) == (64, 0, 3)
+
+    def test_providers_have_separate_lanes(self):
+        scheduler = LLMScheduler(concurrency=1)
+        release = _hold(scheduler, "openai")
+
+        _hold(scheduler, "ollama").set()  # Enters while openai's only slot is held
+        release.set()
+
+    def test_model_limits_apply_within_the_provider(self):
+        scheduler = LLMScheduler(concurrency=8, limits={"anthropic/claude-opus": {"concurrency": 1}})
+        tracker = InFlight()
+
+        def request(i):
+            model = "anthropic/claude-opus" if i % 2 else "anthropic/claude-haiku"
+            tracker.request(scheduler, model, duration=0.02, model=model)
+
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(request, range(16)))
+
+        # model passed as the "provider" key above only to count per model
+        assert tracker.peak["anthropic/claude-opus"] == 1
+        assert tracker.peak["anthropic/claude-haiku"] > 1
+        assert scheduler.get_stats()["lanes"]["anthropic/claude-opus"]["concurrency"] == 1
+
+    def test_cancelled_waiter_does_not_leak_a_slot(self):
+        scheduler = LLMScheduler(concurrency=1)
+
+        async def cancel_while_queued():
+            async def wait_for_slot():
+                async with scheduler.aslot("openai"):
+                    pass
+
+            async with scheduler.aslot("openai"):
+                task = asyncio.ensure_future(wait_for_slot())
+                await asyncio.sleep(0.01)
+                task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_while_queued())
+
+        stats = scheduler.get_stats()
+        assert stats["waiting"] == 0
+        assert stats["lanes"]["openai"]["in_flight"] == 0
+        with scheduler.slot("openai"):
+            assert scheduler.get_stats()["lanes"]["openai"]["in_flight"] == 1
+
+
+class TestPriority:
+    def test_interactive_overtakes_queued_bulk(self):
+        scheduler = LLMScheduler(concurrency=1)
+        release = _hold(scheduler, "openai")
+        order = []
+
+        def request(name, priority):
+            with scheduler.slot("openai", priority=priority):
+                order.append(name)
+
+        threads = []
+        for name, priority in [("bulk-1", "bulk"), ("bulk-2", "bulk"), ("studio", "interactive")]:
+            thread = threading.Thread(target=request, args=(name, priority))
+            thread.start()
+            threads.append(thread)
+            _wait_until(lambda: scheduler.get_stats()["waiting"] == len(threads))
+
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert order == ["studio", "bulk-1", "bulk-2"]
+        stats = scheduler.get_stats()["priorities"]
+        assert (stats["bulk"]["requests"], stats["bulk"]["queued"]) == (2, 2)
+        assert stats["bulk"]["max_wait_ms"] >= stats["interactive"]["max_wait_ms"] > 0
+
+    def test_priority_follows_the_caller_origin(self):
+        sql = CallerContext("sql-test-1", {"origin": "sql"})
+        ui = CallerContext("ui-test-1", {"origin": "ui"})
+
+        assert run_with_caller_context(sql, current_priority) == "bulk"
+        assert run_with_caller_context(ui, current_priority) == "interactive"
+        with ThreadPoolExecutor(1) as pool:
+            assert submit_with_caller_context(pool, current_priority, ctx=sql).result() == "bulk"
+
+        def forced():
+            with llm_priority("interactive"):
+                return current_priority()
+
+        assert run_with_caller_context(sql, forced) == "interactive"
+        with pytest.raises(ValueError):
+            with llm_priority("urgent"):
+                pass
+
+
+class TestRateLimits:
+    def test_tokens_per_minute_delays_the_next_request(self):
+        scheduler = LLMScheduler(tpm=6000)  # 100 tokens/s
+
+        with scheduler.slot("openai", tokens=6000):
+            pass
+        with scheduler.slot("openai", tokens=50) as ticket:
+            pass
+
+        assert ticket.wait_s > 0.4
+
+    def test_actual_usage_settles_the_estimate(self):
+        scheduler = LLMScheduler(tpm=6000)
+
+        with scheduler.slot("openai", tokens=10) as ticket:
+            ticket.complete(tokens=6010)  # Prompt was far bigger than estimated
+
+        with scheduler.slot("openai", tokens=10) as ticket:
+            pass
+        assert ticket.wait_s > 0.05
+        assert scheduler.get_stats()["lanes"]["openai"]["tokens"] == 6010
+
+    def test_requests_per_minute(self):
+        scheduler = LLMScheduler(rpm=120)  # 2/s, burst of 120
+        scheduler._lanes_for("openai", None, time.monotonic())[0].requests.level = 1
+
+        start = time.monotonic()
+        for _ in range(2):
+            with scheduler.slot("openai"):
+                pass
+        assert time.monotonic() - start > 0.4
+
+    def test_429_pauses_the_lane(self):
+        scheduler = LLMScheduler()
+
+        with scheduler.slot("openai") as ticket:
+            ticket.throttled(60)
+        with scheduler.slot("ollama"):  # Other providers are not paused
+            pass
+
+        now = time.monotonic()
+        openai, ollama = (scheduler._lanes_for(name, None, now)[0] for name in ("openai", "ollama"))
+        assert openai.wait_time(0, now) > 50
+        assert ollama.wait_time(0, now) == 0
+        assert scheduler.get_stats()["lanes"]["openai"]["throttled"] == 1
+
+    def test_rate_limit_errors_detected_by_type_and_status(self):
+        import litellm
+        from lars.agent import _is_rate_limit_error
+
+        class HTTPError(Exception):
+            def __init__(self, status):
+                super().__init__(f"HTTP {status}")
+                self.response = SimpleNamespace(status_code=status, headers={})
+
+        assert _is_rate_limit_error(litellm.RateLimitError("slow down", llm_provider="openai", model="gpt-4"))
+        assert _is_rate_limit_error(HTTPError(429))
+        assert not _is_rate_limit_error(HTTPError(500))
+        assert not _is_rate_limit_error(ValueError("RateLimitConfig is invalid"))
+
+
+def test_agent_run_takes_a_scheduler_slot(monkeypatch):
+    scheduler = LLMScheduler(concurrency=2)
+    tracker = InFlight()
+    monkeypatch.setattr(llm_scheduler, "_llm_scheduler", scheduler)
+    monkeypatch.setattr("lars.caller_context.get_caller_id", lambda connection_id=None: None)
+
+    def completion(**args):
+        tracker.request(LLMScheduler(), "provider", duration=0.02)  # Counts calls in flight
+        message = SimpleNamespace(role="assistant", content="ok", tool_calls=None)
+        return SimpleNamespace(
+            id="gen-1", model=args["model"],
+            choices=[SimpleNamespace(message=message, finish_reason="stop")],
+            usage=SimpleNamespace(prompt_tokens=12, completion_tokens=3, total_tokens=15),
+        )
+
+    monkeypatch.setattr("lars.agent.litellm.completion", completion)
+    agent = Agent(model="openai/gpt-4o-mini", system_prompt="", base_url="http://localhost:1", api_key="sk-test")
+
+    with ThreadPoolExecutor(6) as pool:
+        results = list(pool.map(lambda i: agent.run(f"question {i}"), range(12)))
+
+    assert all(r["content"] == "ok" for r in results)
+    assert tracker.peak["provider"] == 2
+    lane = scheduler.get_stats()["lanes"]["openai"]
+    assert (lane["granted"], lane["tokens"]) == (12, 180)
@@ -0,0 +1,179 @@
+"""
+Tests for multi-row prompt packing (`-- @ pack: N`) of scalar semantic operators.
+
+The model call is a stub that answers from the ITEMS block of the packed
+prompt, and the SemanticCache is backed by the in-process fake from
+conftest.py, so no LLM or ClickHouse is needed.
+"""
+
+import json
+import re
+from types import SimpleNamespace
+
+import pyarrow as pa
+import pytest
+import yaml
+
+from lars import runner as runner_module
+from lars import sql_trail
+from lars.semantic_sql import registry
+from lars.semantic_sql.executor import _extract_pack_from_inputs
+from lars.semantic_sql.packing import strip_pack_hint
+from lars.sql_tools import cache_adapter
+from lars.sql_tools.semantic_rewriter_v2 import rewrite_semantic_sql_v2
+from lars.sql_tools.udf import make_vectorized_wrapper
+
+
+CALLER_ID = "sql-test-packing"
+
+PACK_CASCADE = {
+    "cascade_id": "pack_matches",
+    "inputs_schema": {"text": "Text", "criterion": "Criterion"},
+    "sql_function": {
+        "name": "pack_matches",
+        "args": [{"name": "text", "type": "VARCHAR"}, {"name": "criterion", "type": "VARCHAR"}],
+        "returns": "BOOLEAN",
+        "shape": "SCALAR",
+    },
+    "cells": [{
+        "name": "check",
+        "model": "stub/model",
+        "instructions": "Does {{ input.text }} match {{ input.criterion }}? Answer true or false.",
+        "rules": {"max_turns": 1},
+        "output_schema": {"type": "boolean"},
+    }],
+}
+
+_ITEMS = re.compile(r"ITEMS:\n```json\n(.*?)\n```", re.DOTALL)
+
+
+def _is_fruit(text):
+    return text.startswith("a")
+
+
+@pytest.fixture
+def packing_env(cache_with_db, monkeypatch, tmp_path):
+    """Register a packable function, stub the model and record per-row fallbacks."""
+    cache, _ = cache_with_db
+    path = tmp_path / "pack_matches.cascade.yaml"
+    path.write_text(yaml.safe_dump(PACK_CASCADE))
+    fn = registry.SQLFunctionEntry(
+        name="pack_matches",
+        cascade_path=str(path),
+        cascade_id="pack_matches",
+        config=PACK_CASCADE,
+        sql_function=PACK_CASCADE["sql_function"],
+    )
+    monkeypatch.setattr(registry, "get_sql_function", lambda name: fn if name == "pack_matches" else None)
+    monkeypatch.setattr(cache_adapter, "get_cache", lambda: cache)
+    monkeypatch.setattr("lars.caller_context.get_caller_context", lambda *a, **k: (CALLER_ID, None))
+    monkeypatch.setattr("lars.sql_trail.register_cascade_execution", lambda **kw: None)
+    monkeypatch.setattr("lars.unified_logs.log_unified", lambda **kw: None)
+
+    env = SimpleNamespace(prompts=[], per_row=[], answer=None)
+
+    def default_answer(items):
+        return [{"id": item["id"], "result": _is_fruit(item["text"])} for item in items]
+
+    def fake_run(self, input_message=None, context_messages=None):
+        prompt = context_messages[0]["content"]
+        env.prompts.append(prompt)
+        items = json.loads(_ITEMS.search(prompt).group(1))
+        answers = (env.answer or default_answer)(items)
+        return {"role": "assistant", "content": json.dumps(answers), "id": "req",
+                "model": self.model, "tokens_in": 10 + 5 * len(items), "tokens_out": 5,
+                "cost": None, "provider": "stub"}
+
+    def per_row(func_name, inputs_json, use_cache=True, caller_id=None):
+        args, _ = _extract_pack_from_inputs(json.loads(inputs_json))
+        env.per_row.append(args)
+        return "true" if _is_fruit(args["text"]) else "false"
+
+    monkeypatch.setattr(runner_module.Agent, "run", fake_run)
+    env.udf = make_vectorized_wrapper("pack_matches", fn, per_row)
+    sql_trail.get_and_clear_pack_counts(CALLER_ID)
+    yield env
+    sql_trail.get_and_clear_pack_counts(CALLER_ID)
+    sql_trail.get_and_clear_cache_counts(CALLER_ID)
+    sql_trail.get_and_clear_udf_batch_counts(CALLER_ID)
+
+
+def _run(env, texts, pack=5):
+    criterion = f"__LARS_PACK:{pack}__ fruit"
+    return env.udf(pa.array(texts), pa.array([criterion] * len(texts))).to_pylist()
+
+
+class TestPackHint:
+    def test_rewriter_injects_pack_prefix(self):
+        result = rewrite_semantic_sql_v2("-- @ pack: 25\nSELECT * FROM t WHERE review MEANS 'late shipping'")
+        assert "__LARS_PACK:25__" in result.sql_out
+
+    def test_strip_pack_hint(self):
+        rows = [{"text": "a", "criterion": '__LARS_SOURCE:{"column": "c"}____LARS_PACK:25__ fruit'}]
+        assert strip_pack_hint(rows) == 25
+        assert rows[0]["criterion"] == '__LARS_SOURCE:{"column": "c"}__fruit'
+        assert strip_pack_hint([{"text": "a"}]) is None
+
+
+class TestPacking:
+    def test_misses_packed_into_ceil_n_over_pack_calls(self, packing_env):
+        texts = [f"{'a' if i % 2 else 'b'}{i}" for i in range(12)]
+
+        result = _run(packing_env, texts, pack=5)
+
+        assert len(packing_env.prompts) == 3
+        assert packing_env.per_row == []
+        assert result == [_is_fruit(t) for t in texts]
+
+    def test_shared_criterion_rendered_once(self, packing_env):
+        _run(packing_env, ["a1", "b2", "a3"])
+
+        prompt = packing_env.prompts[0]
+        assert "match fruit?" in prompt
+        assert "[ITEM.text]" in prompt
+        assert '"criterion"' not in _ITEMS.search(prompt).group(1)
+
+    def test_missing_and_invalid_items_fall_back_per_row(self, packing_env):
+        def partial(items):
+            # Drop id 0, return an invalid (non-boolean) result for id 1
+            answers = [{"id": item["id"], "result": _is_fruit(item["text"])} for item in items[2:]]
+            return answers + [{"id": items[1]["id"], "result": "maybe"}, {"id": 99, "result": True}]
+        packing_env.answer = partial
+
+        texts = ["a0", "b1", "a2", "b3"]
+        result = _run(packing_env, texts, pack=4)
+
+        assert len(packing_env.prompts) == 1
+        assert sorted(args["text"] for args in packing_env.per_row) == ["a0", "b1"]
+        assert result == [True, False, True, False]
+
+    def test_unparseable_response_falls_back_per_row(self, packing_env):
+        packing_env.answer = lambda items: {"not": "an array"}
+
+        result = _run(packing_env, ["a0", "b1", "a2"])
+
+        assert len(packing_env.per_row) == 3
+        assert result == [True, False, True]
+
+    def test_sql_trail_records_tokens_saved(self, packing_env):
+        texts = [f"a{i}" for i in range(10)]
+        _run(packing_env, texts, pack=10)
+
+        rows, calls, tokens_saved = sql_trail.get_and_clear_pack_counts(CALLER_ID)
+        assert (rows, calls) == (10, 1)
+        assert tokens_saved > 0
+
+    def test_packed_results_are_cached(self, packing_env):
+        texts = ["a0", "b1", "a2"]
+        _run(packing_env, texts)
+        _run(packing_env, texts)
+
+        assert len(packing_env.prompts) == 1
+        assert packing_env.per_row == []
+
+    def test_without_hint_rows_run_individually(self, packing_env):
+        texts = ["a0", "b1", "a2"]
+        packing_env.udf(pa.array(texts), pa.array(["fruit"] * 3))
+
+        assert packing_env.prompts == []
+        assert len(packing_env.per_row) == 3
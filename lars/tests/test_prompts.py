@@ -476,6 +476,78 @@ class TestPromptEngine:
         assert result == "Hello Test"
 
 
+# =============================================================================
+# COMPILED TEMPLATE CACHE
+# =============================================================================
+
+class TestCompiledTemplateCache:
+    """Templates are compiled once and reused across renders."""
+
+    def test_inline_template_compiled_once(self):
+        engine = PromptEngine()
+        template = "Does {{ input.text }} match {{ input.criterion }}?"
+
+        results = [engine.render(template, {"input": {"text": f"row {i}", "criterion": "fruit"}}) for i in range(5)]
+
+        assert results[3] == "Does row 3 match fruit?"
+        stats = engine.templates.get_stats()
+        assert (stats["entries"], stats["hits"], stats["misses"]) == (1, 4, 1)
+
+    def test_file_template_reloads_when_modified(self):
+        engine = PromptEngine()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "prompt.j2"
+            path.write_text("v1 {{ x }}")
+            assert engine.render(f"@{path}", {"x": 1}) == "v1 1"
+            assert engine.render(f"@{path}", {"x": 2}) == "v1 2"
+
+            path.write_text("version2 {{ x }}")
+            assert engine.render(f"@{path}", {"x": 3}) == "version2 3"
+
+        stats = engine.templates.get_stats()
+        assert (stats["hits"], stats["misses"]) == (1, 2)
+
+    def test_bounded_lru(self):
+        engine = PromptEngine()
+        engine.templates.max_entries = 2
+
+        for name in ("a", "b", "a", "c"):
+            engine.render(f"{name} {{{{ x }}}}", {"x": 1})
+
+        assert engine.templates.get_stats()["entries"] == 2
+        engine.render("a {{ x }}", {"x": 1})  # Kept: used more recently than b
+        engine.render("b {{ x }}", {"x": 1})  # Evicted
+        assert (engine.templates.hits, engine.templates.misses) == (2, 4)
+
+
+@pytest.mark.benchmark
+def test_benchmark_operator_prompt_render():
+    """Renders/s of a built-in operator prompt, compiling per render vs cached."""
+    import time
+    import lars
+    from lars.cascade import load_cascade_config
+
+    path = os.path.join(os.path.dirname(lars.__file__), "builtin_cascades", "semantic_sql", "matches.cascade.yaml")
+    instructions = load_cascade_config(path).cells[0].instructions
+    engine = PromptEngine()
+    rows = [{"input": {"text": f"customer review {i}: arrived late", "criterion": "complaint"}} for i in range(300)]
+
+    start = time.perf_counter()
+    for context in rows:
+        engine.env.from_string(instructions).render(**context)
+    uncached = len(rows) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for context in rows:
+        engine.render(instructions, context)
+    cached = len(rows) / (time.perf_counter() - start)
+
+    print(f"\noperator prompt renders/s: compile per render {uncached:.0f}  cached {cached:.0f}  "
+          f"({cached / uncached:.1f}x)")
+    assert cached > uncached
+    assert engine.templates.get_stats()["misses"] == 1
+
+
 # =============================================================================
 # ERROR HANDLING
 # =============================================================================
@@ -0,0 +1,144 @@
+"""
+Tests for the lean row-mode runner used by single-cell semantic SQL operators.
+
+The model call is replaced by a stub (Agent.run) and unified_logs writes are
+captured, so no LLM or ClickHouse is needed.
+"""
+
+import os
+import time
+
+import pytest
+
+import lars
+
+from lars import runner as runner_module
+from lars.cascade import load_cascade_config
+from lars.runner import RowModeFallback, RowModeRunner, is_row_mode_eligible
+from lars.semantic_sql import executor
+
+
+BUILTIN_SQL_DIR = os.path.join(os.path.dirname(lars.__file__), "builtin_cascades", "semantic_sql")
+
+MATCHES_CASCADE = {
+    "cascade_id": "row_mode_matches",
+    "inputs_schema": {"text": "Text", "criterion": "Criterion"},
+    "cells": [{
+        "name": "check",
+        "model": "stub/model",
+        "instructions": "Does {{ input.text }} match {{ input.criterion }}? Answer true or false.",
+        "rules": {"max_turns": 1},
+        "output_schema": {"type": "boolean"},
+    }],
+}
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    """Replace the model call and capture unified_logs records."""
+    calls = []
+    logged = []
+
+    def fake_run(self, input_message=None, context_messages=None):
+        calls.append(context_messages)
+        return {"role": "assistant", "content": stub_llm.reply, "id": f"req-{len(calls)}",
+                "model": self.model, "tokens_in": 20, "tokens_out": 1, "cost": None, "provider": "stub"}
+
+    stub_llm.reply = "true"
+    monkeypatch.setattr(runner_module.Agent, "run", fake_run)
+    monkeypatch.setattr("lars.unified_logs.log_unified", lambda **kw: logged.append(kw))
+    stub_llm.calls = calls
+    stub_llm.logged = logged
+    return stub_llm
+
+
+class TestEligibility:
+    def test_builtin_operators_are_eligible(self):
+        for name in ("matches", "implies", "score"):
+            config = load_cascade_config(os.path.join(BUILTIN_SQL_DIR, f"{name}.cascade.yaml"))
+            assert is_row_mode_eligible(config), name
+
+    @pytest.mark.parametrize("change", [
+        {"cells": [MATCHES_CASCADE["cells"][0], {"name": "second", "instructions": "x"}]},
+        {"takes": {"factor": 3}},
+        {"cells": [{**MATCHES_CASCADE["cells"][0], "skills": ["smart_sql_run"]}]},
+        {"cells": [{**MATCHES_CASCADE["cells"][0], "rules": {"max_turns": 3}}]},
+        {"cells": [{**MATCHES_CASCADE["cells"][0], "rules": {"loop_until": "my_validator"}}]},
+        {"cells": [{"name": "det", "tool": "python:lars.demo_tools.transform_data"}]},
+    ])
+    def test_anything_else_needs_full_runner(self, change):
+        assert not is_row_mode_eligible(load_cascade_config({**MATCHES_CASCADE, **change}))
+
+
+class TestRowModeRunner:
+    def test_single_call_and_single_log_record(self, stub_llm):
+        result = RowModeRunner(MATCHES_CASCADE, session_id="s1", caller_id="c1").run(
+            {"text": "apple", "criterion": "fruit"}
+        )
+
+        assert executor._extract_cascade_output(result) == "true"
+        assert len(stub_llm.calls) == 1
+        prompt = stub_llm.calls[0][0]["content"]
+        assert "Does apple match fruit?" in prompt
+        assert "OUTPUT FORMAT REQUIREMENT" in prompt
+        assert len(stub_llm.logged) == 1
+        record = stub_llm.logged[0]
+        assert record["session_id"] == "s1"
+        assert record["caller_id"] == "c1"
+        assert record["request_id"] == "req-1"
+
+    def test_schema_mismatch_falls_back(self, stub_llm):
+        stub_llm.reply = "I cannot tell"
+
+        with pytest.raises(RowModeFallback):
+            RowModeRunner(MATCHES_CASCADE).run({"text": "a", "criterion": "b"})
+
+    def test_ineligible_config_rejected(self):
+        with pytest.raises(ValueError):
+            RowModeRunner({**MATCHES_CASCADE, "takes": {"factor": 2}})
+
+    def test_executor_uses_row_mode(self, stub_llm, monkeypatch):
+        def no_full_runner(*args, **kwargs):
+            raise AssertionError("full runner should not be constructed")
+
+        monkeypatch.setattr("lars.runner.LARSRunner", no_full_runner)
+        result = executor._run_cascade_sync(MATCHES_CASCADE, "s2", {"text": "a", "criterion": "b"})
+
+        assert executor._extract_cascade_output(result) == "true"
+
+    def test_try_row_mode_returns_none_on_fallback(self, stub_llm):
+        stub_llm.reply = ""
+
+        assert executor._try_row_mode(MATCHES_CASCADE, "s3", {"text": "a", "criterion": "b"}) is None
+
+    def test_disabled_by_config(self, stub_llm, monkeypatch):
+        from lars.config import get_config
+
+        monkeypatch.setattr(get_config(), "sql_row_mode", False)
+
+        assert executor._try_row_mode(MATCHES_CASCADE, "s4", {"text": "a", "criterion": "b"}) is None
+        assert stub_llm.calls == []
+
+
+@pytest.mark.benchmark
+def test_benchmark_row_mode_vs_full_runner(stub_llm):
+    """Framework overhead per row (model call stubbed): row mode vs LARSRunner."""
+    from lars.runner import LARSRunner
+
+    inputs = {"text": "apple", "criterion": "fruit"}
+    config = load_cascade_config(MATCHES_CASCADE)
+
+    rows = 500
+    start = time.perf_counter()
+    for i in range(rows):
+        RowModeRunner(config, session_id=f"row-{i}").run(inputs)
+    row_mode_ms = (time.perf_counter() - start) / rows * 1000
+
+    full_rows = 3
+    start = time.perf_counter()
+    for i in range(full_rows):
+        LARSRunner(config, session_id=f"bench_full_{i}").run(input_data=inputs)
+    full_ms = (time.perf_counter() - start) / full_rows * 1000
+
+    print(f"\nper-row framework overhead: row mode {row_mode_ms:.3f}ms  full runner {full_ms:.1f}ms")
+    assert row_mode_ms < full_ms
@@ -0,0 +1,404 @@
+"""
+Tests for the SemanticCache (sql_tools/cache_adapter.py).
+
+L2 is exercised against an in-process fake of the ClickHouse adapter that
+records every query (see conftest.py), so round trips can be counted without
+a server.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+
+from lars.sql_tools.cache_adapter import L1Cache, SemanticCache
+
+
+def _lookup_queries(db):
+    return [q for q in db.queries if "hit_count" not in q[0]]
+
+
+class TestL1Cache:
+    def test_lru_evicts_least_recently_used(self):
+        l1 = L1Cache(max_entries=3, max_bytes=10_000)
+        for key in ("a", "b", "c"):
+            l1.set(key, "fn", "v", "VARCHAR", 0.0, None)
+
+        l1.get("a")  # a is now most recently used
+        l1.set("d", "fn", "v", "VARCHAR", 0.0, None)
+
+        assert "b" not in l1
+        assert all(k in l1 for k in ("a", "c", "d"))
+        assert l1.evictions == 1
+
+    def test_bounded_by_bytes(self):
+        l1 = L1Cache(max_entries=100, max_bytes=250)
+        for i in range(5):
+            l1.set(f"k{i}", "fn", "x" * 98, "VARCHAR", 0.0, None)
+
+        stats = l1.get_stats()
+        assert stats["entries"] == 2
+        assert stats["bytes"] <= 250
+        assert "k4" in l1 and "k3" in l1
+
+    def test_oversized_result_not_cached(self):
+        l1 = L1Cache(max_entries=100, max_bytes=100)
+        l1.set("small", "fn", "x", "VARCHAR", 0.0, None)
+        l1.set("huge", "fn", "x" * 1000, "VARCHAR", 0.0, None)
+
+        assert "huge" not in l1
+        assert "small" in l1
+        assert l1.rejected == 1
+
+    def test_per_function_limits(self):
+        l1 = L1Cache(
+            max_entries=100,
+            max_bytes=100_000,
+            function_limits={"semantic_summarize": {"max_entries": 2}},
+        )
+        for i in range(5):
+            l1.set(f"s{i}", "semantic_summarize", "summary", "VARCHAR", 0.0, None)
+            l1.set(f"m{i}", "semantic_matches", True, "BOOLEAN", 0.0, None)
+
+        stats = l1.get_stats()["by_function"]
+        assert stats["semantic_summarize"]["entries"] == 2
+        assert stats["semantic_matches"]["entries"] == 5
+        assert "s4" in l1 and "s3" in l1 and "s0" not in l1
+
+    def test_replace_updates_bytes(self):
+        l1 = L1Cache(max_entries=10, max_bytes=10_000)
+        l1.set("k", "fn", "x" * 100, "VARCHAR", 0.0, None)
+        l1.set("k", "fn", "x", "VARCHAR", 0.0, None)
+
+        assert len(l1) == 1
+        assert l1.get_stats()["bytes"] == L1Cache.estimate_size("k", "x")
+
+    def test_hit_miss_and_expiry_counters(self):
+        l1 = L1Cache(max_entries=10, max_bytes=10_000)
+        l1.set("live", "fn", "v", "VARCHAR", 0.0, None)
+        l1.set("dead", "fn", "v", "VARCHAR", 0.0, time.time() - 1)
+
+        assert l1.get("live") is not None
+        assert l1.get("dead") is None
+        assert l1.get("absent") is None
+
+        stats = l1.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+        assert stats["expirations"] == 1
+        assert "dead" not in l1
+
+    def test_clear_by_function_name(self, cache_with_db):
+        cache, _ = cache_with_db
+        cache.set("semantic_matches", {"text": "a"}, True, "BOOLEAN")
+        cache.set("semantic_score", {"text": "a"}, 0.5, "DOUBLE")
+
+        cache.clear(function_name="semantic_matches")
+
+        assert len(SemanticCache._l1_cache) == 1
+        assert cache.get("semantic_score", {"text": "a"}, track_hit=False)[0]
+
+    def test_stats_exposed(self, cache_with_db):
+        from lars.sql_tools.udf import get_udf_cache_stats
+
+        cache, _ = cache_with_db
+        cache.set("fn", {"text": "a"}, "v")
+        cache.get("fn", {"text": "a"}, track_hit=False)
+
+        l1_stats = cache.get_stats()["l1"]
+        assert l1_stats["entries"] == 1
+        assert l1_stats["hits"] >= 1
+        assert "evictions" in l1_stats
+        assert get_udf_cache_stats()["semantic_l1"]["entries"] == 1
+
+
+class TestBackgroundWriter:
+    def test_writes_are_batched_into_one_insert(self, cache_with_db):
+        cache, db = cache_with_db
+        for i in range(100):
+            cache.set("fn", {"text": str(i)}, f"result {i}")
+
+        cache.flush()
+
+        assert len(db.inserts) == 1
+        table, rows = db.inserts[0]
+        assert table == "semantic_sql_cache"
+        assert len(rows) == 100
+
+    def test_repeated_writes_to_same_key_coalesce(self, cache_with_db):
+        cache, db = cache_with_db
+        for value in ("first", "second", "third"):
+            cache.set("fn", {"text": "a"}, value)
+
+        cache.flush()
+
+        rows = db.inserts[0][1]
+        assert len(rows) == 1
+        assert rows[0]["result"] == "third"
+
+    def test_hits_are_summed_per_key(self, cache_with_db):
+        cache, db = cache_with_db
+        key = SemanticCache.make_cache_key("fn", {"text": "a"})
+        db.put(key, "v", hit_count=3)
+        for _ in range(5):
+            cache._record_hit_async(key)
+
+        cache.flush()
+
+        assert len(_lookup_queries(db)) == 0
+        assert len([q for q in db.queries if "hit_count" in q[0]]) == 1
+        assert len(db.inserts) == 1
+        assert db.rows[key]["hit_count"] == 8
+
+    def test_hits_on_pending_write_fold_into_row(self, cache_with_db):
+        cache, db = cache_with_db
+        key = cache.set("fn", {"text": "a"}, "v")
+        cache._record_hit_async(key)
+        cache._record_hit_async(key)
+
+        cache.flush()
+
+        assert db.queries == []
+        assert db.inserts[0][1][0]["hit_count"] == 3
+
+    def test_overflow_is_dropped_and_counted(self, cache_with_db, monkeypatch):
+        from lars.sql_tools import cache_adapter
+
+        cache, db = cache_with_db
+        monkeypatch.setattr(cache_adapter.SemanticCacheWriter, "QUEUE_MAX_SIZE", 5)
+        monkeypatch.setattr(cache_adapter.SemanticCacheWriter, "FLUSH_INTERVAL", 60)
+        cache._writer = None
+        for i in range(8):
+            cache.set("fn", {"text": str(i)}, "v")
+
+        stats = cache.get_stats()["writer"]
+        assert stats["queue_depth"] == 5
+        assert stats["dropped"] == 3
+
+        cache.flush()
+        stats = cache.get_stats()["writer"]
+        assert stats["queue_depth"] == 0
+        assert stats["rows_written"] == 5
+
+    def test_batch_without_db_is_counted_as_dropped(self, cache_with_db):
+        cache, db = cache_with_db
+        for i in range(3):
+            cache.set("fn", {"text": str(i)}, "v")
+
+        cache._db = None  # ClickHouse went away before the flush
+        cache.flush()
+
+        stats = cache.get_stats()["writer"]
+        assert (stats["dropped"], stats["rows_written"], stats["queue_depth"]) == (3, 0, 0)
+        assert db.inserts == []
+
+    def test_shutdown_flushes_pending(self, cache_with_db):
+        cache, db = cache_with_db
+        cache.set("fn", {"text": "a"}, "v")
+
+        cache._writer.shutdown()
+
+        assert len(db.inserts) == 1
+
+
+class TestGetBatch:
+    def test_l2_misses_resolved_in_one_query(self, cache_with_db):
+        cache, db = cache_with_db
+        args_list = [{"text": f"row {i}", "criterion": "c"} for i in range(50)]
+        for args in args_list[:20]:
+            db.put(SemanticCache.make_cache_key("semantic_matches", args), "true", "BOOLEAN")
+
+        results = cache.get_batch("semantic_matches", args_list, track_hit=False)
+
+        assert len(_lookup_queries(db)) == 1
+        assert len(results) == 50
+        hits = [r for r in results.values() if r[0]]
+        assert len(hits) == 20
+        assert all(r == (True, "true", "BOOLEAN") for r in hits)
+
+    def test_results_keyed_by_cache_key(self, cache_with_db):
+        cache, db = cache_with_db
+        args = {"text": "hello"}
+        key = SemanticCache.make_cache_key("fn", args)
+        db.put(key, "world")
+
+        results = cache.get_batch("fn", [args, {"text": "missing"}], track_hit=False)
+
+        assert results[key] == (True, "world", "VARCHAR")
+        missing_key = SemanticCache.make_cache_key("fn", {"text": "missing"})
+        assert results[missing_key] == (False, None, "")
+
+    def test_l2_hits_populate_l1(self, cache_with_db):
+        cache, db = cache_with_db
+        args_list = [{"text": str(i)} for i in range(10)]
+        for args in args_list:
+            db.put(SemanticCache.make_cache_key("fn", args), "x")
+
+        cache.get_batch("fn", args_list, track_hit=False)
+        db.queries.clear()
+        results = cache.get_batch("fn", args_list, track_hit=False)
+
+        assert db.queries == []
+        assert all(found for found, _, _ in results.values())
+
+    def test_l1_hits_skip_l2(self, cache_with_db):
+        cache, db = cache_with_db
+        cache.set("fn", {"text": "a"}, "cached")
+        db.queries.clear()
+
+        results = cache.get_batch("fn", [{"text": "a"}], track_hit=False)
+
+        assert _lookup_queries(db) == []
+        assert list(results.values()) == [(True, "cached", "VARCHAR")]
+
+    def test_duplicate_args_looked_up_once(self, cache_with_db):
+        cache, db = cache_with_db
+        args_list = [{"text": "same"}] * 100
+
+        results = cache.get_batch("fn", args_list, track_hit=False)
+
+        assert len(results) == 1
+        assert len(_lookup_queries(db)) == 1
+        assert len(_lookup_queries(db)[0][1]["cache_keys"]) == 1
+
+    def test_large_batches_are_chunked(self, cache_with_db, monkeypatch):
+        cache, db = cache_with_db
+        monkeypatch.setattr(SemanticCache, "L2_BATCH_CHUNK_SIZE", 100)
+        args_list = [{"text": str(i)} for i in range(250)]
+
+        cache.get_batch("fn", args_list, track_hit=False)
+
+        assert [len(q[1]["cache_keys"]) for q in _lookup_queries(db)] == [100, 100, 50]
+
+    def test_expired_l2_rows_are_misses(self, cache_with_db):
+        cache, db = cache_with_db
+        key = SemanticCache.make_cache_key("fn", {"text": "old"})
+        db.put(key, "stale")
+        db.rows[key]["expires_at"] = datetime(2000, 1, 1)
+
+        results = cache.get_batch("fn", [{"text": "old"}], track_hit=False)
+
+        assert results[key] == (False, None, "")
+
+    def test_l2_unavailable(self, cache_with_db):
+        cache, _ = cache_with_db
+        cache._db = None
+
+        results = cache.get_batch("fn", [{"text": "a"}], track_hit=False)
+
+        assert list(results.values()) == [(False, None, "")]
+
+
+@pytest.mark.benchmark
+def test_benchmark_get_batch_vs_per_row(cache_with_db):
+    """Lookup latency vs. batch size, per-row get() against get_batch().
+
+    Uses a fake L2 with 1ms per round trip to model a nearby ClickHouse.
+    """
+    cache, db = cache_with_db
+    db.latency_s = 0.001
+
+    print("\nbatch_size  per_row_ms  batched_ms  l2_round_trips")
+    for batch_size in (10, 100, 500):
+        args_list = [{"text": f"{batch_size}-{i}"} for i in range(batch_size)]
+        for args in args_list:
+            db.put(SemanticCache.make_cache_key("bench", args), "v")
+
+        SemanticCache._l1_cache.clear()
+        start = time.perf_counter()
+        for args in args_list:
+            cache.get("bench", args, track_hit=False)
+        per_row_ms = (time.perf_counter() - start) * 1000
+
+        SemanticCache._l1_cache.clear()
+        db.queries.clear()
+        start = time.perf_counter()
+        results = cache.get_batch("bench", args_list, track_hit=False)
+        batched_ms = (time.perf_counter() - start) * 1000
+
+        round_trips = len(_lookup_queries(db))
+        print(f"{batch_size:>10}  {per_row_ms:>10.1f}  {batched_ms:>10.1f}  {round_trips:>14}")
+
+        assert all(found for found, _, _ in results.values())
+        assert round_trips == 1
+        assert batched_ms < per_row_ms
+
+
+def _join_from_other_thread(cache, function_name, args):
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(cache.begin_flight, function_name, args).result()
+
+
+class TestInFlight:
+    def test_first_caller_leads(self, cache_with_db):
+        cache, _ = cache_with_db
+        flight = cache.begin_flight("fn", {"text": "a"})
+
+        assert flight.is_leader
+        flight.release()
+        assert cache.get_stats()["inflight"]["in_flight"] == 0
+
+    def test_concurrent_misses_compute_once(self, cache_with_db):
+        cache, _ = cache_with_db
+        args = {"text": "a"}
+        computed = []
+        barrier = threading.Barrier(8)
+
+        def worker():
+            barrier.wait()
+            found, result, _ = cache.get("fn", args, track_hit=False)
+            if found:
+                return result
+            flight = cache.begin_flight("fn", args)
+            try:
+                if not flight.is_leader and flight.wait():
+                    found, result, _ = cache.get("fn", args, track_hit=False)
+                    if found:
+                        return result
+                time.sleep(0.05)
+                computed.append(1)
+                cache.set("fn", args, "computed")
+                return "computed"
+            finally:
+                flight.release()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: worker(), range(8)))
+
+        assert results == ["computed"] * 8
+        assert len(computed) == 1
+        stats = cache.get_stats()["inflight"]
+        assert stats["in_flight"] == 0
+        assert stats["coalesced"] >= 1
+
+    def test_leader_failure_releases_followers(self, cache_with_db):
+        cache, _ = cache_with_db
+        leader = cache.begin_flight("fn", {"text": "a"})
+        follower = _join_from_other_thread(cache, "fn", {"text": "a"})
+        assert not follower.is_leader
+
+        threading.Timer(0.02, leader.release).start()
+
+        assert follower.wait(timeout=5)
+        assert not cache.get("fn", {"text": "a"}, track_hit=False)[0]
+
+    def test_wait_timeout_counted(self, cache_with_db):
+        cache, _ = cache_with_db
+        leader = cache.begin_flight("fn", {"text": "a"})
+        follower = _join_from_other_thread(cache, "fn", {"text": "a"})
+
+        assert not follower.wait(timeout=0.01)
+        assert cache.get_stats()["inflight"]["timeouts"] == 1
+        leader.release()
+
+    def test_reentrant_join_leads_without_deadlock(self, cache_with_db):
+        cache, _ = cache_with_db
+        outer = cache.begin_flight("fn", {"text": "a"})
+        inner = cache.begin_flight("fn", {"text": "a"})
+
+        assert inner.is_leader
+        inner.release()
+        assert cache.get_stats()["inflight"]["in_flight"] == 1
+        outer.release()
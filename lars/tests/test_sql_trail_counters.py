@@ -0,0 +1,135 @@
+"""
+Tests for in-memory SQL trail counters and append-only progress snapshots.
+
+The database is a fake that records statements, so the tests can check that
+LLM calls no longer issue ALTER TABLE UPDATE mutations.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from lars import sql_trail
+from lars.migrations.runner import _parse_sql_statements
+
+MIGRATION = Path(__file__).parent.parent / "lars" / "migrations" / "sql" / "038_sql_query_progress.sql"
+
+
+class FakeDB:
+    def __init__(self):
+        self.executed = []
+        self.inserted = []
+
+    def execute(self, sql, params=None):
+        self.executed.append(" ".join(sql.split()))
+
+    def insert_rows(self, table, rows, columns=None):
+        self.inserted.append((table, rows))
+
+    def query(self, sql, params=None, output_format="dict"):
+        return []
+
+    def rows(self, table):
+        return [row for t, rows in self.inserted if t == table for row in rows]
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = FakeDB()
+    monkeypatch.setattr("lars.db_adapter.get_db", lambda: fake)
+    monkeypatch.setattr(sql_trail, "_progress_interval", lambda: 0)
+    monkeypatch.setattr(sql_trail, "_running_queries", {})
+    yield fake
+    for caller_id in ("sql-a", "sql-b"):
+        sql_trail.get_and_clear_llm_counts(caller_id)
+        sql_trail.get_and_clear_cache_counts(caller_id)
+        sql_trail.get_and_clear_udf_batch_counts(caller_id)
+
+
+class TestLLMCounters:
+    def test_llm_calls_do_not_mutate_query_log(self, db):
+        query_id = sql_trail.log_query_start("sql-a", "SELECT x MEANS 'y' FROM t", "postgresql_wire")
+
+        for _ in range(50):
+            sql_trail.increment_llm_call("sql-a")
+        sql_trail.record_llm_call("sql-a", tokens_in=100, tokens_out=10, cost=0.002)
+
+        assert db.executed == []
+        assert sql_trail.get_query_counters("sql-a")["llm_calls"] == 51
+
+        sql_trail.log_query_complete(query_id, rows_output=5, cache_hits=3)
+
+        [update] = db.executed
+        assert update.startswith("ALTER TABLE sql_query_log UPDATE")
+        assert "llm_calls_count = 51" in update
+        assert "total_tokens_in = 100" in update
+        assert "total_tokens_out = 10" in update
+        assert "total_cost = 0.002" in update
+        assert "cache_hits = 3" in update
+        assert f"WHERE query_id = '{query_id}'" in update
+        assert sql_trail.get_and_clear_llm_counts("sql-a") == (0, 0, 0, 0.0)
+
+    def test_counters_are_kept_per_caller(self, db):
+        sql_trail.record_llm_call("sql-a", tokens_in=5)
+        sql_trail.record_llm_call("sql-b", tokens_in=7)
+        sql_trail.record_llm_call("sql-b", tokens_in=7)
+
+        assert sql_trail.get_and_clear_llm_counts("sql-a") == (1, 5, 0, 0.0)
+        assert sql_trail.get_and_clear_llm_counts("sql-b") == (2, 14, 0, 0.0)
+
+    def test_error_writes_calls_and_clears_counters(self, db):
+        query_id = sql_trail.log_query_start("sql-a", "SELECT 1", "postgresql_wire")
+        sql_trail.record_llm_call("sql-a")
+        sql_trail.increment_cache_miss("sql-a")
+
+        sql_trail.log_query_error(query_id, "boom")
+
+        [update] = db.executed
+        assert "llm_calls_count = 1" in update
+        assert sql_trail.get_query_counters("sql-a")["cache_misses"] == 0
+
+    def test_no_llm_calls_leaves_count_untouched(self, db):
+        query_id = sql_trail.log_query_start("sql-a", "SELECT 1", "postgresql_wire")
+        sql_trail.log_query_complete(query_id)
+
+        assert "llm_calls_count" not in db.executed[0]
+
+
+class TestProgressSnapshots:
+    def test_snapshots_are_appended_only_when_counters_change(self, db):
+        query_id = sql_trail.log_query_start("sql-a", "SELECT 1", "postgresql_wire")
+        sql_trail.record_llm_call("sql-a", tokens_in=10)
+        sql_trail.record_udf_batch("sql-a", rows=100, distinct_calls=20)
+
+        assert sql_trail.write_progress_snapshots() == 1
+        assert sql_trail.write_progress_snapshots() == 0  # Nothing changed
+        sql_trail.increment_cache_hit("sql-a")
+        assert sql_trail.write_progress_snapshots() == 1
+
+        first, second = db.rows("sql_query_progress")
+        assert (first["query_id"], first["llm_calls"], first["udf_rows"]) == (query_id, 1, 100)
+        assert (first["cache_hits"], second["cache_hits"]) == (0, 1)
+        assert db.executed == []
+
+    def test_young_and_finished_queries_are_skipped(self, db):
+        query_id = sql_trail.log_query_start("sql-a", "SELECT 1", "postgresql_wire")
+
+        assert sql_trail.write_progress_snapshots(min_age_s=60) == 0
+        sql_trail.log_query_complete(query_id)
+        assert sql_trail.write_progress_snapshots() == 0
+
+    def test_migration_creates_progress_table(self):
+        session_mod = pytest.importorskip("chdb.session")
+        session = session_mod.Session()
+        try:
+            session.query("CREATE DATABASE IF NOT EXISTS lars_progress_test")
+            session.query("USE lars_progress_test")
+            for stmt in _parse_sql_statements(MIGRATION.read_text()):
+                session.query(stmt)
+            session.query("INSERT INTO sql_query_progress (query_id, caller_id, elapsed_ms, llm_calls) "
+                          "VALUES ('q1', 'sql-a', 1500, 3)")
+            out = session.query("SELECT llm_calls, tokens_in FROM sql_query_progress", "CSV").bytes().decode()
+            assert out.strip() == "3,0"
+        finally:
+            session.query("DROP DATABASE IF EXISTS lars_progress_test")
+            session.close()
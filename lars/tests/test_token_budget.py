@@ -0,0 +1,128 @@
+"""
+Tests for incremental token accounting in TokenBudgetManager.
+
+Counts must match a from-scratch count of the same messages, while only
+never-seen message content is tokenized.
+"""
+
+import time
+
+import pytest
+
+from lars import token_budget
+from lars.cascade import TokenBudgetConfig
+from lars.token_budget import TokenBudgetManager
+
+
+@pytest.fixture(autouse=True)
+def fresh_counts(monkeypatch):
+    monkeypatch.setattr(token_budget, "_token_counts", token_budget.OrderedDict())
+
+
+def _manager(**config):
+    return TokenBudgetManager(TokenBudgetConfig(**config), "gpt-4")
+
+
+def _tool_turn(i):
+    return [
+        {"role": "assistant", "content": f"Checking table {i}",
+         "tool_calls": [{"id": f"call_{i}", "function": {"name": "sql_data", "arguments": f'{{"sql": "SELECT {i}"}}'}}]},
+        {"role": "tool", "tool_call_id": f"call_{i}", "content": f"result rows for query {i} " * 20},
+    ]
+
+
+def _from_scratch(manager, messages):
+    return sum(manager._count_messages_uncached([msg])[0] for msg in messages)
+
+
+def test_counts_match_from_scratch_count():
+    manager = _manager()
+    messages = [
+        {"role": "system", "content": "You are a careful analyst."},
+        {"role": "user", "content": [{"type": "text", "text": "Describe this"},
+                                     {"type": "image_url", "image_url": {"url": "data:image/png;base64,AAA"}}]},
+    ]
+    for i in range(3):
+        messages.extend(_tool_turn(i))
+
+    assert manager.count_tokens(messages) == _from_scratch(manager, messages)
+    assert manager.count_tokens([]) == 0
+
+
+def test_appended_messages_are_the_only_ones_tokenized():
+    manager = _manager()
+    messages = [{"role": "system", "content": "System prompt"}]
+    manager.check_budget(messages)
+
+    for i in range(10):
+        messages.extend(_tool_turn(i))
+        manager.check_budget(messages)
+
+    assert manager.stats["messages_tokenized"] == 21
+    assert manager.stats["messages_hashed"] == 21
+    assert manager.current_usage == _from_scratch(manager, messages)
+
+
+def test_modified_content_is_recounted():
+    manager = _manager()
+    messages = [{"role": "user", "content": "short"}]
+    before = manager.count_tokens(messages)
+
+    messages[0]["content"] = "a much longer message than before " * 10
+    assert manager.count_tokens(messages) > before
+    assert manager.stats["messages_tokenized"] == 2
+
+
+def test_counts_shared_across_managers_by_content_hash():
+    messages = [{"role": "user", "content": f"question {i}"} for i in range(5)]
+    _manager().count_tokens(messages)
+
+    copy = [dict(msg) for msg in messages]
+    other = _manager()
+    other.count_tokens(copy)
+    assert other.stats["messages_hashed"] == 5
+    assert other.stats["messages_tokenized"] == 0
+
+
+def test_enforce_budget_strategies_use_per_message_counts():
+    messages = [{"role": "system", "content": "System prompt"}]
+    for i in range(20):
+        messages.extend(_tool_turn(i))
+
+    budget = dict(max_total=1500, reserve_for_output=500)
+    window = _manager(strategy="sliding_window", **budget).enforce_budget(messages)
+    assert window[0] is messages[0]
+    assert window[-1] is messages[-1]
+    assert _from_scratch(_manager(), window) <= 1000
+
+    pruned = _manager(strategy="prune_oldest", **budget).enforce_budget(messages)
+    assert pruned[0] is messages[0]
+    assert len(pruned) < len(messages)
+    assert _from_scratch(_manager(), pruned) <= 1000
+
+
+@pytest.mark.benchmark
+def test_benchmark_long_tool_loop():
+    """check_budget time over a 40-turn tool loop, re-tokenizing every check vs incremental."""
+    turns = 40
+    messages = [{"role": "system", "content": "You are an agent with SQL tools. " * 20}]
+
+    scratch = _manager()
+    start = time.perf_counter()
+    for i in range(turns):
+        messages.extend(_tool_turn(i))
+        _from_scratch(scratch, messages)
+    uncached = time.perf_counter() - start
+
+    del messages[1:]
+    manager = _manager()
+    start = time.perf_counter()
+    for i in range(turns):
+        messages.extend(_tool_turn(i))
+        manager.check_budget(messages)
+    incremental = time.perf_counter() - start
+
+    print(f"\n{turns}-turn tool loop budget checks: from scratch {uncached * 1000:.1f}ms  "
+          f"incremental {incremental * 1000:.1f}ms  ({uncached / incremental:.1f}x)")
+    assert manager.stats["messages_tokenized"] == 1 + 2 * turns
+    assert manager.current_usage == _from_scratch(scratch, messages)
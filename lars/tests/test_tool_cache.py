@@ -0,0 +1,131 @@
+"""
+Tests for the shared tool result cache (lars.tool_cache).
+
+Each test gets a fresh process-wide LRU; the persistent tier is a SQLite file
+in a temp directory, so no server is needed.
+"""
+
+import time
+
+import pytest
+
+from lars import tool_cache
+from lars.cascade import ToolCachingConfig, ToolCachePolicy
+from lars.tool_cache import SQLiteToolResultStore, SharedToolCache, ToolCache
+
+
+@pytest.fixture(autouse=True)
+def shared(monkeypatch):
+    instance = SharedToolCache(max_entries=100)
+    monkeypatch.setattr(tool_cache, "_shared_cache", instance)
+    monkeypatch.setattr(tool_cache, "_stores", {})
+    return instance
+
+
+@pytest.fixture
+def sqlite_store(monkeypatch, tmp_path):
+    store = SQLiteToolResultStore(str(tmp_path / "tool_cache.sqlite"))
+    monkeypatch.setitem(tool_cache._stores, "sqlite", store)
+    return store
+
+
+def _config(storage="memory", **policy):
+    return ToolCachingConfig(
+        enabled=True,
+        storage=storage,
+        tools={"sql_data": ToolCachePolicy(key="sql_hash", **policy)},
+    )
+
+
+def test_results_are_shared_across_runner_caches():
+    first = ToolCache(_config())
+    first.set("sql_data", {"sql": "SELECT 1"}, {"rows": [[1]]})
+
+    # A new runner (e.g. one per UDF row) sees the result
+    second = ToolCache(_config())
+    assert second.get("sql_data", {"sql": "SELECT 1"}) == {"rows": [[1]]}
+    assert second.get("sql_data", {"sql": "SELECT 2"}) is None
+    assert (second.stats["hits"], second.stats["misses"]) == (1, 1)
+
+    tools = tool_cache.get_tool_cache_stats()["tools"]
+    assert tools["sql_data"]["hits"] == 1
+    assert tools["sql_data"]["sets"] == 1
+    assert tools["sql_data"]["entries"] == 1
+
+
+def test_reader_policy_ttl_applies(monkeypatch):
+    ToolCache(_config(ttl=3600)).set("sql_data", {"sql": "SELECT 1"}, "one")
+
+    later = time.time() + 120
+    monkeypatch.setattr(tool_cache.time, "time", lambda: later)
+    assert ToolCache(_config(ttl=3600)).get("sql_data", {"sql": "SELECT 1"}) == "one"
+    assert ToolCache(_config(ttl=60)).get("sql_data", {"sql": "SELECT 1"}) is None
+
+
+def test_uncached_tools_and_disabled_policies_are_ignored(shared):
+    cache = ToolCache(_config(enabled=False))
+    cache.set("sql_data", {"sql": "SELECT 1"}, "one")
+    cache.set("other_tool", {"x": 1}, "x")
+    assert shared.get_stats()["size"] == 0
+
+
+def test_lru_grows_to_largest_max_cache_size(shared):
+    config = _config()
+    config.max_cache_size = 3
+    shared.max_entries = 2
+    cache = ToolCache(config)
+
+    for i in range(5):
+        cache.set("sql_data", {"sql": f"SELECT {i}"}, i)
+
+    assert shared.get_stats()["size"] == 3
+    assert cache.stats["evictions"] == 2
+    assert cache.get("sql_data", {"sql": "SELECT 0"}) is None
+    assert cache.get("sql_data", {"sql": "SELECT 4"}) == 4
+
+
+def test_persistent_store_survives_restart(shared, sqlite_store):
+    ToolCache(_config("sqlite")).set("sql_data", {"sql": "SELECT 1"}, {"rows": [[1]]})
+
+    shared.clear()  # Simulate a new process
+    cache = ToolCache(_config("sqlite"))
+    assert cache.get("sql_data", {"sql": "SELECT 1"}) == {"rows": [[1]]}
+
+    stats = tool_cache.get_tool_cache_stats()
+    assert stats["tools"]["sql_data"]["persistent_hits"] == 1
+    assert stats["persistent"]["sqlite"] == {"sql_data": 1}
+
+    # Promoted into the LRU: the next lookup is a memory hit
+    assert cache.get("sql_data", {"sql": "SELECT 1"}) == {"rows": [[1]]}
+    assert tool_cache.get_tool_cache_stats()["tools"]["sql_data"]["hits"] == 1
+
+
+def test_sqlite_rows_past_the_largest_policy_ttl_are_pruned(sqlite_store):
+    ToolCache(_config("sqlite", ttl=60))
+    ToolCache(_config("sqlite", ttl=600))  # The largest TTL wins
+    now = time.time()
+
+    sqlite_store.put("sql_data", "sql_data:expired", '"expired"', now - 900)
+    sqlite_store.put("sql_data", "sql_data:kept", '"kept"', now - 300)
+    assert sqlite_store.get("sql_data", "sql_data:kept") is not None
+    assert sqlite_store.get("sql_data", "sql_data:expired") is None
+
+
+def test_non_json_results_stay_in_memory(shared, sqlite_store):
+    cache = ToolCache(_config("sqlite"))
+    cache.set("sql_data", {"sql": "SELECT 1"}, object())
+
+    assert cache.get("sql_data", {"sql": "SELECT 1"}) is not None
+    assert sqlite_store.count_by_tool() == {}
+
+
+def test_invalidate_drops_memory_and_persistent_entries(shared, sqlite_store):
+    cache = ToolCache(_config("sqlite", invalidate_on=["table_changed"]))
+    cache.set("sql_data", {"sql": "SELECT 1"}, "one")
+
+    cache.invalidate("unrelated")
+    assert cache.get("sql_data", {"sql": "SELECT 1"}) == "one"
+
+    cache.invalidate("table_changed")
+    assert cache.get("sql_data", {"sql": "SELECT 1"}) is None
+    assert sqlite_store.count_by_tool() == {}
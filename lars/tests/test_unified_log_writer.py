@@ -0,0 +1,239 @@
+"""
+Tests for the batched unified_logs writer (UnifiedLogWriter).
+
+The database is a fake that records insert_rows() calls, optionally with
+latency, so no ClickHouse server is needed.
+"""
+
+import threading
+import time
+
+import pytest
+
+from lars.unified_logs import UnifiedLogWriter
+
+
+class FakeDB:
+    def __init__(self, latency_s=0.0):
+        self.latency_s = latency_s
+        self.batches = []
+        self.fail = False
+        self.gate = None
+
+    def insert_rows(self, table, rows, columns=None):
+        if self.gate is not None and threading.current_thread().name == "UnifiedLogWriter":
+            self.gate.wait()
+        time.sleep(self.latency_s)
+        if self.fail:
+            raise RuntimeError("connection refused")
+        self.batches.append((table, list(rows)))
+
+    @property
+    def rows(self):
+        return [row["n"] for _, batch in self.batches for row in batch]
+
+
+def _writer(db, **kwargs):
+    kwargs.setdefault("flush_interval", 10.0)
+    return UnifiedLogWriter(lambda: db, **kwargs)
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def writers():
+    created = []
+    yield created
+    for writer in created:
+        writer.shutdown()
+
+
+class TestBatching:
+    def test_full_batch_is_written_without_waiting_for_interval(self, writers):
+        db = FakeDB()
+        writer = _writer(db, batch_size=10)
+        writers.append(writer)
+
+        for n in range(25):
+            writer.write({"n": n})
+
+        assert _wait_for(lambda: len(db.rows) >= 20)
+        writer.flush()
+        assert db.rows == list(range(25))
+        assert all(table == "unified_logs" for table, _ in db.batches)
+        assert max(len(batch) for _, batch in db.batches) <= 10
+
+    def test_partial_batch_written_after_interval(self, writers):
+        db = FakeDB()
+        writer = _writer(db, batch_size=100, flush_interval=0.05)
+        writers.append(writer)
+
+        writer.write({"n": 1})
+        writer.write({"n": 2})
+
+        assert _wait_for(lambda: db.rows == [1, 2])
+        assert len(db.batches) == 1
+        stats = writer.get_stats()
+        assert stats["last_lag_ms"] >= 0
+        assert stats["queue_depth"] == 0
+
+    def test_flush_writes_everything_queued(self, writers):
+        db = FakeDB()
+        writer = _writer(db, batch_size=4)
+        writers.append(writer)
+
+        for n in range(10):
+            writer.write({"n": n})
+        writer.flush()
+
+        assert sorted(db.rows) == list(range(10))
+        stats = writer.get_stats()
+        assert (stats["enqueued"], stats["rows_written"], stats["queue_depth"]) == (10, 10, 0)
+        assert stats["max_batch_size"] <= 4
+
+    def test_caller_is_not_blocked_by_slow_inserts(self, writers):
+        db = FakeDB(latency_s=0.2)
+        writer = _writer(db, batch_size=50, flush_interval=0.01)
+        writers.append(writer)
+
+        start = time.perf_counter()
+        for n in range(200):
+            writer.write({"n": n})
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.1  # 200 immediate inserts would take 40s
+        writer.flush()
+        assert sorted(db.rows) == list(range(200))
+
+    def test_insert_errors_are_counted(self, writers):
+        db = FakeDB()
+        db.fail = True
+        writer = _writer(db, batch_size=10)
+        writers.append(writer)
+
+        writer.write({"n": 1})
+        writer.flush()
+
+        stats = writer.get_stats()
+        assert (stats["errors"], stats["rows_written"]) == (1, 0)
+
+
+class TestOverflow:
+    def _stalled(self, writers, overflow, **kwargs):
+        """Writer whose flush thread is stuck inside an INSERT (the gate only holds that thread)."""
+        db = FakeDB()
+        db.gate = threading.Event()
+        writer = _writer(db, batch_size=1, queue_max=2, overflow=overflow, **kwargs)
+        writers.append(writer)
+        writer.write({"n": 0})
+        assert _wait_for(lambda: writer.get_stats()["queue_depth"] == 0)  # n=0 is in flight
+        writer.write({"n": 1})
+        writer.write({"n": 2})
+        return db, writer
+
+    def test_drop_newest(self, writers):
+        db, writer = self._stalled(writers, "drop_newest")
+
+        writer.write({"n": 3})
+        db.gate.set()
+        writer.flush()
+
+        assert db.rows == [0, 1, 2]
+        assert writer.get_stats()["dropped"] == 1
+
+    def test_drop_oldest(self, writers):
+        db, writer = self._stalled(writers, "drop_oldest")
+
+        writer.write({"n": 3})
+        db.gate.set()
+        writer.flush()
+
+        assert db.rows == [0, 2, 3]
+        assert writer.get_stats()["dropped"] == 1
+
+    def test_block_waits_for_space(self, writers):
+        db, writer = self._stalled(writers, "block", block_timeout=2.0)
+        threading.Timer(0.1, db.gate.set).start()
+
+        start = time.perf_counter()
+        writer.write({"n": 3})
+        waited = time.perf_counter() - start
+        writer.flush()
+
+        assert waited >= 0.05
+        assert db.rows == [0, 1, 2, 3]
+        stats = writer.get_stats()
+        assert (stats["blocked"], stats["dropped"]) == (1, 0)
+
+    def test_block_timeout_drops(self, writers):
+        db, writer = self._stalled(writers, "block", block_timeout=0.05)
+
+        writer.write({"n": 3})
+        db.gate.set()
+        writer.flush()
+
+        assert db.rows == [0, 1, 2]
+        stats = writer.get_stats()
+        assert (stats["blocked"], stats["dropped"]) == (1, 1)
+
+    def test_sync_writes_on_caller_thread(self, writers):
+        db, writer = self._stalled(writers, "sync")
+
+        writer.write({"n": 3})
+        assert db.rows == [3]
+        db.gate.set()
+        writer.flush()
+
+        assert sorted(db.rows) == [0, 1, 2, 3]
+        assert writer.get_stats()["sync_writes"] == 1
+
+    def test_unknown_policy_rejected(self):
+        with pytest.raises(ValueError):
+            UnifiedLogWriter(lambda: FakeDB(), overflow="spill")
+
+
+def test_logger_queues_rows_and_flush_writes_them(monkeypatch):
+    from lars import unified_logs
+
+    db = FakeDB()
+    monkeypatch.setattr("lars.db_adapter.get_db", lambda: db)
+    logger = unified_logs.UnifiedLogger()
+    monkeypatch.setattr(unified_logs, "_unified_logger", logger)
+    try:
+        unified_logs.log_unified(session_id="s1", trace_id="t1", node_type="message", role="user", content="hi")
+        unified_logs.flush_logs()
+
+        [(table, [row])] = db.batches
+        assert table == "unified_logs"
+        assert row["session_id"] == "s1"
+        assert unified_logs.get_log_writer_stats()["rows_written"] == 1
+    finally:
+        logger.writer.shutdown()
+
+
+def test_mark_take_winner_flushes_queued_rows_first(monkeypatch):
+    from lars import unified_logs
+
+    db = FakeDB()
+    events = []
+    db.mark_take_winner = lambda table, session_id, cell_name, index: events.append(("update", len(db.batches)))
+    monkeypatch.setattr("lars.db_adapter.get_db", lambda: db)
+    logger = unified_logs.UnifiedLogger()
+    logger.writer.flush_interval = 10.0
+    monkeypatch.setattr(unified_logs, "_unified_logger", logger)
+    try:
+        unified_logs.log_unified(session_id="s1", trace_id="t1", node_type="message", role="assistant",
+                                 content="take 1", cell_name="c", take_index=1)
+        unified_logs.mark_take_winner("s1", "c", 1)
+
+        # The take row was INSERTed before the ALTER TABLE ... UPDATE ran
+        assert events == [("update", 1)]
+    finally:
+        logger.writer.shutdown()
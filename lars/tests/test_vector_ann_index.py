@@ -0,0 +1,246 @@
+"""
+Tests for the ANN (HNSW vector_similarity) path of clickhouse_vector_search.
+
+The database adapter runs queries on an embedded chdb session, so the real
+ClickHouse DDL, materialized view and vector index are exercised without a
+server. Set LARS_ANN_BENCH_SIZES (e.g. "100000,1000000") to run the
+recall/latency benchmark at larger sizes.
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+import pytest
+
+from lars.db_adapter import ClickHouseAdapter, vector_literal
+from lars.skills import embedding_storage
+from lars.skills.embedding_storage import ann_table_name, clickhouse_vector_search
+
+chdb_session = pytest.importorskip("chdb.session")
+
+DIM = 16
+
+
+class ChdbAdapter:
+    """The subset of ClickHouseAdapter used by the vector search tools."""
+
+    def __init__(self, session):
+        self.session = session
+        self.queries = []
+
+    def execute(self, sql, params=None):
+        self.session.query(sql)
+
+    def query(self, sql, params=None, output_format="dict"):
+        self.queries.append(sql)
+        out = self.session.query(sql, "JSONEachRow").bytes().decode()
+        return [json.loads(line) for line in out.splitlines() if line]
+
+    def insert_rows(self, table, rows, columns=None):
+        payload = "\n".join(json.dumps(row) for row in rows)
+        self.session.query(f"INSERT INTO {table} FORMAT JSONEachRow\n{payload}")
+
+
+@pytest.fixture(scope="module")
+def session():
+    session = chdb_session.Session()
+    session.query("CREATE DATABASE IF NOT EXISTS lars_ann_test")
+    session.query("USE lars_ann_test")
+    session.query("SET output_format_json_quote_64bit_integers = 0")
+    yield session
+    session.query("DROP DATABASE IF EXISTS lars_ann_test")
+    session.close()
+
+
+@pytest.fixture
+def db(session, monkeypatch):
+    for table in ("lars_embeddings", ann_table_name(DIM), f"{ann_table_name(DIM)}_mv"):
+        session.query(f"DROP TABLE IF EXISTS {table}")
+    adapter = ChdbAdapter(session)
+    monkeypatch.setattr(embedding_storage, "get_db_adapter", lambda: adapter)
+    monkeypatch.setattr(embedding_storage, "_ann_tables", set())
+    monkeypatch.setattr(embedding_storage, "_ann_sources", set())
+    monkeypatch.setattr(embedding_storage, "_ann_unavailable", set())
+    monkeypatch.setattr(embedding_storage, "_ann_builds", {})
+    monkeypatch.setattr(embedding_storage, "_ann_row_counts", {})
+    return adapter
+
+
+def _normalized(vectors):
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _clustered(n, dim, seed=0):
+    """Unit vectors around ~50-row clusters, which is closer to real embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    clusters = max(50, n // 50)
+    centroids = rng.normal(size=(clusters, dim))
+    return _normalized(centroids[rng.integers(0, clusters, n)] + 0.3 * rng.normal(size=(n, dim)))
+
+
+def _queries(vectors, n=20, seed=1):
+    """Queries near stored rows, like a search phrased close to a document."""
+    rng = np.random.default_rng(seed)
+    picked = vectors[rng.integers(0, len(vectors), n)]
+    return _normalized(picked + 0.2 * rng.normal(size=picked.shape))
+
+
+def _store(db, vectors, source_table="products", offset=0):
+    embedding_storage.clickhouse_store_embedding(  # Creates lars_embeddings
+        source_table, str(offset), "row 0", vectors[0].tolist(), "test/embed")
+    rows = [
+        {"source_table": source_table, "source_id": str(offset + i), "text": f"row {offset + i}",
+         "embedding": v.tolist(), "embedding_model": "test/embed", "embedding_dim": len(v)}
+        for i, v in enumerate(vectors[1:], start=1)
+    ]
+    for start in range(0, len(rows), 5000):
+        db.insert_rows("lars_embeddings", rows[start:start + 5000])
+
+
+def _ids(result):
+    return [row["source_id"] for row in result["results"]]
+
+
+class TestAnnSearch:
+    def test_ann_matches_exact_search(self, db):
+        vectors = _clustered(2000, DIM)
+        _store(db, vectors)
+        queries = _queries(vectors)
+
+        recalls = []
+        for q in queries:
+            exact = clickhouse_vector_search(q.tolist(), "products", limit=10, index="exact")
+            ann = clickhouse_vector_search(q.tolist(), "products", limit=10, index="ann")
+            assert (exact["index"], ann["index"]) == ("exact", "ann")
+            recalls.append(len(set(_ids(exact)) & set(_ids(ann))) / 10)
+
+        assert np.mean(recalls) >= 0.9
+
+        # The generated query shape is one ClickHouse serves from the HNSW index
+        ann_sql = db.queries[-1]
+        assert ann_table_name(DIM) in ann_sql
+        plan = db.session.query(f"EXPLAIN indexes = 1 {ann_sql}").bytes().decode()
+        assert "vector_similarity" in plan and "_distance" in plan
+
+    def test_threshold_and_metadata_filter(self, db):
+        vectors = _clustered(200, DIM)
+        _store(db, vectors)
+
+        for index in ("exact", "ann"):
+            result = clickhouse_vector_search(vectors[7].tolist(), "products", limit=50,
+                                              threshold=0.9, index=index)
+            assert _ids(result)[0] == "7"
+            assert result["results"][0]["similarity"] == pytest.approx(1.0, abs=1e-5)
+            assert all(row["similarity"] >= 0.9 for row in result["results"])
+
+            result = clickhouse_vector_search(vectors[7].tolist(), "products", limit=5, index=index,
+                                              metadata_filter="source_id != '7'")
+            assert "7" not in _ids(result)
+
+    def test_auto_switches_to_ann_above_row_threshold(self, db, monkeypatch):
+        config = embedding_storage.get_config()
+        monkeypatch.setattr(config, "vector_index", "auto")
+        monkeypatch.setattr(config, "vector_ann_min_rows", 100)
+        vectors = _clustered(150, DIM)
+
+        _store(db, vectors[:50])
+        assert clickhouse_vector_search(vectors[0].tolist(), "products")["index"] == "exact"
+        assert clickhouse_vector_search(vectors[0].tolist(), "products")["index"] == "exact"
+        assert sum("count()" in sql for sql in db.queries) == 1  # Row count is cached
+
+        _store(db, vectors[50:], offset=50)
+        monkeypatch.setattr(embedding_storage, "ANN_COUNT_RECHECK_SECONDS", 0)
+
+        # The index is built in the background; searches stay exact until it's ready
+        assert clickhouse_vector_search(vectors[120].tolist(), "products", limit=3)["index"] == "exact"
+        embedding_storage._ann_builds[DIM].join()
+
+        result = clickhouse_vector_search(vectors[120].tolist(), "products", limit=3)
+        assert result["index"] == "ann"
+        assert _ids(result)[0] == "120"
+
+        # Rows stored after the index exists reach it through the materialized view
+        _store(db, _clustered(5, DIM, seed=9), offset=1000)
+        new = _clustered(5, DIM, seed=9)[3]
+        assert _ids(clickhouse_vector_search(new.tolist(), "products", limit=1))[0] == "1003"
+
+    def test_other_dimensions_stay_out_of_ann_table(self, db, session):
+        _store(db, _clustered(20, DIM))
+        _store(db, _clustered(20, 8), source_table="small", offset=100)
+
+        clickhouse_vector_search(_clustered(1, DIM)[0].tolist(), "products", index="ann")
+
+        count = session.query(f"SELECT count() FROM {ann_table_name(DIM)}", "CSV").bytes().decode()
+        assert int(count) == 20
+
+
+def test_interrupted_build_is_not_used_and_is_rebuilt(db, session):
+    vectors = _clustered(100, DIM)
+    _store(db, vectors)
+    table = ann_table_name(DIM)
+    embedding_storage.ensure_ann_index(DIM, db)
+
+    # Simulate a build that died part-way through the backfill
+    session.query(f"TRUNCATE TABLE {table}")
+    session.query(f"ALTER TABLE {table} MODIFY COMMENT '{embedding_storage.ANN_BUILDING_COMMENT}'")
+    embedding_storage._ann_tables.clear()
+
+    embedding_storage.ensure_ann_index(DIM, db)
+
+    count = session.query(f"SELECT count() FROM {table}", "CSV").bytes().decode()
+    assert int(count) == 100
+    comment = session.query(f"SELECT comment FROM system.tables WHERE name = '{table}'", "CSV").bytes().decode()
+    assert embedding_storage.ANN_READY_COMMENT in comment
+
+
+def test_adapter_vector_search_sends_vector_once():
+    sent = []
+
+    class Recorder:
+        def query(self, sql, params=None, output_format="dict"):
+            sent.append(sql)
+            return []
+
+    vector = [0.123456789] * 4096
+    ClickHouseAdapter.vector_search(Recorder(), "rag_chunks", "embedding", vector, limit=5, where="rag_id = 'r'")
+
+    [sql] = sent
+    assert sql.count(vector_literal(vector)) == 1
+    assert "0.1234568" in sql and "0.123456789" not in sql
+
+
+@pytest.mark.benchmark
+def test_benchmark_ann_recall_latency(db):
+    """Recall@10 and per-query latency, exact vs ANN. Full sizes via LARS_ANN_BENCH_SIZES."""
+    sizes = [int(n) for n in os.getenv("LARS_ANN_BENCH_SIZES", "5000").split(",")]
+    dim = int(os.getenv("LARS_ANN_BENCH_DIM", str(DIM)))
+
+    for n in sizes:
+        for table in ("lars_embeddings", ann_table_name(dim), f"{ann_table_name(dim)}_mv"):
+            db.session.query(f"DROP TABLE IF EXISTS {table}")
+        embedding_storage._ann_tables.clear()
+        vectors = _clustered(n, dim)
+        _store(db, vectors)
+        queries = _queries(vectors)
+
+        start = time.perf_counter()
+        embedding_storage.ensure_ann_index(dim, db)
+        build_s = time.perf_counter() - start
+
+        timings = {"exact": [], "ann": []}
+        recalls = []
+        for q in queries:
+            found = {}
+            for index in ("exact", "ann"):
+                start = time.perf_counter()
+                found[index] = set(_ids(clickhouse_vector_search(q.tolist(), "products", limit=10, index=index)))
+                timings[index].append(time.perf_counter() - start)
+            recalls.append(len(found["exact"] & found["ann"]) / 10)
+
+        exact_ms = 1000 * np.median(timings["exact"])
+        ann_ms = 1000 * np.median(timings["ann"])
+        print(f"\n{n} x {dim}d: index build {build_s:.1f}s  exact {exact_ms:.1f}ms  "
+              f"ann {ann_ms:.1f}ms  recall@10 {np.mean(recalls):.3f}")
+        assert np.mean(recalls) >= 0.9
@@ -0,0 +1,175 @@
+"""
+Tests for make_vectorized_wrapper (Arrow vectorized semantic UDFs).
+
+The cascade executor is replaced by a counting stub and the SemanticCache is
+backed by the in-process fake from conftest.py, so no LLM or ClickHouse is
+needed.
+"""
+
+import threading
+from types import SimpleNamespace
+
+import pyarrow as pa
+import pytest
+
+from lars import sql_trail
+from lars.sql_tools import cache_adapter
+from lars.sql_tools.udf import make_vectorized_wrapper
+
+
+CALLER_ID = "sql-test-vectorized"
+
+
+class CountingExecutor:
+    """Stands in for execute_cascade_udf and records every call."""
+
+    def __init__(self, result_fn=lambda args: "true"):
+        self.calls = []
+        self._lock = threading.Lock()
+        self._result_fn = result_fn
+
+    def __call__(self, func_name, inputs_json, use_cache=True, caller_id=None):
+        import json
+        args = json.loads(inputs_json)
+        with self._lock:
+            self.calls.append(args)
+        return self._result_fn(args)
+
+
+@pytest.fixture
+def wired_cache(cache_with_db, monkeypatch):
+    cache, db = cache_with_db
+    monkeypatch.setattr(cache_adapter, "get_cache", lambda: cache)
+    monkeypatch.setattr("lars.caller_context.get_caller_context", lambda *a, **k: (CALLER_ID, None))
+    sql_trail.get_and_clear_cache_counts(CALLER_ID)
+    sql_trail.get_and_clear_udf_batch_counts(CALLER_ID)
+    yield cache, db
+    sql_trail.get_and_clear_cache_counts(CALLER_ID)
+    sql_trail.get_and_clear_udf_batch_counts(CALLER_ID)
+
+
+def _entry(returns="BOOLEAN"):
+    return SimpleNamespace(
+        args=[{"name": "text"}, {"name": "criterion"}],
+        returns=returns,
+    )
+
+
+class TestInBatchDedup:
+    def test_duplicate_misses_execute_once(self, wired_cache):
+        executor = CountingExecutor(lambda args: "true" if args["text"].startswith("a") else "false")
+        udf = make_vectorized_wrapper("semantic_matches", _entry(), executor)
+
+        texts = ["apple", "banana", "avocado"] * 100
+        result = udf(pa.array(texts), pa.array(["fruit"] * len(texts)))
+
+        assert len(executor.calls) == 3
+        assert result.to_pylist() == [True, False, True] * 100
+
+    def test_sql_trail_reports_rows_vs_distinct_calls(self, wired_cache):
+        executor = CountingExecutor()
+        udf = make_vectorized_wrapper("semantic_matches", _entry(), executor)
+
+        texts = [f"value {i % 40}" for i in range(1000)]
+        udf(pa.array(texts), pa.array(["c"] * len(texts)))
+
+        assert sql_trail.get_and_clear_udf_batch_counts(CALLER_ID) == (1000, 40)
+
+    def test_cache_hits_are_not_executed(self, wired_cache):
+        cache, _ = wired_cache
+        cache.set("semantic_matches", {"text": "known", "criterion": "c"}, True, "BOOLEAN")
+        executor = CountingExecutor(lambda args: "false")
+        udf = make_vectorized_wrapper("semantic_matches", _entry(), executor)
+
+        result = udf(pa.array(["known", "new", "new"]), pa.array(["c", "c", "c"]))
+
+        assert executor.calls == [{"text": "new", "criterion": "c"}]
+        assert result.to_pylist() == [True, False, False]
+        assert sql_trail.get_and_clear_udf_batch_counts(CALLER_ID) == (3, 1)
+
+    def test_errors_fan_out_to_all_rows(self, wired_cache):
+        def boom(args):
+            raise RuntimeError("provider down")
+
+        udf = make_vectorized_wrapper("semantic_summarize", _entry("VARCHAR"), CountingExecutor(boom))
+
+        result = udf(pa.array(["x", "x"]), pa.array(["c", "c"])).to_pylist()
+
+        assert result[0] == result[1]
+        assert result[0].startswith("ERROR:")
+
+    def test_distinct_results_cached_once(self, wired_cache):
+        cache, db = wired_cache
+        udf = make_vectorized_wrapper("semantic_matches", _entry(), CountingExecutor())
+
+        udf(pa.array(["same"] * 50), pa.array(["c"] * 50))
+        cache.flush()
+
+        written = [row for _, rows in db.inserts for row in rows]
+        assert len(written) == 1
+
+
+class TestEmbedTextColumn:
+    @pytest.fixture
+    def embed_calls(self, monkeypatch):
+        """Deterministic embeddings, recording what each Agent.embed call received."""
+        from lars.agent import Agent
+
+        calls = []
+        monkeypatch.setenv("LARS_EMBED_BACKEND", "deterministic")
+        monkeypatch.setattr("lars.caller_context.get_caller_context", lambda *a, **k: (CALLER_ID, None))
+        real_embed = Agent.embed.__func__
+
+        def recording_embed(cls, texts, **kwargs):
+            calls.append(list(texts))
+            return real_embed(cls, texts, **kwargs)
+
+        monkeypatch.setattr(Agent, "embed", classmethod(recording_embed))
+        sql_trail.get_and_clear_udf_batch_counts(CALLER_ID)
+        yield calls
+        sql_trail.get_and_clear_udf_batch_counts(CALLER_ID)
+
+    def test_column_embedded_once_per_distinct_text(self, embed_calls):
+        from lars.agent import Agent
+        from lars.sql_tools.udf import embed_text_column
+
+        texts = ["red apple", None, "green pear", "red apple", "  ", "green pear"]
+        result = embed_text_column(pa.array(texts))
+
+        assert embed_calls == [["red apple", "green pear"]]
+        assert result.type == pa.list_(pa.float32())
+        rows = result.to_pylist()
+        assert [r is None for r in rows] == [False, True, False, False, True, False]
+        expected = Agent._deterministic_embed(["red apple"], "x")["embeddings"][0]
+        assert rows[0] == pytest.approx(expected, abs=1e-6)
+        assert rows[3] == rows[0]
+        assert sql_trail.get_and_clear_udf_batch_counts(CALLER_ID) == (6, 2)
+
+    def test_failure_returns_nulls(self, embed_calls, monkeypatch):
+        from lars.agent import Agent
+        from lars.sql_tools.udf import embed_text_column
+
+        def boom(cls, texts, **kwargs):
+            raise RuntimeError("provider down")
+
+        monkeypatch.setattr(Agent, "embed", classmethod(boom))
+
+        assert embed_text_column(pa.array(["a", "b"])).to_pylist() == [None, None]
+
+    def test_duckdb_arrow_udf_returns_float_lists(self, embed_calls):
+        import duckdb
+        from lars.sql_tools.udf import embed_text_column
+
+        conn = duckdb.connect()
+        conn.create_function("semantic_embed", lambda texts: embed_text_column(texts), ["VARCHAR"], "FLOAT[]",
+                             type="arrow", null_handling="special")
+        conn.execute("CREATE TABLE docs AS SELECT 'doc ' || (i % 100) AS body FROM range(5000) t(i)")
+
+        kind, dims, rows = conn.execute(
+            "SELECT any_value(typeof(e)), min(len(e)), count(*) "
+            "FROM (SELECT semantic_embed(body) AS e FROM docs)"
+        ).fetchone()
+
+        assert (kind, dims, rows) == ("FLOAT[]", 256, 5000)
+        # DuckDB hands the column over in chunks, not one row at a time
+        assert len(embed_calls) <= 5 and all(len(c) <= 100 for c in embed_calls)